@@ -4,6 +4,11 @@ from app.api.endpoints import batidas, feriados, justificativas, secretarias, se
 from app.api.endpoints import auth  # Importação explícita
 from app.api.endpoints import logs_auditoria
 from app.api.endpoints import dashboard
+from app.api.endpoints import tarefas
+from app.api.endpoints import fechamentos
+from app.api.endpoints import anomalias
+from app.api.endpoints import sequencias
+from app.api.endpoints import diagnostico
 
 
 api_router = APIRouter()
@@ -22,5 +27,10 @@ api_router.include_router(secretarias.router, prefix="/secretarias", tags=["secr
 api_router.include_router(servidores.router, prefix="/servidores", tags=["servidores"])
 api_router.include_router(importacao.router, prefix="/importacao", tags=["importacao"])
 api_router.include_router(logs_auditoria.router, prefix="/logs_auditoria", tags=["logs_auditoria"])
+api_router.include_router(tarefas.router, prefix="/tarefas", tags=["tarefas"])
+api_router.include_router(fechamentos.router, prefix="/fechamentos", tags=["fechamentos"])
+api_router.include_router(anomalias.router, prefix="/anomalias", tags=["anomalias"])
+api_router.include_router(sequencias.router, prefix="/analises", tags=["analises"])
+api_router.include_router(diagnostico.router, prefix="/diagnostico", tags=["diagnostico"])
 
 
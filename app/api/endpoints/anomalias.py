@@ -0,0 +1,51 @@
+# app/api/endpoints/anomalias.py
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.session import get_db, get_db_leitura
+from app.schemas.anomalia_batida import AnomaliaBatidaInDB, VarreduraAnomaliasResultado
+from app.services.anomalias_service import TIPOS_ANOMALIA, DetectorAnomalias
+
+router = APIRouter()
+
+def _validar_periodo(data_inicio: date, data_fim: date):
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+
+@router.post("/varredura", response_model=VarreduraAnomaliasResultado)
+def executar_varredura(data_inicio: date, data_fim: date, secretaria_id: Optional[int] = None,
+                       db: Session = Depends(get_db)):
+    """
+    Varre as batidas originais do período em busca de anomalias (quantidade
+    ímpar no dia, batidas duplicadas, entrada/saída fora de sequência e
+    entrada sem saída) e substitui as anomalias gravadas do período.
+    """
+    _validar_periodo(data_inicio, data_fim)
+    por_tipo = DetectorAnomalias(db).detectar(data_inicio, data_fim, secretaria_id)
+    return VarreduraAnomaliasResultado(
+        periodo_inicio=data_inicio,
+        periodo_fim=data_fim,
+        secretaria_id=secretaria_id,
+        total=sum(por_tipo.values()),
+        por_tipo=por_tipo,
+    )
+
+@router.get("/", response_model=List[AnomaliaBatidaInDB])
+def read_anomalias(
+    data_inicio: date,
+    data_fim: date,
+    servidor_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Lista as anomalias gravadas pela última varredura do período.
+    """
+    _validar_periodo(data_inicio, data_fim)
+    if tipo and tipo not in TIPOS_ANOMALIA:
+        raise HTTPException(status_code=400, detail=f"Tipo inválido. Use: {', '.join(TIPOS_ANOMALIA)}")
+    return DetectorAnomalias(db).listar(data_inicio, data_fim, servidor_id, tipo, skip, limit)
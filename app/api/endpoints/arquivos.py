@@ -1,17 +1,16 @@
 # app/api/endpoints/arquivos.py
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 
 from app.db.session import get_db
 from app.services.file_processor import ArquivoPontoProcessor
-from app.services.ponto_processor import ProcessaPonto
+from app.services.fila_tarefas import enfileirar_tarefa
 
 router = APIRouter()
 
 @router.post("/upload/", response_model=Dict[str, Any])
 async def upload_arquivo_ponto(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
@@ -23,11 +22,11 @@ async def upload_arquivo_ponto(
         processor = ArquivoPontoProcessor(db)
         result = await processor.process_file(file)
         
-        # Agenda o processamento das batidas em segundo plano
-        # para calcular horas extras, faltas, etc.
-        background_tasks.add_task(
-            ProcessaPonto(db).processar_batidas_importadas
-        )
+        # Enfileira o processamento das batidas para o worker
+        # (python -m app.worker) calcular horas extras, faltas, etc.
+        tarefa = enfileirar_tarefa(db, "processar_batidas")
+        db.commit()
+        result["tarefa_id"] = tarefa.id
         
         return result
     except ValueError as e:
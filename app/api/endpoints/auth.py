@@ -8,7 +8,9 @@ from app.core.email import send_reset_password_email, send_test_email
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 
 from fastapi import Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from urllib.parse import quote_plus
 
 from app.core.auth import (
@@ -16,7 +18,7 @@ from app.core.auth import (
     obter_usuario_atual, obter_hash_senha, verificar_senha
 )
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.usuario import Usuario
 from app.schemas.usuario import (
     CredenciaisLogin, AlterarSenha, PasswordRecoveryRequest, ResetPasswordRequest
@@ -51,14 +53,14 @@ async def test_email(email: str = Query(..., description="Email para enviar o te
 @router.post("/token", response_model=Token)
 async def login_para_token_acesso(
     credenciais: CredenciaisLogin, # Alterado de form_data: OAuth2PasswordRequestForm
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Endpoint para obtenção de token JWT usando e-mail e senha em JSON.
     (Substitui a necessidade de usar form-data para /token)
     """
     # Autenticar usando e-mail (CORRIGIDO)
-    usuario = autenticar_usuario(db, email=credenciais.email, password=credenciais.password)
+    usuario = await autenticar_usuario(db, email=credenciais.email, password=credenciais.password)
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,13 +87,13 @@ async def login_para_token_acesso(
 @router.post("/login", response_model=Token)
 async def login(
     credenciais: CredenciaisLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Endpoint para login com credenciais (e-mail e senha) em JSON.
     """
     # Autenticar usando e-mail (CORRIGIDO)
-    usuario = autenticar_usuario(db, email=credenciais.email, password=credenciais.password)
+    usuario = await autenticar_usuario(db, email=credenciais.email, password=credenciais.password)
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -127,13 +129,15 @@ async def ler_usuarios_me(
 async def alterar_senha(
     dados: AlterarSenha,
     usuario_atual: UserInDB = Depends(obter_usuario_atual),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Altera a senha do usuário atual.
     """
     # Buscar usuário no banco pelo username (vindo do token via obter_usuario_atual)
-    usuario = db.query(Usuario).filter(Usuario.username == usuario_atual.username).first()
+    usuario = (await db.execute(
+        select(Usuario).where(Usuario.username == usuario_atual.username)
+    )).scalars().first()
     if not usuario:
         # Esta situação é improvável se o token for válido
         raise HTTPException(
@@ -142,15 +146,15 @@ async def alterar_senha(
         )
     
     # Verificar senha atual
-    if not verificar_senha(dados.senha_atual, usuario.senha_hash):
+    if not await run_in_threadpool(verificar_senha, dados.senha_atual, usuario.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Senha atual incorreta",
         )
     
     # Atualizar senha
-    usuario.senha_hash = obter_hash_senha(dados.nova_senha)
-    db.commit()
+    usuario.senha_hash = await run_in_threadpool(obter_hash_senha, dados.nova_senha)
+    await db.commit()
     
     return {"message": "Senha alterada com sucesso"}
 
@@ -160,14 +164,14 @@ async def alterar_senha(
 async def solicitar_recuperacao_senha(
     request_data: PasswordRecoveryRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Solicita a recuperação de senha para um e-mail.
     Gera um token, salva no banco e envia um e-mail com o link de redefinição.
     """
     logger.info(f"Solicitação de recuperação de senha para o e-mail: {request_data.email}")
-    usuario = db.query(Usuario).filter(Usuario.email == request_data.email).first()
+    usuario = (await db.execute(select(Usuario).where(Usuario.email == request_data.email))).scalars().first()
 
     if usuario:
         logger.info(f"Usuário encontrado: {usuario.username}, ID: {usuario.id}")
@@ -194,10 +198,10 @@ async def solicitar_recuperacao_senha(
         # Salvar token no banco
         usuario.reset_token = token
         usuario.reset_token_expires_at = expires_at
-        db.commit()
+        await db.commit()
         
         # Verificar como o token foi salvo
-        usuario_atualizado = db.query(Usuario).filter(Usuario.id == usuario.id).first()
+        usuario_atualizado = (await db.execute(select(Usuario).where(Usuario.id == usuario.id))).scalars().first()
         print(f"DEBUG - Token salvo no banco: '{usuario_atualizado.reset_token}'")
         logger.debug(f"Token salvo no banco: '{usuario_atualizado.reset_token}'")
         
@@ -220,7 +224,7 @@ async def solicitar_recuperacao_senha(
 async def forgot_password(
     request_data: PasswordRecoveryRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """Alias para solicitar_recuperacao_senha"""
     return await solicitar_recuperacao_senha(request_data, background_tasks, db)
@@ -231,7 +235,7 @@ async def forgot_password(
 @router.post("/reset-password", status_code=status.HTTP_200_OK)
 async def redefinir_senha(
     request_data: ResetPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Redefine a senha do usuário usando o token recebido.
@@ -249,7 +253,7 @@ async def redefinir_senha(
     logger.info(f"Tentativa de redefinição de senha com token de {len(token_recebido)} caracteres")
     
     # Buscar usuário pelo token
-    usuario = db.query(Usuario).filter(Usuario.reset_token == token_recebido).first()
+    usuario = (await db.execute(select(Usuario).where(Usuario.reset_token == token_recebido))).scalars().first()
 
     if not usuario:
         logger.warning(f"Token não encontrado no banco de dados")
@@ -281,7 +285,7 @@ async def redefinir_senha(
         # Limpar token expirado
         usuario.reset_token = None
         usuario.reset_token_expires_at = None
-        db.commit()
+        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -304,17 +308,17 @@ async def redefinir_senha(
     # Redefinir a senha
     try:
         # Atualizar senha
-        usuario.senha_hash = obter_hash_senha(request_data.nova_senha)
+        usuario.senha_hash = await run_in_threadpool(obter_hash_senha, request_data.nova_senha)
         usuario.reset_token = None
         usuario.reset_token_expires_at = None
         
-        db.commit()
+        await db.commit()
         logger.info(f"Senha redefinida com sucesso para o usuário {usuario.username}")
         
         return {"message": "Senha redefinida com sucesso! Você já pode fazer login com sua nova senha."}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erro ao redefinir senha: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
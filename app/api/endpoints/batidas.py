@@ -1,14 +1,24 @@
 # app/api/endpoints/batidas.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List, Optional
+from datetime import date
+import json
 
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal, get_db_leitura
+from app.models.anomalia_batida import AnomaliaBatida
 from app.models.batida import BatidaOriginal, BatidaProcessada
+from app.models.servidor import Servidor
 from app.schemas.batida import (
     BatidaOriginalCreate, BatidaOriginalInDB,
     BatidaProcessadaCreate, BatidaProcessadaUpdate, BatidaProcessadaInDB
 )
+from app.schemas.resumo_diario import ResumoDiarioInDB, TotalDiarioInDB, DivergenciaTotalDiario
+from app.services.apuracao_sql import ApuracaoSQL
+from app.services.resumo_diario_service import ResumoDiarioService
+from app.services.fechamento_snapshot import obter_espelho_congelado
+from app.services.ponto_processor import PontoProcessor
 
 router = APIRouter()
 
@@ -17,17 +27,18 @@ router = APIRouter()
 def create_batida_original(batida: BatidaOriginalCreate, db: Session = Depends(get_db)):
     db_batida = BatidaOriginal(**batida.dict())
     db.add(db_batida)
+    ResumoDiarioService(db).invalidar_batidas([(db_batida.servidor_id, db_batida.data_hora)])
     db.commit()
     db.refresh(db_batida)
     return db_batida
 
 @router.get("/originais/", response_model=List[BatidaOriginalInDB])
-def read_batidas_originais(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_batidas_originais(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     batidas = db.query(BatidaOriginal).offset(skip).limit(limit).all()
     return batidas
 
 @router.get("/originais/{batida_id}", response_model=BatidaOriginalInDB)
-def read_batida_original(batida_id: int, db: Session = Depends(get_db)):
+def read_batida_original(batida_id: int, db: Session = Depends(get_db_leitura)):
     batida = db.query(BatidaOriginal).filter(BatidaOriginal.id == batida_id).first()
     if batida is None:
         raise HTTPException(status_code=404, detail="Batida não encontrada")
@@ -39,11 +50,135 @@ def delete_batida_original(batida_id: int, db: Session = Depends(get_db)):
     if batida is None:
         raise HTTPException(status_code=404, detail="Batida não encontrada")
     
+    ResumoDiarioService(db).invalidar_batidas([(batida.servidor_id, batida.data_hora)])
+    # As referências à batida não têm chave estrangeira (tabela particionada):
+    # anula a das batidas processadas e remove as anomalias, como faziam as FKs
+    db.query(BatidaProcessada).filter(
+        BatidaProcessada.batida_original_id == batida.id,
+        BatidaProcessada.data_hora == batida.data_hora
+    ).update({BatidaProcessada.batida_original_id: None}, synchronize_session=False)
+    db.query(AnomaliaBatida).filter(
+        AnomaliaBatida.batida_original_id == batida.id
+    ).delete(synchronize_session=False)
     db.delete(batida)
     db.commit()
     return None
 
+# Espelho de ponto materializado
+@router.get("/espelho-ponto", response_model=List[ResumoDiarioInDB])
+def read_espelho_ponto(servidor_id: int, data_inicio: date, data_fim: date, db: Session = Depends(get_db)):
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    # Meses congelados são lidos do snapshot, sem consulta ao banco
+    espelho, pendentes = obter_espelho_congelado(servidor_id, data_inicio, data_fim)
+    try:
+        for inicio, fim in pendentes:
+            espelho.extend(ResumoDiarioService(db).obter_espelho(servidor_id, inicio, fim))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return sorted(espelho, key=lambda dia: dia["data"] if isinstance(dia, dict) else dia.data)
+
+@router.get("/totais-diarios", response_model=List[TotalDiarioInDB])
+def read_totais_diarios(
+    data_inicio: date,
+    data_fim: date,
+    servidor_id: Optional[int] = None,
+    secretaria_id: Optional[int] = None,
+    intervalo_minimo: Optional[int] = None,
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Minutos trabalhados por servidor e dia, calculados no banco a partir das
+    batidas originais (sem horário previsto, tolerâncias nem turnos noturnos).
+    Não substitui o espelho: os totais oficiais estão em resumos_diarios.
+    """
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    servidor_ids = [servidor_id] if servidor_id is not None else None
+    return [
+        total._asdict()
+        for total in ApuracaoSQL(db).totais_diarios(data_inicio, data_fim, servidor_ids, secretaria_id, intervalo_minimo)
+    ]
+
+@router.get("/totais-diarios/validacao", response_model=List[DivergenciaTotalDiario])
+def validar_totais_diarios(servidor_id: int, data_inicio: date, data_fim: date, db: Session = Depends(get_db)):
+    """
+    Compara os totais calculados no banco com a calculadora de horas do
+    sistema para o servidor no período. Retorna apenas os dias divergentes.
+    """
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    return ApuracaoSQL(db).validar(servidor_id, data_inicio, data_fim)
+
 # Rotas para BatidaProcessada
+def _linha_ndjson(registro: dict) -> bytes:
+    return (json.dumps(registro, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _gerar_processamento_ndjson(servidor_ids: List[int], data_inicio: date, data_fim: date) -> Iterator[bytes]:
+    """
+    Processa servidor a servidor, dia a dia, emitindo uma linha NDJSON por dia
+    e uma linha de totais por servidor. Usa sessão própria, pois a resposta
+    continua sendo enviada depois que a rota retorna; as consultas dela ainda
+    são contadas na rota pela instrumentação (app.db.instrumentacao).
+    """
+    db = SessionLocal()
+    try:
+        processor = PontoProcessor(db)
+        for servidor_id in servidor_ids:
+            totais = {"regular": 0, "irregular": 0, "justificada": 0}
+            try:
+                for dia in processor.iterar_dias(servidor_id, data_inicio, data_fim):
+                    totais[dia["status"]] = totais.get(dia["status"], 0) + 1
+                    yield _linha_ndjson({"tipo": "dia", "servidor_id": servidor_id, **dia})
+            except ValueError as e:
+                db.rollback()
+                yield _linha_ndjson({"tipo": "erro", "servidor_id": servidor_id, "erro": str(e)})
+                continue
+            yield _linha_ndjson({
+                "tipo": "total",
+                "servidor_id": servidor_id,
+                "total_processado": sum(totais.values()),
+                "total_regular": totais["regular"],
+                "total_irregular": totais["irregular"],
+                "total_justificada": totais["justificada"],
+            })
+    finally:
+        db.close()
+
+@router.post("/processamento/stream")
+def stream_processamento(
+    data_inicio: date,
+    data_fim: date,
+    servidor_id: Optional[int] = None,
+    secretaria_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Processa o período e transmite o resultado em NDJSON (uma linha JSON por
+    dia, seguida de uma linha de totais por servidor) à medida que é calculado.
+    Informe servidor_id ou secretaria_id (todos os servidores ativos). É POST
+    porque grava resumos, batidas processadas e o banco de horas.
+    """
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    if (servidor_id is None) == (secretaria_id is None):
+        raise HTTPException(status_code=400, detail="Informe servidor_id ou secretaria_id")
+
+    if servidor_id is not None:
+        servidor_ids = [servidor_id]
+    else:
+        servidor_ids = [
+            s for (s,) in db.query(Servidor.id).filter(
+                Servidor.secretaria_id == secretaria_id,
+                Servidor.ativo == True
+            ).order_by(Servidor.id)
+        ]
+
+    return StreamingResponse(
+        _gerar_processamento_ndjson(servidor_ids, data_inicio, data_fim),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/processadas/", response_model=BatidaProcessadaInDB, status_code=status.HTTP_201_CREATED)
 def create_batida_processada(batida: BatidaProcessadaCreate, db: Session = Depends(get_db)):
     db_batida = BatidaProcessada(**batida.dict())
@@ -53,12 +188,12 @@ def create_batida_processada(batida: BatidaProcessadaCreate, db: Session = Depen
     return db_batida
 
 @router.get("/processadas/", response_model=List[BatidaProcessadaInDB])
-def read_batidas_processadas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_batidas_processadas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     batidas = db.query(BatidaProcessada).offset(skip).limit(limit).all()
     return batidas
 
 @router.get("/processadas/{batida_id}", response_model=BatidaProcessadaInDB)
-def read_batida_processada(batida_id: int, db: Session = Depends(get_db)):
+def read_batida_processada(batida_id: int, db: Session = Depends(get_db_leitura)):
     batida = db.query(BatidaProcessada).filter(BatidaProcessada.id == batida_id).first()
     if batida is None:
         raise HTTPException(status_code=404, detail="Batida processada não encontrada")
@@ -1,21 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict, Any, List
+from sqlalchemy import func, select
+from typing import Dict, Any, List, Optional
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db, get_db_leitura
 from app.models.servidor import Servidor
+from app.schemas.pontualidade import PercentisPontualidade
+from app.schemas.tarefa_processamento import TarefaProcessamentoInDB
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.pontualidade_service import PontualidadeService
 
 router = APIRouter()
 
 @router.get("/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
     """
     Retorna estatísticas para o dashboard
     """
     try:
         # Contagem real de servidores
-        total_servidores = db.query(func.count(Servidor.id)).scalar() or 0
+        total_servidores = (await db.execute(select(func.count(Servidor.id)))).scalar() or 0
         
         # Mantém os outros valores sintéticos
         return {
@@ -42,4 +48,42 @@ async def get_recent_activities():
         {"servidor": "Carlos Santos", "tipo": "Justificativa", "data": "03/05/2025", "status": "Rejeitado"},
         {"servidor": "Ana Pereira", "tipo": "Batida", "data": "03/05/2025", "status": "Aprovado"},
         {"servidor": "Pedro Souza", "tipo": "Justificativa", "data": "02/05/2025", "status": "Pendente"}
-    ]
\ No newline at end of file
+    ]
+
+@router.get("/pontualidade", response_model=List[PercentisPontualidade])
+def get_pontualidade(
+    data_inicio: date,
+    data_fim: date,
+    tipo: str = "entrada",
+    secretaria_id: Optional[int] = None,
+    quantis: List[float] = Query([0.5, 0.9, 0.99]),
+    db: Session = Depends(get_db_leitura)
+):
+    """
+    Percentis do desvio de horário (minutos em relação ao previsto) na
+    entrada ou na saída, por secretaria e no total, somando os esboços
+    diários do período.
+    """
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    try:
+        return PontualidadeService(db).percentis(data_inicio, data_fim, tipo, secretaria_id, tuple(quantis))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/pontualidade/atualizar", response_model=TarefaProcessamentoInDB, status_code=status.HTTP_202_ACCEPTED)
+def atualizar_pontualidade(data_inicio: date, data_fim: date, secretaria_id: Optional[int] = None,
+                           db: Session = Depends(get_db)):
+    """
+    Enfileira a reconstrução dos esboços de pontualidade do período (ex.:
+    após alterar horários). As importações de arquivo já os atualizam.
+    """
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    tarefa = enfileirar_tarefa(db, "atualizar_pontualidade", {
+        "data_inicio": data_inicio.isoformat(),
+        "data_fim": data_fim.isoformat(),
+        "secretaria_id": secretaria_id,
+    })
+    db.commit()
+    return tarefa
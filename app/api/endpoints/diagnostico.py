@@ -0,0 +1,30 @@
+# app/api/endpoints/diagnostico.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Any, List
+
+from app.core.auth import verificar_admin
+from app.db.instrumentacao import estatisticas_rotas
+from app.schemas.diagnostico import EstatisticaConsultasRota
+
+router = APIRouter()
+
+@router.get("/consultas", response_model=List[EstatisticaConsultasRota])
+def read_estatisticas_consultas(
+    ordenar_por: str = "tempo_db_total_ms",
+    limite: int = Query(50, ge=1, le=500),
+    usuario_atual: Any = Depends(verificar_admin)
+):
+    """
+    Consultas ao banco por rota neste processo da API: quantidade, tempo e
+    SQL repetido na mesma requisição (prováveis N+1).
+    """
+    try:
+        return estatisticas_rotas.resumo(ordenar_por, limite)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/consultas", status_code=status.HTTP_204_NO_CONTENT)
+def limpar_estatisticas_consultas(usuario_atual: Any = Depends(verificar_admin)):
+    """Zera as estatísticas de consultas deste processo (ex.: antes de medir uma mudança)."""
+    estatisticas_rotas.limpar()
+    return None
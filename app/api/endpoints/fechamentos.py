@@ -0,0 +1,97 @@
+# app/api/endpoints/fechamentos.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+
+from app.db.session import get_db, get_db_leitura
+from app.models.secretaria import Secretaria
+from app.schemas.fechamento import FechamentoSnapshotInfo, FechamentoRelatorioSecretaria
+from app.schemas.regras_calculo import SimulacaoRegrasResultado
+from app.schemas.tarefa_processamento import TarefaProcessamentoInDB
+from app.services.fechamento_snapshot import SnapshotSecretaria, obter_mes_fechado
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.simulacao_regras import simular_regras
+
+router = APIRouter()
+
+def _validar_mes(mes: int):
+    if mes < 1 or mes > 12:
+        raise HTTPException(status_code=400, detail="Mês inválido")
+
+def _info_snapshot(snapshot: SnapshotSecretaria) -> FechamentoSnapshotInfo:
+    manifesto = snapshot.manifesto
+    return FechamentoSnapshotInfo(
+        ano=manifesto["ano"],
+        mes=manifesto["mes"],
+        secretaria_id=manifesto["secretaria_id"],
+        periodo_inicio=manifesto["periodo_inicio"],
+        periodo_fim=manifesto["periodo_fim"],
+        gerado_em=manifesto["gerado_em"],
+        linhas=manifesto["linhas"],
+        total_servidores=len(snapshot.servidores),
+    )
+
+@router.post("/{ano}/{mes}/congelar", response_model=List[TarefaProcessamentoInDB], status_code=status.HTTP_202_ACCEPTED)
+def congelar_fechamento(ano: int, mes: int, secretaria_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Enfileira o congelamento do mês em snapshots imutáveis, por secretaria.
+    Sem secretaria_id, congela todas as secretarias ativas ainda não congeladas.
+    """
+    _validar_mes(mes)
+    if secretaria_id is not None:
+        secretaria_ids = [secretaria_id]
+    else:
+        secretaria_ids = [s for (s,) in db.query(Secretaria.id).filter(Secretaria.ativo == True).order_by(Secretaria.id)]
+
+    mes_fechado = obter_mes_fechado(ano, mes)
+    congeladas = set(mes_fechado.secretarias) if mes_fechado else set()
+
+    tarefas = [
+        enfileirar_tarefa(db, "congelar_fechamento", {"ano": ano, "mes": mes, "secretaria_id": s})
+        for s in secretaria_ids
+        if s not in congeladas
+    ]
+    db.commit()
+    return tarefas
+
+@router.get("/{ano}/{mes}", response_model=List[FechamentoSnapshotInfo])
+def read_fechamento(ano: int, mes: int):
+    """
+    Lista os snapshots congelados do mês (lidos do disco, sem consulta ao banco).
+    """
+    _validar_mes(mes)
+    mes_fechado = obter_mes_fechado(ano, mes)
+    if mes_fechado is None:
+        return []
+    return [_info_snapshot(snapshot) for _, snapshot in sorted(mes_fechado.secretarias.items())]
+
+@router.get("/{ano}/{mes}/secretarias/{secretaria_id}", response_model=FechamentoRelatorioSecretaria)
+def read_relatorio_fechamento(ano: int, mes: int, secretaria_id: int):
+    """
+    Relatório do mês fechado de uma secretaria, com os totais por servidor
+    calculados sobre o snapshot congelado.
+    """
+    _validar_mes(mes)
+    mes_fechado = obter_mes_fechado(ano, mes)
+    snapshot = mes_fechado.secretarias.get(secretaria_id) if mes_fechado else None
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Mês não congelado para esta secretaria")
+    return FechamentoRelatorioSecretaria(
+        snapshot=_info_snapshot(snapshot),
+        servidores=snapshot.totais_por_servidor(),
+    )
+
+@router.post("/{ano}/{mes}/simulacao-regras", response_model=SimulacaoRegrasResultado)
+def simular_regras_fechamento(ano: int, mes: int, regras: Dict[str, Any], secretaria_id: Optional[int] = None,
+                              db: Session = Depends(get_db_leitura)):
+    """
+    Simula o mês com as regras propostas, sem gravar nada. Apenas os campos
+    informados sobrescrevem as regras vigentes de cada secretaria
+    (ex.: {"tolerancia_batida_minutos": 10}); retorna os totais atuais e
+    propostos e os dias que mudariam de status.
+    """
+    _validar_mes(mes)
+    try:
+        return simular_regras(db, ano, mes, regras, secretaria_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
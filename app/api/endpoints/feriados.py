@@ -3,12 +3,24 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_db, get_db_leitura
 from app.models.feriado import Feriado
 from app.schemas.feriado import FeriadoCreate, FeriadoUpdate, FeriadoInDB
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.resumo_diario_service import ResumoDiarioService
 
 router = APIRouter()
 
+def _recalcular_datas(db: Session, *datas):
+    """
+    Marca as datas como desatualizadas no espelho e enfileira o recálculo em
+    lote de cada uma para todos os servidores. Não faz commit.
+    """
+    servico = ResumoDiarioService(db)
+    for data in sorted(set(datas)):
+        servico.invalidar_data(data)
+        enfileirar_tarefa(db, "recalcular_data", {"data": data.isoformat()})
+
 @router.post("/", response_model=FeriadoInDB, status_code=status.HTTP_201_CREATED)
 def create_feriado(feriado: FeriadoCreate, db: Session = Depends(get_db)):
     # Verificar se já existe um feriado nessa data
@@ -21,17 +33,18 @@ def create_feriado(feriado: FeriadoCreate, db: Session = Depends(get_db)):
     
     db_feriado = Feriado(**feriado.dict())
     db.add(db_feriado)
+    _recalcular_datas(db, db_feriado.data)
     db.commit()
     db.refresh(db_feriado)
     return db_feriado
 
 @router.get("/", response_model=List[FeriadoInDB])
-def read_feriados(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_feriados(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     feriados = db.query(Feriado).order_by(Feriado.data).offset(skip).limit(limit).all()
     return feriados
 
 @router.get("/{feriado_id}", response_model=FeriadoInDB)
-def read_feriado(feriado_id: int, db: Session = Depends(get_db)):
+def read_feriado(feriado_id: int, db: Session = Depends(get_db_leitura)):
     feriado = db.query(Feriado).filter(Feriado.id == feriado_id).first()
     if feriado is None:
         raise HTTPException(status_code=404, detail="Feriado não encontrado")
@@ -43,10 +56,12 @@ def update_feriado(feriado_id: int, feriado: FeriadoUpdate, db: Session = Depend
     if db_feriado is None:
         raise HTTPException(status_code=404, detail="Feriado não encontrado")
     
+    data_anterior = db_feriado.data
     update_data = feriado.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_feriado, key, value)
     
+    _recalcular_datas(db, data_anterior, db_feriado.data)
     db.commit()
     db.refresh(db_feriado)
     return db_feriado
@@ -57,6 +72,7 @@ def delete_feriado(feriado_id: int, db: Session = Depends(get_db)):
     if feriado is None:
         raise HTTPException(status_code=404, detail="Feriado não encontrado")
     
+    _recalcular_datas(db, feriado.data)
     db.delete(feriado)
     db.commit()
     return None
\ No newline at end of file
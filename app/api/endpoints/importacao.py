@@ -1,16 +1,16 @@
 # app/api/endpoints/importacao.py
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 
 from app.db.session import get_db
 from app.services.file_import_service import ImportadorArquivoPonto
+from app.services.fila_tarefas import enfileirar_tarefa
 
 router = APIRouter()
 
 @router.post("/upload/", response_model=Dict[str, Any])
 async def importar_arquivo_ponto(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
@@ -32,11 +32,11 @@ async def importar_arquivo_ponto(
         importador = ImportadorArquivoPonto(db)
         resultado = await importador.importar_arquivo(file)
         
-        # Comentado temporariamente até implementarmos o processador de batidas
-        # if resultado["registros_importados"] > 0:
-        #     background_tasks.add_task(
-        #         ProcessadorBatidas(db).processar_batidas_nao_processadas
-        #     )
+        # Enfileira o processamento das batidas importadas para o worker (python -m app.worker)
+        if resultado["registros_importados"] > 0:
+            tarefa = enfileirar_tarefa(db, "processar_batidas")
+            db.commit()
+            resultado["tarefa_id"] = tarefa.id
         
         return resultado
     except Exception as e:
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.core.auth import obter_usuario_atual, verificar_gestor, verificar_permissao_justificativa
-from app.db.session import get_db
+from app.db.session import get_db, get_db_leitura
 from app.models.justificativa import Justificativa
 from app.models.servidor import Servidor
 from app.schemas.justificativa import (
@@ -15,9 +15,20 @@ from app.schemas.justificativa import (
     JustificativaList, JustificativaFilter, JustificativaAprovacao
 )
 from app.schemas.usuario import UsuarioInDB  # Corrigido: UserInDB -> UsuarioInDB
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.resumo_diario_service import ResumoDiarioService
 
 router = APIRouter()
 
+def _reprocessar_dia(db: Session, servidor_id: int, data: date):
+    """
+    Marca o dia como desatualizado e enfileira o reprocessamento apenas desse
+    (servidor, data), que atualiza o espelho, as batidas processadas e o banco
+    de horas. Não faz commit.
+    """
+    ResumoDiarioService(db).invalidar_dia(servidor_id, data)
+    enfileirar_tarefa(db, "processar_dias", {"servidor_id": servidor_id, "datas": [data.isoformat()]})
+
 @router.post("/", response_model=JustificativaInDB, status_code=status.HTTP_201_CREATED)
 def criar_justificativa(
     justificativa: JustificativaCreate,
@@ -52,6 +63,7 @@ def criar_justificativa(
     # Criar justificativa
     db_justificativa = Justificativa(**justificativa.dict())
     db.add(db_justificativa)
+    ResumoDiarioService(db).invalidar_dia(db_justificativa.servidor_id, db_justificativa.data)
     db.commit()
     db.refresh(db_justificativa)
     
@@ -59,7 +71,7 @@ def criar_justificativa(
 
 @router.get("/", response_model=JustificativaList)
 def listar_justificativas(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     usuario_atual: UsuarioInDB = Depends(obter_usuario_atual),  # Corrigido: UserInDB -> UsuarioInDB
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -121,7 +133,7 @@ def listar_justificativas(
 @router.get("/{justificativa_id}", response_model=JustificativaInDB)
 def ler_justificativa(
     justificativa_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_leitura),
     usuario_atual: UsuarioInDB = Depends(obter_usuario_atual)  # Corrigido: UserInDB -> UsuarioInDB
 ) -> Any:
     """
@@ -215,16 +227,25 @@ def atualizar_justificativa(
         )
     
     # Atualizar campos
+    status_anterior = db_justificativa.status
+    data_anterior = db_justificativa.data
     update_data = justificativa_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_justificativa, key, value)
     
     # Se estiver aprovando a justificativa, adicionar timestamp
-    if update_data.get("status") == "aprovada" and db_justificativa.status != "aprovada":
+    if update_data.get("status") == "aprovada" and status_anterior != "aprovada":
         db_justificativa.aprovado_em = datetime.now()
         if not db_justificativa.aprovado_por and usuario_atual.nome_completo:
             db_justificativa.aprovado_por = usuario_atual.nome_completo
     
+    if db_justificativa.status != status_anterior or db_justificativa.data != data_anterior:
+        # Aprovação, rejeição ou mudança de data: reprocessa só os dias afetados
+        _reprocessar_dia(db, db_justificativa.servidor_id, db_justificativa.data)
+        if db_justificativa.data != data_anterior:
+            _reprocessar_dia(db, db_justificativa.servidor_id, data_anterior)
+    else:
+        ResumoDiarioService(db).invalidar_dia(db_justificativa.servidor_id, db_justificativa.data)
     db.commit()
     db.refresh(db_justificativa)
     
@@ -267,6 +288,7 @@ def aprovar_justificativa(
     if dados.observacao:
         db_justificativa.descricao += f"\n\nObservação do gestor: {dados.observacao}"
     
+    _reprocessar_dia(db, db_justificativa.servidor_id, db_justificativa.data)
     db.commit()
     db.refresh(db_justificativa)
     
@@ -318,6 +340,7 @@ def deletar_justificativa(
         )
     
     # Deletar justificativa
+    ResumoDiarioService(db).invalidar_dia(justificativa.servidor_id, justificativa.data)
     db.delete(justificativa)
     db.commit()
     
@@ -1,8 +1,9 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.log_auditoria import LogAuditoria
 from app.schemas.log_auditoria import LogAuditoria as LogAuditoriaSchema
 from app.core.auth import obter_usuario_atual, UserInDB
@@ -19,7 +20,7 @@ async def listar_logs(
     data_inicio: Optional[str] = None,
     data_fim: Optional[str] = None,
     usuario_atual: UserInDB = Depends(obter_usuario_atual),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Lista os logs de auditoria com filtros opcionais.
@@ -33,24 +34,24 @@ async def listar_logs(
         )
     
     # Construir a query base
-    query = db.query(LogAuditoria)
+    query = select(LogAuditoria)
     
     # Aplicar filtros se fornecidos
     if usuario_id:
-        query = query.filter(LogAuditoria.usuario_id == usuario_id)
+        query = query.where(LogAuditoria.usuario_id == usuario_id)
     if acao:
-        query = query.filter(LogAuditoria.acao == acao)
+        query = query.where(LogAuditoria.acao == acao)
     if tabela:
-        query = query.filter(LogAuditoria.tabela == tabela)
+        query = query.where(LogAuditoria.tabela == tabela)
     if data_inicio:
-        query = query.filter(LogAuditoria.data_hora >= data_inicio)
+        query = query.where(LogAuditoria.data_hora >= data_inicio)
     if data_fim:
-        query = query.filter(LogAuditoria.data_hora <= data_fim)
+        query = query.where(LogAuditoria.data_hora <= data_fim)
     
     # Ordenar por data/hora decrescente (mais recentes primeiro)
     query = query.order_by(LogAuditoria.data_hora.desc())
     
     # Aplicar paginação
-    logs = query.offset(skip).limit(limit).all()
+    logs = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
     
     return logs
@@ -1,14 +1,35 @@
 # app/api/endpoints/secretarias.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from app.db.session import get_db
+from app.db.session import get_db, get_db_leitura
 from app.models.secretaria import Secretaria
 from app.schemas.secretaria import SecretariaCreate, SecretariaUpdate, SecretariaInDB
+from app.schemas.regras_calculo import RegrasCalculo
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.regras_calculo import carregar_regras, salvar_regras_secretaria
+from app.services.resumo_diario_service import ResumoDiarioService
 
 router = APIRouter()
 
+def _reprocessar_secretaria(db: Session, secretaria_id: int, a_partir_de: date) -> int:
+    """
+    Marca como desatualizados os dias dos servidores da secretaria a partir da
+    data e enfileira o reprocessamento dessas datas por servidor. Não faz commit.
+
+    Returns:
+        Quantidade de servidores com reprocessamento enfileirado
+    """
+    dias = ResumoDiarioService(db).invalidar_secretaria(secretaria_id, a_partir_de)
+    for servidor_id, datas in dias.items():
+        enfileirar_tarefa(db, "processar_dias", {
+            "servidor_id": servidor_id,
+            "datas": [data.isoformat() for data in datas],
+        })
+    return len(dias)
+
 @router.post("/", response_model=SecretariaInDB, status_code=status.HTTP_201_CREATED)
 def create_secretaria(secretaria: SecretariaCreate, db: Session = Depends(get_db)):
     db_secretaria = Secretaria(**secretaria.dict())
@@ -18,12 +39,12 @@ def create_secretaria(secretaria: SecretariaCreate, db: Session = Depends(get_db
     return db_secretaria
 
 @router.get("/", response_model=List[SecretariaInDB])
-def read_secretarias(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_secretarias(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     secretarias = db.query(Secretaria).offset(skip).limit(limit).all()
     return secretarias
 
 @router.get("/{secretaria_id}", response_model=SecretariaInDB)
-def read_secretaria(secretaria_id: int, db: Session = Depends(get_db)):
+def read_secretaria(secretaria_id: int, db: Session = Depends(get_db_leitura)):
     db_secretaria = db.query(Secretaria).filter(Secretaria.id == secretaria_id).first()
     if db_secretaria is None:
         raise HTTPException(status_code=404, detail="Secretaria não encontrada")
@@ -51,4 +72,39 @@ def delete_secretaria(secretaria_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_secretaria)
     db.commit()
-    return None
\ No newline at end of file
+    return None
+
+@router.get("/{secretaria_id}/regras-calculo", response_model=RegrasCalculo)
+def read_regras_calculo(secretaria_id: int, db: Session = Depends(get_db_leitura)):
+    """Regras de apuração vigentes para a secretaria (globais + sobrescritas da secretaria)."""
+    if db.query(Secretaria.id).filter(Secretaria.id == secretaria_id).first() is None:
+        raise HTTPException(status_code=404, detail="Secretaria não encontrada")
+    return carregar_regras(db, secretaria_id)
+
+@router.put("/{secretaria_id}/regras-calculo", response_model=RegrasCalculo)
+def update_regras_calculo(
+    secretaria_id: int,
+    regras: Dict[str, Any],
+    vigencia_inicio: Optional[date] = Query(
+        None, description="Primeira data reapurada com as novas regras (padrão: início do mês corrente)"
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Define as regras próprias da secretaria. Apenas os campos informados
+    sobrescrevem as regras globais (ex.: {"limite_extras_diario_minutos": 120}).
+
+    Na mesma transação, os dias dos servidores da secretaria a partir de
+    vigencia_inicio são marcados como desatualizados e reprocessados pelo
+    worker; os anteriores (ex.: meses já fechados) mantêm a apuração gravada.
+    """
+    if db.query(Secretaria.id).filter(Secretaria.id == secretaria_id).first() is None:
+        raise HTTPException(status_code=404, detail="Secretaria não encontrada")
+    try:
+        efetivas = salvar_regras_secretaria(db, secretaria_id, regras)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=str(e))
+    _reprocessar_secretaria(db, secretaria_id, vigencia_inicio or date.today().replace(day=1))
+    db.commit()
+    return efetivas
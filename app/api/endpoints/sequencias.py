@@ -0,0 +1,66 @@
+# app/api/endpoints/sequencias.py
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.session import get_db, get_db_leitura
+from app.schemas.sequencia_status import OcorrenciasServidor
+from app.schemas.tarefa_processamento import TarefaProcessamentoInDB
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.sequencias_status import AnaliseSequencias
+
+router = APIRouter()
+
+def _validar_periodo(data_inicio: date, data_fim: date):
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+
+@router.post("/atualizar", response_model=TarefaProcessamentoInDB, status_code=status.HTTP_202_ACCEPTED)
+def atualizar_sequencias(data_inicio: date, data_fim: date, secretaria_id: Optional[int] = None,
+                         db: Session = Depends(get_db)):
+    """
+    Enfileira a atualização das sequências de faltas, atrasos e justificativas
+    dos dias do período, a partir do espelho de ponto.
+    """
+    _validar_periodo(data_inicio, data_fim)
+    tarefa = enfileirar_tarefa(db, "atualizar_sequencias", {
+        "data_inicio": data_inicio.isoformat(),
+        "data_fim": data_fim.isoformat(),
+        "secretaria_id": secretaria_id,
+    })
+    db.commit()
+    return tarefa
+
+@router.get("/sequencias", response_model=List[OcorrenciasServidor])
+def read_sequencias(tipo: str, data_inicio: date, data_fim: date, minimo: int = 3,
+                    secretaria_id: Optional[int] = None, atravessar_descanso: bool = True,
+                    limit: int = 100, db: Session = Depends(get_db_leitura)):
+    """
+    Servidores com pelo menos `minimo` dias seguidos do tipo (falta, atraso ou
+    justificada) no período. Por padrão, fins de semana, folgas e feriados
+    entre as ocorrências não interrompem a sequência.
+    """
+    _validar_periodo(data_inicio, data_fim)
+    try:
+        return AnaliseSequencias(db).consultar(
+            tipo, data_inicio, data_fim, minimo_sequencia=minimo, secretaria_id=secretaria_id,
+            atravessar_descanso=atravessar_descanso, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/frequencia", response_model=List[OcorrenciasServidor])
+def read_frequencia(tipo: str, data_inicio: date, data_fim: date, minimo: int = 5,
+                    secretaria_id: Optional[int] = None, limit: int = 100, db: Session = Depends(get_db_leitura)):
+    """
+    Servidores com pelo menos `minimo` dias do tipo (falta, atraso ou
+    justificada) no período, seguidos ou não.
+    """
+    _validar_periodo(data_inicio, data_fim)
+    try:
+        return AnaliseSequencias(db).consultar(
+            tipo, data_inicio, data_fim, minimo_dias=minimo, secretaria_id=secretaria_id, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,11 +1,16 @@
 # app/api/endpoints/servidores.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import date, timedelta
 
-from app.db.session import get_db
+from app.db.session import get_db, get_db_leitura
 from app.models.servidor import Servidor
 from app.schemas.servidor import ServidorCreate, ServidorUpdate, ServidorInDB
+from app.schemas.banco_horas import BancoHorasSaldo, BancoHorasExtrato
+from app.services.banco_horas_service import BancoHorasService
+from app.schemas.regras_calculo import ApuracaoMensal
+from app.services.regras_calculo import apurar_mes
 
 router = APIRouter()
 
@@ -19,7 +24,7 @@ def create_servidor(servidor: ServidorCreate, db: Session = Depends(get_db)):
     return db_servidor
 
 @router.get("/", response_model=List[Dict[str, Any]])
-def read_servidores(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_servidores(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     """
     Lista todos os servidores com tratamento personalizado para
     evitar erros de validação.
@@ -51,7 +56,7 @@ def read_servidores(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
         )
 
 @router.get("/{servidor_id}", response_model=Dict[str, Any])
-def read_servidor(servidor_id: int, db: Session = Depends(get_db)):
+def read_servidor(servidor_id: int, db: Session = Depends(get_db_leitura)):
     """Busca um servidor específico pelo ID com tratamento de validação."""
     try:
         db_servidor = db.query(Servidor).filter(Servidor.id == servidor_id).first()
@@ -122,4 +127,43 @@ def delete_servidor(servidor_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_servidor)
     db.commit()
-    return None
\ No newline at end of file
+    return None
+
+@router.get("/{servidor_id}/banco-horas", response_model=BancoHorasSaldo)
+def read_saldo_banco_horas(servidor_id: int, data: Optional[date] = None, db: Session = Depends(get_db_leitura)):
+    """Saldo do banco de horas do servidor ao final da data (padrão: hoje)."""
+    data = data or date.today()
+    return BancoHorasSaldo(
+        servidor_id=servidor_id,
+        data=data,
+        saldo_minutos=BancoHorasService(db).saldo_em(servidor_id, data),
+    )
+
+@router.get("/{servidor_id}/banco-horas/extrato", response_model=BancoHorasExtrato)
+def read_extrato_banco_horas(servidor_id: int, data_inicio: date, data_fim: date, db: Session = Depends(get_db_leitura)):
+    """Extrato do banco de horas do servidor no período, com saldo anterior e final."""
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+
+    service = BancoHorasService(db)
+    saldo_anterior = service.saldo_em(servidor_id, data_inicio - timedelta(days=1))
+    saldo_final = service.saldo_em(servidor_id, data_fim)
+    return BancoHorasExtrato(
+        servidor_id=servidor_id,
+        periodo_inicio=data_inicio,
+        periodo_fim=data_fim,
+        saldo_anterior_minutos=saldo_anterior,
+        saldo_periodo_minutos=saldo_final - saldo_anterior,
+        saldo_final_minutos=saldo_final,
+        lancamentos=service.extrato(servidor_id, data_inicio, data_fim),
+    )
+
+@router.get("/{servidor_id}/apuracao-mensal", response_model=ApuracaoMensal)
+def read_apuracao_mensal(servidor_id: int, ano: int, mes: int, db: Session = Depends(get_db)):
+    """Apuração do mês pelas regras da secretaria: teto de horas extras, adicional noturno e DSR."""
+    if mes < 1 or mes > 12:
+        raise HTTPException(status_code=400, detail="Mês inválido")
+    try:
+        return apurar_mes(db, servidor_id, ano, mes)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,38 @@
+# app/api/endpoints/tarefas.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.session import get_db
+from app.models.tarefa_processamento import TarefaProcessamento
+from app.schemas.tarefa_processamento import TarefaProcessamentoInDB
+
+router = APIRouter()
+
+@router.get("/", response_model=List[TarefaProcessamentoInDB])
+def read_tarefas(
+    status: Optional[str] = None,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    Lista as tarefas da fila de processamento, das mais recentes para as mais antigas.
+    """
+    query = db.query(TarefaProcessamento)
+    if status:
+        query = query.filter(TarefaProcessamento.status == status)
+    if tipo:
+        query = query.filter(TarefaProcessamento.tipo == tipo)
+    return query.order_by(TarefaProcessamento.id.desc()).offset(skip).limit(limit).all()
+
+@router.get("/{tarefa_id}", response_model=TarefaProcessamentoInDB)
+def read_tarefa(tarefa_id: int, db: Session = Depends(get_db)):
+    """
+    Consulta o andamento de uma tarefa enfileirada (ex.: após a importação de um arquivo).
+    """
+    tarefa = db.query(TarefaProcessamento).filter(TarefaProcessamento.id == tarefa_id).first()
+    if tarefa is None:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    return tarefa
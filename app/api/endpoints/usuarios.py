@@ -2,13 +2,14 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, or_, select
 
 from app.services.auditoria_service import registrar_log
 
 from app.core.auth import obter_usuario_atual, verificar_admin, obter_hash_senha
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.usuario import Usuario
 from app.schemas.usuario import (
     UsuarioCreate, UsuarioUpdate, UsuarioInDB, UsuarioList, UsuarioFilter
@@ -20,14 +21,14 @@ router = APIRouter()
 async def criar_usuario(
     usuario: UsuarioCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: Any = Depends(verificar_admin)  # Apenas administradores podem criar usuários
 ) -> Any:
     """
     Cria um novo usuário.
     """
     # Verificar se username já existe
-    db_usuario = db.query(Usuario).filter(Usuario.username == usuario.username).first()
+    db_usuario = (await db.execute(select(Usuario).where(Usuario.username == usuario.username))).scalars().first()
     if db_usuario:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,7 +36,7 @@ async def criar_usuario(
         )
     
     # Verificar se email já existe
-    db_usuario = db.query(Usuario).filter(Usuario.email == usuario.email).first()
+    db_usuario = (await db.execute(select(Usuario).where(Usuario.email == usuario.email))).scalars().first()
     if db_usuario:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,15 +48,15 @@ async def criar_usuario(
         username=usuario.username,
         email=usuario.email,
         nome_completo=usuario.nome_completo,
-        senha_hash=obter_hash_senha(usuario.senha),
+        senha_hash=await run_in_threadpool(obter_hash_senha, usuario.senha),
         ativo=True,
         perfil=usuario.perfil,
         secretaria_id=usuario.secretaria_id
     )
     
     db.add(db_usuario)
-    db.commit()
-    db.refresh(db_usuario)
+    await db.commit()
+    await db.refresh(db_usuario)
     
     # Registrar a ação no log de auditoria
     await registrar_log(
@@ -72,7 +73,7 @@ async def criar_usuario(
 @router.get("/", response_model=UsuarioList)
 async def listar_usuarios(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: Any = Depends(verificar_admin),  # Apenas administradores podem listar todos os usuários
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -87,27 +88,27 @@ async def listar_usuarios(
     Lista todos os usuários com filtros opcionais.
     """
     # Construir query base
-    query = db.query(Usuario)
+    query = select(Usuario)
     
     # Aplicar filtros
     if username:
-        query = query.filter(Usuario.username.ilike(f"%{username}%"))
+        query = query.where(Usuario.username.ilike(f"%{username}%"))
     if email:
-        query = query.filter(Usuario.email.ilike(f"%{email}%"))
+        query = query.where(Usuario.email.ilike(f"%{email}%"))
     if nome:
-        query = query.filter(Usuario.nome_completo.ilike(f"%{nome}%"))
+        query = query.where(Usuario.nome_completo.ilike(f"%{nome}%"))
     if perfil:
-        query = query.filter(Usuario.perfil == perfil)
+        query = query.where(Usuario.perfil == perfil)
     if secretaria_id:
-        query = query.filter(Usuario.secretaria_id == secretaria_id)
+        query = query.where(Usuario.secretaria_id == secretaria_id)
     if ativo is not None:
-        query = query.filter(Usuario.ativo == ativo)
+        query = query.where(Usuario.ativo == ativo)
     
     # Contar total
-    total = query.count()
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
     
     # Aplicar paginação
-    usuarios = query.offset(skip).limit(limit).all()
+    usuarios = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
     
     # Calcular páginas
     pages = (total + limit - 1) // limit if limit > 0 else 1
@@ -145,7 +146,7 @@ async def listar_usuarios(
 async def ler_usuario(
     usuario_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: UsuarioInDB = Depends(obter_usuario_atual)
 ) -> Any:
     """
@@ -159,7 +160,7 @@ async def ler_usuario(
         )
     
     # Buscar usuário
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = (await db.execute(select(Usuario).where(Usuario.id == usuario_id))).scalars().first()
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,7 +184,7 @@ async def atualizar_usuario(
     usuario_id: int,
     usuario_update: UsuarioUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: UsuarioInDB = Depends(obter_usuario_atual)
 ) -> Any:
     """
@@ -197,7 +198,7 @@ async def atualizar_usuario(
         )
     
     # Buscar usuário
-    db_usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    db_usuario = (await db.execute(select(Usuario).where(Usuario.id == usuario_id))).scalars().first()
     if not db_usuario:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -206,10 +207,10 @@ async def atualizar_usuario(
     
     # Verificar se email já existe (se estiver sendo atualizado)
     if usuario_update.email and usuario_update.email != db_usuario.email:
-        email_exists = db.query(Usuario).filter(
+        email_exists = (await db.execute(select(Usuario).where(
             Usuario.email == usuario_update.email,
             Usuario.id != usuario_id
-        ).first()
+        ))).scalars().first()
         if email_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -241,8 +242,8 @@ async def atualizar_usuario(
     for key, value in update_data.items():
         setattr(db_usuario, key, value)
     
-    db.commit()
-    db.refresh(db_usuario)
+    await db.commit()
+    await db.refresh(db_usuario)
     
     return db_usuario
 
@@ -250,14 +251,14 @@ async def atualizar_usuario(
 async def deletar_usuario(
     usuario_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: Any = Depends(verificar_admin)  # Apenas administradores podem deletar usuários
 ) -> None:
     """
     Deleta um usuário.
     """
     # Buscar usuário
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = (await db.execute(select(Usuario).where(Usuario.id == usuario_id))).scalars().first()
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -268,8 +269,8 @@ async def deletar_usuario(
     username = usuario.username
     
     # Deletar usuário
-    db.delete(usuario)
-    db.commit()
+    await db.delete(usuario)
+    await db.commit()
     
     # Registrar a ação no log de auditoria
     await registrar_log(
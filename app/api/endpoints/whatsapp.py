@@ -2,10 +2,11 @@
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import obter_usuario_atual, verificar_gestor
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.services.whatsapp_service import WhatsAppService
 from app.models.servidor import Servidor
 from app.models.justificativa import Justificativa
@@ -17,7 +18,7 @@ router = APIRouter()
 async def enviar_mensagem(
     numero_telefone: str = Body(..., embed=True),
     mensagem: str = Body(..., embed=True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: UserInDB = Depends(verificar_gestor)  # Apenas gestores podem enviar mensagens
 ) -> Dict[str, Any]:
     """
@@ -39,14 +40,16 @@ async def enviar_mensagem(
 async def notificar_justificativa(
     justificativa_id: int,
     observacao: str = Body(None, embed=True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: UserInDB = Depends(verificar_gestor)  # Apenas gestores podem notificar
 ) -> Dict[str, Any]:
     """
     Notifica um servidor sobre o status de sua justificativa via WhatsApp.
     """
     # Buscar justificativa
-    justificativa = db.query(Justificativa).filter(Justificativa.id == justificativa_id).first()
+    justificativa = (await db.execute(
+        select(Justificativa).where(Justificativa.id == justificativa_id)
+    )).scalars().first()
     if not justificativa:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,7 +57,7 @@ async def notificar_justificativa(
         )
     
     # Buscar servidor
-    servidor = db.query(Servidor).filter(Servidor.id == justificativa.servidor_id).first()
+    servidor = (await db.execute(select(Servidor).where(Servidor.id == justificativa.servidor_id))).scalars().first()
     if not servidor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,14 +105,14 @@ async def notificar_batidas_irregulares(
     data_inicio: str = Body(..., embed=True),
     data_fim: str = Body(..., embed=True),
     total_irregulares: int = Body(..., embed=True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: UserInDB = Depends(verificar_gestor)  # Apenas gestores podem notificar
 ) -> Dict[str, Any]:
     """
     Notifica um servidor sobre batidas irregulares via WhatsApp.
     """
     # Buscar servidor
-    servidor = db.query(Servidor).filter(Servidor.id == servidor_id).first()
+    servidor = (await db.execute(select(Servidor).where(Servidor.id == servidor_id))).scalars().first()
     if not servidor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -150,7 +153,7 @@ async def notificar_batidas_irregulares(
 
 @router.get("/status", status_code=status.HTTP_200_OK)
 async def verificar_status(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     usuario_atual: UserInDB = Depends(obter_usuario_atual)
 ) -> Dict[str, Any]:
     """
@@ -0,0 +1,416 @@
+# app/benchmark.py
+"""
+Benchmark do motor de processamento.
+
+Semeia o banco configurado (DATABASE_URL) com uma massa sintética e
+reprodutível em escala municipal (servidores, horários, batidas, feriados
+e justificativas), mede os caminhos de processamento e grava as métricas
+em JSON para comparação entre commits. Uso, em um banco exclusivo para
+testes de desempenho:
+
+    python -m app.benchmark --semear --servidores 10000 --dias 60 --saida benchmark.json
+
+Métricas por caminho: duração, servidor-dias por segundo, quantidade de
+consultas SQL e pico de memória alocada no Python (tracemalloc; a medição
+de memória torna a execução mais lenta, desative com --sem-memoria).
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import resource
+import subprocess
+import time
+import tracemalloc
+from array import array
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+
+# Configurar logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("app.benchmark")
+logger.setLevel(logging.INFO)
+
+# Identifica os dados criados pelo benchmark (matrícula, código da secretaria, feriados)
+PREFIXO = "BENCH"
+DESCRICAO_FERIADO = "Feriado benchmark"
+
+# Proporções da massa sintética
+PROPORCAO_TURNO_NOTURNO = 20  # 1 a cada 20 servidores trabalha 22:00-06:00 em dias alternados
+PROBABILIDADE_FALTA = 0.03
+PROBABILIDADE_JUSTIFICATIVA = 0.015  # Parte das faltas com justificativa aprovada
+PROBABILIDADE_BATIDA_ESQUECIDA = 0.05
+VARIACAO_SEGUNDOS = 600  # Batidas até 10 minutos antes ou depois do horário
+
+class ContadorConsultas:
+    """Conta os comandos SQL executados no engine enquanto estiver ativo."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.total = 0
+
+    def _contar(self, conn, cursor, statement, parameters, context, executemany):
+        self.total += 1
+
+    def iniciar(self):
+        event.listen(self.engine, "before_cursor_execute", self._contar)
+
+    def parar(self):
+        event.remove(self.engine, "before_cursor_execute", self._contar)
+
+def medir(nome: str, funcao: Callable[[], Optional[int]], engine: Optional[Engine],
+          servidor_dias: int, memoria: bool = True) -> Dict[str, Any]:
+    """
+    Executa e mede um caminho de processamento.
+
+    Args:
+        nome: Nome do caminho no relatório
+        funcao: Função medida; pode retornar a quantidade de servidor-dias efetivamente processados
+        engine: Engine cujas consultas são contadas (None para caminhos sem banco)
+        servidor_dias: Servidor-dias processados, quando a função não informa
+        memoria: Mede o pico de memória com tracemalloc
+
+    Returns:
+        Métricas do caminho
+    """
+    logger.info(f"Medindo {nome}...")
+    contador = ContadorConsultas(engine) if engine is not None else None
+    if memoria:
+        tracemalloc.start()
+    if contador is not None:
+        contador.iniciar()
+    try:
+        inicio = time.perf_counter()
+        processados = funcao()
+        duracao = time.perf_counter() - inicio
+    finally:
+        if contador is not None:
+            contador.parar()
+        pico = None
+        if memoria:
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    if processados is not None:
+        servidor_dias = processados
+    resultado = {
+        "segundos": round(duracao, 4),
+        "servidor_dias": servidor_dias,
+        "servidor_dias_por_segundo": round(servidor_dias / duracao, 1) if duracao > 0 else None,
+        "consultas": contador.total if contador is not None else None,
+        "consultas_por_servidor_dia": (
+            round(contador.total / servidor_dias, 3) if contador is not None and servidor_dias else None
+        ),
+        "pico_memoria_bytes": pico,
+    }
+    logger.info(f"{nome}: {resultado}")
+    return resultado
+
+def limpar(engine: Engine) -> None:
+    """Remove os dados criados pelo benchmark (em cascata a partir dos servidores)."""
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM ponto.servidores WHERE matricula LIKE :prefixo"), {"prefixo": f"{PREFIXO}%"})
+        conn.execute(text("DELETE FROM ponto.secretarias WHERE codigo LIKE :prefixo"), {"prefixo": f"{PREFIXO}-%"})
+        conn.execute(text("DELETE FROM ponto.feriados WHERE descricao = :descricao"), {"descricao": DESCRICAO_FERIADO})
+
+def semear(engine: Engine, servidores: int, dias: int, inicio: date, secretarias: int,
+           feriados: int, semente: int) -> Dict[str, int]:
+    """
+    Recria a massa sintética. Toda a geração é feita no PostgreSQL
+    (generate_series + random() com setseed), em uma única transação: a
+    mesma semente e os mesmos parâmetros produzem os mesmos dados.
+
+    Returns:
+        Quantidade de registros criados por tabela
+    """
+    limpar(engine)
+    parametros = {
+        "prefixo": f"{PREFIXO}%",
+        "servidores": servidores,
+        "dias": dias,
+        "inicio": inicio,
+        "secretarias": secretarias,
+        "feriados": feriados,
+        "noturno": PROPORCAO_TURNO_NOTURNO,
+        "falta": PROBABILIDADE_FALTA,
+        "justificativa": PROBABILIDADE_JUSTIFICATIVA,
+        "esquecida": PROBABILIDADE_BATIDA_ESQUECIDA,
+        "variacao": VARIACAO_SEGUNDOS,
+        "descricao_feriado": DESCRICAO_FERIADO,
+    }
+    contagens = {}
+    with engine.begin() as conn:
+        conn.execute(text("SELECT setseed(:semente)"), {"semente": (semente % 2000) / 1000.0 - 1.0})
+
+        conn.execute(text("""
+            INSERT INTO ponto.secretarias (nome, codigo, ativo, created_at, updated_at)
+            SELECT 'Secretaria Benchmark ' || i, 'BENCH-' || lpad(i::text, 3, '0'), true, now(), now()
+            FROM generate_series(1, :secretarias) i
+        """), parametros)
+
+        conn.execute(text("""
+            INSERT INTO ponto.servidores (nome, matricula, cpf, ativo, secretaria_id, created_at, updated_at)
+            SELECT 'Servidor Benchmark ' || i, 'BENCH' || lpad(i::text, 7, '0'), 'B' || lpad(i::text, 10, '0'),
+                   true, sec.id, now(), now()
+            FROM generate_series(1, :servidores) i
+            JOIN (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY codigo) - 1 AS posicao
+                FROM ponto.secretarias WHERE codigo LIKE 'BENCH-%'
+            ) sec ON sec.posicao = i % :secretarias
+        """), parametros)
+
+        # Número sequencial de cada servidor do benchmark (independe dos IDs gerados)
+        conn.execute(text("""
+            CREATE TEMP TABLE bench_servidores ON COMMIT DROP AS
+            SELECT id, CAST(substr(matricula, 6) AS integer) AS numero
+            FROM ponto.servidores WHERE matricula LIKE :prefixo
+        """), parametros)
+
+        # Jornada 08-12/13-17 de segunda a sexta; os servidores do turno noturno não têm horário cadastrado
+        conn.execute(text("""
+            INSERT INTO ponto.horarios_padrao (servidor_id, dia_semana, entrada_1, saida_1, entrada_2, saida_2,
+                                               created_at, updated_at)
+            SELECT s.id, d, TIME '08:00', TIME '12:00', TIME '13:00', TIME '17:00', now(), now()
+            FROM bench_servidores s CROSS JOIN generate_series(1, 5) d
+            WHERE s.numero % :noturno <> 0
+        """), parametros)
+
+        # Feriados distribuídos em dias úteis do período (sem sobrescrever os existentes)
+        conn.execute(text("""
+            INSERT INTO ponto.feriados (data, descricao, tipo, ambito, ativo, created_at, updated_at)
+            SELECT CAST(:inicio AS date) + (k * :dias / (:feriados + 1)), :descricao_feriado,
+                   'feriado', 'municipal', true, now(), now()
+            FROM generate_series(1, :feriados) k
+            WHERE EXTRACT(ISODOW FROM CAST(:inicio AS date) + (k * :dias / (:feriados + 1))) < 6
+            ON CONFLICT (data) DO NOTHING
+        """), parametros)
+
+        conn.execute(text("""
+            CREATE TEMP TABLE bench_dias ON COMMIT DROP AS
+            SELECT s.id AS servidor_id, s.numero, CAST(:inicio AS date) + k AS data, k, random() AS sorteio,
+                   EXISTS (SELECT 1 FROM ponto.feriados f WHERE f.data = CAST(:inicio AS date) + k AND f.ativo)
+                       AS feriado
+            FROM bench_servidores s CROSS JOIN generate_series(0, :dias - 1) k
+            ORDER BY s.numero, k
+        """), parametros)
+
+        # Turno diurno: quatro batidas com variação, faltas e batidas esquecidas
+        diurno = conn.execute(text("""
+            INSERT INTO ponto.batidas_originais (servidor_id, data_hora, tipo, dispositivo, arquivo_origem,
+                                                 importado_em, created_at)
+            SELECT d.servidor_id,
+                   d.data + p.hora + make_interval(secs => floor(random() * (2 * :variacao + 1)) - :variacao),
+                   p.tipo, 'benchmark', 'benchmark', now(), now()
+            FROM bench_dias d
+            CROSS JOIN (VALUES (1, 'entrada', TIME '08:00'), (2, 'saida', TIME '12:00'),
+                               (3, 'entrada', TIME '13:00'), (4, 'saida', TIME '17:00')) AS p(ordem, tipo, hora)
+            WHERE d.numero % :noturno <> 0
+              AND EXTRACT(ISODOW FROM d.data) < 6
+              AND NOT d.feriado
+              AND d.sorteio >= :falta
+              AND NOT (d.sorteio < :falta + :esquecida AND p.ordem = 3)
+            ORDER BY d.servidor_id, d.data, p.ordem
+        """), parametros)
+
+        # Turno noturno em dias alternados: entrada às 22:00 e saída às 06:00 do dia seguinte
+        noturno = conn.execute(text("""
+            INSERT INTO ponto.batidas_originais (servidor_id, data_hora, tipo, dispositivo, arquivo_origem,
+                                                 importado_em, created_at)
+            SELECT d.servidor_id,
+                   d.data + p.hora + make_interval(secs => floor(random() * (2 * :variacao + 1)) - :variacao),
+                   p.tipo, 'benchmark', 'benchmark', now(), now()
+            FROM bench_dias d
+            CROSS JOIN (VALUES (1, 'entrada', INTERVAL '22 hours'), (2, 'saida', INTERVAL '30 hours'))
+                AS p(ordem, tipo, hora)
+            WHERE d.numero % :noturno = 0
+              AND (d.k + d.numero / :noturno) % 2 = 0
+              AND d.sorteio >= :falta
+            ORDER BY d.servidor_id, d.data, p.ordem
+        """), parametros)
+
+        justificativas = conn.execute(text("""
+            INSERT INTO ponto.justificativas (servidor_id, data, tipo, descricao, status, canal_origem,
+                                              criado_em, created_at, updated_at)
+            SELECT servidor_id, data, 'falta', 'Justificativa benchmark', 'aprovada', 'sistema', now(), now(), now()
+            FROM bench_dias
+            WHERE sorteio < :justificativa
+        """), parametros)
+
+        contagens = {
+            "secretarias": secretarias,
+            "servidores": servidores,
+            "batidas_originais": diurno.rowcount + noturno.rowcount,
+            "justificativas": justificativas.rowcount,
+        }
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        for tabela in ("servidores", "horarios_padrao", "feriados", "batidas_originais", "justificativas"):
+            conn.execute(text(f"ANALYZE ponto.{tabela}"))
+    return contagens
+
+def bench_calculadora(servidor_dias: int, semente: int) -> Callable[[], int]:
+    """Apuração de dias sintéticos em memória, sem banco (cadeia de regras compilada)."""
+    from app.schemas.regras_calculo import RegrasCalculo
+    from app.services.ponto_processor import CalculadoraHorasExtras, HorarioTrabalho, RegistroPonto
+
+    gerador = random.Random(semente)
+    horario = HorarioTrabalho([(dtime(8, 0), dtime(12, 0)), (dtime(13, 0), dtime(17, 0))], origem="benchmark")
+    base = date(2025, 1, 6)
+    registros = []
+    for i in range(servidor_dias):
+        minutos = array("i", sorted(m + gerador.randint(-10, 10) for m in horario.minutos))
+        registros.append(RegistroPonto.de_minutos(base + timedelta(days=i % 5), minutos))
+    calculadora = CalculadoraHorasExtras(regras=RegrasCalculo())
+
+    def executar() -> int:
+        for registro in registros:
+            calculadora.apurar(registro, horario)
+        return len(registros)
+    return executar
+
+def executar_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Executa os caminhos selecionados e monta o relatório."""
+    from app.services.apuracao_sql import ApuracaoSQL
+    from app.services.batida_processor_service import ProcessadorBatidas
+    from app.services.fechamento_paralelo import OrquestradorFechamento
+    from app.services.horario_resolver import ResolvedorHorarios
+    from app.services.ponto_processor import PontoProcessor
+
+    # Duas conexões: a varredura de batidas lê por um cursor em conexão própria
+    engine = create_engine(settings.DATABASE_URI, pool_size=2, max_overflow=0)
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    inicio = date.fromisoformat(args.inicio)
+    fim = inicio + timedelta(days=args.dias - 1)
+    memoria = not args.sem_memoria
+
+    relatorio: Dict[str, Any] = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "parametros": {
+            "servidores": args.servidores,
+            "dias": args.dias,
+            "inicio": inicio.isoformat(),
+            "secretarias": args.secretarias,
+            "feriados": args.feriados,
+            "semente": args.semente,
+            "amostra": args.amostra,
+        },
+        "resultados": {},
+    }
+    resultados = relatorio["resultados"]
+
+    if args.semear:
+        inicio_semeadura = time.perf_counter()
+        relatorio["massa"] = semear(engine, args.servidores, args.dias, inicio, args.secretarias,
+                                    args.feriados, args.semente)
+        relatorio["massa"]["segundos"] = round(time.perf_counter() - inicio_semeadura, 2)
+
+    db = SessionBench()
+    try:
+        servidor_ids = [
+            servidor_id for (servidor_id,) in db.execute(text(
+                "SELECT id FROM ponto.servidores WHERE matricula LIKE :prefixo ORDER BY matricula LIMIT :limite"
+            ), {"prefixo": f"{PREFIXO}%", "limite": args.amostra})
+        ]
+        if not servidor_ids:
+            raise SystemExit("Nenhum servidor do benchmark no banco. Execute com --semear.")
+        amostra_dias = len(servidor_ids) * args.dias
+
+        resultados["calculadora"] = medir(
+            "calculadora", bench_calculadora(args.servidores * args.dias, args.semente), None,
+            args.servidores * args.dias, memoria
+        )
+
+        # Caminho da API: um processador por servidor, recalculando todos os dias
+        def processar_por_servidor(reprocessar: bool) -> Callable[[], None]:
+            def executar():
+                processor = PontoProcessor(db, reprocessar_inalterados=reprocessar)
+                for servidor_id in servidor_ids:
+                    processor.processar_batidas_por_servidor(servidor_id, inicio, fim)
+            return executar
+
+        resultados["processar_batidas_por_servidor"] = medir(
+            "processar_batidas_por_servidor", processar_por_servidor(True), engine, amostra_dias, memoria
+        )
+        # Mesmo período, entradas inalteradas: dias ignorados pela impressão das entradas
+        resultados["processar_batidas_por_servidor_inalterado"] = medir(
+            "processar_batidas_por_servidor_inalterado", processar_por_servidor(False), engine, amostra_dias, memoria
+        )
+
+        # Caminho de uma faixa do fechamento: horários de todos os servidores carregados de uma vez
+        def faixa_fechamento():
+            resolvedor = ResolvedorHorarios(db).carregar(servidor_ids, inicio - timedelta(days=1), fim)
+            processor = PontoProcessor(db, resolvedor, reprocessar_inalterados=True)
+            for servidor_id in servidor_ids:
+                processor.processar_batidas_por_servidor(servidor_id, inicio, fim)
+
+        resultados["faixa_fechamento"] = medir("faixa_fechamento", faixa_fechamento, engine, amostra_dias, memoria)
+
+        def apuracao_sql():
+            ApuracaoSQL(db).totais_diarios(inicio, fim, servidor_ids)
+
+        resultados["apuracao_sql"] = medir("apuracao_sql", apuracao_sql, engine, amostra_dias, memoria)
+
+        if args.lote:
+            resultados["batidas_nao_processadas"] = medir(
+                "batidas_nao_processadas",
+                lambda: ProcessadorBatidas(db).processar_batidas_nao_processadas(varredura_completa=True)["dias"],
+                engine, 0, memoria
+            )
+
+        if args.fechamento:
+            # Processos separados: consultas e memória dos trabalhadores não são contadas
+            def fechamento_paralelo() -> int:
+                return OrquestradorFechamento(db).executar(inicio, fim).total_dias
+            resultados["fechamento_paralelo"] = medir("fechamento_paralelo", fechamento_paralelo, None, 0, False)
+    finally:
+        db.close()
+        engine.dispose()
+
+    relatorio["pico_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return relatorio
+
+def _commit_atual() -> Optional[str]:
+    """Commit do código medido, quando executado dentro do repositório git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do motor de processamento do ponto")
+    parser.add_argument("--semear", action="store_true", help="Recria a massa sintética antes de medir")
+    parser.add_argument("--limpar", action="store_true", help="Remove a massa sintética e sai")
+    parser.add_argument("--servidores", type=int, default=10000)
+    parser.add_argument("--dias", type=int, default=60)
+    parser.add_argument("--inicio", default="2025-03-03", help="Primeiro dia do período (ISO)")
+    parser.add_argument("--secretarias", type=int, default=20)
+    parser.add_argument("--feriados", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--amostra", type=int, default=200, help="Servidores medidos nos caminhos por servidor")
+    parser.add_argument("--lote", action="store_true", help="Mede a varredura de batidas não processadas")
+    parser.add_argument("--fechamento", action="store_true", help="Mede o fechamento paralelo (todos os servidores ativos)")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (tracemalloc)")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    if args.limpar:
+        limpar(create_engine(settings.DATABASE_URI))
+    else:
+        relatorio = json.dumps(executar_benchmark(args), indent=2, ensure_ascii=False)
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as arquivo:
+                arquivo.write(relatorio + "\n")
+        else:
+            print(relatorio)
@@ -5,13 +5,16 @@ from typing import Optional, List
 
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.models.usuario import Usuario
 
 # Configuração de logging
@@ -64,13 +67,13 @@ def obter_hash_senha(senha_plana: str) -> str:
     logger.debug(f"Hash gerado: {hash_senha}")
     return hash_senha
 
-def autenticar_usuario(db: Session, email: str, password: str) -> Optional[Usuario]:
+async def autenticar_usuario(db: AsyncSession, email: str, password: str) -> Optional[Usuario]:
     """Autentica um usuário verificando seu e-mail e senha."""
     logger.debug(f"Tentativa de autenticação para e-mail: {email}")
     logger.debug(f"Senha recebida (primeiros 3 caracteres): {password[:3]}***")
     
     # Buscar usuário pelo e-mail
-    usuario = db.query(Usuario).filter(Usuario.email == email).first()
+    usuario = (await db.execute(select(Usuario).where(Usuario.email == email))).scalars().first()
     
     if not usuario:
         logger.debug(f"Usuário com e-mail '{email}' não encontrado no banco de dados")
@@ -78,7 +81,8 @@ def autenticar_usuario(db: Session, email: str, password: str) -> Optional[Usuar
     
     logger.debug(f"Usuário encontrado: {usuario.username}, id: {usuario.id}, ativo: {usuario.ativo}")
     
-    if not verificar_senha(password, usuario.senha_hash):
+    # O bcrypt é custoso: verifica fora do event loop
+    if not await run_in_threadpool(verificar_senha, password, usuario.senha_hash):
         logger.debug("Verificação de senha falhou")
         return None
     
@@ -103,7 +107,7 @@ def criar_token_acesso(data: dict, expires_delta: Optional[timedelta] = None) ->
 
 async def obter_usuario_atual(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserInDB:
     """Obtém o usuário atual a partir do token JWT."""
     logger.debug("Verificando token de acesso")
@@ -129,7 +133,9 @@ async def obter_usuario_atual(
         logger.error(f"Erro ao decodificar token JWT: {str(e)}")
         raise credentials_exception
     
-    usuario = db.query(Usuario).filter(Usuario.username == token_data.username).first()
+    usuario = (await db.execute(
+        select(Usuario).where(Usuario.username == token_data.username)
+    )).scalars().first()
     
     if usuario is None:
         logger.debug(f"Usuário {token_data.username} não encontrado no banco de dados")
@@ -196,7 +202,7 @@ def verificar_secretaria_acesso(
     )
     
     
-async def obter_usuario_atual_opcional(db: Session, request: Request) -> Optional[UserInDB]:
+async def obter_usuario_atual_opcional(db: AsyncSession, request: Request) -> Optional[UserInDB]:
     """
     Tenta obter o usuário atual a partir do token de autenticação.
     Retorna None se não houver token ou se o token for inválido.
@@ -216,18 +222,11 @@ async def obter_usuario_atual_opcional(db: Session, request: Request) -> Optiona
             return None
             
         # Busca o usuário no banco de dados
-        usuario = db.query(Usuario).filter(Usuario.username == username).first()
+        usuario = (await db.execute(select(Usuario).where(Usuario.username == username))).scalars().first()
         if usuario is None:
             return None
             
-        return UserInDB(
-            id=usuario.id,
-            username=usuario.username,
-            email=usuario.email,
-            perfil=usuario.perfil,
-            secretaria_id=usuario.secretaria_id,
-            is_active=usuario.is_active
-        )
+        return UserInDB.model_validate(usuario)
     except (JWTError, ValidationError):
         return None
     
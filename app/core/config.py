@@ -26,7 +26,44 @@ class Settings(BaseSettings):
     DB_POOL_TIMEOUT: int = Field(default=30)
     DB_POOL_RECYCLE: int = Field(default=1800)
     DB_ECHO_LOG: bool = Field(default=False)
+    DB_N_MAIS_UM_LIMITE: int = Field(default=10)  # Execuções do mesmo SQL em uma requisição para sinalizar N+1
     
+    # Réplicas de leitura (opcionais): listagens, consultas e relatórios
+    DATABASE_REPLICA_URLS: Optional[str] = Field(default=None)  # URLs das réplicas, separadas por vírgula
+    DB_REPLICA_JANELA_LEITURA_PROPRIA: int = Field(default=10)  # Segundos lendo do primário após uma escrita do cliente (0 desativa)
+    
+    # Configurações do fechamento mensal paralelo
+    FECHAMENTO_WORKERS: int = Field(default=4)  # Processos trabalhadores
+    FECHAMENTO_SHARDS_POR_WORKER: int = Field(default=4)  # Faixas de servidores por processo
+    FECHAMENTO_MAX_TENTATIVAS: int = Field(default=3)  # Tentativas por faixa antes de desistir
+    FECHAMENTO_SNAPSHOT_DIR: str = Field(default="data/fechamentos")  # Snapshots congelados dos meses fechados
+    
+    # Configurações da varredura de batidas não processadas
+    PROCESSAMENTO_LOTE_BATIDAS: int = Field(default=5000)  # Batidas por lote (alinhado a servidor/dia)
+    PROCESSAMENTO_JANELA_WATERMARK: int = Field(default=10000)  # IDs abaixo da marca revisitados a cada execução
+    
+    # Montagem de turnos (plantões que atravessam a meia-noite)
+    TURNO_INTERVALO_CORTE_MINUTOS: int = Field(default=360)  # Pausa que separa turnos de quem não tem horário
+    TURNO_INTERVALO_CORTE_MINIMO: int = Field(default=120)  # Menor pausa que separa turnos com horário previsto
+    
+    # Varredura de anomalias das batidas
+    ANOMALIA_JANELA_DUPLICADA_MINUTOS: int = Field(default=5)  # Batidas mais próximas que isso são duplicadas
+    ANOMALIA_JORNADA_MAXIMA_MINUTOS: int = Field(default=960)  # Entrada sem batida seguinte nesse prazo fica sem saída
+    
+    # Esboços de pontualidade (percentis de atraso por secretaria e dia)
+    PONTUALIDADE_LIMITE_MINUTOS: int = Field(default=720)  # Desvios além disso (em módulo) são truncados
+    
+    # Particionamento mensal de batidas_originais e batidas_processadas
+    PARTICOES_MESES_A_FRENTE: int = Field(default=3)  # Partições mensais futuras mantidas criadas
+    PARTICOES_INTERVALO_HORAS: int = Field(default=24)  # Intervalo da tarefa que cria as partições futuras
+    
+    # Configurações do worker de processamento (python -m app.worker)
+    WORKER_CONCORRENCIA: int = Field(default=2)  # Tarefas executadas simultaneamente
+    WORKER_INTERVALO_POLL: float = Field(default=2.0)  # Segundos de espera quando a fila está vazia
+    WORKER_TIMEOUT_TAREFA: int = Field(default=300)  # Segundos sem sinal de vida até uma tarefa "executando" ser considerada abandonada
+    WORKER_INTERVALO_SINAL: float = Field(default=30.0)  # Segundos entre as renovações do sinal de vida da tarefa em execução
+    WORKER_MAX_TENTATIVAS: int = Field(default=3)  # Tentativas por tarefa antes de marcá-la como erro
+
     # Configurações de autenticação
     SECRET_KEY: str = Field(default="sua_chave_secreta_padrao_deve_ser_alterada_em_producao")
     ALGORITHM: str = Field(default="HS256")
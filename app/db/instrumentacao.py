@@ -0,0 +1,181 @@
+# app/db/instrumentacao.py
+"""
+Instrumentação das consultas ao banco por requisição.
+
+Os eventos before/after_cursor_execute dos engines acumulam, na requisição
+corrente (contextvar iniciado pelo middleware), a quantidade de consultas, o
+tempo gasto no banco e quantas vezes cada statement foi executado. Fora de
+uma requisição (worker, scripts) os eventos retornam de imediato.
+
+Ao final da requisição os statements são agrupados por forma (o SQL com os
+parâmetros como marcadores e as listas de IN colapsadas): uma forma executada
+DB_N_MAIS_UM_LIMITE vezes ou mais é sinalizada como provável N+1 (ex.: uma
+consulta por dia em um laço). Os totais são agregados por rota em memória,
+por processo, e consultados em /api/diagnostico/consultas.
+"""
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Listas de marcadores (IN expandido, VALUES em lote) viram um único marcador
+_LISTA_MARCADORES = re.compile(r"(%\(\w+\)s|\$\d+|\?)(\s*,\s*(%\(\w+\)s|\$\d+|\?))+")
+_ESPACOS = re.compile(r"\s+")
+
+# Formas repetidas guardadas por rota
+MAX_FORMAS_POR_ROTA = 10
+
+def forma_sql(statement: str) -> str:
+    """Normaliza o statement para comparar execuções da mesma consulta."""
+    return _ESPACOS.sub(" ", _LISTA_MARCADORES.sub(r"\1", statement)).strip()
+
+class ConsultasRequisicao:
+    """Consultas de uma requisição: quantidade, tempo e execuções por statement."""
+
+    __slots__ = ("consultas", "tempo", "statements", "inicio")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo = 0.0
+        self.statements: Dict[str, int] = {}
+        self.inicio = time.perf_counter()
+
+    def registrar(self, statement: str, duracao: float):
+        self.consultas += 1
+        self.tempo += duracao
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repetidas(self, limite: int) -> List[Tuple[str, int]]:
+        """Formas executadas ao menos `limite` vezes, da mais repetida para a menos."""
+        formas: Dict[str, int] = {}
+        for statement, vezes in self.statements.items():
+            forma = forma_sql(statement)
+            formas[forma] = formas.get(forma, 0) + vezes
+        return sorted(
+            ((forma, vezes) for forma, vezes in formas.items() if vezes >= limite),
+            key=lambda item: -item[1]
+        )
+
+_requisicao_atual: ContextVar[Optional[ConsultasRequisicao]] = ContextVar("consultas_requisicao", default=None)
+
+def iniciar_requisicao() -> ConsultasRequisicao:
+    """Associa um novo acumulador à requisição (chamado pelo middleware)."""
+    consultas = ConsultasRequisicao()
+    _requisicao_atual.set(consultas)
+    return consultas
+
+def instrumentar_engine(engine: Engine):
+    """Registra os eventos de contagem e tempo das consultas no engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if _requisicao_atual.get() is not None:
+            conn.info.setdefault("instrumentacao_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        consultas = _requisicao_atual.get()
+        if consultas is None:
+            return
+        inicios = conn.info.get("instrumentacao_inicio")
+        if inicios:
+            consultas.registrar(statement, time.perf_counter() - inicios.pop())
+
+class EstatisticasRotas:
+    """Totais de consultas por rota, acumulados desde o início do processo (ou da última limpeza)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._rotas: Dict[str, Dict[str, Any]] = {}
+
+    def registrar(self, rota: str, consultas: ConsultasRequisicao, repetidas: List[Tuple[str, int]]):
+        tempo_ms = consultas.tempo * 1000
+        with self._trava:
+            estatistica = self._rotas.get(rota)
+            if estatistica is None:
+                estatistica = self._rotas[rota] = {
+                    "rota": rota,
+                    "requisicoes": 0,
+                    "consultas_total": 0,
+                    "consultas_max": 0,
+                    "tempo_db_total_ms": 0.0,
+                    "tempo_db_max_ms": 0.0,
+                    "requisicoes_n_mais_um": 0,
+                    "formas_repetidas": {},
+                }
+            estatistica["requisicoes"] += 1
+            estatistica["consultas_total"] += consultas.consultas
+            estatistica["consultas_max"] = max(estatistica["consultas_max"], consultas.consultas)
+            estatistica["tempo_db_total_ms"] += tempo_ms
+            estatistica["tempo_db_max_ms"] = max(estatistica["tempo_db_max_ms"], tempo_ms)
+            if repetidas:
+                estatistica["requisicoes_n_mais_um"] += 1
+                formas = estatistica["formas_repetidas"]
+                for forma, vezes in repetidas:
+                    if forma in formas or len(formas) < MAX_FORMAS_POR_ROTA:
+                        formas[forma] = max(formas.get(forma, 0), vezes)
+
+    def resumo(self, ordenar_por: str = "tempo_db_total_ms", limite: int = 50) -> List[Dict[str, Any]]:
+        """
+        Estatísticas por rota, com as médias por requisição.
+
+        Args:
+            ordenar_por: Campo numérico de ordenação (decrescente)
+            limite: Quantidade máxima de rotas
+
+        Returns:
+            Uma entrada por rota
+
+        Raises:
+            ValueError: Se o campo de ordenação for inválido
+        """
+        with self._trava:
+            linhas = [
+                {
+                    **estatistica,
+                    "consultas_media": estatistica["consultas_total"] / estatistica["requisicoes"],
+                    "tempo_db_medio_ms": estatistica["tempo_db_total_ms"] / estatistica["requisicoes"],
+                    "formas_repetidas": [
+                        {"sql": forma, "execucoes_max": vezes}
+                        for forma, vezes in sorted(estatistica["formas_repetidas"].items(), key=lambda item: -item[1])
+                    ],
+                }
+                for estatistica in self._rotas.values()
+            ]
+        if linhas and not isinstance(linhas[0].get(ordenar_por), (int, float)):
+            raise ValueError(f"Campo de ordenação inválido: {ordenar_por}")
+        linhas.sort(key=lambda linha: -linha[ordenar_por])
+        return linhas[:limite]
+
+    def limpar(self):
+        with self._trava:
+            self._rotas.clear()
+
+estatisticas_rotas = EstatisticasRotas()
+
+def finalizar_requisicao(rota: str, consultas: ConsultasRequisicao) -> List[Tuple[str, int]]:
+    """
+    Agrega a requisição nas estatísticas da rota e sinaliza as formas repetidas.
+
+    Args:
+        rota: Método e caminho da rota (ex.: "GET /api/batidas/originais/{batida_id}")
+        consultas: Acumulador da requisição
+
+    Returns:
+        Formas repetidas (prováveis N+1) com a quantidade de execuções
+    """
+    repetidas = consultas.repetidas(settings.DB_N_MAIS_UM_LIMITE) if consultas.consultas else []
+    for forma, vezes in repetidas:
+        logger.warning(f"Possível N+1 em {rota}: {vezes} execuções de {forma[:300]}")
+    estatisticas_rotas.registrar(rota, consultas, repetidas)
+    return repetidas
@@ -123,8 +123,11 @@ CREATE TABLE feriados (
 );
 
 -- Tabela de Batidas de Ponto (Originais)
+-- Particionada por mês em data_hora: as partições mensais são criadas pela
+-- aplicação (app.services.particoes_batidas); a partição padrão recebe as
+-- batidas de meses ainda sem partição.
 CREATE TABLE batidas_originais (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     servidor_id INTEGER REFERENCES servidores(id) ON DELETE CASCADE,
     data_hora TIMESTAMP NOT NULL,
     tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('entrada', 'saida')),
@@ -132,13 +135,18 @@ CREATE TABLE batidas_originais (
     localizacao VARCHAR(100),
     importado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     arquivo_origem VARCHAR(200),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, data_hora)
+) PARTITION BY RANGE (data_hora);
+
+CREATE TABLE batidas_originais_padrao PARTITION OF batidas_originais DEFAULT;
 
 -- Tabela de Batidas de Ponto (Processadas/Autorizadas)
+-- Particionada por mês em data_hora, como batidas_originais. batida_original_id
+-- não tem chave estrangeira: id sozinho não é único na tabela particionada.
 CREATE TABLE batidas_processadas (
-    id SERIAL PRIMARY KEY,
-    batida_original_id INTEGER REFERENCES batidas_originais(id) ON DELETE SET NULL,
+    id SERIAL,
+    batida_original_id INTEGER,
     servidor_id INTEGER REFERENCES servidores(id) ON DELETE CASCADE,
     data_hora TIMESTAMP NOT NULL,
     tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('entrada', 'saida')),
@@ -147,8 +155,11 @@ CREATE TABLE batidas_processadas (
     justificativa_id INTEGER,
     processado_por VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, data_hora)
+) PARTITION BY RANGE (data_hora);
+
+CREATE TABLE batidas_processadas_padrao PARTITION OF batidas_processadas DEFAULT;
 
 -- Tabela de Justificativas
 CREATE TABLE justificativas (
@@ -624,11 +635,14 @@ CREATE INDEX idx_horarios_padrao_servidor ON horarios_padrao(servidor_id);
 CREATE INDEX idx_batidas_originais_servidor ON batidas_originais(servidor_id);
 CREATE INDEX idx_batidas_originais_data ON batidas_originais(data_hora);
 CREATE INDEX idx_batidas_originais_tipo ON batidas_originais(tipo);
+CREATE INDEX idx_batidas_originais_servidor_data_hora ON batidas_originais(servidor_id, data_hora);
 
 CREATE INDEX idx_batidas_processadas_servidor ON batidas_processadas(servidor_id);
 CREATE INDEX idx_batidas_processadas_data ON batidas_processadas(data_hora);
 CREATE INDEX idx_batidas_processadas_status ON batidas_processadas(status);
 CREATE INDEX idx_batidas_processadas_tipo ON batidas_processadas(tipo);
+CREATE INDEX idx_batidas_processadas_original ON batidas_processadas(batida_original_id);
+CREATE INDEX idx_batidas_processadas_servidor_data_hora ON batidas_processadas(servidor_id, data_hora);
 
 CREATE INDEX idx_justificativas_servidor ON justificativas(servidor_id);
 CREATE INDEX idx_justificativas_data ON justificativas(data);
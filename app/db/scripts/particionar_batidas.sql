@@ -0,0 +1,246 @@
+-- =============================================
+-- Migração: particionamento mensal de batidas_originais e batidas_processadas
+-- =============================================
+-- Converte as tabelas de um banco existente (não particionadas) para o layout
+-- particionado por intervalo de data_hora. Tudo roda em uma transação com as
+-- duas tabelas bloqueadas: em caso de erro nada muda. Uso, com a API e os
+-- workers parados:
+--
+--     psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f app/db/scripts/particionar_batidas.sql
+--
+-- Passos: guarda e remove as visões que dependem das tabelas; remove as
+-- chaves estrangeiras para elas (id deixa de ser único); renomeia as tabelas
+-- antigas (e seus índices) para *_antiga; cria as tabelas particionadas, a
+-- partição padrão e uma partição por mês com dados; copia as linhas; transfere
+-- as sequências de id, os gatilhos e recria índices e visões; remove as
+-- tabelas antigas. As partições dos meses seguintes são criadas pela API na
+-- inicialização (app.services.particoes_batidas).
+
+BEGIN;
+
+SET LOCAL search_path TO ponto, public;
+
+LOCK TABLE ponto.batidas_originais, ponto.batidas_processadas IN ACCESS EXCLUSIVE MODE;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid IN ('ponto.batidas_originais'::regclass, 'ponto.batidas_processadas'::regclass)
+    ) THEN
+        RAISE EXCEPTION 'batidas_originais/batidas_processadas já são particionadas';
+    END IF;
+END $$;
+
+-- 1. Visões que dependem das tabelas (direta ou indiretamente), na ordem de criação
+CREATE TEMP TABLE _visoes_batidas (
+    ordem SERIAL,
+    nome TEXT,
+    materializada BOOLEAN,
+    definicao TEXT
+) ON COMMIT DROP;
+
+WITH RECURSIVE dependentes (oid, nivel) AS (
+    SELECT DISTINCT r.ev_class, 1
+    FROM pg_depend d
+    JOIN pg_rewrite r ON r.oid = d.objid
+    WHERE d.classid = 'pg_rewrite'::regclass
+      AND d.refobjid IN ('ponto.batidas_originais'::regclass, 'ponto.batidas_processadas'::regclass)
+    UNION
+    SELECT r.ev_class, dependentes.nivel + 1
+    FROM dependentes
+    JOIN pg_depend d ON d.refobjid = dependentes.oid AND d.classid = 'pg_rewrite'::regclass
+    JOIN pg_rewrite r ON r.oid = d.objid
+    WHERE r.ev_class <> dependentes.oid
+)
+INSERT INTO _visoes_batidas (nome, materializada, definicao)
+SELECT c.oid::regclass::text, c.relkind = 'm', pg_get_viewdef(c.oid)
+FROM (SELECT oid, MAX(nivel) AS nivel FROM dependentes GROUP BY oid) v
+JOIN pg_class c ON c.oid = v.oid
+ORDER BY v.nivel, c.relname;
+
+DO $$
+DECLARE
+    v RECORD;
+BEGIN
+    FOR v IN SELECT * FROM _visoes_batidas ORDER BY ordem DESC LOOP
+        IF v.materializada THEN
+            EXECUTE format('DROP MATERIALIZED VIEW %s', v.nome);
+        ELSE
+            EXECUTE format('DROP VIEW %s', v.nome);
+        END IF;
+    END LOOP;
+END $$;
+
+-- 2. Chaves estrangeiras para as tabelas (ex.: batidas_processadas.batida_original_id, anomalias_batidas)
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT conrelid::regclass AS tabela, conname
+        FROM pg_constraint
+        WHERE contype = 'f'
+          AND confrelid IN ('ponto.batidas_originais'::regclass, 'ponto.batidas_processadas'::regclass)
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', r.tabela, r.conname);
+    END LOOP;
+END $$;
+
+-- 3. Tabelas antigas renomeadas; índices (e as restrições que os usam) com sufixo _antiga
+ALTER TABLE ponto.batidas_originais RENAME TO batidas_originais_antiga;
+ALTER TABLE ponto.batidas_processadas RENAME TO batidas_processadas_antiga;
+
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = 'ponto' AND tablename IN ('batidas_originais_antiga', 'batidas_processadas_antiga')
+    LOOP
+        EXECUTE format('ALTER INDEX ponto.%I RENAME TO %I', r.indexname, left(r.indexname, 56) || '_antiga');
+    END LOOP;
+END $$;
+
+-- 4. Tabelas particionadas (mesma definição de docker/postgres/init.sql)
+CREATE TABLE ponto.batidas_originais (
+    id INTEGER NOT NULL,
+    servidor_id INTEGER REFERENCES ponto.servidores(id) ON DELETE CASCADE,
+    data_hora TIMESTAMP NOT NULL,
+    tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('entrada', 'saida')),
+    dispositivo VARCHAR(50),
+    localizacao VARCHAR(100),
+    importado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    arquivo_origem VARCHAR(200),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, data_hora)
+) PARTITION BY RANGE (data_hora);
+
+CREATE TABLE ponto.batidas_processadas (
+    id INTEGER NOT NULL,
+    batida_original_id INTEGER,
+    servidor_id INTEGER REFERENCES ponto.servidores(id) ON DELETE CASCADE,
+    data_hora TIMESTAMP NOT NULL,
+    tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('entrada', 'saida')),
+    status VARCHAR(20) NOT NULL,
+    processado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    justificativa_id INTEGER REFERENCES ponto.justificativas(id) ON DELETE SET NULL,
+    processado_por VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, data_hora)
+) PARTITION BY RANGE (data_hora);
+
+-- As restrições CHECK de status da tabela antiga são mantidas
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT pg_get_constraintdef(oid) AS definicao
+        FROM pg_constraint
+        WHERE conrelid = 'ponto.batidas_processadas_antiga'::regclass
+          AND contype = 'c'
+          AND pg_get_constraintdef(oid) LIKE '%status%'
+    LOOP
+        EXECUTE format('ALTER TABLE ponto.batidas_processadas ADD %s', r.definicao);
+    END LOOP;
+END $$;
+
+-- 5. Partição padrão e uma partição por mês com dados (nomes de app.services.particoes_batidas.nome_particao)
+DO $$
+DECLARE
+    v_tabela TEXT;
+    v_mes DATE;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY['batidas_originais', 'batidas_processadas'] LOOP
+        EXECUTE format('CREATE TABLE ponto.%I PARTITION OF ponto.%I DEFAULT', v_tabela || '_padrao', v_tabela);
+        FOR v_mes IN EXECUTE format(
+            'SELECT DISTINCT CAST(date_trunc(''month'', data_hora) AS date) FROM ponto.%I ORDER BY 1',
+            v_tabela || '_antiga'
+        ) LOOP
+            EXECUTE format(
+                'CREATE TABLE ponto.%I PARTITION OF ponto.%I FOR VALUES FROM (%L) TO (%L)',
+                v_tabela || to_char(v_mes, '"_p"YYYY_MM'), v_tabela, v_mes, (v_mes + interval '1 month')::date
+            );
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- 6. Cópia das linhas
+INSERT INTO ponto.batidas_originais
+    (id, servidor_id, data_hora, tipo, dispositivo, localizacao, importado_em, arquivo_origem, created_at)
+SELECT id, servidor_id, data_hora, tipo, dispositivo, localizacao, importado_em, arquivo_origem, created_at
+FROM ponto.batidas_originais_antiga;
+
+INSERT INTO ponto.batidas_processadas
+    (id, batida_original_id, servidor_id, data_hora, tipo, status, processado_em,
+     justificativa_id, processado_por, created_at, updated_at)
+SELECT id, batida_original_id, servidor_id, data_hora, tipo, status, processado_em,
+       justificativa_id, processado_por, created_at, updated_at
+FROM ponto.batidas_processadas_antiga;
+
+-- 7. Sequências de id e gatilhos passam para as novas tabelas
+DO $$
+DECLARE
+    v_tabela TEXT;
+    v_sequencia TEXT;
+    r RECORD;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY['batidas_originais', 'batidas_processadas'] LOOP
+        v_sequencia := pg_get_serial_sequence('ponto.' || v_tabela || '_antiga', 'id');
+        IF v_sequencia IS NULL THEN
+            RAISE EXCEPTION 'Sequência de ponto.%.id não encontrada', v_tabela;
+        END IF;
+        EXECUTE format('ALTER TABLE ponto.%I ALTER COLUMN id SET DEFAULT nextval(%L)', v_tabela, v_sequencia);
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY ponto.%I.id', v_sequencia, v_tabela);
+        EXECUTE format('ALTER TABLE ponto.%I ALTER COLUMN id DROP DEFAULT', v_tabela || '_antiga');
+
+        FOR r IN
+            SELECT tgname, pg_get_triggerdef(oid) AS definicao
+            FROM pg_trigger
+            WHERE tgrelid = ('ponto.' || v_tabela || '_antiga')::regclass AND NOT tgisinternal
+        LOOP
+            EXECUTE format('DROP TRIGGER %I ON ponto.%I', r.tgname, v_tabela || '_antiga');
+            EXECUTE regexp_replace(
+                r.definicao, ' ON (ponto\.)?' || v_tabela || '_antiga ', ' ON ponto.' || v_tabela || ' '
+            );
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- 8. Índices (criados em cada partição pelo PostgreSQL)
+CREATE INDEX idx_batidas_originais_servidor ON ponto.batidas_originais(servidor_id);
+CREATE INDEX idx_batidas_originais_data ON ponto.batidas_originais(data_hora);
+CREATE INDEX idx_batidas_originais_tipo ON ponto.batidas_originais(tipo);
+CREATE INDEX idx_batidas_originais_servidor_data_hora ON ponto.batidas_originais(servidor_id, data_hora);
+
+CREATE INDEX idx_batidas_processadas_servidor ON ponto.batidas_processadas(servidor_id);
+CREATE INDEX idx_batidas_processadas_data ON ponto.batidas_processadas(data_hora);
+CREATE INDEX idx_batidas_processadas_status ON ponto.batidas_processadas(status);
+CREATE INDEX idx_batidas_processadas_tipo ON ponto.batidas_processadas(tipo);
+CREATE INDEX idx_batidas_processadas_original ON ponto.batidas_processadas(batida_original_id);
+CREATE INDEX idx_batidas_processadas_servidor_data_hora ON ponto.batidas_processadas(servidor_id, data_hora);
+
+-- 9. Tabelas antigas removidas e visões recriadas
+DROP TABLE ponto.batidas_originais_antiga;
+DROP TABLE ponto.batidas_processadas_antiga;
+
+DO $$
+DECLARE
+    v RECORD;
+BEGIN
+    FOR v IN SELECT * FROM _visoes_batidas ORDER BY ordem LOOP
+        IF v.materializada THEN
+            EXECUTE format('CREATE MATERIALIZED VIEW %s AS %s', v.nome, v.definicao);
+        ELSE
+            EXECUTE format('CREATE VIEW %s AS %s', v.nome, v.definicao);
+        END IF;
+    END LOOP;
+END $$;
+
+ANALYZE ponto.batidas_originais;
+ANALYZE ponto.batidas_processadas;
+
+COMMIT;
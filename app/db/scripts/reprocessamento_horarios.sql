@@ -0,0 +1,154 @@
+-- =============================================
+-- Reprocessamento do espelho após mudanças de horário
+-- =============================================
+-- Horários padrão e alterações de horário são gravados fora da API (fluxo de
+-- conversas do WhatsApp, SQL direto). Os gatilhos abaixo marcam, na mesma
+-- transação da mudança, os resumos diários afetados como desatualizados e
+-- enfileiram uma tarefa "processar_dias" por servidor com as datas marcadas.
+--
+-- Idempotente: executado por init_db na inicialização da API.
+
+-- Marca os resumos dos servidores (ou dos servidores das secretarias) no
+-- intervalo, opcionalmente só em um dia da semana (0-6, domingo-sábado), e
+-- enfileira o reprocessamento. resumos_diarios e tarefas_processamento são
+-- criadas pela aplicação; antes disso não há o que invalidar.
+CREATE OR REPLACE FUNCTION ponto.invalidar_resumos_horario(
+    p_servidores INTEGER[],
+    p_secretarias INTEGER[],
+    p_inicio DATE,
+    p_fim DATE,
+    p_dia_semana INTEGER DEFAULT NULL
+)
+RETURNS void AS $$
+BEGIN
+    IF to_regclass('ponto.resumos_diarios') IS NULL OR to_regclass('ponto.tarefas_processamento') IS NULL THEN
+        RETURN;
+    END IF;
+
+    WITH marcados AS (
+        UPDATE ponto.resumos_diarios r
+        SET desatualizado = TRUE
+        WHERE NOT r.desatualizado
+          AND r.data BETWEEN p_inicio AND p_fim
+          AND (p_dia_semana IS NULL OR EXTRACT(DOW FROM r.data) = p_dia_semana)
+          AND (
+              r.servidor_id = ANY(COALESCE(p_servidores, '{}'))
+              OR r.servidor_id IN (
+                  SELECT s.id FROM ponto.servidores s
+                  WHERE s.secretaria_id = ANY(COALESCE(p_secretarias, '{}'))
+              )
+          )
+        RETURNING r.servidor_id, r.data
+    )
+    -- max_tentativas vem do padrão da coluna (WORKER_MAX_TENTATIVAS, ver tarefas_processamento.sql)
+    INSERT INTO ponto.tarefas_processamento
+        (tipo, parametros, status, tentativas, disponivel_em, created_at, updated_at)
+    SELECT 'processar_dias',
+           jsonb_build_object(
+               'servidor_id', servidor_id,
+               'datas', jsonb_agg(to_char(data, 'YYYY-MM-DD') ORDER BY data)
+           ),
+           'pendente', 0, now(), now(), now()
+    FROM marcados
+    GROUP BY servidor_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Horário padrão (não tem vigência): reprocessa o mês corrente no dia da semana alterado
+CREATE OR REPLACE FUNCTION ponto.reprocessar_horario_padrao()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM ponto.invalidar_resumos_horario(
+            ARRAY[OLD.servidor_id], NULL, date_trunc('month', CURRENT_DATE)::date, CURRENT_DATE, OLD.dia_semana
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM ponto.invalidar_resumos_horario(
+            ARRAY[NEW.servidor_id], NULL, date_trunc('month', CURRENT_DATE)::date, CURRENT_DATE, NEW.dia_semana
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Alteração de horário: reprocessa o intervalo antigo e o novo dos servidores e secretarias vinculados.
+-- Na exclusão roda antes do ON DELETE CASCADE, enquanto os vínculos ainda existem.
+CREATE OR REPLACE FUNCTION ponto.reprocessar_alteracao_horario()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_alteracao_id INTEGER := COALESCE(NEW.id, OLD.id);
+    v_servidores INTEGER[];
+    v_secretarias INTEGER[];
+BEGIN
+    SELECT array_agg(servidor_id) INTO v_servidores
+    FROM ponto.alteracoes_horario_servidores WHERE alteracao_id = v_alteracao_id;
+    SELECT array_agg(secretaria_id) INTO v_secretarias
+    FROM ponto.alteracoes_horario_secretarias WHERE alteracao_id = v_alteracao_id;
+
+    PERFORM ponto.invalidar_resumos_horario(v_servidores, v_secretarias, OLD.data_inicio, OLD.data_fim);
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM ponto.invalidar_resumos_horario(v_servidores, v_secretarias, NEW.data_inicio, NEW.data_fim);
+        RETURN NULL;
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Vínculo de servidor ou secretaria incluído ou removido: reprocessa o intervalo da alteração
+CREATE OR REPLACE FUNCTION ponto.reprocessar_vinculo_alteracao_horario()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_vinculo RECORD;
+    v_alteracao RECORD;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_vinculo := OLD;
+    ELSE
+        v_vinculo := NEW;
+    END IF;
+
+    -- Removido em cascata com a alteração: já tratado por reprocessar_alteracao_horario
+    SELECT data_inicio, data_fim INTO v_alteracao
+    FROM ponto.alteracoes_horario WHERE id = v_vinculo.alteracao_id;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_TABLE_NAME = 'alteracoes_horario_servidores' THEN
+        PERFORM ponto.invalidar_resumos_horario(
+            ARRAY[v_vinculo.servidor_id], NULL, v_alteracao.data_inicio, v_alteracao.data_fim
+        );
+    ELSE
+        PERFORM ponto.invalidar_resumos_horario(
+            NULL, ARRAY[v_vinculo.secretaria_id], v_alteracao.data_inicio, v_alteracao.data_fim
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS reprocessar_horario_padrao ON ponto.horarios_padrao;
+CREATE TRIGGER reprocessar_horario_padrao
+AFTER INSERT OR UPDATE OR DELETE ON ponto.horarios_padrao
+FOR EACH ROW EXECUTE FUNCTION ponto.reprocessar_horario_padrao();
+
+DROP TRIGGER IF EXISTS reprocessar_alteracao_horario ON ponto.alteracoes_horario;
+CREATE TRIGGER reprocessar_alteracao_horario
+AFTER UPDATE ON ponto.alteracoes_horario
+FOR EACH ROW EXECUTE FUNCTION ponto.reprocessar_alteracao_horario();
+
+DROP TRIGGER IF EXISTS reprocessar_exclusao_alteracao_horario ON ponto.alteracoes_horario;
+CREATE TRIGGER reprocessar_exclusao_alteracao_horario
+BEFORE DELETE ON ponto.alteracoes_horario
+FOR EACH ROW EXECUTE FUNCTION ponto.reprocessar_alteracao_horario();
+
+DROP TRIGGER IF EXISTS reprocessar_vinculo_servidor ON ponto.alteracoes_horario_servidores;
+CREATE TRIGGER reprocessar_vinculo_servidor
+AFTER INSERT OR DELETE ON ponto.alteracoes_horario_servidores
+FOR EACH ROW EXECUTE FUNCTION ponto.reprocessar_vinculo_alteracao_horario();
+
+DROP TRIGGER IF EXISTS reprocessar_vinculo_secretaria ON ponto.alteracoes_horario_secretarias;
+CREATE TRIGGER reprocessar_vinculo_secretaria
+AFTER INSERT OR DELETE ON ponto.alteracoes_horario_secretarias
+FOR EACH ROW EXECUTE FUNCTION ponto.reprocessar_vinculo_alteracao_horario();
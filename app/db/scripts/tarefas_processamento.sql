@@ -0,0 +1,20 @@
+-- =============================================
+-- Fila de processamento (ponto.tarefas_processamento)
+-- =============================================
+-- A tabela é criada pela aplicação (create_all), que não altera tabelas já
+-- existentes: as colunas adicionadas depois da criação ficam aqui, assim como
+-- os padrões usados por quem enfileira direto no banco (gatilhos de
+-- reprocessamento_horarios.sql).
+--
+-- Idempotente: executado por init_db na inicialização da API, com
+-- ponto.worker_max_tentativas definido a partir de WORKER_MAX_TENTATIVAS.
+
+-- Sinal de vida renovado pelo worker durante a execução (app.services.fila_tarefas)
+ALTER TABLE ponto.tarefas_processamento ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMP;
+
+-- Tentativas das tarefas enfileiradas sem max_tentativas, acompanhando a configuração a cada inicialização
+DO $$
+BEGIN
+    EXECUTE 'ALTER TABLE ponto.tarefas_processamento ALTER COLUMN max_tentativas SET DEFAULT '
+        || current_setting('ponto.worker_max_tentativas')::integer;
+END $$;
@@ -1,13 +1,21 @@
 # app/db/session.py
 import logging
+import os
+import random
 import time
+from contextvars import ContextVar
+from typing import List, Optional
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select, TextClause
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 
 from app.core.config import settings
+from app.db.instrumentacao import instrumentar_engine
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +35,40 @@ engine = create_engine(
     echo=settings.DB_ECHO_LOG,  # Habilita log de SQL quando em modo debug
 )
 
+# Engines das réplicas de leitura (vazio quando DATABASE_REPLICA_URLS não está definido)
+replica_engines: List[Engine] = [
+    create_engine(
+        url.strip(),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=settings.DB_ECHO_LOG,
+    )
+    for url in (settings.DATABASE_REPLICA_URLS or "").split(",") if url.strip()
+]
+
+# Engine assíncrono (asyncpg) para as rotas "async def": as consultas não
+# bloqueiam o event loop e requisições simultâneas sobrepõem a espera do banco
+def _url_assincrona(url: str) -> str:
+    """Troca o driver da URL do banco pelo asyncpg (ex.: postgresql+psycopg2:// -> postgresql+asyncpg://)."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+async_engine = create_async_engine(
+    _url_assincrona(SQLALCHEMY_DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO_LOG,
+)
+
+# Contagem e tempo das consultas por requisição (sempre ativos; ver app.db.instrumentacao)
+for _engine in (engine, *replica_engines, async_engine.sync_engine):
+    instrumentar_engine(_engine)
+
 # Configurar evento para logging de queries
 if settings.DB_ECHO_LOG:
     @event.listens_for(engine, "before_cursor_execute")
@@ -62,7 +104,93 @@ def get_session_with_retry(retries=3, backoff=0.5):
             logger.error(f"Erro ao conectar ao banco de dados: {str(e)}")
             raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class EstadoLeituraRequisicao:
+    """
+    Estado de roteamento de uma requisição HTTP, compartilhado pelas sessões
+    abertas nela (inclusive nas threads das rotas síncronas).
+    """
+
+    __slots__ = ("forcar_primario", "escreveu", "replica")
+
+    def __init__(self, forcar_primario: bool = False):
+        self.forcar_primario = forcar_primario  # Leitura própria: o cliente escreveu há pouco
+        self.escreveu = False  # Alguma sessão da requisição escreveu no primário
+        self.replica: Optional[Engine] = None  # Réplica sorteada na primeira leitura da requisição
+
+_estado_leitura: ContextVar[Optional[EstadoLeituraRequisicao]] = ContextVar("estado_leitura", default=None)
+
+def iniciar_estado_leitura(forcar_primario: bool = False) -> EstadoLeituraRequisicao:
+    """Associa um novo estado de roteamento à requisição (chamado pelo middleware)."""
+    estado = EstadoLeituraRequisicao(forcar_primario)
+    _estado_leitura.set(estado)
+    return estado
+
+def _somente_leitura(clause) -> bool:
+    """SELECT sem FOR UPDATE (ou SQL textual iniciado por SELECT/WITH)."""
+    if isinstance(clause, Select):
+        return clause._for_update_arg is None
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() in ("SELECT", "WITH")
+    return False
+
+class SessaoRoteada(Session):
+    """
+    Sessão que envia as leituras às réplicas e as escritas ao primário.
+
+    As leituras só vão para uma réplica quando a sessão foi aberta com
+    usar_replica (get_db_leitura) e há réplicas configuradas. Depois da
+    primeira escrita, a sessão lê apenas do primário (lê o que escreveu),
+    assim como a requisição cujo cliente escreveu há menos de
+    DB_REPLICA_JANELA_LEITURA_PROPRIA segundos.
+
+    A réplica é sorteada uma vez por requisição (guardada no estado de
+    roteamento) ou, fora de requisições, uma vez por sessão: todas as
+    leituras veem o mesmo ponto da replicação, e a conexão da sessão é
+    reaproveitada em vez de abrir uma por réplica.
+    """
+
+    def __init__(self, *args, usar_replica: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.usar_replica = usar_replica and bool(replica_engines)
+        self.escreveu = False
+        self._replica: Optional[Engine] = None
+
+    def _replica_da_sessao(self, estado: Optional[EstadoLeituraRequisicao]) -> Engine:
+        if self._replica is None:
+            if estado is not None:
+                if estado.replica is None:
+                    estado.replica = random.choice(replica_engines)
+                self._replica = estado.replica
+            else:
+                self._replica = random.choice(replica_engines)
+        return self._replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        leitura = not self._flushing and _somente_leitura(clause)
+        if leitura:
+            if self.usar_replica and not self.escreveu:
+                estado = _estado_leitura.get()
+                if estado is None or not estado.forcar_primario:
+                    return self._replica_da_sessao(estado)
+        elif clause is not None or self._flushing:
+            self.escreveu = True
+            estado = _estado_leitura.get()
+            if estado is not None:
+                estado.escreveu = True
+        return engine
+
+# As rotas assíncronas usam sempre o primário; suas escritas também ativam a leitura própria
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _marcar_escrita_assincrona(conn, cursor, statement, parameters, context, executemany):
+    estado = _estado_leitura.get()
+    if estado is not None and not estado.escreveu and statement.lstrip()[:6].upper() not in ("SELECT", "WITH"):
+        estado.escreveu = True
+
+SessionLocal = sessionmaker(class_=SessaoRoteada, autocommit=False, autoflush=False, bind=engine)
+SessionLeitura = sessionmaker(class_=SessaoRoteada, autocommit=False, autoflush=False, bind=engine,
+                              usar_replica=True)
+# expire_on_commit=False: atributos lidos após o commit não disparam I/O implícito
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # Dependência para obter a sessão do banco de dados
@@ -78,6 +206,48 @@ def get_db():
     finally:
         db.close()
 
+# Dependência para rotas somente leitura (listagens, consultas e relatórios)
+def get_db_leitura():
+    """
+    Dependência para obter uma sessão que lê das réplicas, quando configuradas.
+    Escritas feitas por ela vão para o primário.
+    """
+    db = SessionLeitura()
+    try:
+        yield db
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Erro na transação do banco de dados: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+# Dependência para obter a sessão assíncrona do banco de dados
+async def get_async_db():
+    """Dependência para obter uma sessão assíncrona (asyncpg) para uso nas rotas "async def"."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Erro na transação do banco de dados: {str(e)}")
+            raise
+
+# Scripts SQL idempotentes executados na inicialização (colunas novas, funções e gatilhos)
+DIRETORIO_SCRIPTS = os.path.join(os.path.dirname(__file__), "scripts")
+SCRIPTS_INICIALIZACAO = ("tarefas_processamento.sql", "reprocessamento_horarios.sql")
+
+def executar_scripts_inicializacao(connection):
+    """Executa os scripts de SCRIPTS_INICIALIZACAO na conexão (sem commit)."""
+    # Configurações lidas pelos scripts com current_setting, válidas só nesta transação
+    connection.execute(
+        text("SELECT set_config('ponto.worker_max_tentativas', :valor, true)"),
+        {"valor": str(settings.WORKER_MAX_TENTATIVAS)}
+    )
+    for nome in SCRIPTS_INICIALIZACAO:
+        with open(os.path.join(DIRETORIO_SCRIPTS, nome), encoding="utf-8") as arquivo:
+            connection.exec_driver_sql(arquivo.read())
+
 # Função para inicializar o banco de dados
 def init_db():
     """Inicializa o banco de dados criando todas as tabelas definidas."""
@@ -88,6 +258,8 @@ def init_db():
             connection.commit()
             # Criar todas as tabelas
             Base.metadata.create_all(bind=engine)
+            executar_scripts_inicializacao(connection)
+            connection.commit()
             logger.info("Banco de dados inicializado com sucesso.")
     except Exception as e:
         logger.error(f"Erro ao inicializar o banco de dados: {str(e)}")
@@ -1,9 +1,12 @@
-from fastapi import FastAPI, Depends
+import time
+
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db.instrumentacao import finalizar_requisicao, iniciar_requisicao
 from app.api.api import api_router  # Importe o roteador API
-from app.db.session import init_db, get_db  # Importando a função init_db e get_db
+from app.db.session import init_db, get_db, async_engine, iniciar_estado_leitura, replica_engines  # Importando a função init_db e get_db
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -21,8 +24,63 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Consultas por requisição: agregadas por rota e, em modo DEBUG, devolvidas em cabeçalhos.
+# A agregação só é feita quando o corpo termina de ser enviado, para incluir as
+# consultas das respostas em streaming (ex.: NDJSON de POST
+# /api/batidas/processamento/stream), que rodam depois de call_next; os
+# cabeçalhos, enviados antes do corpo, contam só as consultas feitas até o
+# início da resposta.
+@app.middleware("http")
+async def instrumentacao_consultas_middleware(request: Request, call_next):
+    consultas = iniciar_requisicao()
+    response = await call_next(request)
+    rota = request.scope.get("route")
+    nome_rota = f"{request.method} {getattr(rota, 'path', 'sem rota')}"
+    if settings.DEBUG:
+        response.headers["X-DB-Consultas"] = str(consultas.consultas)
+        response.headers["X-DB-Tempo-Ms"] = f"{consultas.tempo * 1000:.1f}"
+        response.headers["X-DB-Consultas-Repetidas"] = str(len(consultas.repetidas(settings.DB_N_MAIS_UM_LIMITE)))
+
+    corpo = response.body_iterator
+
+    async def corpo_instrumentado():
+        try:
+            async for parte in corpo:
+                yield parte
+        finally:
+            finalizar_requisicao(nome_rota, consultas)
+
+    response.body_iterator = corpo_instrumentado()
+    return response
+
+# Leitura própria com réplicas: depois de uma escrita, o cliente lê do primário
+# durante DB_REPLICA_JANELA_LEITURA_PROPRIA segundos (cookie) ou quando pede
+# explicitamente com o cabeçalho X-Ler-Primario
+COOKIE_LEITURA_PRIMARIO = "ponto_ler_primario_ate"
+
+@app.middleware("http")
+async def roteamento_leitura_middleware(request: Request, call_next):
+    if not replica_engines:
+        return await call_next(request)
+    try:
+        primario_ate = float(request.cookies.get(COOKIE_LEITURA_PRIMARIO, 0))
+    except ValueError:
+        primario_ate = 0
+    estado = iniciar_estado_leitura(
+        forcar_primario=primario_ate > time.time() or request.headers.get("X-Ler-Primario") == "1"
+    )
+    response = await call_next(request)
+    janela = settings.DB_REPLICA_JANELA_LEITURA_PROPRIA
+    if estado.escreveu and janela > 0:
+        response.set_cookie(
+            COOKIE_LEITURA_PRIMARIO, str(int(time.time()) + janela), max_age=janela, httponly=True
+        )
+    return response
+
 # Importe a função de seeds
 from app.db.seeds import criar_ou_atualizar_usuarios
+from app.services.particoes_batidas import garantir_particoes
+from app.services.fila_tarefas import agendar_criacao_particoes
 
 # Adicionar evento de inicialização
 @app.on_event("startup")
@@ -35,10 +93,20 @@ async def startup_db_event():
     try:
         # Criar ou atualizar usuários com senhas consistentes
         criar_ou_atualizar_usuarios(db)
+        
+        # Partições mensais das batidas (a tarefa periódica mantém as futuras)
+        garantir_particoes(db)
+        agendar_criacao_particoes(db, settings.PARTICOES_INTERVALO_HORAS * 3600)
+        db.commit()
     finally:
         # Fechar a sessão
         db.close()
 
+@app.on_event("shutdown")
+async def shutdown_db_event():
+    # Fecha as conexões do pool assíncrono
+    await async_engine.dispose()
+
 # Incluir o roteador de API com prefixo /api
 app.include_router(api_router, prefix="/api")
 
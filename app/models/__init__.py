@@ -7,4 +7,12 @@ from app.models.batida import BatidaOriginal, BatidaProcessada
 from app.models.justificativa import Justificativa
 from app.models.feriado import Feriado
 from app.models.relatorio import Relatorio
+from app.models.resumo_diario import ResumoDiario
+from app.models.horario import HorarioPadrao, AlteracaoHorario, AlteracaoHorarioServidor, AlteracaoHorarioSecretaria
+from app.models.configuracao_sistema import ConfiguracaoSistema
+from app.models.tarefa_processamento import TarefaProcessamento
+from app.models.banco_horas import BancoHorasLancamento
+from app.models.anomalia_batida import AnomaliaBatida
+from app.models.sequencia_status import SequenciaStatus
+from app.models.esboco_pontualidade import EsbocoPontualidade
 # Adicione outras importações conforme necessário
\ No newline at end of file
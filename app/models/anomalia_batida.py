@@ -0,0 +1,24 @@
+# app/models/anomalia_batida.py
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Index, func
+
+from app.db.session import Base
+
+class AnomaliaBatida(Base):
+    """Anomalia encontrada pela varredura de qualidade das batidas originais."""
+    __tablename__ = "anomalias_batidas"
+    __table_args__ = (
+        # Consulta e substituição das anomalias de um período por servidor
+        Index("idx_anomalias_batidas_servidor_data", "servidor_id", "data"),
+        Index("idx_anomalias_batidas_data_tipo", "data", "tipo"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"), nullable=False)
+    data = Column(Date, nullable=False)
+    # Batida que originou a anomalia (nula nas anomalias do dia, ex.: quantidade ímpar).
+    # Sem chave estrangeira para a tabela particionada; removida com a batida em delete_batida_original.
+    batida_original_id = Column(Integer)
+    tipo = Column(String(30), nullable=False)  # quantidade_impar, batida_duplicada, sequencia_invalida, entrada_sem_saida
+    detalhe = Column(Text)
+    detectado_em = Column(DateTime, default=func.now())
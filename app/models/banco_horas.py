@@ -0,0 +1,20 @@
+# app/models/banco_horas.py
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint, func
+
+from app.db.session import Base
+
+class BancoHorasLancamento(Base):
+    """Lançamento diário do banco de horas, com o saldo acumulado até o dia (soma de prefixo)."""
+    __tablename__ = "banco_horas_lancamentos"
+    __table_args__ = (
+        # Também serve de índice para a busca do saldo por (servidor_id, data)
+        UniqueConstraint("servidor_id", "data", name="uq_banco_horas_servidor_data"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"), nullable=False)
+    data = Column(Date, nullable=False)
+    minutos_delta = Column(Integer, nullable=False, default=0)  # Extras menos faltas não justificadas do dia
+    saldo_minutos = Column(Integer, nullable=False, default=0)  # Soma dos deltas até a data, inclusive
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
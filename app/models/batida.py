@@ -1,16 +1,23 @@
 # app/models/batida.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
 
+# Tabela particionada por mês em data_hora (partições criadas por
+# app.services.particoes_batidas). A chave primária inclui data_hora, como o
+# PostgreSQL exige, e o índice (servidor_id, data_hora) é criado em cada partição.
 class BatidaOriginal(Base):
     __tablename__ = "batidas_originais"
-    __table_args__ = ({"schema": "ponto"},)  # Corrigido: adicionada a tupla e vírgula
+    __table_args__ = (
+        # Leitura da sequência de batidas de cada servidor em ordem (turnos, janelas LAG/LEAD)
+        Index("idx_batidas_originais_servidor_data_hora", "servidor_id", "data_hora"),
+        {"schema": "ponto", "postgresql_partition_by": "RANGE (data_hora)"},
+    )
     
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"))
-    data_hora = Column(DateTime, nullable=False)
+    data_hora = Column(DateTime, primary_key=True)
     tipo = Column(String(10), nullable=False)
     dispositivo = Column(String(50))
     localizacao = Column(String(100))
@@ -21,14 +28,21 @@ class BatidaOriginal(Base):
     # Relacionamentos
     servidor = relationship("Servidor", back_populates="batidas_originais")
 
+# Particionada por mês em data_hora, como batidas_originais
 class BatidaProcessada(Base):
     __tablename__ = "batidas_processadas"
-    __table_args__ = ({"schema": "ponto"},)  # Corrigido: adicionada a tupla e vírgula
+    __table_args__ = (
+        # Espelho e reprocessamento de um servidor em um período (poda para as partições do período)
+        Index("idx_batidas_processadas_servidor_data_hora", "servidor_id", "data_hora"),
+        {"schema": "ponto", "postgresql_partition_by": "RANGE (data_hora)"},
+    )
     
-    id = Column(Integer, primary_key=True)
-    batida_original_id = Column(Integer, ForeignKey("ponto.batidas_originais.id", ondelete="SET NULL"))
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Sem chave estrangeira: batidas_originais.id sozinho não é único na tabela particionada.
+    # A exclusão da batida original anula esta referência (ver delete_batida_original).
+    batida_original_id = Column(Integer, index=True)
     servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"))
-    data_hora = Column(DateTime, nullable=False)
+    data_hora = Column(DateTime, primary_key=True)
     tipo = Column(String(10), nullable=False)
     status = Column(String(20), nullable=False)
     processado_em = Column(DateTime, default=func.now())
@@ -39,5 +53,10 @@ class BatidaProcessada(Base):
     
     # Relacionamentos
     servidor = relationship("Servidor", back_populates="batidas_processadas")
-    batida_original = relationship("BatidaOriginal", backref="batida_processada")
+    batida_original = relationship(
+        "BatidaOriginal",
+        primaryjoin="foreign(BatidaProcessada.batida_original_id) == BatidaOriginal.id",
+        backref="batida_processada",
+        viewonly=True,
+    )
     justificativa = relationship("Justificativa", back_populates="batidas_processadas")
\ No newline at end of file
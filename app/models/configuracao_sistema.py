@@ -0,0 +1,19 @@
+# app/models/configuracao_sistema.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, func
+
+from app.db.session import Base
+
+class ConfiguracaoSistema(Base):
+    """Estado global do sistema em pares chave/valor."""
+    __tablename__ = "configuracoes_sistema"
+    __table_args__ = ({"schema": "ponto"},)
+
+    id = Column(Integer, primary_key=True)
+    chave = Column(String(100), unique=True, nullable=False, index=True)
+    valor = Column(Text)
+    tipo = Column(String(20), nullable=False)  # texto, numero, booleano, json, data, hora
+    descricao = Column(Text)
+    atualizado_em = Column(DateTime, default=func.now())
+    atualizado_por = Column(String(100))
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
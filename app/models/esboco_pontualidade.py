@@ -0,0 +1,26 @@
+# app/models/esboco_pontualidade.py
+from sqlalchemy import Column, Integer, String, Date, LargeBinary, DateTime, ForeignKey, UniqueConstraint, func
+
+from app.db.session import Base
+
+class EsbocoPontualidade(Base):
+    """
+    Distribuição dos desvios de horário (minutos em relação ao previsto) das
+    entradas ou saídas dos servidores de uma secretaria em um dia. Esboços de
+    dias diferentes são somados para responder percentis de qualquer período.
+    """
+    __tablename__ = "esbocos_pontualidade"
+    __table_args__ = (
+        # Também serve de índice para a leitura de um período por tipo
+        UniqueConstraint("secretaria_id", "tipo", "data", name="uq_esbocos_pontualidade_secretaria_tipo_data"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    secretaria_id = Column(Integer, ForeignKey("ponto.secretarias.id", ondelete="CASCADE"), nullable=False)
+    data = Column(Date, nullable=False)
+    tipo = Column(String(10), nullable=False)  # entrada, saida
+    # Pares (desvio em minutos, quantidade) como int32 little-endian, em ordem de desvio
+    esboco = Column(LargeBinary, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -0,0 +1,76 @@
+# app/models/horario.py
+from sqlalchemy import Column, Integer, String, Text, Date, Time, Boolean, DateTime, Interval, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+class HorarioPadrao(Base):
+    __tablename__ = "horarios_padrao"
+    __table_args__ = (
+        UniqueConstraint("servidor_id", "dia_semana"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"), index=True)
+    dia_semana = Column(Integer, nullable=False)  # 0-6 (domingo-sábado), como EXTRACT(DOW)
+    entrada_1 = Column(Time)
+    saida_1 = Column(Time)
+    entrada_2 = Column(Time)
+    saida_2 = Column(Time)
+    carga_horaria_diaria = Column(Interval)  # Calculada pelo trigger calcular_carga_horaria_padrao
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    # Relacionamentos
+    servidor = relationship("Servidor")
+
+class AlteracaoHorario(Base):
+    __tablename__ = "alteracoes_horario"
+    __table_args__ = ({"schema": "ponto"},)
+
+    id = Column(Integer, primary_key=True)
+    descricao = Column(Text, nullable=False)
+    data_criacao = Column(DateTime, nullable=False, default=func.now())
+    criado_por = Column(String(100), nullable=False)
+    data_inicio = Column(Date, nullable=False)
+    data_fim = Column(Date, nullable=False)
+    entrada_1 = Column(Time)
+    saida_1 = Column(Time)
+    entrada_2 = Column(Time)
+    saida_2 = Column(Time)
+    carga_horaria_diaria = Column(Interval)
+    comando_natural = Column(Text)
+    ativo = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class AlteracaoHorarioServidor(Base):
+    __tablename__ = "alteracoes_horario_servidores"
+    __table_args__ = (
+        UniqueConstraint("alteracao_id", "servidor_id"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    alteracao_id = Column(Integer, ForeignKey("ponto.alteracoes_horario.id", ondelete="CASCADE"))
+    servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"), index=True)
+    created_at = Column(DateTime, default=func.now())
+
+    # Relacionamentos
+    alteracao = relationship("AlteracaoHorario")
+
+class AlteracaoHorarioSecretaria(Base):
+    __tablename__ = "alteracoes_horario_secretarias"
+    __table_args__ = (
+        UniqueConstraint("alteracao_id", "secretaria_id"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    alteracao_id = Column(Integer, ForeignKey("ponto.alteracoes_horario.id", ondelete="CASCADE"))
+    secretaria_id = Column(Integer, ForeignKey("ponto.secretarias.id", ondelete="CASCADE"), index=True)
+    created_at = Column(DateTime, default=func.now())
+
+    # Relacionamentos
+    alteracao = relationship("AlteracaoHorario")
@@ -0,0 +1,33 @@
+# app/models/resumo_diario.py
+from sqlalchemy import Column, Integer, String, Date, Boolean, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+class ResumoDiario(Base):
+    """Resumo materializado do processamento de um dia de um servidor (espelho de ponto)."""
+    __tablename__ = "resumos_diarios"
+    __table_args__ = (
+        # A restrição única também serve de índice para a leitura por período
+        UniqueConstraint("servidor_id", "data", name="uq_resumos_diarios_servidor_data"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"), nullable=False)
+    data = Column(Date, nullable=False)
+    minutos_trabalhados = Column(Integer, nullable=False, default=0)
+    minutos_extras = Column(Integer, nullable=False, default=0)
+    minutos_faltantes = Column(Integer, nullable=False, default=0)
+    minutos_noturnos = Column(Integer, nullable=False, default=0)  # Já convertidos pela hora noturna reduzida, se aplicável
+    status = Column(String(20), nullable=False)
+    justificativa_id = Column(Integer, ForeignKey("ponto.justificativas.id", ondelete="SET NULL"))
+    observacao = Column(String(200))
+    desatualizado = Column(Boolean, nullable=False, default=False)  # Marcado quando batidas, justificativas ou feriados mudam
+    hash_entradas = Column(String(32))  # Impressão das entradas do último cálculo; dia igual não é recalculado
+    processado_em = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    # Relacionamentos
+    servidor = relationship("Servidor")
+    justificativa = relationship("Justificativa")
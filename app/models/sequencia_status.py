@@ -0,0 +1,26 @@
+# app/models/sequencia_status.py
+from sqlalchemy import Column, Integer, SmallInteger, String, LargeBinary, DateTime, ForeignKey, Index, UniqueConstraint, func
+
+from app.db.session import Base
+
+class SequenciaStatus(Base):
+    """
+    Ocorrências diárias de um tipo (falta, atraso, justificada, descanso) de
+    um servidor em um ano, como bits codificados em comprimentos de corrida.
+    """
+    __tablename__ = "sequencias_status"
+    __table_args__ = (
+        UniqueConstraint("servidor_id", "ano", "tipo", name="uq_sequencias_status_servidor_ano_tipo"),
+        # Consultas de toda a prefeitura por tipo, apenas de quem tem ocorrências
+        Index("idx_sequencias_status_tipo_ano", "tipo", "ano"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    servidor_id = Column(Integer, ForeignKey("ponto.servidores.id", ondelete="CASCADE"), nullable=False)
+    ano = Column(SmallInteger, nullable=False)
+    tipo = Column(String(20), nullable=False)  # falta, atraso, justificada, descanso
+    # Comprimentos de corrida alternados (0s, 1s, 0s, ...) a partir de 1º de janeiro, uint16
+    sequencia = Column(LargeBinary, nullable=False)
+    dias = Column(SmallInteger, nullable=False, default=0)  # Quantidade de dias marcados no ano
+    atualizado_em = Column(DateTime, default=func.now(), onupdate=func.now())
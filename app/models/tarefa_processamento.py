@@ -0,0 +1,29 @@
+# app/models/tarefa_processamento.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.session import Base
+
+class TarefaProcessamento(Base):
+    """Tarefa da fila de processamento consumida pelo worker (python -m app.worker)."""
+    __tablename__ = "tarefas_processamento"
+    __table_args__ = (
+        # Consulta de reserva: status + disponível_em, na ordem de chegada
+        Index("idx_tarefas_processamento_fila", "status", "disponivel_em", "id"),
+        {"schema": "ponto"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    tipo = Column(String(50), nullable=False)  # Nome do manipulador registrado em app.services.fila_tarefas
+    parametros = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="pendente")  # pendente, executando, concluida, erro
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False, default=3)
+    disponivel_em = Column(DateTime, nullable=False, default=func.now())  # Adiada em novas tentativas
+    iniciado_em = Column(DateTime)
+    atualizado_em = Column(DateTime)  # Sinal de vida renovado pelo worker durante a execução
+    concluido_em = Column(DateTime)
+    resultado = Column(JSONB)
+    erro = Column(Text)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
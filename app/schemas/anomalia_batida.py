@@ -0,0 +1,25 @@
+# app/schemas/anomalia_batida.py
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from datetime import date, datetime
+
+class AnomaliaBatidaInDB(BaseModel):
+    """Schema para uma anomalia encontrada na varredura das batidas."""
+    id: int
+    servidor_id: int
+    data: date
+    batida_original_id: Optional[int] = Field(None, description="Batida que originou a anomalia (nula nas anomalias do dia)")
+    tipo: str = Field(..., description="quantidade_impar, batida_duplicada, sequencia_invalida ou entrada_sem_saida")
+    detalhe: Optional[str] = None
+    detectado_em: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class VarreduraAnomaliasResultado(BaseModel):
+    """Schema para o resultado de uma varredura de anomalias."""
+    periodo_inicio: date
+    periodo_fim: date
+    secretaria_id: Optional[int] = None
+    total: int
+    por_tipo: Dict[str, int] = Field(..., description="Quantidade de anomalias gravadas por tipo")
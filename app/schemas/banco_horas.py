@@ -0,0 +1,29 @@
+# app/schemas/banco_horas.py
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import date
+
+class BancoHorasLancamentoInDB(BaseModel):
+    """Schema para um lançamento diário do banco de horas."""
+    data: date
+    minutos_delta: int = Field(..., description="Saldo do dia em minutos (positivo = crédito)")
+    saldo_minutos: int = Field(..., description="Saldo acumulado até o dia, inclusive")
+
+    class Config:
+        from_attributes = True
+
+class BancoHorasSaldo(BaseModel):
+    """Schema para o saldo do banco de horas de um servidor."""
+    servidor_id: int
+    data: date = Field(..., description="Data de referência do saldo")
+    saldo_minutos: int = Field(..., description="Saldo acumulado até a data")
+
+class BancoHorasExtrato(BaseModel):
+    """Schema para o extrato do banco de horas de um servidor em um período."""
+    servidor_id: int
+    periodo_inicio: date
+    periodo_fim: date
+    saldo_anterior_minutos: int = Field(..., description="Saldo ao final do dia anterior ao período")
+    saldo_periodo_minutos: int = Field(..., description="Variação do saldo no período")
+    saldo_final_minutos: int = Field(..., description="Saldo ao final do período")
+    lancamentos: List[BancoHorasLancamentoInDB] = []
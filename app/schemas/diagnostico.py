@@ -0,0 +1,21 @@
+# app/schemas/diagnostico.py
+from pydantic import BaseModel, Field
+from typing import List
+
+class FormaRepetida(BaseModel):
+    """Schema para um SQL executado repetidamente em uma mesma requisição (provável N+1)."""
+    sql: str = Field(..., description="Forma do SQL (parâmetros como marcadores)")
+    execucoes_max: int = Field(..., description="Maior quantidade de execuções em uma requisição")
+
+class EstatisticaConsultasRota(BaseModel):
+    """Schema para os totais de consultas ao banco de uma rota, desde o início do processo."""
+    rota: str = Field(..., description="Método e caminho da rota")
+    requisicoes: int
+    consultas_total: int
+    consultas_max: int = Field(..., description="Maior quantidade de consultas em uma requisição")
+    consultas_media: float
+    tempo_db_total_ms: float
+    tempo_db_max_ms: float
+    tempo_db_medio_ms: float
+    requisicoes_n_mais_um: int = Field(..., description="Requisições com SQL repetido acima de DB_N_MAIS_UM_LIMITE")
+    formas_repetidas: List[FormaRepetida] = []
@@ -0,0 +1,68 @@
+# app/schemas/fechamento.py
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+
+class FechamentoFalhaServidor(BaseModel):
+    """Schema para uma falha de processamento de um servidor durante o fechamento."""
+    servidor_id: int
+    erro: str
+
+class FechamentoShardResult(BaseModel):
+    """Schema para o resultado do processamento de uma faixa (shard) de servidores."""
+    indice: int = Field(..., description="Índice do shard")
+    servidor_id_inicio: int = Field(..., description="Primeiro ID de servidor da faixa (inclusive)")
+    servidor_id_fim: int = Field(..., description="Último ID de servidor da faixa (inclusive)")
+    tentativas: int = Field(1, description="Número de tentativas até a conclusão")
+    concluido: bool = Field(False, description="Indica se o shard foi concluído")
+    total_servidores: int = 0
+    total_dias: int = 0
+    total_regular: int = 0
+    total_irregular: int = 0
+    total_justificada: int = 0
+    duracao_segundos: float = 0.0
+    falhas: List[FechamentoFalhaServidor] = []
+    erro: Optional[str] = Field(None, description="Erro da última tentativa, se o shard falhou")
+
+class FechamentoResult(BaseModel):
+    """Schema para o resultado consolidado de um fechamento mensal paralelo."""
+    periodo_inicio: date
+    periodo_fim: date
+    total_shards: int
+    shards_concluidos: int
+    shards_com_falha: int
+    total_servidores: int
+    total_dias: int
+    total_regular: int
+    total_irregular: int
+    total_justificada: int
+    duracao_segundos: float
+    shards: List[FechamentoShardResult] = []
+
+class FechamentoSnapshotInfo(BaseModel):
+    """Schema para o manifesto resumido do snapshot congelado de uma secretaria."""
+    ano: int
+    mes: int
+    secretaria_id: int
+    periodo_inicio: date
+    periodo_fim: date
+    gerado_em: datetime
+    linhas: int = Field(..., description="Dias gravados no snapshot")
+    total_servidores: int
+
+class FechamentoTotaisServidor(BaseModel):
+    """Schema para os totais do mês fechado de um servidor."""
+    servidor_id: int
+    dias: int
+    minutos_trabalhados: int
+    minutos_extras: int
+    minutos_faltantes: int
+    minutos_noturnos: int = 0
+    dias_regulares: int
+    dias_irregulares: int
+    dias_justificados: int
+
+class FechamentoRelatorioSecretaria(BaseModel):
+    """Schema para o relatório do mês fechado de uma secretaria, servido do snapshot."""
+    snapshot: FechamentoSnapshotInfo
+    servidores: List[FechamentoTotaisServidor] = []
@@ -0,0 +1,10 @@
+# app/schemas/pontualidade.py
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+class PercentisPontualidade(BaseModel):
+    """Schema para os percentis dos desvios de horário de uma secretaria (ou do total) em um período."""
+    secretaria_id: Optional[int] = Field(None, description="Nulo na linha de total de todas as secretarias")
+    tipo: str = Field(..., description="entrada (positivo = atraso) ou saida (negativo = saída antecipada)")
+    total: int = Field(..., description="Turnos considerados")
+    percentis: Dict[str, Optional[int]] = Field(..., description="Desvio em minutos por percentil (ex.: p50, p90, p99)")
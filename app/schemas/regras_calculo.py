@@ -0,0 +1,112 @@
+# app/schemas/regras_calculo.py
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, time
+
+class AdicionalNoturnoConfig(BaseModel):
+    """Configuração do adicional noturno (CLT art. 73)."""
+    ativo: bool = Field(True, description="Apura as horas noturnas")
+    inicio: time = Field(time(22, 0), description="Início do período noturno")
+    fim: time = Field(time(5, 0), description="Fim do período noturno (no dia seguinte, se menor que o início)")
+    hora_reduzida: bool = Field(True, description="Conta a hora noturna como 52min30s")
+    percentual: int = Field(20, ge=0, description="Percentual do adicional")
+
+class DsrConfig(BaseModel):
+    """Configuração do descanso semanal remunerado (Lei 605/49)."""
+    ativo: bool = Field(True, description="Apura o DSR por semana")
+    perde_com_falta_injustificada: bool = Field(True, description="Falta injustificada na semana faz perder o DSR")
+    reflexo_horas_extras: bool = Field(True, description="Calcula o reflexo das horas extras no DSR")
+
+class PareamentoConfig(BaseModel):
+    """Configuração do pareamento das batidas em pares entrada/saída."""
+    janela_duplicada_minutos: int = Field(0, ge=0, description="Batidas a menos que isso da anterior são descartadas (0 = não descarta)")
+    estrategia_impar: Literal["ignorar", "horario", "sinalizar"] = Field(
+        "ignorar",
+        description="Quantidade ímpar: ignorar a última batida, completar a batida faltante pelo horário "
+                    "previsto (sinaliza se não for possível) ou ignorar a última e sinalizar o dia"
+    )
+    descontar_intervalo_nao_registrado: bool = Field(False, description="Desconta o intervalo mínimo de jornadas sem batida de intervalo")
+    jornada_exige_intervalo_minutos: int = Field(360, ge=0, description="Jornada a partir da qual o intervalo é obrigatório (CLT art. 71)")
+
+class RegrasCalculo(BaseModel):
+    """
+    Configuração declarativa das regras de apuração do ponto.
+
+    É compilada uma única vez por (regras, horário) em uma cadeia de funções
+    em app.services.regras_calculo.
+    """
+    jornada_padrao_minutos: int = Field(480, ge=0, description="Jornada de quem não tem horário cadastrado")
+    intervalo_minimo_minutos: int = Field(60, ge=0, description="Intervalo mínimo entre períodos")
+    dias_semana_descanso: List[int] = Field([5, 6], description="Dias da semana sem jornada (0=segunda) para quem não tem horário")
+    tolerancia_batida_minutos: int = Field(5, ge=0, description="Variação desconsiderada por batida (CLT art. 58 §1º)")
+    tolerancia_diaria_minutos: int = Field(10, ge=0, description="Limite diário das variações desconsideradas")
+    limite_extras_diario_minutos: Optional[int] = Field(None, ge=0, description="Teto de horas extras computadas por dia")
+    limite_extras_mensal_minutos: Optional[int] = Field(None, ge=0, description="Teto de horas extras computadas por mês")
+    adicional_noturno: AdicionalNoturnoConfig = Field(default_factory=AdicionalNoturnoConfig)
+    dsr: DsrConfig = Field(default_factory=DsrConfig)
+    pareamento: PareamentoConfig = Field(default_factory=PareamentoConfig)
+
+    @field_validator("dias_semana_descanso")
+    @classmethod
+    def validar_dias_semana(cls, v):
+        if any(d < 0 or d > 6 for d in v):
+            raise ValueError("Dias da semana devem estar entre 0 (segunda) e 6 (domingo)")
+        return sorted(set(v))
+
+class SemanaDsr(BaseModel):
+    """Schema para a apuração do DSR de uma semana."""
+    inicio: date
+    fim: date
+    dias_uteis: int
+    dias_descanso: int
+    faltas_injustificadas: int
+    dsr_devido: bool
+    minutos_extras: int
+    reflexo_dsr_minutos: int = Field(..., description="Reflexo das horas extras no DSR")
+
+class ApuracaoMensal(BaseModel):
+    """Schema para a apuração mensal de um servidor segundo as regras da secretaria."""
+    servidor_id: int
+    ano: int
+    mes: int
+    minutos_trabalhados: int
+    minutos_extras: int = Field(..., description="Horas extras computadas (após o teto mensal)")
+    minutos_extras_excedentes: int = Field(..., description="Horas extras acima do teto mensal")
+    minutos_faltantes: int
+    minutos_noturnos: int
+    semanas: List[SemanaDsr] = []
+    reflexo_dsr_minutos: int
+
+class TotaisSimulacao(BaseModel):
+    """Schema para os totais de um lado da simulação de regras."""
+    minutos_trabalhados: int
+    minutos_extras: int = Field(..., description="Horas extras computadas (após os tetos diário e mensal)")
+    minutos_extras_excedentes: int = Field(..., description="Horas extras acima dos tetos")
+    minutos_faltantes: int
+    minutos_noturnos: int
+    dias_irregulares: int
+    dias_justificados: int
+
+class SimulacaoSecretaria(BaseModel):
+    """Schema para o resultado da simulação de regras em uma secretaria."""
+    secretaria_id: Optional[int]
+    servidores: int
+    servidores_afetados: int = Field(..., description="Servidores com algum total diferente entre as regras")
+    atual: TotaisSimulacao
+    proposta: TotaisSimulacao
+
+class SimulacaoRegrasResultado(BaseModel):
+    """Schema para a comparação das regras vigentes com as propostas em um mês (nada é gravado)."""
+    ano: int
+    mes: int
+    secretaria_id: Optional[int] = None
+    sobrescritas: Dict[str, Any]
+    servidores: int
+    servidores_afetados: int
+    dias_apurados: int
+    dias_status_alterado: int
+    transicoes_status: Dict[str, int] = Field(..., description="Dias por transição de status (ex.: \"regular->irregular\")")
+    atual: TotaisSimulacao
+    proposta: TotaisSimulacao
+    secretarias: List[SimulacaoSecretaria] = []
+    duracao_segundos: float
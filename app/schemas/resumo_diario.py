@@ -0,0 +1,33 @@
+# app/schemas/resumo_diario.py
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime, date
+
+class ResumoDiarioInDB(BaseModel):
+    """Schema para representação de um dia do espelho de ponto materializado."""
+    servidor_id: int = Field(..., description="ID do servidor")
+    data: date = Field(..., description="Data do resumo")
+    minutos_trabalhados: int = Field(..., description="Minutos trabalhados no dia")
+    minutos_extras: int = Field(..., description="Minutos extras no dia")
+    minutos_faltantes: int = Field(..., description="Minutos faltantes no dia")
+    minutos_noturnos: int = Field(0, description="Minutos noturnos no dia (adicional noturno)")
+    status: str = Field(..., description="Status do dia: regular, irregular ou justificada")
+    justificativa_id: Optional[int] = Field(None, description="ID da justificativa considerada no dia")
+    observacao: Optional[str] = Field(None, description="Observação do processamento")
+    processado_em: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class TotalDiarioInDB(BaseModel):
+    """Schema para os minutos trabalhados de um dia calculados no banco (apuração simplificada)."""
+    servidor_id: int
+    data: date
+    batidas: int = Field(..., description="Quantidade de batidas no dia")
+    minutos_trabalhados: int = Field(..., description="Soma dos pares entrada/saída menos o intervalo mínimo não cumprido")
+
+class DivergenciaTotalDiario(BaseModel):
+    """Schema para um dia em que a apuração no banco difere da calculadora."""
+    data: date
+    minutos_banco: int
+    minutos_calculadora: int
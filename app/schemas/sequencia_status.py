@@ -0,0 +1,14 @@
+# app/schemas/sequencia_status.py
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date
+
+class OcorrenciasServidor(BaseModel):
+    """Schema para as ocorrências (faltas, atrasos ou justificativas) de um servidor em um período."""
+    servidor_id: int
+    nome: Optional[str] = None
+    tipo: str = Field(..., description="falta, atraso ou justificada")
+    total_dias: int = Field(..., description="Dias com ocorrência no período")
+    maior_sequencia: int = Field(..., description="Dias com ocorrência na maior sequência (descansos não contam)")
+    sequencia_inicio: date
+    sequencia_fim: date
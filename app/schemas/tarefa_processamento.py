@@ -0,0 +1,23 @@
+# app/schemas/tarefa_processamento.py
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+class TarefaProcessamentoInDB(BaseModel):
+    """Schema para acompanhamento de uma tarefa da fila de processamento."""
+    id: int
+    tipo: str = Field(..., description="Tipo da tarefa")
+    parametros: Dict[str, Any] = Field(default_factory=dict, description="Parâmetros da tarefa")
+    status: str = Field(..., description="Status: pendente, executando, concluida ou erro")
+    tentativas: int = Field(..., description="Tentativas já realizadas")
+    max_tentativas: int = Field(..., description="Tentativas permitidas")
+    disponivel_em: datetime = Field(..., description="Momento a partir do qual a tarefa pode ser executada")
+    iniciado_em: Optional[datetime] = None
+    atualizado_em: Optional[datetime] = Field(None, description="Último sinal de vida do worker durante a execução")
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[Any] = Field(None, description="Resultado retornado pela tarefa")
+    erro: Optional[str] = Field(None, description="Último erro registrado")
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,149 @@
+# app/services/anomalias_service.py
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.anomalia_batida import AnomaliaBatida
+from app.models.servidor import Servidor
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+TIPOS_ANOMALIA = ("quantidade_impar", "batida_duplicada", "sequencia_invalida", "entrada_sem_saida")
+
+class DetectorAnomalias:
+    """
+    Varredura de qualidade das batidas originais.
+
+    Todas as verificações são feitas em um único comando SQL: funções de
+    janela (LAG/LEAD sobre a sequência de cada servidor e COUNT por dia)
+    marcam as batidas suspeitas e o resultado é gravado direto em
+    ponto.anomalias_batidas, sem carregar batidas no Python. Uma nova
+    varredura substitui as anomalias do período.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def detectar(self, periodo_inicio: date, periodo_fim: date,
+                 secretaria_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Detecta as anomalias das batidas no período e grava na tabela de anomalias.
+
+        As batidas são lidas desde a véspera até o dia seguinte ao período,
+        para que LAG/LEAD enxerguem as vizinhas das batidas das pontas; só
+        são gravadas anomalias de datas dentro do período.
+
+        Args:
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            secretaria_id: Restringe aos servidores da secretaria; todos quando None
+
+        Returns:
+            Quantidade de anomalias gravadas por tipo
+        """
+        parametros = {
+            "inicio": periodo_inicio,
+            "fim": periodo_fim,
+            "leitura_inicio": datetime.combine(periodo_inicio - timedelta(days=1), time.min),
+            "leitura_fim": datetime.combine(periodo_fim + timedelta(days=2), time.min),
+            "janela_duplicada": settings.ANOMALIA_JANELA_DUPLICADA_MINUTOS,
+            "jornada_maxima": settings.ANOMALIA_JORNADA_MAXIMA_MINUTOS,
+        }
+        filtro_secretaria = ""
+        if secretaria_id is not None:
+            filtro_secretaria = (
+                "AND b.servidor_id IN (SELECT id FROM ponto.servidores WHERE secretaria_id = :secretaria_id)"
+            )
+            parametros["secretaria_id"] = secretaria_id
+
+        # Substitui as anomalias anteriores do mesmo escopo
+        anteriores = self.db.query(AnomaliaBatida).filter(
+            AnomaliaBatida.data >= periodo_inicio,
+            AnomaliaBatida.data <= periodo_fim
+        )
+        if secretaria_id is not None:
+            anteriores = anteriores.filter(AnomaliaBatida.servidor_id.in_(
+                self.db.query(Servidor.id).filter(Servidor.secretaria_id == secretaria_id)
+            ))
+        anteriores.delete(synchronize_session=False)
+
+        linhas = self.db.execute(text(f"""
+            WITH sequencia AS (
+                SELECT b.id, b.servidor_id, b.data_hora, b.tipo,
+                       CAST(b.data_hora AS date) AS data,
+                       LAG(b.data_hora) OVER w AS anterior_hora,
+                       LAG(b.tipo) OVER w AS anterior_tipo,
+                       LEAD(b.data_hora) OVER w AS proxima_hora,
+                       COUNT(*) OVER dia AS batidas_dia,
+                       ROW_NUMBER() OVER (dia ORDER BY b.data_hora, b.id) AS ordem_dia
+                FROM ponto.batidas_originais b
+                WHERE b.data_hora >= :leitura_inicio
+                  AND b.data_hora < :leitura_fim
+                  {filtro_secretaria}
+                WINDOW w AS (PARTITION BY b.servidor_id ORDER BY b.data_hora, b.id),
+                       dia AS (PARTITION BY b.servidor_id, CAST(b.data_hora AS date))
+            ),
+            marcadas AS (
+                SELECT servidor_id, data, NULL::integer AS batida_original_id,
+                       'quantidade_impar' AS tipo,
+                       batidas_dia || ' batida(s) no dia' AS detalhe
+                FROM sequencia
+                WHERE ordem_dia = 1 AND batidas_dia % 2 = 1
+                UNION ALL
+                SELECT servidor_id, data, id, 'batida_duplicada',
+                       'Repetida ' || EXTRACT(EPOCH FROM data_hora - anterior_hora)::integer || 's após a anterior'
+                FROM sequencia
+                WHERE anterior_hora IS NOT NULL
+                  AND data_hora - anterior_hora < make_interval(mins => :janela_duplicada)
+                UNION ALL
+                SELECT servidor_id, data, id, 'sequencia_invalida',
+                       'Duas batidas seguidas de ' || tipo
+                FROM sequencia
+                WHERE anterior_tipo = tipo
+                  AND data_hora - anterior_hora >= make_interval(mins => :janela_duplicada)
+                UNION ALL
+                SELECT servidor_id, data, id, 'entrada_sem_saida',
+                       'Nenhuma batida em ' || :jornada_maxima || ' minutos após a entrada'
+                FROM sequencia
+                WHERE tipo = 'entrada'
+                  AND (proxima_hora IS NULL OR proxima_hora - data_hora > make_interval(mins => :jornada_maxima))
+            ),
+            gravadas AS (
+                INSERT INTO ponto.anomalias_batidas (servidor_id, data, batida_original_id, tipo, detalhe, detectado_em)
+                SELECT servidor_id, data, batida_original_id, tipo, detalhe, now()
+                FROM marcadas
+                WHERE data BETWEEN :inicio AND :fim
+                RETURNING tipo
+            )
+            SELECT tipo, COUNT(*) FROM gravadas GROUP BY tipo
+        """), parametros).all()
+        self.db.commit()
+
+        resultado = {tipo: 0 for tipo in TIPOS_ANOMALIA}
+        resultado.update({tipo: quantidade for tipo, quantidade in linhas})
+        logger.info(
+            f"Varredura de anomalias {periodo_inicio} a {periodo_fim}: "
+            f"{sum(resultado.values())} anomalia(s) {resultado}"
+        )
+        return resultado
+
+    def listar(self, periodo_inicio: date, periodo_fim: date, servidor_id: Optional[int] = None,
+               tipo: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[AnomaliaBatida]:
+        """
+        Anomalias gravadas no período, em ordem de servidor e data.
+        """
+        query = self.db.query(AnomaliaBatida).filter(
+            AnomaliaBatida.data >= periodo_inicio,
+            AnomaliaBatida.data <= periodo_fim
+        )
+        if servidor_id is not None:
+            query = query.filter(AnomaliaBatida.servidor_id == servidor_id)
+        if tipo:
+            query = query.filter(AnomaliaBatida.tipo == tipo)
+        return query.order_by(AnomaliaBatida.servidor_id, AnomaliaBatida.data, AnomaliaBatida.id) \
+            .offset(skip).limit(limit).all()
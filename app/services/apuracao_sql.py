@@ -0,0 +1,161 @@
+# app/services/apuracao_sql.py
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.batida import BatidaOriginal
+from app.models.servidor import Servidor
+from app.services.ponto_processor import CalculadoraHorasExtras, RegistroPonto
+from app.services.regras_calculo import carregar_regras
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class TotalDiario(NamedTuple):
+    """Minutos trabalhados de um servidor em uma data, calculados no banco."""
+    servidor_id: int
+    data: date
+    batidas: int
+    minutos_trabalhados: int
+
+# Pares entrada/saída por posição no dia (1ª-2ª, 3ª-4ª, ...); a última batida
+# de um dia com quantidade ímpar é ignorada, como em CalculadoraHorasExtras.
+# Os segundos são descartados antes da subtração.
+_SQL_TOTAIS_DIARIOS = """
+    WITH batidas AS (
+        SELECT b.servidor_id,
+               CAST(b.data_hora AS date) AS data,
+               CAST(EXTRACT(EPOCH FROM date_trunc('minute', b.data_hora)
+                    - CAST(CAST(b.data_hora AS date) AS timestamp)) / 60 AS integer) AS minuto,
+               ROW_NUMBER() OVER dia AS ordem,
+               COUNT(*) OVER (PARTITION BY b.servidor_id, CAST(b.data_hora AS date)) AS total
+        FROM ponto.batidas_originais b
+        WHERE b.data_hora >= :inicio
+          AND b.data_hora < :fim
+          {filtro}
+        WINDOW dia AS (PARTITION BY b.servidor_id, CAST(b.data_hora AS date) ORDER BY b.data_hora, b.id)
+    ),
+    pares AS (
+        SELECT servidor_id, data, ordem, total,
+               minuto AS entrada,
+               LEAD(minuto) OVER w AS saida,
+               LAG(minuto) OVER w AS saida_anterior
+        FROM batidas
+        WINDOW w AS (PARTITION BY servidor_id, data ORDER BY ordem)
+    )
+    SELECT servidor_id, data, MAX(total) AS batidas,
+           COALESCE(SUM(
+               saida - entrada
+               - CASE WHEN ordem > 1 AND entrada - saida_anterior < :intervalo_minimo
+                      THEN :intervalo_minimo - (entrada - saida_anterior) ELSE 0 END
+           ) FILTER (WHERE ordem % 2 = 1 AND ordem < total), 0) AS minutos_trabalhados
+    FROM pares
+    GROUP BY servidor_id, data
+    ORDER BY servidor_id, data
+"""
+
+class ApuracaoSQL:
+    """
+    Apuração simplificada executada no PostgreSQL.
+
+    Os pares de batidas são formados com LEAD() sobre batidas_originais e só
+    os totais diários trafegam para a aplicação. Não aplica horário previsto,
+    tolerâncias, justificativas nem montagem de turnos noturnos (as batidas
+    são agrupadas pela data do calendário).
+
+    Usada apenas pela rota /batidas/totais-diarios (consulta ad hoc de batidas
+    ainda não processadas), pela validação contra CalculadoraHorasExtras e
+    pelo benchmark. Dashboard, relatórios, fechamento e recálculos em lote
+    leem ou gravam ponto.resumos_diarios, apurados pelo PontoProcessor /
+    RecalculoData: trocá-los por esta apuração mudaria os totais dos dias com
+    turno noturno, horário previsto ou justificativa.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def totais_diarios(self, periodo_inicio: date, periodo_fim: date,
+                       servidor_ids: Optional[Iterable[int]] = None,
+                       secretaria_id: Optional[int] = None,
+                       intervalo_minimo: Optional[int] = None) -> List[TotalDiario]:
+        """
+        Calcula os minutos trabalhados por (servidor, dia) no banco.
+
+        Args:
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            servidor_ids: Restringe aos servidores informados
+            secretaria_id: Restringe aos servidores da secretaria
+            intervalo_minimo: Intervalo mínimo entre pares, em minutos (padrão:
+                o das regras de cálculo da secretaria, ou das regras globais)
+
+        Returns:
+            Totais dos dias com batidas, em ordem de servidor e data
+        """
+        if intervalo_minimo is None:
+            intervalo_minimo = carregar_regras(self.db, secretaria_id).intervalo_minimo_minutos
+
+        parametros = {
+            "inicio": datetime.combine(periodo_inicio, time.min),
+            "fim": datetime.combine(periodo_fim + timedelta(days=1), time.min),
+            "intervalo_minimo": intervalo_minimo,
+        }
+        filtros = []
+        if servidor_ids is not None:
+            servidor_ids = list(servidor_ids)
+            if not servidor_ids:
+                return []
+            filtros.append("AND b.servidor_id = ANY(:servidor_ids)")
+            parametros["servidor_ids"] = servidor_ids
+        if secretaria_id is not None:
+            filtros.append("AND b.servidor_id IN (SELECT id FROM ponto.servidores WHERE secretaria_id = :secretaria_id)")
+            parametros["secretaria_id"] = secretaria_id
+
+        linhas = self.db.execute(text(_SQL_TOTAIS_DIARIOS.format(filtro="\n          ".join(filtros))), parametros)
+        return [TotalDiario(*linha) for linha in linhas]
+
+    def validar(self, servidor_id: int, periodo_inicio: date, periodo_fim: date,
+                intervalo_minimo: Optional[int] = None) -> List[Dict]:
+        """
+        Confere os totais calculados no banco com CalculadoraHorasExtras, sobre
+        as mesmas batidas e o mesmo intervalo mínimo, sem horário previsto.
+
+        Returns:
+            Dias divergentes, com os minutos calculados de cada forma (lista vazia se iguais)
+        """
+        if intervalo_minimo is None:
+            secretaria_id = self.db.query(Servidor.secretaria_id).filter(Servidor.id == servidor_id).scalar()
+            intervalo_minimo = carregar_regras(self.db, secretaria_id).intervalo_minimo_minutos
+
+        no_banco = {
+            total.data: total.minutos_trabalhados
+            for total in self.totais_diarios(periodo_inicio, periodo_fim, [servidor_id],
+                                             intervalo_minimo=intervalo_minimo)
+        }
+
+        batidas_por_data: Dict[date, List[datetime]] = {}
+        for (data_hora,) in self.db.query(BatidaOriginal.data_hora).filter(
+            BatidaOriginal.servidor_id == servidor_id,
+            BatidaOriginal.data_hora >= datetime.combine(periodo_inicio, time.min),
+            BatidaOriginal.data_hora < datetime.combine(periodo_fim + timedelta(days=1), time.min)
+        ).order_by(BatidaOriginal.data_hora):
+            batidas_por_data.setdefault(data_hora.date(), []).append(data_hora)
+
+        calculadora = CalculadoraHorasExtras(intervalo_minimo=intervalo_minimo)
+        divergencias = []
+        for data in sorted(set(no_banco) | set(batidas_por_data)):
+            registro = RegistroPonto(data, batidas_por_data.get(data, []))
+            na_calculadora = calculadora.calcular_minutos(registro)[0]
+            if no_banco.get(data, 0) != na_calculadora:
+                divergencias.append({
+                    "data": data,
+                    "minutos_banco": no_banco.get(data, 0),
+                    "minutos_calculadora": na_calculadora,
+                })
+
+        if divergencias:
+            logger.warning(f"Apuração no banco diverge da calculadora em {len(divergencias)} dia(s) do servidor {servidor_id}")
+        return divergencias
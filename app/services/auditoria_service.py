@@ -1,11 +1,11 @@
 from fastapi import Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.log_auditoria import LogAuditoria
 from app.core.auth import obter_usuario_atual_opcional
 
 async def registrar_log(
-    db: Session,
+    db: AsyncSession,
     request: Request,
     acao: str,
     tabela: str,
@@ -16,7 +16,7 @@ async def registrar_log(
     Registra uma ação no log de auditoria.
     
     Args:
-        db: Sessão do banco de dados
+        db: Sessão assíncrona do banco de dados
         request: Objeto de requisição do FastAPI
         acao: Tipo de ação (ex: "criar", "atualizar", "excluir")
         tabela: Nome da tabela ou entidade afetada
@@ -41,6 +41,6 @@ async def registrar_log(
     
     # Salva no banco de dados
     db.add(log)
-    db.commit()
+    await db.commit()
     
     return log
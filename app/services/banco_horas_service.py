@@ -0,0 +1,271 @@
+# app/services/banco_horas_service.py
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.banco_horas import BancoHorasLancamento
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Primeira chave dos advisory locks do banco de horas (a segunda é o servidor_id)
+CHAVE_LOCK_BANCO_HORAS = 7301
+
+class BancoHorasService:
+    """
+    Razão (ledger) do banco de horas.
+
+    Cada dia processado gera um lançamento com o delta do dia (minutos extras
+    menos minutos faltantes não justificados) e o saldo acumulado até aquele
+    dia. O saldo em uma data é o saldo_minutos do último lançamento até ela
+    (uma busca no índice (servidor_id, data)), e o saldo de um período é a
+    diferença entre dois saldos. Uma alteração retroativa soma a diferença do
+    delta apenas nos lançamentos posteriores à data alterada.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def registrar_delta(self, servidor_id: int, data: date, minutos_delta: int) -> None:
+        """
+        Grava o delta do dia e propaga a diferença para o sufixo posterior.
+        Não faz commit: participa da transação de quem processou o dia.
+
+        Args:
+            servidor_id: ID do servidor
+            data: Data do lançamento
+            minutos_delta: Saldo do dia em minutos (positivo = crédito)
+        """
+        self.registrar_deltas_servidor(servidor_id, {data: minutos_delta})
+
+    def registrar_deltas_servidor(self, servidor_id: int, deltas: Dict[date, int]) -> int:
+        """
+        Grava os deltas de várias datas de um servidor em lote (ex.: um período
+        reprocessado): um lock, uma leitura dos lançamentos do intervalo, um
+        upsert das datas e uma única atualização dos lançamentos posteriores,
+        em que cada um soma as diferenças das datas que o antecedem. Não faz commit.
+
+        Args:
+            servidor_id: ID do servidor
+            deltas: Saldo do dia em minutos por data
+
+        Returns:
+            Quantidade de lançamentos das datas gravados
+        """
+        if not deltas:
+            return 0
+        datas = sorted(deltas)
+
+        # Serializa as atualizações do razão de um mesmo servidor
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:chave, :servidor_id)"),
+            {"chave": CHAVE_LOCK_BANCO_HORAS, "servidor_id": servidor_id}
+        )
+
+        existentes = {
+            lancamento_data: (minutos_delta, saldo_minutos)
+            for lancamento_data, minutos_delta, saldo_minutos in self.db.query(
+                BancoHorasLancamento.data, BancoHorasLancamento.minutos_delta, BancoHorasLancamento.saldo_minutos
+            ).filter(
+                BancoHorasLancamento.servidor_id == servidor_id,
+                BancoHorasLancamento.data >= datas[0],
+                BancoHorasLancamento.data <= datas[-1]
+            )
+        }
+
+        # Percorre o intervalo em ordem: saldo_antigo é o saldo gravado até a data e
+        # acumulado, a soma das diferenças das datas do lote já percorridas
+        saldo_antigo = self.saldo_em(servidor_id, datas[0] - timedelta(days=1))
+        acumulado = 0
+        acumulados = []
+        lancamentos = []
+        for lancamento_data in sorted(existentes.keys() | deltas.keys()):
+            existente = existentes.get(lancamento_data)
+            if existente is not None:
+                saldo_antigo = existente[1]
+            if lancamento_data not in deltas:
+                continue
+            minutos_delta = deltas[lancamento_data]
+            acumulado += minutos_delta - (existente[0] if existente is not None else 0)
+            acumulados.append(acumulado)
+            saldo = saldo_antigo + acumulado
+            if existente is None or existente != (minutos_delta, saldo):
+                lancamentos.append({"servidor_id": servidor_id, "data": lancamento_data,
+                                    "minutos_delta": minutos_delta, "saldo_minutos": saldo})
+
+        if lancamentos:
+            stmt = insert(BancoHorasLancamento)
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[BancoHorasLancamento.servidor_id, BancoHorasLancamento.data],
+                set_={
+                    "minutos_delta": stmt.excluded.minutos_delta,
+                    "saldo_minutos": stmt.excluded.saldo_minutos,
+                    "updated_at": func.now(),
+                }
+            ), lancamentos)
+
+        # Lançamentos fora do lote, entre uma data do lote e a seguinte (ou depois da última)
+        if any(acumulados):
+            self.db.execute(text("""
+                UPDATE ponto.banco_horas_lancamentos l
+                SET saldo_minutos = l.saldo_minutos + d.acumulado
+                FROM (
+                    SELECT data, acumulado, lead(data) OVER (ORDER BY data) AS proxima
+                    FROM unnest(CAST(:datas AS date[]), CAST(:acumulados AS integer[])) AS u(data, acumulado)
+                ) d
+                WHERE l.servidor_id = :servidor_id
+                  AND d.acumulado <> 0
+                  AND l.data > d.data
+                  AND (d.proxima IS NULL OR l.data < d.proxima)
+            """), {"servidor_id": servidor_id, "datas": datas, "acumulados": acumulados})
+
+        return len(lancamentos)
+
+    def registrar_deltas(self, data: date, deltas: Dict[int, int]) -> int:
+        """
+        Grava o delta de uma mesma data para vários servidores, em lote: uma
+        leitura dos lançamentos e saldos anteriores, um upsert dos lançamentos
+        da data e uma atualização dos sufixos posteriores. Não faz commit.
+
+        Args:
+            data: Data dos lançamentos
+            deltas: Saldo do dia em minutos por servidor_id
+
+        Returns:
+            Quantidade de servidores cujo delta mudou
+        """
+        if not deltas:
+            return 0
+        servidor_ids = sorted(deltas)
+
+        # Mesmos locks de registrar_delta, adquiridos em ordem para evitar deadlock
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:chave, s) FROM unnest(CAST(:servidor_ids AS integer[])) s ORDER BY s"),
+            {"chave": CHAVE_LOCK_BANCO_HORAS, "servidor_ids": servidor_ids}
+        )
+
+        # Lançamento da data, se existir, ou o último anterior (saldo de partida)
+        anteriores = {
+            servidor_id: (lancamento_data, minutos_delta, saldo_minutos)
+            for servidor_id, lancamento_data, minutos_delta, saldo_minutos in self.db.execute(text("""
+                SELECT DISTINCT ON (servidor_id) servidor_id, data, minutos_delta, saldo_minutos
+                FROM ponto.banco_horas_lancamentos
+                WHERE servidor_id = ANY(:servidor_ids) AND data <= :data
+                ORDER BY servidor_id, data DESC
+            """), {"servidor_ids": servidor_ids, "data": data})
+        }
+
+        lancamentos = []
+        diferencas = {}
+        for servidor_id in servidor_ids:
+            minutos_delta = deltas[servidor_id]
+            anterior = anteriores.get(servidor_id)
+            if anterior is not None and anterior[0] == data:
+                diferenca = minutos_delta - anterior[1]
+                if diferenca == 0:
+                    continue
+                saldo = anterior[2] + diferenca
+            else:
+                diferenca = minutos_delta
+                saldo = (anterior[2] if anterior is not None else 0) + minutos_delta
+            lancamentos.append({"servidor_id": servidor_id, "data": data,
+                                "minutos_delta": minutos_delta, "saldo_minutos": saldo})
+            if diferenca:
+                diferencas[servidor_id] = diferenca
+
+        if lancamentos:
+            stmt = insert(BancoHorasLancamento)
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[BancoHorasLancamento.servidor_id, BancoHorasLancamento.data],
+                set_={
+                    "minutos_delta": stmt.excluded.minutos_delta,
+                    "saldo_minutos": stmt.excluded.saldo_minutos,
+                    "updated_at": func.now(),
+                }
+            ), lancamentos)
+
+        if diferencas:
+            self.db.execute(text("""
+                UPDATE ponto.banco_horas_lancamentos l
+                SET saldo_minutos = l.saldo_minutos + d.diferenca
+                FROM unnest(CAST(:servidor_ids AS integer[]), CAST(:diferencas AS integer[])) AS d(servidor_id, diferenca)
+                WHERE l.servidor_id = d.servidor_id AND l.data > :data
+            """), {"servidor_ids": list(diferencas), "diferencas": list(diferencas.values()), "data": data})
+
+        return len(lancamentos)
+
+    def saldo_em(self, servidor_id: int, data: date) -> int:
+        """
+        Saldo acumulado do servidor ao final da data.
+
+        Args:
+            servidor_id: ID do servidor
+            data: Data de referência
+
+        Returns:
+            Saldo em minutos (0 se não há lançamentos até a data)
+        """
+        saldo = self.db.query(BancoHorasLancamento.saldo_minutos).filter(
+            BancoHorasLancamento.servidor_id == servidor_id,
+            BancoHorasLancamento.data <= data
+        ).order_by(BancoHorasLancamento.data.desc()).limit(1).scalar()
+        return saldo or 0
+
+    def saldo_periodo(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> int:
+        """
+        Variação do saldo no período (soma dos deltas entre as datas, inclusive).
+        """
+        return self.saldo_em(servidor_id, periodo_fim) - self.saldo_em(servidor_id, periodo_inicio - timedelta(days=1))
+
+    def extrato(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> List[BancoHorasLancamento]:
+        """
+        Lançamentos do servidor no período, em ordem de data.
+        """
+        return self.db.query(BancoHorasLancamento).filter(
+            BancoHorasLancamento.servidor_id == servidor_id,
+            BancoHorasLancamento.data >= periodo_inicio,
+            BancoHorasLancamento.data <= periodo_fim
+        ).order_by(BancoHorasLancamento.data).all()
+
+    def reconstruir(self, servidor_id: Optional[int] = None) -> int:
+        """
+        Reconstrói o razão a partir do espelho de ponto (resumos_diarios) com
+        uma soma acumulada por janela, em um único comando. Usado para a carga
+        inicial ou para corrigir divergências.
+
+        Args:
+            servidor_id: Restringe a um servidor; todos quando None
+
+        Returns:
+            Quantidade de lançamentos gravados
+        """
+        filtro = "WHERE servidor_id = :servidor_id" if servidor_id is not None else ""
+        resultado = self.db.execute(text(f"""
+            INSERT INTO ponto.banco_horas_lancamentos (servidor_id, data, minutos_delta, saldo_minutos, updated_at)
+            SELECT servidor_id, data, delta,
+                   SUM(delta) OVER (PARTITION BY servidor_id ORDER BY data),
+                   now()
+            FROM (
+                SELECT servidor_id, data,
+                       minutos_extras - CASE WHEN status = 'justificada' THEN 0 ELSE minutos_faltantes END AS delta
+                FROM ponto.resumos_diarios
+                {filtro}
+            ) deltas
+            ON CONFLICT (servidor_id, data) DO UPDATE
+            SET minutos_delta = EXCLUDED.minutos_delta,
+                saldo_minutos = EXCLUDED.saldo_minutos,
+                updated_at = now()
+        """), {"servidor_id": servidor_id})
+        self.db.commit()
+        logger.info(f"Banco de horas reconstruído: {resultado.rowcount} lançamento(s)")
+        return resultado.rowcount
+
+def calcular_delta_minutos(status: str, minutos_extras: int, minutos_faltantes: int) -> int:
+    """Delta do banco de horas de um dia: faltas justificadas não são debitadas."""
+    if status == "justificada":
+        return minutos_extras
+    return minutos_extras - minutos_faltantes
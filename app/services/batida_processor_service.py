@@ -2,51 +2,158 @@
 from sqlalchemy.orm import Session
 from datetime import datetime, date, time, timedelta
 from typing import List, Dict, Any, Tuple
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, select, exists, cast, BigInteger, Text
+from sqlalchemy.dialects.postgresql import insert
+import logging
 
-from app.models.batida import BatidasOriginais, BatidasProcessadas
-from app.models.servidor import Servidores
-from app.models.feriado import Feriados
-from app.models.horarios_padrao import HorariosPadrao
+from app.core.config import settings
+from app.models.batida import BatidaOriginal, BatidaProcessada
+from app.models.configuracao_sistema import ConfiguracaoSistema
+from app.models.feriado import Feriado
+from app.services.horario_resolver import ResolvedorHorarios
+from app.services.ponto_processor import HorarioTrabalho
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Chave em configuracoes_sistema com o último ID de batidas_originais varrido
+CHAVE_WATERMARK = "batidas_processamento_watermark"
 
 class ProcessadorBatidas:
     """Serviço para processamento e análise de batidas de ponto"""
     
     def __init__(self, db: Session):
         self.db = db
+        self.resolvedor_horarios = None
+        self._feriados: Dict[date, bool] = {}
     
-    def processar_batidas_nao_processadas(self):
+    def processar_batidas_nao_processadas(self, varredura_completa: bool = False) -> Dict[str, Any]:
         """
         Processa todas as batidas originais que ainda não foram processadas.
         - Agrupa por servidor e data
         - Verifica inconsistências
         - Calcula horas trabalhadas
         - Detecta batidas faltantes
+        
+        A varredura parte de uma marca d'água persistida (último ID de
+        batidas_originais já varrido). Uma janela de IDs abaixo da marca é
+        revisada com anti-join (NOT EXISTS) para não perder batidas de
+        transações que confirmaram fora de ordem. As linhas são lidas em
+        streaming e processadas em lotes que só são cortados na troca de
+        (servidor, data), mantendo a memória limitada.
+        
+        Args:
+            varredura_completa: Ignora a marca d'água e revisa toda a tabela
+            
+        Returns:
+            Estatísticas da execução (lotes, batidas, dias, marca d'água)
         """
-        # Buscando batidas não processadas (que não existem na tabela de processadas)
-        batidas_originais = self.db.query(BatidasOriginais) \
-            .filter(~BatidasOriginais.id.in_(
-                self.db.query(BatidasProcessadas.batida_original_id)
-            )) \
-            .order_by(BatidasOriginais.servidor_id, BatidasOriginais.data_hora) \
-            .all()
-        
-        # Agrupando por servidor e data
-        batidas_por_servidor_data = {}
-        for batida in batidas_originais:
-            data = batida.data_hora.date()
-            key = (batida.servidor_id, data)
+        estatisticas = {"lotes": 0, "batidas": 0, "dias": 0, "watermark": None}
+        
+        limite = self.db.query(func.max(BatidaOriginal.id)).scalar()
+        if limite is None:
+            return estatisticas
+        
+        watermark = 0 if varredura_completa else self._obter_watermark()
+        id_inicial = max(watermark - settings.PROCESSAMENTO_JANELA_WATERMARK, 0)
+        
+        # Anti-join restrito à faixa de IDs; usa o índice de batida_original_id. A batida
+        # processada tem o mesmo data_hora da original, o que poda a busca para uma partição
+        consulta = select(
+            BatidaOriginal.id, BatidaOriginal.servidor_id, BatidaOriginal.data_hora, BatidaOriginal.tipo
+        ).where(
+            BatidaOriginal.id > id_inicial,
+            BatidaOriginal.id <= limite,
+            ~exists().where(
+                BatidaProcessada.batida_original_id == BatidaOriginal.id,
+                BatidaProcessada.data_hora == BatidaOriginal.data_hora
+            )
+        ).order_by(BatidaOriginal.servidor_id, BatidaOriginal.data_hora)
+        
+        tamanho_lote = settings.PROCESSAMENTO_LOTE_BATIDAS
+        
+        # Conexão própria para o cursor do servidor: os commits de cada lote na
+        # sessão não podem encerrar o cursor que ainda está sendo lido
+        with self.db.get_bind().connect() as conexao:
+            resultado = conexao.execution_options(stream_results=True, yield_per=tamanho_lote).execute(consulta)
             
-            if key not in batidas_por_servidor_data:
-                batidas_por_servidor_data[key] = []
+            lote: Dict[Tuple[int, date], List] = {}
+            total_lote = 0
+            for batida in resultado:
+                key = (batida.servidor_id, batida.data_hora.date())
+                
+                # Só fecha o lote na troca de (servidor, data): um dia nunca é dividido
+                if key not in lote and total_lote >= tamanho_lote:
+                    self._processar_lote(lote, estatisticas)
+                    lote = {}
+                    total_lote = 0
                 
-            batidas_por_servidor_data[key].append(batida)
+                lote.setdefault(key, []).append(batida)
+                total_lote += 1
+            
+            if lote:
+                self._processar_lote(lote, estatisticas)
+        
+        # Marca d'água só avança após a varredura completa até o limite
+        self._salvar_watermark(limite)
+        estatisticas["watermark"] = limite
+        return estatisticas
+    
+    def _processar_lote(self, batidas_por_servidor_data: Dict[Tuple[int, date], List], estatisticas: Dict[str, Any]):
+        """
+        Processa um lote de grupos (servidor, data) e confirma de uma vez.
+        
+        Args:
+            batidas_por_servidor_data: Batidas agrupadas por (servidor_id, data)
+            estatisticas: Contadores da execução, atualizados no lugar
+        """
+        # Carregar de uma vez os horários de todos os servidores e datas do lote
+        datas = [data for _, data in batidas_por_servidor_data]
+        self.resolvedor_horarios = ResolvedorHorarios(self.db).carregar(
+            {servidor_id for servidor_id, _ in batidas_por_servidor_data}, min(datas), max(datas)
+        )
         
         # Processando cada grupo
         for (servidor_id, data), batidas_do_dia in batidas_por_servidor_data.items():
             self._processar_batidas_dia(servidor_id, data, batidas_do_dia)
+            estatisticas["batidas"] += len(batidas_do_dia)
+        
+        self.db.commit()
+        estatisticas["lotes"] += 1
+        estatisticas["dias"] += len(batidas_por_servidor_data)
+        logger.info(
+            f"Lote {estatisticas['lotes']} processado: {len(batidas_por_servidor_data)} dia(s), "
+            f"{estatisticas['batidas']} batida(s) no total"
+        )
+    
+    def _obter_watermark(self) -> int:
+        """Retorna o último ID de batidas_originais já varrido (0 se nunca houve varredura)."""
+        valor = self.db.query(ConfiguracaoSistema.valor).filter(
+            ConfiguracaoSistema.chave == CHAVE_WATERMARK
+        ).scalar()
+        return int(valor) if valor else 0
+    
+    def _salvar_watermark(self, batida_id: int):
+        """Persiste a marca d'água, sem retroceder se outra execução já avançou além."""
+        stmt = insert(ConfiguracaoSistema).values(
+            chave=CHAVE_WATERMARK,
+            valor=str(batida_id),
+            tipo="numero",
+            descricao="Último ID de batidas_originais varrido pelo processamento de batidas",
+            atualizado_por="processador_batidas",
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConfiguracaoSistema.chave],
+            set_={
+                "valor": func.greatest(cast(ConfiguracaoSistema.valor, BigInteger), batida_id).cast(Text),
+                "atualizado_em": func.now(),
+                "updated_at": func.now(),
+            }
+        )
+        self.db.execute(stmt)
+        self.db.commit()
     
-    def _processar_batidas_dia(self, servidor_id: int, data: date, batidas: List[BatidasOriginais]):
+    def _processar_batidas_dia(self, servidor_id: int, data: date, batidas: List[BatidaOriginal]):
         """
         Processa as batidas de um servidor em um determinado dia.
         - Detecta inconsistências no padrão de entrada/saída
@@ -61,8 +168,8 @@ class ProcessadorBatidas:
         # Verificar se é feriado ou fim de semana
         is_dia_especial = self._verificar_dia_especial(data)
         
-        # Obter o horário padrão do servidor para o dia da semana
-        horario_padrao = self._obter_horario_padrao(servidor_id, data.weekday())
+        # Obter o horário previsto do servidor para o dia
+        horario_padrao = self._obter_horario_padrao(servidor_id, data)
         
         # Ordenar batidas por horário
         batidas_ordenadas = sorted(batidas, key=lambda b: b.data_hora)
@@ -82,7 +189,7 @@ class ProcessadorBatidas:
                 batidas_inconsistentes.append(batida)
             
             # Criar batida processada
-            batida_processada = BatidasProcessadas(
+            batida_processada = BatidaProcessada(
                 batida_original_id=batida.id,
                 servidor_id=batida.servidor_id,
                 data_hora=batida.data_hora,
@@ -93,10 +200,9 @@ class ProcessadorBatidas:
             
             batidas_processadas.append(batida_processada)
         
-        # Adicionar todas as batidas processadas
+        # Adicionar todas as batidas processadas (o commit é feito por lote)
         if batidas_processadas:
             self.db.add_all(batidas_processadas)
-            self.db.commit()
         
         # Verificar batidas faltantes comparando com o horário padrão
         if horario_padrao and not is_dia_especial:
@@ -116,29 +222,30 @@ class ProcessadorBatidas:
         if data.weekday() >= 5:
             return True
             
-        # Verificar se é feriado
-        feriado = self.db.query(Feriados).filter(Feriados.data == data).first()
-        return feriado is not None
+        # Verificar se é feriado (consultado uma única vez por data)
+        if data not in self._feriados:
+            self._feriados[data] = self.db.query(Feriado.id).filter(Feriado.data == data).first() is not None
+        return self._feriados[data]
     
-    def _obter_horario_padrao(self, servidor_id: int, dia_semana: int) -> HorariosPadrao:
+    def _obter_horario_padrao(self, servidor_id: int, data: date) -> HorarioTrabalho:
         """
-        Obtém o horário padrão do servidor para o dia da semana.
+        Obtém o horário previsto do servidor para a data, considerando o horário
+        padrão do dia da semana e as alterações de horário vigentes.
         
         Args:
             servidor_id: ID do servidor
-            dia_semana: Dia da semana (0-6, sendo 0=segunda, 6=domingo)
+            data: Data de referência
             
         Returns:
-            Objeto HorariosPadrao ou None se não encontrado
+            Objeto HorarioTrabalho ou None se não houver horário cadastrado
         """
-        return self.db.query(HorariosPadrao).filter(
-            HorariosPadrao.servidor_id == servidor_id,
-            HorariosPadrao.dia_semana == dia_semana
-        ).first()
+        if self.resolvedor_horarios is None:
+            self.resolvedor_horarios = ResolvedorHorarios(self.db).carregar([servidor_id], data, data)
+        return self.resolvedor_horarios.resolver(servidor_id, data)
     
     def _verificar_batidas_faltantes(self, servidor_id: int, data: date, 
-                                    batidas: List[BatidasOriginais], 
-                                    horario_padrao: HorariosPadrao):
+                                    batidas: List[BatidaOriginal], 
+                                    horario_padrao: HorarioTrabalho):
         """
         Verifica se há batidas faltantes comparando com o horário padrão.
         Cria registros para controle interno (não modifica as batidas originais).
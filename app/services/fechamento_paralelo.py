@@ -0,0 +1,259 @@
+# app/services/fechamento_paralelo.py
+"""
+Fechamento mensal paralelo.
+
+Divide os servidores ativos em faixas contíguas de ID (shards) e processa cada
+faixa em um processo separado, cada um com sua própria conexão com o banco.
+Uso pela linha de comando:
+
+    python -m app.services.fechamento_paralelo --ano 2025 --mes 4
+"""
+import argparse
+import calendar
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.servidor import Servidor
+from app.schemas.fechamento import FechamentoResult, FechamentoShardResult
+from app.services.horario_resolver import ResolvedorHorarios
+from app.services.ponto_processor import PontoProcessor
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Fábrica de sessões do processo trabalhador (criada em _inicializar_worker)
+_SessionWorker: Optional[sessionmaker] = None
+
+def _inicializar_worker(database_uri: str) -> None:
+    """
+    Inicializa o processo trabalhador com um engine próprio.
+
+    Cada processo mantém uma única conexão; o pool do processo principal
+    nunca é compartilhado com os trabalhadores.
+    """
+    global _SessionWorker
+    engine = create_engine(database_uri, pool_size=1, max_overflow=0, pool_pre_ping=True)
+    _SessionWorker = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _processar_shard(indice: int, servidor_id_inicio: int, servidor_id_fim: int,
+                     periodo_inicio: date, periodo_fim: date) -> Dict:
+    """
+    Processa todos os servidores ativos de uma faixa de IDs no período.
+
+    Falhas de um servidor são registradas e não interrompem a faixa; exceções
+    de infraestrutura (ex.: conexão perdida) propagam e fazem a faixa ser
+    reenviada pelo orquestrador.
+
+    Returns:
+        Dicionário compatível com FechamentoShardResult
+    """
+    inicio = time.monotonic()
+    resultado = {
+        "indice": indice,
+        "servidor_id_inicio": servidor_id_inicio,
+        "servidor_id_fim": servidor_id_fim,
+        "total_servidores": 0,
+        "total_dias": 0,
+        "total_regular": 0,
+        "total_irregular": 0,
+        "total_justificada": 0,
+        "falhas": [],
+    }
+
+    db = _SessionWorker()
+    try:
+        servidor_ids = [
+            servidor_id for (servidor_id,) in db.query(Servidor.id).filter(
+                Servidor.id >= servidor_id_inicio,
+                Servidor.id <= servidor_id_fim,
+                Servidor.ativo == True
+            ).order_by(Servidor.id)
+        ]
+
+        # Horários de toda a faixa carregados de uma vez, desde a véspera (corte dos turnos
+        # que atravessam a meia-noite do dia 1), como em PontoProcessor._preparar_periodo
+        resolvedor = ResolvedorHorarios(db).carregar(
+            servidor_ids, periodo_inicio - timedelta(days=1), periodo_fim
+        )
+        processor = PontoProcessor(db, resolvedor)
+        for servidor_id in servidor_ids:
+            try:
+                processamento = processor.processar_batidas_por_servidor(servidor_id, periodo_inicio, periodo_fim)
+            except ValueError as e:
+                db.rollback()
+                resultado["falhas"].append({"servidor_id": servidor_id, "erro": str(e)})
+                continue
+
+            resultado["total_servidores"] += 1
+            resultado["total_dias"] += processamento.total_processado
+            resultado["total_regular"] += processamento.total_regular
+            resultado["total_irregular"] += processamento.total_irregular
+            resultado["total_justificada"] += processamento.total_justificada
+    finally:
+        db.close()
+
+    resultado["duracao_segundos"] = time.monotonic() - inicio
+    resultado["concluido"] = True
+    return resultado
+
+class OrquestradorFechamento:
+    """Orquestra o fechamento mensal distribuindo faixas de servidores entre processos."""
+
+    def __init__(self, db: Session, num_workers: int = None, shards_por_worker: int = None,
+                 max_tentativas: int = None):
+        """
+        Args:
+            db: Sessão usada apenas para planejar as faixas de servidores
+            num_workers: Número de processos trabalhadores
+            shards_por_worker: Faixas por processo (mais faixas equilibram melhor a carga)
+            max_tentativas: Tentativas por faixa antes de registrá-la como falha
+        """
+        self.db = db
+        self.num_workers = num_workers or settings.FECHAMENTO_WORKERS
+        self.shards_por_worker = shards_por_worker or settings.FECHAMENTO_SHARDS_POR_WORKER
+        self.max_tentativas = max_tentativas or settings.FECHAMENTO_MAX_TENTATIVAS
+
+    def dividir_em_shards(self) -> List[Tuple[int, int]]:
+        """
+        Divide os servidores ativos em faixas contíguas de ID com quantidades
+        equilibradas de servidores.
+
+        Returns:
+            Lista de faixas (servidor_id_inicio, servidor_id_fim), inclusivas
+        """
+        servidor_ids = [
+            servidor_id for (servidor_id,) in self.db.query(Servidor.id)
+            .filter(Servidor.ativo == True)
+            .order_by(Servidor.id)
+        ]
+        if not servidor_ids:
+            return []
+
+        num_shards = min(len(servidor_ids), self.num_workers * self.shards_por_worker)
+        tamanho, resto = divmod(len(servidor_ids), num_shards)
+
+        shards = []
+        posicao = 0
+        for i in range(num_shards):
+            quantidade = tamanho + (1 if i < resto else 0)
+            shards.append((servidor_ids[posicao], servidor_ids[posicao + quantidade - 1]))
+            posicao += quantidade
+        return shards
+
+    def executar(self, periodo_inicio: date, periodo_fim: date,
+                 ao_concluir_shard: Callable[[FechamentoShardResult], None] = None) -> FechamentoResult:
+        """
+        Executa o fechamento do período em paralelo.
+
+        Args:
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            ao_concluir_shard: Callback opcional chamado a cada faixa finalizada (progresso)
+
+        Returns:
+            Resultado consolidado do fechamento
+        """
+        inicio = time.monotonic()
+        shards = self.dividir_em_shards()
+        resultados: Dict[int, FechamentoShardResult] = {}
+        tentativas = {indice: 0 for indice in range(len(shards))}
+
+        logger.info(
+            f"Fechamento {periodo_inicio} a {periodo_fim}: {len(shards)} faixa(s) em {self.num_workers} processo(s)"
+        )
+
+        # 'spawn' evita que os trabalhadores herdem conexões abertas do processo principal
+        with ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_worker,
+            initargs=(settings.DATABASE_URI,),
+        ) as executor:
+            def submeter(indice: int):
+                tentativas[indice] += 1
+                id_inicio, id_fim = shards[indice]
+                return executor.submit(_processar_shard, indice, id_inicio, id_fim, periodo_inicio, periodo_fim)
+
+            pendentes = {submeter(indice): indice for indice in range(len(shards))}
+            while pendentes:
+                for futuro in as_completed(list(pendentes)):
+                    indice = pendentes.pop(futuro)
+                    id_inicio, id_fim = shards[indice]
+                    try:
+                        shard = FechamentoShardResult(**futuro.result(), tentativas=tentativas[indice])
+                    except Exception as e:
+                        if tentativas[indice] < self.max_tentativas:
+                            logger.warning(
+                                f"Faixa {indice} ({id_inicio}-{id_fim}) falhou na tentativa "
+                                f"{tentativas[indice]}: {str(e)}. Reenviando."
+                            )
+                            pendentes[submeter(indice)] = indice
+                            continue
+                        logger.error(f"Faixa {indice} ({id_inicio}-{id_fim}) falhou definitivamente: {str(e)}")
+                        shard = FechamentoShardResult(
+                            indice=indice,
+                            servidor_id_inicio=id_inicio,
+                            servidor_id_fim=id_fim,
+                            tentativas=tentativas[indice],
+                            erro=str(e),
+                        )
+
+                    resultados[indice] = shard
+                    logger.info(
+                        f"Faixa {indice} concluída ({len(resultados)}/{len(shards)}): "
+                        f"{shard.total_servidores} servidor(es), {shard.total_dias} dia(s), {len(shard.falhas)} falha(s)"
+                    )
+                    if ao_concluir_shard:
+                        ao_concluir_shard(shard)
+
+        return self._consolidar(periodo_inicio, periodo_fim, [resultados[i] for i in sorted(resultados)],
+                                time.monotonic() - inicio)
+
+    def executar_mes(self, ano: int, mes: int) -> FechamentoResult:
+        """Executa o fechamento do mês/ano informado."""
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+        return self.executar(date(ano, mes, 1), date(ano, mes, ultimo_dia))
+
+    @staticmethod
+    def _consolidar(periodo_inicio: date, periodo_fim: date, shards: List[FechamentoShardResult],
+                    duracao: float) -> FechamentoResult:
+        """Agrega os resultados das faixas."""
+        return FechamentoResult(
+            periodo_inicio=periodo_inicio,
+            periodo_fim=periodo_fim,
+            total_shards=len(shards),
+            shards_concluidos=sum(1 for s in shards if s.concluido),
+            shards_com_falha=sum(1 for s in shards if not s.concluido),
+            total_servidores=sum(s.total_servidores for s in shards),
+            total_dias=sum(s.total_dias for s in shards),
+            total_regular=sum(s.total_regular for s in shards),
+            total_irregular=sum(s.total_irregular for s in shards),
+            total_justificada=sum(s.total_justificada for s in shards),
+            duracao_segundos=duracao,
+            shards=shards,
+        )
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Fechamento mensal paralelo do ponto")
+    parser.add_argument("--ano", type=int, required=True)
+    parser.add_argument("--mes", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        resultado = OrquestradorFechamento(db, num_workers=args.workers).executar_mes(args.ano, args.mes)
+    finally:
+        db.close()
+
+    print(resultado.model_dump_json(indent=2))
@@ -0,0 +1,360 @@
+# app/services/fechamento_snapshot.py
+"""
+Snapshots congelados do fechamento mensal.
+
+Depois de fechado, um mês é gravado por secretaria em um diretório imutável
+com um arquivo binário por coluna (inteiros de largura fixa, no formato do
+módulo array) e um manifesto JSON. A leitura mapeia os arquivos em memória
+(mmap) e fatia as colunas pelos deslocamentos de cada servidor registrados no
+manifesto: servir um mês fechado não faz nenhuma consulta ao banco.
+
+Layout em disco:
+
+    {FECHAMENTO_SNAPSHOT_DIR}/2025-04/secretaria_000003/
+        manifesto.json
+        servidor_id.bin, data.bin, minutos_trabalhados.bin, ...
+"""
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import calendar
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import sys
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.resumo_diario import ResumoDiario
+from app.models.servidor import Servidor
+from app.services.resumo_diario_service import ResumoDiarioService
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+FORMATO = "pontual-fechamento-colunar"
+VERSAO_FORMATO = 1
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+# Colunas e tipos do módulo array (i = int32, B = uint8, H = uint16)
+COLUNAS = (
+    ("servidor_id", "i"),
+    ("data", "i"),  # date.toordinal()
+    ("minutos_trabalhados", "i"),
+    ("minutos_extras", "i"),
+    ("minutos_faltantes", "i"),
+    ("minutos_noturnos", "i"),
+    ("justificativa_id", "i"),  # 0 = sem justificativa
+    ("status", "B"),  # Código no dicionário "status" do manifesto
+    ("observacao", "H"),  # Código no dicionário "observacao" do manifesto (0 = sem observação)
+)
+
+def _diretorio_mes(ano: int, mes: int, base: str = None) -> str:
+    return os.path.join(base or settings.FECHAMENTO_SNAPSHOT_DIR, f"{ano:04d}-{mes:02d}")
+
+def _periodo_mes(ano: int, mes: int) -> Tuple[date, date]:
+    return date(ano, mes, 1), date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+def congelar_secretaria(db: Session, ano: int, mes: int, secretaria_id: int, base: str = None) -> Dict:
+    """
+    Congela o mês de uma secretaria em um snapshot colunar imutável.
+
+    Os resumos diários ausentes ou desatualizados são recalculados antes da
+    gravação. O snapshot é escrito em um diretório temporário e publicado com
+    uma renomeação atômica; um mês já congelado não é sobrescrito.
+
+    Args:
+        db: Sessão do banco de dados
+        ano: Ano do fechamento
+        mes: Mês do fechamento
+        secretaria_id: ID da secretaria
+        base: Diretório raiz dos snapshots (padrão: FECHAMENTO_SNAPSHOT_DIR)
+
+    Returns:
+        Manifesto do snapshot gravado
+
+    Raises:
+        ValueError: Se o mês ainda não terminou ou já foi congelado para a secretaria
+    """
+    periodo_inicio, periodo_fim = _periodo_mes(ano, mes)
+    if periodo_fim >= date.today():
+        raise ValueError(f"O mês {mes:02d}/{ano} ainda não terminou")
+
+    diretorio_mes = _diretorio_mes(ano, mes, base)
+    destino = os.path.join(diretorio_mes, f"secretaria_{secretaria_id:06d}")
+    if os.path.exists(destino):
+        raise ValueError(f"O mês {mes:02d}/{ano} já foi congelado para a secretaria {secretaria_id}")
+
+    servidor_ids = [
+        servidor_id for (servidor_id,) in db.query(Servidor.id).filter(
+            Servidor.secretaria_id == secretaria_id,
+            Servidor.ativo == True
+        ).order_by(Servidor.id)
+    ]
+
+    # Garante que todos os dias do mês estejam calculados e atualizados
+    resumo_service = ResumoDiarioService(db)
+    for servidor_id in servidor_ids:
+        resumo_service.obter_espelho(servidor_id, periodo_inicio, periodo_fim)
+
+    colunas = {nome: array(tipo) for nome, tipo in COLUNAS}
+    dicionario_status: List[str] = []
+    dicionario_observacao: List[Optional[str]] = [None]
+    codigos_status: Dict[str, int] = {}
+    codigos_observacao: Dict[Optional[str], int] = {None: 0}
+    servidores: Dict[str, List[int]] = {}
+
+    resumos = []
+    if servidor_ids:
+        resumos = db.query(ResumoDiario).filter(
+            ResumoDiario.servidor_id.in_(servidor_ids),
+            ResumoDiario.data >= periodo_inicio,
+            ResumoDiario.data <= periodo_fim
+        ).order_by(ResumoDiario.servidor_id, ResumoDiario.data).yield_per(1000)
+
+    for linha, resumo in enumerate(resumos):
+        faixa = servidores.setdefault(str(resumo.servidor_id), [linha, linha])
+        faixa[1] = linha + 1
+
+        if resumo.status not in codigos_status:
+            codigos_status[resumo.status] = len(dicionario_status)
+            dicionario_status.append(resumo.status)
+        if resumo.observacao not in codigos_observacao:
+            codigos_observacao[resumo.observacao] = len(dicionario_observacao)
+            dicionario_observacao.append(resumo.observacao)
+
+        colunas["servidor_id"].append(resumo.servidor_id)
+        colunas["data"].append(resumo.data.toordinal())
+        colunas["minutos_trabalhados"].append(resumo.minutos_trabalhados)
+        colunas["minutos_extras"].append(resumo.minutos_extras)
+        colunas["minutos_faltantes"].append(resumo.minutos_faltantes)
+        colunas["minutos_noturnos"].append(resumo.minutos_noturnos or 0)
+        colunas["justificativa_id"].append(resumo.justificativa_id or 0)
+        colunas["status"].append(codigos_status[resumo.status])
+        colunas["observacao"].append(codigos_observacao[resumo.observacao])
+
+    os.makedirs(diretorio_mes, exist_ok=True)
+    temporario = os.path.join(diretorio_mes, f".tmp-secretaria_{secretaria_id:06d}-{os.getpid()}")
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    try:
+        descricao_colunas = {}
+        for nome, tipo in COLUNAS:
+            arquivo = f"{nome}.bin"
+            dados = colunas[nome].tobytes()
+            with open(os.path.join(temporario, arquivo), "wb") as f:
+                f.write(dados)
+                f.flush()
+                os.fsync(f.fileno())
+            descricao_colunas[nome] = {
+                "arquivo": arquivo,
+                "tipo": tipo,
+                "tamanho_item": colunas[nome].itemsize,
+                "bytes": len(dados),
+                "sha256": hashlib.sha256(dados).hexdigest(),
+            }
+
+        manifesto = {
+            "formato": FORMATO,
+            "versao": VERSAO_FORMATO,
+            "ano": ano,
+            "mes": mes,
+            "secretaria_id": secretaria_id,
+            "periodo_inicio": periodo_inicio.isoformat(),
+            "periodo_fim": periodo_fim.isoformat(),
+            "gerado_em": datetime.now().isoformat(timespec="seconds"),
+            "linhas": len(colunas["servidor_id"]),
+            "ordem_bytes": sys.byteorder,
+            "colunas": descricao_colunas,
+            "dicionarios": {"status": dicionario_status, "observacao": dicionario_observacao},
+            "servidores": servidores,  # servidor_id -> [linha_inicio, linha_fim)
+        }
+        with open(os.path.join(temporario, ARQUIVO_MANIFESTO), "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+        for arquivo in os.listdir(temporario):
+            os.chmod(os.path.join(temporario, arquivo), 0o444)
+
+        # Publicação atômica: leitores nunca veem um snapshot parcial
+        os.rename(temporario, destino)
+    except Exception:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+
+    logger.info(
+        f"Fechamento {mes:02d}/{ano} da secretaria {secretaria_id} congelado: "
+        f"{manifesto['linhas']} dia(s) de {len(servidores)} servidor(es)"
+    )
+    return manifesto
+
+class SnapshotSecretaria:
+    """Snapshot congelado de uma secretaria, com as colunas mapeadas em memória."""
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), encoding="utf-8") as f:
+            self.manifesto = json.load(f)
+        if self.manifesto.get("formato") != FORMATO or self.manifesto.get("versao") != VERSAO_FORMATO:
+            raise ValueError(f"Snapshot em formato não suportado: {diretorio}")
+
+        self.servidores: Dict[int, Tuple[int, int]] = {
+            int(servidor_id): (inicio, fim) for servidor_id, (inicio, fim) in self.manifesto["servidores"].items()
+        }
+        self._status = self.manifesto["dicionarios"]["status"]
+        self._observacao = self.manifesto["dicionarios"]["observacao"]
+        self._colunas = {nome: self._mapear(descricao) for nome, descricao in self.manifesto["colunas"].items()}
+
+    def _mapear(self, descricao: Dict):
+        """Mapeia um arquivo de coluna; se a ordem de bytes difere, carrega e converte."""
+        caminho = os.path.join(self.diretorio, descricao["arquivo"])
+        tipo = descricao["tipo"]
+        if descricao["bytes"] == 0:
+            return array(tipo)
+
+        if self.manifesto["ordem_bytes"] != sys.byteorder:
+            coluna = array(tipo)
+            with open(caminho, "rb") as f:
+                coluna.frombytes(f.read())
+            coluna.byteswap()
+            return coluna
+
+        with open(caminho, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapa).cast(tipo)
+
+    def linhas_servidor(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> Optional[List[Dict]]:
+        """
+        Retorna os dias do servidor no período, no formato do espelho de ponto.
+
+        Returns:
+            Lista de dicionários compatíveis com ResumoDiarioInDB, ou None se o
+            servidor não faz parte deste snapshot
+        """
+        faixa = self.servidores.get(servidor_id)
+        if faixa is None:
+            return None
+
+        inicio_ord, fim_ord = periodo_inicio.toordinal(), periodo_fim.toordinal()
+        c = self._colunas
+        linhas = []
+        for i in range(*faixa):
+            ordinal = c["data"][i]
+            if ordinal < inicio_ord or ordinal > fim_ord:
+                continue
+            linhas.append({
+                "servidor_id": servidor_id,
+                "data": date.fromordinal(ordinal),
+                "minutos_trabalhados": c["minutos_trabalhados"][i],
+                "minutos_extras": c["minutos_extras"][i],
+                "minutos_faltantes": c["minutos_faltantes"][i],
+                "minutos_noturnos": c["minutos_noturnos"][i],
+                "status": self._status[c["status"][i]],
+                "justificativa_id": c["justificativa_id"][i] or None,
+                "observacao": self._observacao[c["observacao"][i]],
+                "processado_em": None,
+            })
+        return linhas
+
+    def totais_por_servidor(self) -> List[Dict]:
+        """Totais do mês por servidor, calculados direto sobre as colunas."""
+        c = self._colunas
+        codigo_status = {status: codigo for codigo, status in enumerate(self._status)}
+        totais = []
+        for servidor_id, (inicio, fim) in sorted(self.servidores.items()):
+            status = c["status"][inicio:fim].tolist()
+            totais.append({
+                "servidor_id": servidor_id,
+                "dias": fim - inicio,
+                "minutos_trabalhados": sum(c["minutos_trabalhados"][inicio:fim]),
+                "minutos_extras": sum(c["minutos_extras"][inicio:fim]),
+                "minutos_faltantes": sum(c["minutos_faltantes"][inicio:fim]),
+                "minutos_noturnos": sum(c["minutos_noturnos"][inicio:fim]),
+                "dias_regulares": status.count(codigo_status.get("regular", -1)),
+                "dias_irregulares": status.count(codigo_status.get("irregular", -1)),
+                "dias_justificados": status.count(codigo_status.get("justificada", -1)),
+            })
+        return totais
+
+class MesFechado:
+    """Todos os snapshots de secretaria congelados de um mês."""
+
+    def __init__(self, ano: int, mes: int, diretorio: str):
+        self.ano = ano
+        self.mes = mes
+        self.secretarias: Dict[int, SnapshotSecretaria] = {}
+        self._por_servidor: Dict[int, SnapshotSecretaria] = {}
+
+        for nome in sorted(os.listdir(diretorio)):
+            caminho = os.path.join(diretorio, nome)
+            if not nome.startswith("secretaria_") or not os.path.isdir(caminho):
+                continue
+            snapshot = SnapshotSecretaria(caminho)
+            self.secretarias[snapshot.manifesto["secretaria_id"]] = snapshot
+            for servidor_id in snapshot.servidores:
+                self._por_servidor[servidor_id] = snapshot
+
+    def snapshot_do_servidor(self, servidor_id: int) -> Optional[SnapshotSecretaria]:
+        return self._por_servidor.get(servidor_id)
+
+# Meses abertos por (ano, mes), com a data de modificação do diretório do mês
+# para perceber secretarias congeladas depois do primeiro carregamento
+_cache_meses: Dict[Tuple[int, int], Tuple[int, Optional[MesFechado]]] = {}
+_cache_lock = threading.Lock()
+
+def obter_mes_fechado(ano: int, mes: int, base: str = None) -> Optional[MesFechado]:
+    """
+    Retorna os snapshots congelados do mês (ou None se nenhum), com cache por processo.
+    """
+    diretorio = _diretorio_mes(ano, mes, base)
+    try:
+        modificado = os.stat(diretorio).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    chave = (ano, mes)
+    with _cache_lock:
+        em_cache = _cache_meses.get(chave)
+        if em_cache is not None and em_cache[0] == modificado:
+            return em_cache[1]
+        mes_fechado = MesFechado(ano, mes, diretorio)
+        _cache_meses[chave] = (modificado, mes_fechado if mes_fechado.secretarias else None)
+        return _cache_meses[chave][1]
+
+def obter_espelho_congelado(servidor_id: int, periodo_inicio: date,
+                            periodo_fim: date) -> Tuple[List[Dict], List[Tuple[date, date]]]:
+    """
+    Separa o período em meses e lê dos snapshots os meses já congelados.
+
+    Args:
+        servidor_id: ID do servidor
+        periodo_inicio: Data de início do período
+        periodo_fim: Data de fim do período
+
+    Returns:
+        (linhas lidas dos snapshots, faixas de datas não cobertas por snapshot)
+    """
+    linhas: List[Dict] = []
+    pendentes: List[Tuple[date, date]] = []
+
+    inicio = periodo_inicio
+    while inicio <= periodo_fim:
+        fim = min(_periodo_mes(inicio.year, inicio.month)[1], periodo_fim)
+
+        mes_fechado = obter_mes_fechado(inicio.year, inicio.month)
+        snapshot = mes_fechado.snapshot_do_servidor(servidor_id) if mes_fechado else None
+        if snapshot is not None:
+            linhas.extend(snapshot.linhas_servidor(servidor_id, inicio, fim))
+        elif pendentes and pendentes[-1][1] + timedelta(days=1) == inicio:
+            pendentes[-1] = (pendentes[-1][0], fim)
+        else:
+            pendentes.append((inicio, fim))
+
+        inicio = fim + timedelta(days=1)
+
+    return linhas, pendentes
@@ -0,0 +1,312 @@
+# app/services/fila_tarefas.py
+"""
+Fila durável de tarefas de processamento.
+
+As tarefas são gravadas em ponto.tarefas_processamento na mesma transação de
+quem as enfileira e consumidas pelo worker dedicado (python -m app.worker),
+fora dos processos da API. A reserva usa SELECT ... FOR UPDATE SKIP LOCKED,
+de modo que vários workers podem consumir a mesma fila sem disputar linhas.
+
+Enquanto executa uma tarefa, o worker renova atualizado_em a cada
+WORKER_INTERVALO_SINAL segundos, em uma conexão própria. Uma tarefa
+"executando" sem sinal de vida há mais de WORKER_TIMEOUT_TAREFA segundos
+(worker interrompido) volta a ser reservada, ou é marcada como erro se já
+esgotou as tentativas.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.tarefa_processamento import TarefaProcessamento
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Espera base entre tentativas (dobra a cada falha)
+ESPERA_BASE_SEGUNDOS = 30
+
+# Manipuladores registrados por tipo de tarefa
+MANIPULADORES: Dict[str, Callable[[Session, Dict[str, Any]], Any]] = {}
+
+def manipulador(tipo: str):
+    """Decorador que registra a função que executa as tarefas de um tipo."""
+    def registrar(funcao: Callable[[Session, Dict[str, Any]], Any]):
+        MANIPULADORES[tipo] = funcao
+        return funcao
+    return registrar
+
+def enfileirar_tarefa(db: Session, tipo: str, parametros: Optional[Dict[str, Any]] = None,
+                      atraso_segundos: int = 0, max_tentativas: Optional[int] = None) -> TarefaProcessamento:
+    """
+    Adiciona uma tarefa à fila. Não faz commit: a tarefa só fica visível para o
+    worker quando a transação de quem a enfileirou for confirmada.
+
+    Args:
+        db: Sessão do banco de dados
+        tipo: Tipo da tarefa (deve ter um manipulador registrado)
+        parametros: Parâmetros serializáveis em JSON
+        atraso_segundos: Adia o início da execução
+        max_tentativas: Tentativas antes de marcar a tarefa como erro
+
+    Returns:
+        A tarefa criada (com id, após o flush)
+    """
+    if tipo not in MANIPULADORES:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+
+    tarefa = TarefaProcessamento(
+        tipo=tipo,
+        parametros=parametros or {},
+        status="pendente",
+        max_tentativas=max_tentativas or settings.WORKER_MAX_TENTATIVAS,
+        disponivel_em=datetime.now() + timedelta(seconds=atraso_segundos),
+    )
+    db.add(tarefa)
+    db.flush()
+    return tarefa
+
+class SinalVidaTarefa:
+    """
+    Renova atualizado_em da tarefa em uma thread, enquanto ela é executada.
+
+    A renovação usa uma conexão própria do engine, pois a sessão do worker
+    está ocupada pelo manipulador. Só atualiza a linha se a tarefa ainda
+    estiver na mesma tentativa; caso contrário ela foi retomada por outro
+    worker, o que é registrado no log.
+    """
+
+    def __init__(self, db: Session, tarefa: TarefaProcessamento, intervalo: Optional[float] = None):
+        self.engine = db.get_bind()
+        self.tarefa_id = tarefa.id
+        self.tentativa = tarefa.tentativas
+        self.intervalo = intervalo or settings.WORKER_INTERVALO_SINAL
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._laco, name=f"sinal-tarefa-{tarefa.id}", daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._parar.set()
+        self._thread.join()
+
+    def renovar(self) -> bool:
+        """Renova o sinal de vida. Retorna False se a tarefa não está mais nesta tentativa."""
+        with self.engine.begin() as conexao:
+            renovadas = conexao.execute(
+                update(TarefaProcessamento).where(
+                    TarefaProcessamento.id == self.tarefa_id,
+                    TarefaProcessamento.status == "executando",
+                    TarefaProcessamento.tentativas == self.tentativa
+                ).values(atualizado_em=datetime.now())
+            ).rowcount
+        return renovadas > 0
+
+    def _laco(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                if not self.renovar():
+                    logger.warning(f"Tarefa {self.tarefa_id} foi retomada por outro worker durante a execução")
+                    return
+            except Exception as e:
+                logger.error(f"Erro ao renovar o sinal de vida da tarefa {self.tarefa_id}: {str(e)}")
+
+class FilaTarefas:
+    """Reserva, executa e finaliza tarefas da fila de processamento."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reservar(self) -> Optional[TarefaProcessamento]:
+        """
+        Reserva a próxima tarefa disponível, ignorando as que estão bloqueadas
+        por outro worker. Tarefas "executando" sem sinal de vida há mais de
+        WORKER_TIMEOUT_TAREFA segundos (worker interrompido) também são
+        retomadas; as que já esgotaram as tentativas são marcadas como erro.
+
+        Returns:
+            A tarefa reservada (já marcada como "executando") ou None se a fila estiver vazia
+        """
+        agora = datetime.now()
+        abandonada_antes_de = agora - timedelta(seconds=settings.WORKER_TIMEOUT_TAREFA)
+        abandonada = and_(
+            TarefaProcessamento.status == "executando",
+            func.coalesce(TarefaProcessamento.atualizado_em, TarefaProcessamento.iniciado_em) < abandonada_antes_de
+        )
+
+        # Abandonadas na última tentativa não voltam à fila
+        esgotadas = self.db.query(TarefaProcessamento).filter(
+            abandonada,
+            TarefaProcessamento.tentativas >= TarefaProcessamento.max_tentativas
+        ).update({
+            TarefaProcessamento.status: "erro",
+            TarefaProcessamento.erro: "Tarefa abandonada (sem sinal de vida do worker) na última tentativa",
+            TarefaProcessamento.concluido_em: agora,
+        }, synchronize_session=False)
+        if esgotadas:
+            self.db.commit()
+            logger.warning(f"{esgotadas} tarefa(s) abandonada(s) na última tentativa marcada(s) como erro")
+
+        tarefa = self.db.query(TarefaProcessamento).filter(
+            or_(
+                and_(TarefaProcessamento.status == "pendente", TarefaProcessamento.disponivel_em <= agora),
+                and_(abandonada, TarefaProcessamento.tentativas < TarefaProcessamento.max_tentativas)
+            )
+        ).order_by(
+            TarefaProcessamento.disponivel_em, TarefaProcessamento.id
+        ).with_for_update(skip_locked=True).first()
+
+        if tarefa is None:
+            self.db.rollback()
+            return None
+
+        tarefa.status = "executando"
+        tarefa.tentativas += 1
+        tarefa.iniciado_em = agora
+        tarefa.atualizado_em = agora
+        tarefa.erro = None
+        self.db.commit()
+        return tarefa
+
+    def executar(self, tarefa: TarefaProcessamento) -> bool:
+        """
+        Executa a tarefa com o manipulador do seu tipo e registra o desfecho,
+        renovando o sinal de vida enquanto o manipulador trabalha.
+
+        Returns:
+            True se concluída, False se falhou
+        """
+        funcao = MANIPULADORES.get(tarefa.tipo)
+        try:
+            if funcao is None:
+                raise ValueError(f"Tipo de tarefa desconhecido: {tarefa.tipo}")
+            with SinalVidaTarefa(self.db, tarefa):
+                resultado = funcao(self.db, tarefa.parametros or {})
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"Tarefa {tarefa.id} ({tarefa.tipo}) falhou na tentativa {tarefa.tentativas}")
+            self._falhar(tarefa, str(e))
+            return False
+
+        tarefa.status = "concluida"
+        tarefa.concluido_em = datetime.now()
+        tarefa.resultado = resultado
+        self.db.commit()
+        logger.info(f"Tarefa {tarefa.id} ({tarefa.tipo}) concluída")
+        return True
+
+    def _falhar(self, tarefa: TarefaProcessamento, erro: str):
+        """Devolve a tarefa à fila com espera exponencial ou a marca como erro."""
+        tarefa.erro = erro
+        if tarefa.tentativas < tarefa.max_tentativas:
+            tarefa.status = "pendente"
+            tarefa.disponivel_em = datetime.now() + timedelta(
+                seconds=ESPERA_BASE_SEGUNDOS * 2 ** (tarefa.tentativas - 1)
+            )
+        else:
+            tarefa.status = "erro"
+            tarefa.concluido_em = datetime.now()
+        self.db.commit()
+
+# Manipuladores. As importações são locais para que os serviços possam
+# importar este módulo para enfileirar tarefas sem importação circular.
+
+@manipulador("processar_batidas")
+def _processar_batidas(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Processa as batidas originais ainda não processadas."""
+    from app.services.batida_processor_service import ProcessadorBatidas
+    return ProcessadorBatidas(db).processar_batidas_nao_processadas(
+        varredura_completa=parametros.get("varredura_completa", False)
+    )
+
+@manipulador("processar_dias")
+def _processar_dias(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Reprocessa datas específicas de um servidor (parâmetros: servidor_id, datas em ISO)."""
+    from app.services.ponto_processor import PontoProcessor
+    datas = [date.fromisoformat(d) for d in parametros["datas"]]
+    resultados = PontoProcessor(db).processar_dias(parametros["servidor_id"], datas)
+    return {"servidor_id": parametros["servidor_id"], "dias": len(resultados)}
+
+@manipulador("recalcular_data")
+def _recalcular_data(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Recalcula uma data para todos os servidores, em lote (parâmetro: data em ISO)."""
+    from app.services.recalculo_data import RecalculoData
+    return RecalculoData(db).recalcular(date.fromisoformat(parametros["data"]))
+
+@manipulador("atualizar_sequencias")
+def _atualizar_sequencias(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Atualiza as sequências de status (parâmetros: data_inicio, data_fim em ISO; secretaria_id opcional)."""
+    from app.services.sequencias_status import AnaliseSequencias
+    gravadas = AnaliseSequencias(db).atualizar(
+        date.fromisoformat(parametros["data_inicio"]),
+        date.fromisoformat(parametros["data_fim"]),
+        parametros.get("secretaria_id")
+    )
+    return {"sequencias": gravadas}
+
+@manipulador("atualizar_pontualidade")
+def _atualizar_pontualidade(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstrói os esboços de pontualidade (parâmetros: data_inicio, data_fim em ISO; secretaria_id opcional)."""
+    from app.services.pontualidade_service import PontualidadeService
+    gravados = PontualidadeService(db).atualizar(
+        date.fromisoformat(parametros["data_inicio"]),
+        date.fromisoformat(parametros["data_fim"]),
+        parametros.get("secretaria_id")
+    )
+    return {"esbocos": gravados}
+
+@manipulador("fechamento_mensal")
+def _fechamento_mensal(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa o fechamento mensal paralelo (parâmetros: ano, mes)."""
+    from app.services.fechamento_paralelo import OrquestradorFechamento
+    resultado = OrquestradorFechamento(db).executar_mes(parametros["ano"], parametros["mes"])
+    return resultado.model_dump(mode="json", exclude={"shards"})
+
+@manipulador("congelar_fechamento")
+def _congelar_fechamento(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Congela o mês de uma secretaria em snapshot (parâmetros: ano, mes, secretaria_id)."""
+    from app.services.fechamento_snapshot import congelar_secretaria
+    manifesto = congelar_secretaria(db, parametros["ano"], parametros["mes"], parametros["secretaria_id"])
+    return {"secretaria_id": manifesto["secretaria_id"], "linhas": manifesto["linhas"]}
+
+@manipulador("reconstruir_banco_horas")
+def _reconstruir_banco_horas(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstrói o razão do banco de horas (parâmetro opcional: servidor_id)."""
+    from app.services.banco_horas_service import BancoHorasService
+    return {"lancamentos": BancoHorasService(db).reconstruir(parametros.get("servidor_id"))}
+
+@manipulador("criar_particoes_batidas")
+def _criar_particoes_batidas(db: Session, parametros: Dict[str, Any]) -> Dict[str, Any]:
+    """Cria as partições mensais futuras das batidas e reagenda a própria tarefa."""
+    from app.services.particoes_batidas import garantir_particoes
+    criadas = garantir_particoes(db)
+    agendar_criacao_particoes(db, settings.PARTICOES_INTERVALO_HORAS * 3600)
+    return {"particoes_criadas": criadas}
+
+def agendar_criacao_particoes(db: Session, atraso_segundos: int = 0) -> Optional[TarefaProcessamento]:
+    """
+    Enfileira a tarefa periódica de criação de partições, se ainda não houver
+    uma pendente. Não faz commit.
+
+    Args:
+        db: Sessão do banco de dados
+        atraso_segundos: Adia a execução
+
+    Returns:
+        A tarefa criada, ou None se já havia uma pendente
+    """
+    pendente = db.query(TarefaProcessamento.id).filter(
+        TarefaProcessamento.tipo == "criar_particoes_batidas",
+        TarefaProcessamento.status == "pendente"
+    ).first()
+    if pendente is not None:
+        return None
+    return enfileirar_tarefa(db, "criar_particoes_batidas", atraso_segundos=atraso_segundos)
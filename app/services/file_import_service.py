@@ -1,13 +1,15 @@
 # app/services/file_import_service.py
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 import io
 from typing import Dict, Any, List
 
 # Corrigido: nome da classe no singular
 from app.models.batida import BatidaOriginal
 from app.models.servidor import Servidor  # Também ajustado para singular, assumindo que está assim no modelo
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.services.resumo_diario_service import ResumoDiarioService
 
 class ImportadorArquivoPonto:
     """Serviço para importação de arquivos de batidas de ponto"""
@@ -52,6 +54,16 @@ class ImportadorArquivoPonto:
         # Adiciona todas as batidas de uma vez (mais eficiente)
         if batidas:
             self.db.add_all(batidas)
+            ResumoDiarioService(self.db).invalidar_batidas(
+                (batida.servidor_id, batida.data_hora) for batida in batidas
+            )
+            # Atualiza os percentis de pontualidade dos dias recebidos (e da véspera,
+            # cujo turno pode terminar nas batidas do arquivo)
+            datas = [batida.data_hora.date() for batida in batidas]
+            enfileirar_tarefa(self.db, "atualizar_pontualidade", {
+                "data_inicio": (min(datas) - timedelta(days=1)).isoformat(),
+                "data_fim": max(datas).isoformat(),
+            })
             self.db.commit()
             
         return resultado
@@ -0,0 +1,226 @@
+# app/services/horario_resolver.py
+from bisect import bisect_right
+from datetime import date, time
+from heapq import heappush, heappop
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.horario import HorarioPadrao, AlteracaoHorario, AlteracaoHorarioServidor, AlteracaoHorarioSecretaria
+from app.models.servidor import Servidor
+from app.services.ponto_processor import HorarioTrabalho
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Prioridade das alterações: as do servidor prevalecem sobre as da secretaria
+PRIORIDADE_SECRETARIA = 0
+PRIORIDADE_SERVIDOR = 1
+
+class IndiceIntervalos:
+    """
+    Índice estático de intervalos de datas com prioridade.
+
+    Os intervalos (que podem se sobrepor) são achatados uma única vez, por
+    varredura, em segmentos disjuntos ordenados, cada um associado ao valor
+    de maior prioridade que o cobre. A consulta "qual valor vale na data d"
+    é então uma busca binária: O(log n), sem alocações.
+    """
+
+    __slots__ = ("_inicios", "_fins", "_valores")
+
+    def __init__(self, intervalos: Iterable[Tuple[date, date, Any, Any]]):
+        """
+        Args:
+            intervalos: Tuplas (inicio, fim, prioridade, valor), com inicio e fim inclusivos
+        """
+        self._inicios: List[int] = []
+        self._fins: List[int] = []
+        self._valores: List[Any] = []
+
+        itens = sorted(
+            (inicio.toordinal(), fim.toordinal(), prioridade, valor)
+            for inicio, fim, prioridade, valor in intervalos
+            if inicio <= fim
+        )
+        if not itens:
+            return
+
+        pontos = sorted({i[0] for i in itens} | {i[1] + 1 for i in itens})
+        ativos: List[Tuple] = []  # heap de (-prioridade, posição, fim)
+        proximo = 0
+
+        for atual, seguinte in zip(pontos, pontos[1:]):
+            while proximo < len(itens) and itens[proximo][0] <= atual:
+                _, fim, prioridade, _ = itens[proximo]
+                heappush(ativos, (_negar(prioridade), proximo, fim))
+                proximo += 1
+            while ativos and ativos[0][2] < atual:
+                heappop(ativos)
+            if not ativos:
+                continue
+
+            valor = itens[ativos[0][1]][3]
+            if self._fins and self._fins[-1] == atual - 1 and self._valores[-1] is valor:
+                # Segmento contíguo com o mesmo vencedor: estende o anterior
+                self._fins[-1] = seguinte - 1
+            else:
+                self._inicios.append(atual)
+                self._fins.append(seguinte - 1)
+                self._valores.append(valor)
+
+    def buscar(self, data: date) -> Optional[Any]:
+        """
+        Retorna o valor de maior prioridade vigente na data, ou None.
+        """
+        ordinal = data.toordinal()
+        i = bisect_right(self._inicios, ordinal) - 1
+        if i >= 0 and ordinal <= self._fins[i]:
+            return self._valores[i]
+        return None
+
+    def __len__(self) -> int:
+        return len(self._inicios)
+
+def _negar(prioridade):
+    """Inverte a prioridade (tupla ou número) para uso no heap de mínimo."""
+    if isinstance(prioridade, tuple):
+        return tuple(-p for p in prioridade)
+    return -prioridade
+
+def _periodos(entrada_1: Optional[time], saida_1: Optional[time],
+              entrada_2: Optional[time], saida_2: Optional[time]) -> List[Tuple[time, time]]:
+    """Monta a lista de períodos de trabalho a partir das colunas de horário."""
+    periodos = []
+    if entrada_1 is not None and saida_1 is not None:
+        periodos.append((entrada_1, saida_1))
+    if entrada_2 is not None and saida_2 is not None:
+        periodos.append((entrada_2, saida_2))
+    return periodos
+
+class ResolvedorHorarios:
+    """
+    Resolve o horário esperado de cada (servidor, data) sem consultas ao banco.
+
+    Carrega em lote os horários padrão e as alterações de horário (por servidor
+    e por secretaria) e monta, por servidor, um IndiceIntervalos das alterações.
+    A precedência é: alteração do servidor > alteração da secretaria > horário
+    padrão do dia da semana; entre alterações do mesmo nível vale a mais recente.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._padrao: Dict[int, Dict[int, HorarioTrabalho]] = {}
+        self._alteracoes: Dict[int, IndiceIntervalos] = {}
+
+    def carregar(self, servidor_ids: Iterable[int], periodo_inicio: date, periodo_fim: date) -> "ResolvedorHorarios":
+        """
+        Carrega os horários dos servidores informados para o período.
+
+        Args:
+            servidor_ids: IDs dos servidores
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+
+        Returns:
+            O próprio resolvedor, para encadeamento
+        """
+        servidor_ids = list(set(servidor_ids))
+        if not servidor_ids:
+            return self
+
+        secretaria_por_servidor = dict(
+            self.db.query(Servidor.id, Servidor.secretaria_id).filter(Servidor.id.in_(servidor_ids)).all()
+        )
+
+        # Horários padrão por dia da semana
+        for horario in self.db.query(HorarioPadrao).filter(HorarioPadrao.servidor_id.in_(servidor_ids)):
+            self._padrao.setdefault(horario.servidor_id, {})[horario.dia_semana] = HorarioTrabalho(
+                _periodos(horario.entrada_1, horario.saida_1, horario.entrada_2, horario.saida_2),
+                origem=f"padrao:{horario.id}:{horario.updated_at}"
+            )
+
+        sobrepoe_periodo = and_(
+            AlteracaoHorario.ativo == True,
+            AlteracaoHorario.data_inicio <= periodo_fim,
+            AlteracaoHorario.data_fim >= periodo_inicio
+        )
+
+        # Uma instância de HorarioTrabalho por alteração, compartilhada entre servidores
+        horarios_alteracao: Dict[int, HorarioTrabalho] = {}
+
+        def horario_da_alteracao(alteracao: AlteracaoHorario) -> HorarioTrabalho:
+            if alteracao.id not in horarios_alteracao:
+                horarios_alteracao[alteracao.id] = HorarioTrabalho(
+                    _periodos(alteracao.entrada_1, alteracao.saida_1, alteracao.entrada_2, alteracao.saida_2),
+                    origem=f"alteracao:{alteracao.id}:{alteracao.updated_at}"
+                )
+            return horarios_alteracao[alteracao.id]
+
+        intervalos: Dict[int, List[Tuple[date, date, Tuple[int, int], HorarioTrabalho]]] = {}
+
+        alteracoes_servidor = self.db.query(AlteracaoHorarioServidor.servidor_id, AlteracaoHorario).join(
+            AlteracaoHorario, AlteracaoHorario.id == AlteracaoHorarioServidor.alteracao_id
+        ).filter(AlteracaoHorarioServidor.servidor_id.in_(servidor_ids), sobrepoe_periodo)
+        for servidor_id, alteracao in alteracoes_servidor:
+            intervalos.setdefault(servidor_id, []).append((
+                alteracao.data_inicio, alteracao.data_fim,
+                (PRIORIDADE_SERVIDOR, alteracao.id), horario_da_alteracao(alteracao)
+            ))
+
+        secretaria_ids = {s for s in secretaria_por_servidor.values() if s is not None}
+        if secretaria_ids:
+            servidores_por_secretaria: Dict[int, List[int]] = {}
+            for servidor_id, secretaria_id in secretaria_por_servidor.items():
+                servidores_por_secretaria.setdefault(secretaria_id, []).append(servidor_id)
+
+            alteracoes_secretaria = self.db.query(AlteracaoHorarioSecretaria.secretaria_id, AlteracaoHorario).join(
+                AlteracaoHorario, AlteracaoHorario.id == AlteracaoHorarioSecretaria.alteracao_id
+            ).filter(AlteracaoHorarioSecretaria.secretaria_id.in_(secretaria_ids), sobrepoe_periodo)
+            for secretaria_id, alteracao in alteracoes_secretaria:
+                horario = horario_da_alteracao(alteracao)
+                for servidor_id in servidores_por_secretaria.get(secretaria_id, []):
+                    intervalos.setdefault(servidor_id, []).append((
+                        alteracao.data_inicio, alteracao.data_fim,
+                        (PRIORIDADE_SECRETARIA, alteracao.id), horario
+                    ))
+
+        for servidor_id, lista in intervalos.items():
+            self._alteracoes[servidor_id] = IndiceIntervalos(lista)
+
+        logger.debug(
+            f"Horários carregados: {len(self._padrao)} servidor(es) com horário padrão, "
+            f"{len(self._alteracoes)} com alterações"
+        )
+        return self
+
+    def resolver(self, servidor_id: int, data: date) -> Optional[HorarioTrabalho]:
+        """
+        Retorna o horário esperado do servidor na data.
+
+        Args:
+            servidor_id: ID do servidor
+            data: Data de referência
+
+        Returns:
+            HorarioTrabalho vigente. Se o servidor tem horário padrão, mas não
+            para aquele dia da semana, retorna um horário sem períodos (folga).
+            None se não há nenhum horário cadastrado (usa a jornada padrão).
+        """
+        indice = self._alteracoes.get(servidor_id)
+        if indice is not None:
+            horario = indice.buscar(data)
+            if horario is not None:
+                return horario
+
+        padrao = self._padrao.get(servidor_id)
+        if padrao is None:
+            return None
+
+        # date.weekday() usa 0=segunda; horarios_padrao usa 0=domingo (EXTRACT(DOW))
+        return padrao.get((data.weekday() + 1) % 7, FOLGA)
+
+# Horário sem períodos de trabalho (dia sem jornada prevista)
+FOLGA = HorarioTrabalho([], origem="folga")
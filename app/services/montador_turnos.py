@@ -0,0 +1,104 @@
+# app/services/montador_turnos.py
+"""
+Montagem de turnos a partir da sequência de batidas de um servidor.
+
+Em vez de agrupar as batidas pela data do calendário (o que divide em dois
+dias o plantão noturno), a sequência ordenada é percorrida uma única vez e um
+novo turno começa sempre que a distância para a batida anterior ultrapassa o
+intervalo de corte do horário previsto. O turno pertence à data da sua
+primeira batida e suas batidas ficam em minutos a partir da meia-noite dessa
+data (valores acima de 1440 são do dia seguinte), prontos para a calculadora.
+"""
+from array import array
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+class Turno:
+    """Batidas de um turno, como datetime e em minutos a partir da data do turno."""
+
+    __slots__ = ("data", "horarios", "minutos")
+
+    def __init__(self, data: date):
+        self.data = data
+        self.horarios: List[datetime] = []
+        self.minutos = array("i")
+
+class TurnosMontados:
+    """Turnos do período por data de início, com o fim das caudas de turnos que atravessam a meia-noite."""
+
+    __slots__ = ("turnos", "caudas")
+
+    def __init__(self):
+        self.turnos: Dict[date, Turno] = {}
+        # Última batida, em cada data, que pertence a um turno iniciado em data anterior
+        self.caudas: Dict[date, datetime] = {}
+
+    def get(self, data: date) -> Optional[Turno]:
+        return self.turnos.get(data)
+
+def intervalo_corte(horario, padrao: Optional[int] = None) -> int:
+    """
+    Intervalo, em minutos, a partir do qual duas batidas consecutivas
+    pertencem a turnos diferentes.
+
+    Com horário previsto, é o ponto médio entre o maior período de trabalho
+    (a maior pausa esperada dentro do turno, se faltar a batida do intervalo)
+    e o descanso entre o fim de um turno e o início do seguinte, nunca menor
+    que o intervalo previsto entre os períodos mais uma margem. Sem horário
+    (ou em dia de folga), usa o padrão configurado.
+
+    Args:
+        horario: HorarioTrabalho previsto para a data de início do turno, ou None
+        padrao: Corte padrão em minutos (default: TURNO_INTERVALO_CORTE_MINUTOS)
+    """
+    if padrao is None:
+        padrao = settings.TURNO_INTERVALO_CORTE_MINUTOS
+    if horario is None or not horario.minutos:
+        return padrao
+
+    minutos = horario.minutos
+    maior_periodo = max(minutos[i + 1] - minutos[i] for i in range(0, len(minutos) - 1, 2))
+    descanso = 1440 - (minutos[-1] - minutos[0])
+    minimo = max(settings.TURNO_INTERVALO_CORTE_MINIMO, (horario.intervalo_minutos or 0) + 60)
+    return max((maior_periodo + descanso) // 2, minimo)
+
+def montar_turnos(horarios: Iterable[datetime], corte_para: Callable[[date], int]) -> TurnosMontados:
+    """
+    Monta os turnos de uma sequência de batidas em uma única passada.
+
+    Args:
+        horarios: Batidas de um servidor, em ordem cronológica
+        corte_para: Função que retorna o intervalo de corte (minutos) para a data de início do turno
+
+    Returns:
+        Turnos indexados pela data de início. Vários turnos iniciados na mesma
+        data (ex.: jornada partida com longa pausa) são reunidos no mesmo dia.
+    """
+    resultado = TurnosMontados()
+    turnos = resultado.turnos
+    caudas = resultado.caudas
+
+    turno: Optional[Turno] = None
+    base = None  # datetime da meia-noite da data do turno atual
+    corte = 0
+    anterior: Optional[datetime] = None
+
+    for horario in horarios:
+        if anterior is None or (horario - anterior).total_seconds() > corte * 60:
+            data = horario.date()
+            turno = turnos.get(data)
+            if turno is None:
+                turno = turnos[data] = Turno(data)
+            base = datetime.combine(data, datetime.min.time())
+            corte = corte_para(data)
+        elif horario.date() != turno.data:
+            # Batida após a meia-noite que continua o turno do dia anterior
+            caudas[horario.date()] = horario
+
+        turno.horarios.append(horario)
+        turno.minutos.append(int((horario - base).total_seconds()) // 60)
+        anterior = horario
+
+    return resultado
@@ -0,0 +1,124 @@
+# app/services/pareamento_batidas.py
+"""
+Pareamento das batidas de um dia em pares entrada/saída.
+
+Uma única passada sobre os minutos inteiros (já ordenados) descarta as
+batidas repetidas e, quando sobra uma quantidade ímpar, aplica a
+estratégia configurada: ignorar a última batida (comportamento original),
+completar a batida faltante pelo horário previsto ou sinalizar o dia para
+revisão. O pareador é compilado uma vez por (regras, horário), como as
+demais etapas de app.services.regras_calculo.
+"""
+from array import array
+from typing import Callable, Iterable, List, Optional
+
+from app.schemas.regras_calculo import PareamentoConfig
+
+class ResultadoPareamento:
+    """Batidas pareadas (quantidade par) e o que foi descartado, inferido ou sinalizado."""
+
+    __slots__ = ("minutos", "descartadas", "inferidas", "inconsistente")
+
+    def __init__(self, minutos: array, descartadas: int = 0, inferidas: int = 0, inconsistente: bool = False):
+        self.minutos = minutos
+        self.descartadas = descartadas
+        self.inferidas = inferidas
+        self.inconsistente = inconsistente
+
+Pareador = Callable[[array], ResultadoPareamento]
+
+def pareamento_legado(config: PareamentoConfig) -> bool:
+    """Configuração equivalente ao cálculo original (as etapas já ignoram a última batida ímpar)."""
+    return config.janela_duplicada_minutos == 0 and config.estrategia_impar == "ignorar"
+
+def _lacuna_unica(minutos: array, esperado: array) -> int:
+    """
+    Alinha as batidas às batidas previstas (ambas em ordem) em uma passada:
+    cada batida ocupa a posição prevista mais próxima a partir da atual.
+    Retorna o índice previsto da única posição sem batida, ou -1 se não
+    houver exatamente uma.
+    """
+    if len(esperado) != len(minutos) + 1:
+        return -1
+    lacuna = -1
+    j = 0
+    for minuto in minutos:
+        while j + 1 < len(esperado) and abs(esperado[j + 1] - minuto) < abs(esperado[j] - minuto):
+            if lacuna >= 0:
+                return -1
+            lacuna = j
+            j += 1
+        j += 1
+    if lacuna < 0:
+        # Todas as batidas ocuparam as primeiras posições: falta a última prevista
+        lacuna = len(esperado) - 1
+    return lacuna
+
+def criar_pareador(config: PareamentoConfig, esperado: Optional[array] = None) -> Optional[Pareador]:
+    """
+    Compila o pareador para a configuração e o horário previsto.
+
+    Args:
+        config: Configuração de pareamento das regras
+        esperado: Batidas previstas do horário, em minutos (None sem horário)
+
+    Returns:
+        Função que pareia os minutos de um dia, ou None na configuração legada
+    """
+    if pareamento_legado(config):
+        return None
+
+    janela = config.janela_duplicada_minutos
+    estrategia = config.estrategia_impar
+    completar = estrategia == "horario" and bool(esperado)
+
+    def parear(minutos: array) -> ResultadoPareamento:
+        if janela:
+            mantidas = array("i")
+            anterior = None
+            for minuto in minutos:
+                if anterior is not None and minuto - anterior < janela:
+                    continue
+                mantidas.append(minuto)
+                anterior = minuto
+            descartadas = len(minutos) - len(mantidas)
+        else:
+            mantidas = minutos
+            descartadas = 0
+
+        if len(mantidas) % 2 == 0:
+            return ResultadoPareamento(mantidas, descartadas)
+
+        if completar:
+            lacuna = _lacuna_unica(mantidas, esperado)
+            if lacuna >= 0:
+                completas = array("i", mantidas)
+                # Insere a batida prevista na posição que mantém a ordem
+                posicao = 0
+                while posicao < len(completas) and completas[posicao] <= esperado[lacuna]:
+                    posicao += 1
+                completas.insert(posicao, esperado[lacuna])
+                return ResultadoPareamento(completas, descartadas, inferidas=1)
+
+        # Ignora a última batida; sinaliza, exceto na estratégia "ignorar"
+        return ResultadoPareamento(mantidas[:-1], descartadas + 1, inconsistente=estrategia != "ignorar")
+
+    return parear
+
+def parear_lote(pareador: Optional[Pareador], dias: Iterable[array]) -> List[ResultadoPareamento]:
+    """
+    Pareia vários dias com o mesmo pareador (ex.: um mês de um servidor).
+
+    Args:
+        pareador: Pareador compilado (None = configuração legada)
+        dias: Minutos de cada dia
+
+    Returns:
+        Resultado de cada dia, na mesma ordem
+    """
+    if pareador is None:
+        return [
+            ResultadoPareamento(m if len(m) % 2 == 0 else m[:-1], len(m) % 2)
+            for m in dias
+        ]
+    return [pareador(m) for m in dias]
@@ -0,0 +1,155 @@
+# app/services/particoes_batidas.py
+"""
+Partições mensais de batidas_originais e batidas_processadas.
+
+As duas tabelas são particionadas por intervalo de data_hora, com uma
+partição por mês (ex.: ponto.batidas_originais_p2025_03) e uma partição
+padrão para as batidas de meses sem partição. Consultas de um período com
+limites constantes em data_hora leem apenas as partições do período (uma ou
+duas para um mês com a véspera e o dia seguinte). Os índices criados na
+tabela particionada, como (servidor_id, data_hora), são replicados em cada
+partição pelo PostgreSQL.
+
+garantir_particoes é executada na inicialização da API e periodicamente
+pela tarefa "criar_particoes_batidas". Bancos criados antes do
+particionamento são convertidos uma única vez pelo script
+app/db/scripts/particionar_batidas.sql.
+"""
+from datetime import date, timedelta
+from typing import List, Optional, Set
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+TABELAS_PARTICIONADAS = ("batidas_originais", "batidas_processadas")
+
+def _proximo_mes(mes: date) -> date:
+    return (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def nome_particao(tabela: str, mes: date) -> str:
+    """Nome da partição mensal de uma tabela (ex.: batidas_originais_p2025_03)."""
+    return f"{tabela}_p{mes.year:04d}_{mes.month:02d}"
+
+def _particionada(db: Session, tabela: str) -> bool:
+    return db.execute(text("""
+        SELECT 1
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'ponto' AND c.relname = :tabela
+    """), {"tabela": tabela}).first() is not None
+
+def _particoes_existentes(db: Session, tabela: str) -> Set[str]:
+    return {
+        nome for (nome,) in db.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            JOIN pg_namespace n ON n.oid = p.relnamespace
+            WHERE n.nspname = 'ponto' AND p.relname = :tabela
+        """), {"tabela": tabela})
+    }
+
+def _meses_na_padrao(db: Session, padrao: str) -> Set[date]:
+    return {
+        inicio.date() for (inicio,) in db.execute(text(
+            f"SELECT DISTINCT date_trunc('month', data_hora) FROM ponto.{padrao}"
+        ))
+    }
+
+def _criar_particao(db: Session, tabela: str, padrao: str, nome: str, inicio: date, fim: date):
+    """
+    Cria a partição do mês movendo para ela as linhas do mês que estejam na
+    partição padrão (o PostgreSQL recusa a nova partição enquanto a padrão
+    tiver linhas do intervalo). A partição padrão deve estar bloqueada contra
+    inserções (ver garantir_particoes).
+    """
+    db.execute(text(
+        f"CREATE TABLE ponto.{nome} (LIKE ponto.{tabela} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    db.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM ponto.{padrao}
+            WHERE data_hora >= :inicio AND data_hora < :fim
+            RETURNING *
+        )
+        INSERT INTO ponto.{nome} SELECT * FROM movidas
+    """), {"inicio": inicio, "fim": fim})
+    db.execute(text(
+        f"ALTER TABLE ponto.{tabela} ATTACH PARTITION ponto.{nome} "
+        f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+    ))
+
+def garantir_particoes(db: Session, referencia: Optional[date] = None,
+                       meses_a_frente: Optional[int] = None) -> List[str]:
+    """
+    Cria as partições que faltam: a padrão, a do mês de referência e as dos
+    meses seguintes, além das dos meses que já tenham linhas na partição padrão
+    (ex.: importação de um mês antigo), que são movidas para elas.
+
+    Args:
+        db: Sessão do banco de dados
+        referencia: Mês de referência (hoje quando None)
+        meses_a_frente: Meses futuros a manter criados (PARTICOES_MESES_A_FRENTE quando None)
+
+    Returns:
+        Nomes das partições criadas
+    """
+    referencia = (referencia or date.today()).replace(day=1)
+    if meses_a_frente is None:
+        meses_a_frente = settings.PARTICOES_MESES_A_FRENTE
+
+    # Serializa a DDL entre a API e os workers
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('ponto.particoes_batidas'))"))
+
+    criadas: List[str] = []
+    for tabela in TABELAS_PARTICIONADAS:
+        if not _particionada(db, tabela):
+            logger.warning(f"Tabela ponto.{tabela} não é particionada; partições não criadas")
+            continue
+
+        existentes = _particoes_existentes(db, tabela)
+        padrao = f"{tabela}_padrao"
+        if padrao not in existentes:
+            db.execute(text(f"CREATE TABLE ponto.{padrao} PARTITION OF ponto.{tabela} DEFAULT"))
+            criadas.append(padrao)
+
+        futuros = set()
+        mes = referencia
+        for _ in range(meses_a_frente + 1):
+            futuros.add(mes)
+            mes = _proximo_mes(mes)
+
+        faltantes = {
+            mes for mes in futuros | _meses_na_padrao(db, padrao)
+            if nome_particao(tabela, mes) not in existentes
+        }
+        if not faltantes:
+            continue
+
+        # Uma batida inserida na partição padrão entre a movimentação das linhas e o
+        # ATTACH faria a criação falhar. SHARE ROW EXCLUSIVE bloqueia as inserções na
+        # padrão (importações, gatilhos, processamento) até o commit, sem bloquear as
+        # leituras nem as inserções que vão para partições mensais já existentes.
+        # Os meses com linhas na padrão são relidos com o bloqueio.
+        db.execute(text(f"LOCK TABLE ponto.{padrao} IN SHARE ROW EXCLUSIVE MODE"))
+        faltantes = {
+            mes for mes in futuros | _meses_na_padrao(db, padrao)
+            if nome_particao(tabela, mes) not in existentes
+        }
+        for mes in sorted(faltantes):
+            nome = nome_particao(tabela, mes)
+            _criar_particao(db, tabela, padrao, nome, mes, _proximo_mes(mes))
+            criadas.append(nome)
+
+    db.commit()
+    if criadas:
+        logger.info(f"Partições de batidas criadas: {', '.join(criadas)}")
+    return criadas
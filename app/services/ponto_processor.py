@@ -1,28 +1,67 @@
 # app/services/ponto_processor.py
+from array import array
+from contextlib import contextmanager
 from datetime import datetime, date, time, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional
+import hashlib
 import logging
 
+from sqlalchemy import Row, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from app.models.batida import BatidaOriginal, BatidaProcessada
 from app.models.servidor import Servidor
 from app.models.justificativa import Justificativa
+from app.models.feriado import Feriado
+from app.models.resumo_diario import ResumoDiario
 from app.schemas.batida import BatidaProcessamentoResult
+from app.schemas.regras_calculo import RegrasCalculo
+from app.services.banco_horas_service import BancoHorasService, calcular_delta_minutos
+from app.services.montador_turnos import Turno, TurnosMontados, intervalo_corte, montar_turnos
+from app.services.regras_calculo import ApuracaoDia, PipelineRegras, carregar_regras, compilar, regras_legadas
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 class HorarioTrabalho:
-    """Representa o horário de trabalho de um funcionário."""
+    """
+    Representa o horário de trabalho de um funcionário.
 
-    def __init__(self, periodos: List[Tuple[time, time]]):
+    Os períodos são mantidos também em minutos desde a meia-noite, em um
+    array('i') plano e crescente [inicio_1, fim_1, inicio_2, fim_2, ...]; jornada e
+    intervalo são calculados uma única vez, pois o mesmo horário é
+    compartilhado por muitos dias.
+    """
+
+    __slots__ = ("periodos", "origem", "minutos", "jornada_minutos", "intervalo_minutos", "_horas_regulares")
+
+    def __init__(self, periodos: List[Tuple[time, time]], origem: Optional[str] = None):
         """
         Inicializa HorarioTrabalho com uma lista de períodos de trabalho.
 
         Args:
             periodos (List[Tuple[time, time]]): Lista de tuplas de períodos de trabalho (início, fim).
+            origem (Optional[str]): Identificação do cadastro que gerou o horário (padrão/alteração).
         """
         self.periodos = periodos
+        self.origem = origem
+        self.minutos = array("i")
+        # Horários que atravessam a meia-noite (ex.: 22:00-06:00) continuam
+        # crescentes: cada valor menor que o anterior é do dia seguinte
+        deslocamento = 0
+        for inicio, fim in periodos:
+            for horario in (inicio, fim):
+                minuto = horario.hour * 60 + horario.minute + deslocamento
+                if self.minutos and minuto < self.minutos[-1]:
+                    deslocamento += 1440
+                    minuto += 1440
+                self.minutos.append(minuto)
+
+        minutos = self.minutos
+        self.jornada_minutos = sum(minutos[i + 1] - minutos[i] for i in range(0, len(minutos), 2))
+        # Intervalo previsto entre o primeiro e o segundo período (None se houver apenas um)
+        self.intervalo_minutos = minutos[2] - minutos[1] if len(minutos) >= 4 else None
+        self._horas_regulares = timedelta(minutes=self.jornada_minutos)
 
     def calcular_horas_regulares(self) -> timedelta:
         """
@@ -31,26 +70,27 @@ class HorarioTrabalho:
         Retorna:
             timedelta: Soma total das horas trabalhadas em todos os períodos.
         """
-        # Usa uma compreensão de lista para calcular a duração de cada período
-        # e soma todos os resultados usando a função sum()
-        return sum((self._time_to_timedelta(fim) - self._time_to_timedelta(inicio) 
-                    for inicio, fim in self.periodos), 
-                   start=timedelta())
+        return self._horas_regulares
 
-    def _time_to_timedelta(self, t: time) -> timedelta:
+    def calcular_intervalo_minutos(self) -> Optional[int]:
         """
-        Converte um objeto time para timedelta.
-
-        Args:
-            t (time): Objeto time para converter.
+        Calcula a duração prevista do intervalo entre os períodos de trabalho.
 
         Retorna:
-            timedelta: Objeto timedelta equivalente.
+            Optional[int]: Intervalo em minutos, ou None se houver apenas um período.
         """
-        return timedelta(hours=t.hour, minutes=t.minute)
+        return self.intervalo_minutos
 
 class RegistroPonto:
-    """Representa um registro de ponto."""
+    """
+    Representa um registro de ponto.
+
+    As batidas do dia ficam em um array('i') ordenado de minutos contados a
+    partir da meia-noite da data do registro (batidas do dia seguinte passam
+    de 1440). Os segundos são descartados, como no arquivo de importação.
+    """
+
+    __slots__ = ("data", "minutos")
 
     def __init__(self, data: date, horarios: List[datetime]):
         """
@@ -62,12 +102,40 @@ class RegistroPonto:
         """
         self.data = data
         # Ordena os horários para garantir que estejam em ordem cronológica
-        self.horarios = sorted(horarios)
+        self.minutos = array("i", sorted(
+            (h.date() - data).days * 1440 + h.hour * 60 + h.minute for h in horarios
+        ))
+
+    @classmethod
+    def de_minutos(cls, data: date, minutos: array) -> "RegistroPonto":
+        """
+        Cria um registro a partir de minutos já ordenados, sem conversões.
+
+        Args:
+            data (date): Data do registro.
+            minutos (array): Batidas em minutos desde a meia-noite da data, em ordem.
+        """
+        registro = cls.__new__(cls)
+        registro.data = data
+        registro.minutos = minutos
+        return registro
+
+    @property
+    def horarios(self) -> List[datetime]:
+        """Batidas como datetime (montadas sob demanda; o cálculo usa apenas os minutos)."""
+        inicio = datetime.combine(self.data, time.min)
+        return [inicio + timedelta(minutes=m) for m in self.minutos]
 
 class CalculadoraHorasExtras:
-    """Calcula as horas extras para um funcionário."""
+    """
+    Calcula as horas extras para um funcionário.
+
+    As regras (jornada, intervalo, tolerâncias, tetos, adicional noturno) vêm
+    de uma configuração RegrasCalculo, compilada uma única vez por horário.
+    """
 
-    def __init__(self, jornada_diaria: timedelta = timedelta(hours=8), intervalo_minimo: int = 0, feriados: List[date] = None):
+    def __init__(self, jornada_diaria: timedelta = timedelta(hours=8), intervalo_minimo: int = 0,
+                 feriados: List[date] = None, regras: Optional[RegrasCalculo] = None):
         """
         Inicializa CalculadoraHorasExtras.
 
@@ -75,129 +143,305 @@ class CalculadoraHorasExtras:
             jornada_diaria (timedelta): Jornada diária padrão (default: 8 horas)
             intervalo_minimo (int): Tempo mínimo de intervalo em minutos.
             feriados (List[date]): Lista de datas de feriados.
+            regras (Optional[RegrasCalculo]): Regras de apuração. Quando ausentes, usa a
+                jornada e o intervalo informados, sem tolerâncias nem adicional noturno.
         """
-        self.intervalo_minimo = intervalo_minimo
         self.feriados = feriados or []
-        self.jornada_diaria = jornada_diaria
+        # Pipelines compilados por conjunto de regras (a referência às regras mantém o id válido)
+        self._pipelines_por_regras: Dict[int, Tuple[RegrasCalculo, Dict[object, PipelineRegras]]] = {}
+        self.regras = regras or regras_legadas(int(jornada_diaria.total_seconds()) // 60, intervalo_minimo)
+
+    @property
+    def feriados(self) -> frozenset:
+        return self._feriados
+
+    @feriados.setter
+    def feriados(self, feriados):
+        # Conjunto: a verificação por dia é O(1)
+        self._feriados = frozenset(feriados)
+
+    @property
+    def regras(self) -> RegrasCalculo:
+        return self._regras
+
+    @regras.setter
+    def regras(self, regras: RegrasCalculo):
+        self._regras = regras
+        self._dias_descanso = frozenset(regras.dias_semana_descanso)
+        self._pipelines = self._pipelines_por_regras.setdefault(id(regras), (regras, {}))[1]
+
+    @property
+    def jornada_minutos(self) -> int:
+        return self._regras.jornada_padrao_minutos
+
+    @property
+    def jornada_diaria(self) -> timedelta:
+        return timedelta(minutes=self._regras.jornada_padrao_minutos)
+
+    @property
+    def intervalo_minimo(self) -> int:
+        return self._regras.intervalo_minimo_minutos
+
+    def _pipeline(self, horario: Optional[HorarioTrabalho]) -> PipelineRegras:
+        """Pipeline compilado para as regras atuais e o horário (compilado uma única vez)."""
+        if horario is None:
+            chave_horario = None
+        else:
+            chave_horario = horario.origem if horario.origem is not None else id(horario)
+        pipeline = self._pipelines.get(chave_horario)
+        if pipeline is None:
+            pipeline = self._pipelines[chave_horario] = compilar(self._regras, horario)
+        return pipeline
 
-    def calcular_horas_trabalhadas_e_extras(self, registro: RegistroPonto) -> Tuple[timedelta, timedelta, timedelta, bool]:
+    def apurar(self, registro: RegistroPonto, horario: Optional[HorarioTrabalho] = None) -> ApuracaoDia:
         """
-        Calcula as horas trabalhadas e extras para um registro de ponto.
-        
+        Apura um dia segundo as regras: minutos trabalhados, extras, faltantes,
+        extras acima do teto e minutos noturnos.
+
         Args:
             registro (RegistroPonto): Registro de ponto do dia.
-            
+            horario (Optional[HorarioTrabalho]): Horário previsto do dia.
+
         Returns:
-            Tuple[timedelta, timedelta, timedelta, bool]: 
-                - Horas trabalhadas
-                - Horas extras
-                - Horas faltantes
-                - Indicador se é dia especial (feriado/fim de semana)
+            ApuracaoDia: Resultado em minutos.
         """
-        horas_trabalhadas = self._calcular_horas_trabalhadas(registro)
-        is_dia_especial = self._is_dia_especial(registro.data)
-    
-        if is_dia_especial:
-            return horas_trabalhadas, horas_trabalhadas, timedelta(), True
-        
-        diferenca = horas_trabalhadas - self.jornada_diaria
-        horas_extras = max(diferenca, timedelta())
-        horas_faltantes = max(-diferenca, timedelta())
-        
-        return horas_trabalhadas, horas_extras, horas_faltantes, False
+        pipeline = self._pipeline(horario)
+        if len(registro.minutos) % 2 != 0 and not pipeline.pareia:
+            logger.warning(f"Número ímpar de batidas para a data {registro.data}. Ignorando a última batida.")
+        return pipeline.apurar(registro.minutos, self._is_dia_especial(registro.data, horario))
 
-    def _is_dia_especial(self, data: date) -> bool:
+    def apurar_lote(self, dias: Iterable[Tuple[RegistroPonto, Optional[HorarioTrabalho]]]) -> List[ApuracaoDia]:
         """
-        Verifica se a data fornecida é um dia especial (fim de semana ou feriado).
+        Apura vários dias de uma vez (ex.: o mês de um servidor), sem registrar
+        aviso por dia; o pareamento das batidas segue as regras.
 
         Args:
-            data (date): Data a ser verificada.
+            dias: Pares (registro, horário previsto)
 
-        Retorna:
-            bool: True se for fim de semana ou feriado, False caso contrário.
+        Returns:
+            List[ApuracaoDia]: Apuração de cada dia, na mesma ordem.
         """
-        # Considera sábado (5) e domingo (6) como dias especiais
-        return data.weekday() >= 5 or data in self.feriados
+        return [
+            self._pipeline(horario).apurar(registro.minutos, self._is_dia_especial(registro.data, horario))
+            for registro, horario in dias
+        ]
 
-    def _calcular_horas_trabalhadas(self, registro: RegistroPonto) -> timedelta:
+    def calcular_minutos(self, registro: RegistroPonto,
+                         horario: Optional[HorarioTrabalho] = None) -> Tuple[int, int, int, bool]:
         """
-        Calcula o total de horas trabalhadas para um dado registro de ponto.
+        Calcula, em minutos inteiros, as horas trabalhadas, extras e faltantes.
 
         Args:
             registro (RegistroPonto): Registro de ponto do dia.
+            horario (Optional[HorarioTrabalho]): Horário previsto do dia. Quando ausente,
+                usa a jornada diária e o intervalo mínimo padrão da calculadora.
 
-        Retorna:
-            timedelta: Total de horas trabalhadas.
+        Returns:
+            Tuple[int, int, int, bool]: Minutos trabalhados, extras e faltantes e o
+                indicador de dia especial (feriado, folga ou fim de semana).
         """
-        horas_trabalhadas = timedelta()
-        
-        # Verifica se há um número par de batidas (entrada/saída)
-        if len(registro.horarios) % 2 != 0:
+        is_dia_especial = self._is_dia_especial(registro.data, horario)
+        pipeline = self._pipeline(horario)
+        if len(registro.minutos) % 2 != 0 and not pipeline.pareia:
             logger.warning(f"Número ímpar de batidas para a data {registro.data}. Ignorando a última batida.")
-            horarios = registro.horarios[:-1]  # Remove a última batida
-        else:
-            horarios = registro.horarios
-        
-        # Itera sobre os pares de entrada/saída
-        for i in range(0, len(horarios), 2):
-            if i + 1 < len(horarios):  # Garante que há um par completo
-                entrada, saida = horarios[i], horarios[i + 1]
-                periodo_trabalhado = saida - entrada
-                horas_trabalhadas += periodo_trabalhado
+        apuracao = pipeline.apurar(registro.minutos, is_dia_especial)
+        return apuracao.trabalhados, apuracao.extras, apuracao.faltantes, is_dia_especial
 
-        # Ajusta as horas trabalhadas considerando o intervalo mínimo
-        ajuste = self._ajustar_intervalos(registro)
-        horas_trabalhadas -= ajuste
-
-        return horas_trabalhadas
-
-    def _ajustar_intervalos(self, registro: RegistroPonto) -> timedelta:
+    def calcular_horas_trabalhadas_e_extras(self, registro: RegistroPonto,
+                                            horario: Optional[HorarioTrabalho] = None) -> Tuple[timedelta, timedelta, timedelta, bool]:
         """
-        Ajusta as horas trabalhadas com base no requisito de intervalo mínimo.
-
+        Calcula as horas trabalhadas e extras para um registro de ponto.
+        
         Args:
             registro (RegistroPonto): Registro de ponto do dia.
+            horario (Optional[HorarioTrabalho]): Horário previsto do dia. Quando ausente,
+                usa a jornada diária e o intervalo mínimo padrão da calculadora.
+            
+        Returns:
+            Tuple[timedelta, timedelta, timedelta, bool]: 
+                - Horas trabalhadas
+                - Horas extras
+                - Horas faltantes
+                - Indicador se é dia especial (feriado/fim de semana)
+        """
+        trabalhados, extras, faltantes, is_dia_especial = self.calcular_minutos(registro, horario)
+        return (timedelta(minutes=trabalhados), timedelta(minutes=extras),
+                timedelta(minutes=faltantes), is_dia_especial)
 
-        Retorna:
-            timedelta: Tempo total a ser deduzido das horas trabalhadas.
+    def _is_dia_especial(self, data: date, horario: Optional[HorarioTrabalho] = None) -> bool:
         """
-        if self.intervalo_minimo == 0:
-            return timedelta()
-    
-        ajuste_total = timedelta()
-        
-        # Verifica se há um número par de batidas
-        if len(registro.horarios) % 2 != 0:
-            horarios = registro.horarios[:-1]  # Remove a última batida
-        else:
-            horarios = registro.horarios
-            
-        # Verifica cada intervalo entre períodos de trabalho
-        for i in range(1, len(horarios) // 2):
-            intervalo = horarios[i*2] - horarios[i*2 - 1]
-            
-            # Se o intervalo for menor que o mínimo, calcula a diferença
-            if intervalo < timedelta(minutes=self.intervalo_minimo):
-                diferenca_intervalo = timedelta(minutes=self.intervalo_minimo) - intervalo
-                ajuste_total += diferenca_intervalo
+        Verifica se a data fornecida é um dia especial (fim de semana, folga ou feriado).
 
-        return ajuste_total
+        Args:
+            data (date): Data a ser verificada.
+            horario (Optional[HorarioTrabalho]): Horário previsto do dia, se cadastrado.
+
+        Retorna:
+            bool: True se for feriado ou dia sem jornada prevista, False caso contrário.
+        """
+        if data in self._feriados:
+            return True
+        if horario is not None:
+            # Com horário cadastrado, é especial o dia sem jornada prevista
+            return not horario.minutos
+        # Sem horário cadastrado, usa os dias de descanso das regras (padrão: sábado e domingo)
+        return data.weekday() in self._dias_descanso
+
+def impressao_entradas(horarios: List[datetime], cauda: Optional[datetime], justificativas: List[Row],
+                       feriado: bool, horario: Optional[HorarioTrabalho], versao_regras: str) -> str:
+    """
+    Impressão digital de tudo o que determina o resultado de um dia: batidas do
+    turno (e a cauda do turno da véspera), justificativas da data, feriado,
+    versão do horário previsto e versão das regras de cálculo.
+
+    Returns:
+        str: Hash hexadecimal de 32 caracteres.
+    """
+    partes = [
+        ",".join(h.isoformat() for h in horarios),
+        cauda.isoformat() if cauda is not None else "",
+        ",".join(f"{j.id}:{j.status}:{j.updated_at}" for j in justificativas),
+        "F" if feriado else "",
+        "sem_horario" if horario is None else str(horario.origem if horario.origem is not None else list(horario.minutos)),
+        versao_regras,
+    ]
+    return hashlib.blake2b("|".join(partes).encode("utf-8"), digest_size=16).hexdigest()
+
+def versao_regras(regras: RegrasCalculo) -> str:
+    """Hash curto de um conjunto de regras de cálculo, usado na impressão das entradas."""
+    return hashlib.blake2b(regras.model_dump_json().encode("utf-8"), digest_size=8).hexdigest()
+
+def classificar_dia(tem_batidas: bool, is_dia_especial: bool, justificativa,
+                    minutos_faltantes: int, inconsistente: bool = False) -> Tuple[str, str, Optional[int]]:
+    """
+    Determina o status e a observação de um dia apurado.
+
+    Args:
+        tem_batidas (bool): Se o dia tem batidas.
+        is_dia_especial (bool): Fim de semana, folga ou feriado.
+        justificativa: Justificativa aprovada da data (com id, tipo e descricao), ou None.
+        minutos_faltantes (int): Minutos faltantes apurados.
+        inconsistente (bool): Pareamento das batidas sinalizado para revisão.
+
+    Returns:
+        Tuple[str, str, Optional[int]]: Status, observação e ID da justificativa considerada.
+    """
+    if not tem_batidas:
+        if is_dia_especial:
+            # Fim de semana, folga ou feriado sem batidas é considerado regular
+            return "regular", "Fim de semana, folga ou feriado", None
+        if justificativa:
+            # Dia com justificativa é considerado justificado
+            return "justificada", f"Justificativa: {justificativa.tipo} - {justificativa.descricao}", justificativa.id
+        # Dia útil sem batidas e sem justificativa é considerado irregular
+        return "irregular", "Falta não justificada", None
+
+    justificativa_id = justificativa.id if justificativa else None
+    if is_dia_especial:
+        return "regular", "Trabalho em fim de semana, folga ou feriado", justificativa_id
+    if justificativa and minutos_faltantes > 0:
+        return "justificada", f"Justificativa: {justificativa.tipo} - {justificativa.descricao}", justificativa_id
+    if minutos_faltantes > 0:
+        return "irregular", "Horas faltantes sem justificativa", justificativa_id
+    if inconsistente and not justificativa:
+        return "irregular", "Batidas sem par: revisar as marcações do dia", justificativa_id
+    return "regular", "Jornada regular", justificativa_id
+
+def faixa_batidas_processadas(data: date, horarios: List[datetime],
+                              cauda: Optional[datetime] = None) -> Tuple[datetime, Optional[datetime], datetime]:
+    """
+    Faixa de batidas processadas substituída ao regravar o turno de uma data:
+    da meia-noite (ou após a cauda do turno da véspera) até o fim do dia ou a
+    última batida do turno, se ele atravessar a meia-noite.
+
+    Args:
+        data (date): Data do turno.
+        horarios (List[datetime]): Batidas do turno, em ordem.
+        cauda (Optional[datetime]): Última batida da data que pertence ao turno da
+            véspera; as batidas até ela são mantidas.
+
+    Returns:
+        Tuple[datetime, Optional[datetime], datetime]: Meia-noite, cauda e fim; a faixa
+        são as batidas com meia-noite <= data_hora <= fim e data_hora > cauda.
+    """
+    fim = datetime.combine(data, time.max)
+    if horarios and horarios[-1] > fim:
+        fim = horarios[-1]
+    return datetime.combine(data, time.min), cauda, fim
+
+def linhas_batidas_processadas(servidor_id: int, horarios: List[datetime], status: str,
+                               justificativa_id: Optional[int],
+                               ids_originais: Dict[datetime, List[int]]) -> List[dict]:
+    """
+    Linhas das batidas processadas de um turno, cada uma ligada à sua batida
+    original. A varredura de batidas novas (BatidaProcessorService) considera
+    processada a original com uma batida processada de mesmo id e horário;
+    sem o vínculo, todo dia reprocessado voltaria a ser varrido e duplicado.
+
+    Args:
+        servidor_id (int): ID do servidor.
+        horarios (List[datetime]): Batidas do turno, em ordem.
+        status (str): Status do dia.
+        justificativa_id (Optional[int]): ID da justificativa considerada, se houver.
+        ids_originais (Dict[datetime, List[int]]): IDs das batidas originais do servidor
+            por horário (mais de um quando há batidas repetidas no mesmo instante).
+
+    Returns:
+        List[dict]: Valores de cada batida processada.
+    """
+    usados: Dict[datetime, int] = {}
+    linhas = []
+    for i, horario in enumerate(horarios):
+        ids = ids_originais.get(horario, ())
+        indice = usados.get(horario, 0)
+        usados[horario] = indice + 1
+        linhas.append({
+            "batida_original_id": ids[indice] if indice < len(ids) else None,
+            "servidor_id": servidor_id,
+            "data_hora": horario,
+            "tipo": "entrada" if i % 2 == 0 else "saida",
+            "status": status,
+            "justificativa_id": justificativa_id,
+            "processado_por": "sistema",
+        })
+    return linhas
 
 class PontoProcessor:
     """Processa as batidas de ponto e calcula horas trabalhadas, extras e faltantes."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, resolvedor_horarios=None, reprocessar_inalterados: bool = False):
         """
         Inicializa o processador de ponto.
         
         Args:
             db (Session): Sessão do banco de dados.
+            resolvedor_horarios (Optional[ResolvedorHorarios]): Resolvedor já carregado para
+                vários servidores (processamento em lote). Quando ausente, os horários
+                são carregados a cada período processado.
+            reprocessar_inalterados (bool): Recalcula e regrava também os dias cuja
+                impressão das entradas é igual à gravada no espelho.
         """
         self.db = db
+        # Jornada e intervalo padrão; substituídos pelas regras da secretaria de cada servidor
         self.calculadora = CalculadoraHorasExtras(
             jornada_diaria=timedelta(hours=8),
             intervalo_minimo=60  # 1 hora de intervalo mínimo
         )
+        self.resolvedor_horarios = resolvedor_horarios
+        self._resolvedor_compartilhado = resolvedor_horarios is not None
+        # Regras de apuração por secretaria, carregadas uma vez por processador
+        self._regras_por_secretaria: Dict[Optional[int], RegrasCalculo] = {}
+        # Intervalo de corte de turnos por horário (origem), calculado uma vez
+        self._cortes_por_horario: Dict[object, int] = {}
+        # Memoização por impressão das entradas: resumos gravados e justificativas do período atual
+        self.reprocessar_inalterados = reprocessar_inalterados
+        self._resumos: Dict[date, Row] = {}
+        self._justificativas: Dict[date, List[Row]] = {}
+        # IDs das batidas originais do servidor por horário, para vincular as batidas processadas
+        self._ids_originais: Dict[datetime, List[int]] = {}
+        self._versoes_regras: Dict[int, Tuple[RegrasCalculo, str]] = {}
+        # Deltas do banco de horas dos dias já gravados, aplicados em lote ao final do período
+        self._deltas_banco_horas: Dict[date, int] = {}
         
     def processar_batidas_por_servidor(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> BatidaProcessamentoResult:
         """
@@ -211,25 +455,6 @@ class PontoProcessor:
         Returns:
             BatidaProcessamentoResult: Resultado do processamento.
         """
-        # Verificar se o servidor existe
-        servidor = self.db.query(Servidor).filter(Servidor.id == servidor_id).first()
-        if not servidor:
-            raise ValueError(f"Servidor com ID {servidor_id} não encontrado")
-            
-        # Buscar batidas originais do período
-        batidas_originais = self.db.query(BatidaOriginal).filter(
-            BatidaOriginal.servidor_id == servidor_id,
-            BatidaOriginal.data_hora >= datetime.combine(periodo_inicio, time.min),
-            BatidaOriginal.data_hora <= datetime.combine(periodo_fim, time.max)
-        ).order_by(BatidaOriginal.data_hora).all()
-        
-        # Buscar feriados do período
-        feriados = self._buscar_feriados(periodo_inicio, periodo_fim)
-        self.calculadora.feriados = feriados
-        
-        # Agrupar batidas por data
-        batidas_por_data = self._agrupar_batidas_por_data(batidas_originais)
-        
         # Processar cada dia
         total_processado = 0
         total_regular = 0
@@ -237,12 +462,7 @@ class PontoProcessor:
         total_justificada = 0
         detalhes = []
         
-        # Iterar por todas as datas do período
-        data_atual = periodo_inicio
-        while data_atual <= periodo_fim:
-            # Processar o dia
-            resultado_dia = self._processar_dia(servidor_id, data_atual, batidas_por_data.get(data_atual, []))
-            
+        for resultado_dia in self.iterar_dias(servidor_id, periodo_inicio, periodo_fim):
             # Atualizar contadores
             total_processado += 1
             if resultado_dia["status"] == "regular":
@@ -255,9 +475,6 @@ class PontoProcessor:
             # Adicionar aos detalhes
             detalhes.append(resultado_dia)
             
-            # Avançar para o próximo dia
-            data_atual += timedelta(days=1)
-            
         # Retornar resultado
         return BatidaProcessamentoResult(
             total_processado=total_processado,
@@ -269,7 +486,182 @@ class PontoProcessor:
             periodo_fim=periodo_fim,
             detalhes=detalhes
         )
-    
+
+    def iterar_dias(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> Iterator[dict]:
+        """
+        Processa o período dia a dia, entregando cada resultado assim que é calculado.
+
+        As batidas, feriados e horários são carregados em janelas de até um mês,
+        de modo que a memória usada não cresce com o tamanho do período.
+
+        Args:
+            servidor_id (int): ID do servidor.
+            periodo_inicio (date): Data de início do período.
+            periodo_fim (date): Data de fim do período.
+
+        Yields:
+            dict: Resultado do processamento de cada dia, em ordem de data.
+        """
+        with self._banco_horas_em_lote(servidor_id):
+            janela_inicio = periodo_inicio
+            while janela_inicio <= periodo_fim:
+                # Fim da janela: último dia do mês da data inicial ou fim do período
+                proximo_mes = (janela_inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+                janela_fim = min(proximo_mes - timedelta(days=1), periodo_fim)
+
+                turnos = self._preparar_periodo(servidor_id, janela_inicio, janela_fim)
+
+                data_atual = janela_inicio
+                while data_atual <= janela_fim:
+                    yield self._processar_turno(servidor_id, data_atual, turnos)
+                    data_atual += timedelta(days=1)
+
+                janela_inicio = janela_fim + timedelta(days=1)
+
+    def processar_dias(self, servidor_id: int, datas: List[date]) -> List[dict]:
+        """
+        Processa apenas as datas informadas de um servidor.
+
+        Usado para recalcular de forma incremental os dias marcados como
+        desatualizados no espelho de ponto, sem reprocessar o período inteiro.
+
+        Args:
+            servidor_id (int): ID do servidor.
+            datas (List[date]): Datas a serem processadas.
+
+        Returns:
+            List[dict]: Resultado do processamento de cada dia, na ordem das datas.
+        """
+        if not datas:
+            return []
+
+        datas = sorted(set(datas))
+        with self._banco_horas_em_lote(servidor_id):
+            turnos = self._preparar_periodo(servidor_id, datas[0], datas[-1])
+            return [self._processar_turno(servidor_id, data, turnos) for data in datas]
+
+    @contextmanager
+    def _banco_horas_em_lote(self, servidor_id: int):
+        """
+        Aplica ao final do bloco, em um único lote, os deltas do banco de horas
+        dos dias gravados nele (um lock e uma atualização dos lançamentos
+        posteriores, em vez de uma por dia). Se o bloco é interrompido (erro
+        ou gerador encerrado pelo consumidor), o dia em andamento é descartado
+        e os dias já gravados recebem seus lançamentos.
+
+        Args:
+            servidor_id (int): ID do servidor.
+        """
+        try:
+            yield
+        except BaseException:
+            self.db.rollback()
+            self._aplicar_banco_horas(servidor_id)
+            raise
+        self._aplicar_banco_horas(servidor_id)
+
+    def _aplicar_banco_horas(self, servidor_id: int) -> None:
+        """Grava os deltas pendentes do banco de horas do servidor e faz o commit."""
+        if not self._deltas_banco_horas:
+            return
+        deltas, self._deltas_banco_horas = self._deltas_banco_horas, {}
+        BancoHorasService(self.db).registrar_deltas_servidor(servidor_id, deltas)
+        self.db.commit()
+
+    def _preparar_periodo(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> TurnosMontados:
+        """
+        Valida o servidor, carrega os feriados na calculadora e monta os turnos do período.
+
+        As batidas são lidas desde a véspera do período (turno que termina no
+        primeiro dia) até o dia seguinte ao fim (turno do último dia que
+        atravessa a meia-noite).
+
+        Args:
+            servidor_id (int): ID do servidor.
+            periodo_inicio (date): Data de início do período.
+            periodo_fim (date): Data de fim do período.
+
+        Returns:
+            TurnosMontados: Turnos do servidor indexados pela data de início.
+        """
+        # Verificar se o servidor existe
+        servidor = self.db.query(Servidor).filter(Servidor.id == servidor_id).first()
+        if not servidor:
+            raise ValueError(f"Servidor com ID {servidor_id} não encontrado")
+
+        # Regras de apuração da secretaria do servidor
+        if servidor.secretaria_id not in self._regras_por_secretaria:
+            self._regras_por_secretaria[servidor.secretaria_id] = carregar_regras(self.db, servidor.secretaria_id)
+        self.calculadora.regras = self._regras_por_secretaria[servidor.secretaria_id]
+
+        # Buscar feriados do período
+        feriados = self._buscar_feriados(periodo_inicio, periodo_fim)
+        self.calculadora.feriados = feriados
+
+        # Carregar os horários do servidor, a menos que um resolvedor em lote tenha sido fornecido
+        vespera = periodo_inicio - timedelta(days=1)
+        if not self._resolvedor_compartilhado:
+            from app.services.horario_resolver import ResolvedorHorarios  # Evita import circular
+            self.resolvedor_horarios = ResolvedorHorarios(self.db).carregar([servidor_id], vespera, periodo_fim)
+
+        # Resumos já gravados (com a impressão das entradas) e justificativas do período.
+        # Lidos como tuplas: os commits de cada dia não as expiram.
+        self._resumos = {
+            resumo.data: resumo for resumo in self.db.query(
+                ResumoDiario.data, ResumoDiario.hash_entradas, ResumoDiario.desatualizado, ResumoDiario.status,
+                ResumoDiario.minutos_trabalhados, ResumoDiario.minutos_extras, ResumoDiario.minutos_faltantes,
+                ResumoDiario.minutos_noturnos, ResumoDiario.justificativa_id, ResumoDiario.observacao
+            ).filter(
+                ResumoDiario.servidor_id == servidor_id,
+                ResumoDiario.data >= periodo_inicio,
+                ResumoDiario.data <= periodo_fim
+            )
+        }
+        self._justificativas = {}
+        for justificativa in self.db.query(
+            Justificativa.id, Justificativa.data, Justificativa.status, Justificativa.tipo,
+            Justificativa.descricao, Justificativa.updated_at
+        ).filter(
+            Justificativa.servidor_id == servidor_id,
+            Justificativa.data >= periodo_inicio,
+            Justificativa.data <= periodo_fim
+        ).order_by(Justificativa.id):
+            self._justificativas.setdefault(justificativa.data, []).append(justificativa)
+
+        # Buscar apenas os horários (e IDs) das batidas, já ordenados, e montar os turnos em uma passada
+        batidas = self.db.query(BatidaOriginal.data_hora, BatidaOriginal.id).filter(
+            BatidaOriginal.servidor_id == servidor_id,
+            BatidaOriginal.data_hora >= datetime.combine(vespera, time.min),
+            BatidaOriginal.data_hora < datetime.combine(periodo_fim + timedelta(days=2), time.min)
+        ).order_by(BatidaOriginal.data_hora, BatidaOriginal.id).all()
+
+        self._ids_originais = {}
+        for data_hora, batida_id in batidas:
+            self._ids_originais.setdefault(data_hora, []).append(batida_id)
+
+        return montar_turnos(
+            (data_hora for data_hora, _ in batidas),
+            lambda data: self._intervalo_corte(servidor_id, data)
+        )
+
+    def _intervalo_corte(self, servidor_id: int, data: date) -> int:
+        """
+        Intervalo de corte dos turnos iniciados na data, conforme o horário previsto.
+
+        Args:
+            servidor_id (int): ID do servidor.
+            data (date): Data de início do turno.
+
+        Returns:
+            int: Intervalo em minutos entre batidas que separa dois turnos.
+        """
+        horario = self.resolvedor_horarios.resolver(servidor_id, data) if self.resolvedor_horarios else None
+        chave = None if horario is None else (horario.origem if horario.origem is not None else id(horario))
+        corte = self._cortes_por_horario.get(chave)
+        if corte is None:
+            corte = self._cortes_por_horario[chave] = intervalo_corte(horario)
+        return corte
+
     def _buscar_feriados(self, data_inicio: date, data_fim: date) -> List[date]:
         """
         Busca os feriados no período especificado.
@@ -281,152 +673,207 @@ class PontoProcessor:
         Returns:
             List[date]: Lista de datas de feriados.
         """
-        # Implementar busca de feriados no banco de dados
-        # Por enquanto, retorna uma lista vazia
-        return []
+        feriados = self.db.query(Feriado.data).filter(
+            Feriado.data >= data_inicio,
+            Feriado.data <= data_fim,
+            Feriado.ativo == True
+        ).all()
+        return [feriado.data for feriado in feriados]
     
-    def _agrupar_batidas_por_data(self, batidas: List[BatidaOriginal]) -> Dict[date, List[datetime]]:
+    def _processar_turno(self, servidor_id: int, data: date, turnos: TurnosMontados) -> dict:
         """
-        Agrupa as batidas por data.
-        
+        Processa o turno iniciado na data (ou a ausência dele).
+
         Args:
-            batidas (List[BatidaOriginal]): Lista de batidas originais.
-            
+            servidor_id (int): ID do servidor.
+            data (date): Data a ser processada.
+            turnos (TurnosMontados): Turnos montados do período.
+
         Returns:
-            Dict[date, List[datetime]]: Dicionário com datas e listas de horários.
-        """
-        resultado = {}
-        for batida in batidas:
-            data = batida.data_hora.date()
-            if data not in resultado:
-                resultado[data] = []
-            resultado[data].append(batida.data_hora)
-            
-        # Ordenar os horários em cada data
-        for data in resultado:
-            resultado[data] = sorted(resultado[data])
-            
-        return resultado
-    
-    def _processar_dia(self, servidor_id: int, data: date, horarios: List[datetime]) -> dict:
+            dict: Resultado do processamento do dia.
+        """
+        turno: Optional[Turno] = turnos.get(data)
+        if turno is None:
+            return self._processar_dia(servidor_id, data, [], cauda=turnos.caudas.get(data))
+        return self._processar_dia(servidor_id, data, turno.horarios, turno.minutos, turnos.caudas.get(data))
+
+    def _processar_dia(self, servidor_id: int, data: date, horarios: List[datetime],
+                       minutos: Optional[array] = None, cauda: Optional[datetime] = None) -> dict:
         """
         Processa as batidas de um dia específico.
         
         Args:
             servidor_id (int): ID do servidor.
             data (date): Data a ser processada.
-            horarios (List[datetime]): Lista de horários de batidas.
+            horarios (List[datetime]): Lista de horários de batidas (do turno iniciado na data).
+            minutos (Optional[array]): As mesmas batidas em minutos desde a meia-noite da data,
+                quando já montadas; evita a conversão.
+            cauda (Optional[datetime]): Última batida da data que pertence ao turno da véspera.
             
         Returns:
             dict: Resultado do processamento do dia.
         """
-        # Verificar se é fim de semana ou feriado
-        is_dia_especial = self.calculadora._is_dia_especial(data)
+        # Horário previsto do dia (None se o servidor não tem horário cadastrado)
+        horario = self.resolvedor_horarios.resolver(servidor_id, data) if self.resolvedor_horarios else None
+        jornada_minutos = horario.jornada_minutos if horario is not None else self.calculadora.jornada_minutos
+        
+        # Verificar se é fim de semana, folga ou feriado
+        is_dia_especial = self.calculadora._is_dia_especial(data, horario)
         
-        # Verificar se há justificativa para o dia
-        justificativa = self._buscar_justificativa(servidor_id, data)
+        # Justificativas da data; vale a primeira aprovada
+        justificativas = self._justificativas.get(data, [])
+        justificativa = next((j for j in justificativas if j.status == "aprovada"), None)
+
+        # Dia com as mesmas entradas do último processamento: mantém o que está gravado
+        impressao = impressao_entradas(
+            horarios, cauda, justificativas, data in self.calculadora.feriados, horario, self._versao_regras()
+        )
+        resumo = self._resumos.get(data)
+        if not self.reprocessar_inalterados and resumo is not None and resumo.hash_entradas == impressao:
+            return self._resultado_memorizado(servidor_id, resumo, horarios)
         
         # Se não há batidas
         if not horarios:
-            if is_dia_especial:
-                # Fim de semana ou feriado sem batidas é considerado regular
-                return {
-                    "data": data,
-                    "status": "regular",
-                    "batidas": [],
-                    "horas_trabalhadas": "00:00",
-                    "horas_extras": "00:00",
-                    "horas_faltantes": "00:00",
-                    "justificativa_id": None,
-                    "observacao": "Fim de semana ou feriado"
-                }
-            elif justificativa:
-                # Dia com justificativa é considerado justificado
-                return {
-                    "data": data,
-                    "status": "justificada",
-                    "batidas": [],
-                    "horas_trabalhadas": "00:00",
-                    "horas_extras": "00:00",
-                    "horas_faltantes": "08:00",
-                    "justificativa_id": justificativa.id,
-                    "observacao": f"Justificativa: {justificativa.tipo} - {justificativa.descricao}"
-                }
+            minutos_trabalhados = 0
+            minutos_extras = 0
+            minutos_noturnos = 0
+            inconsistente = False
+            # Fim de semana, folga ou feriado sem batidas não gera falta
+            minutos_faltantes = 0 if is_dia_especial else jornada_minutos
+        else:
+            # Criar registro de ponto
+            if minutos is not None:
+                registro = RegistroPonto.de_minutos(data, minutos)
             else:
-                # Dia útil sem batidas e sem justificativa é considerado irregular
-                return {
-                    "data": data,
-                    "status": "irregular",
-                    "batidas": [],
-                    "horas_trabalhadas": "00:00",
-                    "horas_extras": "00:00",
-                    "horas_faltantes": "08:00",
-                    "justificativa_id": None,
-                    "observacao": "Falta não justificada"
-                }
-        
-        # Criar registro de ponto
-        registro = RegistroPonto(data, horarios)
-        
-        # Calcular horas trabalhadas e extras
-        horas_trabalhadas, horas_extras, horas_faltantes, _ = self.calculadora.calcular_horas_trabalhadas_e_extras(registro)
+                registro = RegistroPonto(data, horarios)
+            
+            # Apurar minutos trabalhados, extras, faltantes e noturnos segundo as regras da secretaria
+            apuracao = self.calculadora.apurar(registro, horario)
+            minutos_trabalhados = apuracao.trabalhados
+            minutos_extras = apuracao.extras
+            minutos_faltantes = apuracao.faltantes
+            minutos_noturnos = apuracao.noturnos
+            inconsistente = apuracao.inconsistente
         
         # Determinar status
-        if is_dia_especial:
-            status = "regular"
-            observacao = "Trabalho em fim de semana ou feriado"
-        elif justificativa and horas_faltantes > timedelta():
-            status = "justificada"
-            observacao = f"Justificativa: {justificativa.tipo} - {justificativa.descricao}"
-        elif horas_faltantes > timedelta():
-            status = "irregular"
-            observacao = "Horas faltantes sem justificativa"
-        else:
-            status = "regular"
-            observacao = "Jornada regular"
-            
-        # Formatar horas
-        horas_trabalhadas_str = self._formatar_horas(horas_trabalhadas)
-        horas_extras_str = self._formatar_horas(horas_extras)
-        horas_faltantes_str = self._formatar_horas(horas_faltantes)
+        status, observacao, justificativa_id = classificar_dia(
+            bool(horarios), is_dia_especial, justificativa, minutos_faltantes, inconsistente
+        )
         
-        # Formatar batidas
-        batidas_str = [h.strftime("%H:%M") for h in horarios]
+        # Atualizar o espelho de ponto materializado
+        self._salvar_resumo_diario(
+            servidor_id, data, status, minutos_trabalhados, minutos_extras, minutos_faltantes,
+            justificativa_id, observacao, minutos_noturnos, impressao
+        )
         
-        # Criar e salvar batidas processadas
-        self._salvar_batidas_processadas(servidor_id, data, horarios, status, justificativa.id if justificativa else None)
+        # Criar e salvar batidas processadas (faz o commit do dia)
+        self._salvar_batidas_processadas(servidor_id, data, horarios, status, justificativa_id, cauda)
+
+        # Lançamento do banco de horas, aplicado com os dos demais dias do período
+        self._deltas_banco_horas[data] = calcular_delta_minutos(status, minutos_extras, minutos_faltantes)
         
         # Retornar resultado
         return {
             "data": data,
             "status": status,
-            "batidas": batidas_str,
-            "horas_trabalhadas": horas_trabalhadas_str,
-            "horas_extras": horas_extras_str,
-            "horas_faltantes": horas_faltantes_str,
-            "justificativa_id": justificativa.id if justificativa else None,
+            "batidas": [h.strftime("%H:%M") for h in horarios],
+            "horas_trabalhadas": self._formatar_minutos(minutos_trabalhados),
+            "horas_extras": self._formatar_minutos(minutos_extras),
+            "horas_faltantes": self._formatar_minutos(minutos_faltantes),
+            "horas_noturnas": self._formatar_minutos(minutos_noturnos),
+            "justificativa_id": justificativa_id,
             "observacao": observacao
         }
-    
-    def _buscar_justificativa(self, servidor_id: int, data: date) -> Optional[Justificativa]:
+
+    def _versao_regras(self) -> str:
+        """Hash das regras de cálculo em uso (calculado uma vez por conjunto de regras)."""
+        regras = self.calculadora.regras
+        versao = self._versoes_regras.get(id(regras))
+        if versao is None:
+            versao = self._versoes_regras[id(regras)] = (regras, versao_regras(regras))
+        return versao[1]
+
+    def _resultado_memorizado(self, servidor_id: int, resumo: Row, horarios: List[datetime]) -> dict:
         """
-        Busca uma justificativa para o servidor na data especificada.
-        
+        Resultado de um dia inalterado, lido do espelho gravado, sem recalcular
+        nem regravar batidas e banco de horas.
+
         Args:
             servidor_id (int): ID do servidor.
-            data (date): Data a ser verificada.
-            
+            resumo (Row): Resumo gravado do dia.
+            horarios (List[datetime]): Batidas do turno do dia.
+
         Returns:
-            Optional[Justificativa]: Justificativa encontrada ou None.
+            dict: Resultado do processamento do dia.
         """
-        return self.db.query(Justificativa).filter(
-            Justificativa.servidor_id == servidor_id,
-            Justificativa.data == data,
-            Justificativa.status == "aprovada"
-        ).first()
-    
-    def _salvar_batidas_processadas(self, servidor_id: int, data: date, horarios: List[datetime], 
-                                   status: str, justificativa_id: Optional[int]) -> None:
+        if resumo.desatualizado:
+            # Marcado por uma alteração que não mudou as entradas deste dia
+            self.db.query(ResumoDiario).filter(
+                ResumoDiario.servidor_id == servidor_id,
+                ResumoDiario.data == resumo.data
+            ).update({ResumoDiario.desatualizado: False}, synchronize_session=False)
+            self.db.commit()
+
+        return {
+            "data": resumo.data,
+            "status": resumo.status,
+            "batidas": [h.strftime("%H:%M") for h in horarios],
+            "horas_trabalhadas": self._formatar_minutos(resumo.minutos_trabalhados),
+            "horas_extras": self._formatar_minutos(resumo.minutos_extras),
+            "horas_faltantes": self._formatar_minutos(resumo.minutos_faltantes),
+            "horas_noturnas": self._formatar_minutos(resumo.minutos_noturnos),
+            "justificativa_id": resumo.justificativa_id,
+            "observacao": resumo.observacao
+        }
+
+    def _salvar_resumo_diario(self, servidor_id: int, data: date, status: str,
+                              minutos_trabalhados: int, minutos_extras: int, minutos_faltantes: int,
+                              justificativa_id: Optional[int], observacao: str, minutos_noturnos: int = 0,
+                              hash_entradas: Optional[str] = None) -> None:
+        """
+        Grava (upsert) o resumo do dia no espelho de ponto materializado.
+        O lançamento do banco de horas é aplicado em lote ao final do período
+        (ver _banco_horas_em_lote).
+
+        Args:
+            servidor_id (int): ID do servidor.
+            data (date): Data do resumo.
+            status (str): Status do processamento.
+            minutos_trabalhados (int): Minutos trabalhados no dia.
+            minutos_extras (int): Minutos extras no dia.
+            minutos_faltantes (int): Minutos faltantes no dia.
+            justificativa_id (Optional[int]): ID da justificativa, se houver.
+            observacao (str): Observação do processamento.
+            minutos_noturnos (int): Minutos noturnos apurados (adicional noturno).
+            hash_entradas (Optional[str]): Impressão das entradas usadas no cálculo.
+        """
+        valores = {
+            "servidor_id": servidor_id,
+            "data": data,
+            "minutos_trabalhados": minutos_trabalhados,
+            "minutos_extras": minutos_extras,
+            "minutos_faltantes": minutos_faltantes,
+            "minutos_noturnos": minutos_noturnos,
+            "status": status,
+            "justificativa_id": justificativa_id,
+            "observacao": observacao[:200],
+            "desatualizado": False,
+            "hash_entradas": hash_entradas,
+        }
+        stmt = insert(ResumoDiario).values(**valores)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResumoDiario.servidor_id, ResumoDiario.data],
+            set_={
+                **{coluna: stmt.excluded[coluna] for coluna in valores if coluna not in ("servidor_id", "data")},
+                "processado_em": func.now(),
+                "updated_at": func.now(),
+            }
+        )
+        self.db.execute(stmt)
+
+    def _salvar_batidas_processadas(self, servidor_id: int, data: date, horarios: List[datetime],
+                                   status: str, justificativa_id: Optional[int],
+                                   cauda: Optional[datetime] = None) -> None:
         """
         Salva as batidas processadas no banco de dados.
         
@@ -436,36 +883,30 @@ class PontoProcessor:
             horarios (List[datetime]): Lista de horários de batidas.
             status (str): Status do processamento.
             justificativa_id (Optional[int]): ID da justificativa, se houver.
+            cauda (Optional[datetime]): Última batida da data que pertence ao turno da
+                véspera; as batidas até ela são mantidas.
         """
-        # Verificar se já existem batidas processadas para este servidor e data
-        batidas_existentes = self.db.query(BatidaProcessada).filter(
+        # Faixa do turno: da meia-noite (ou após a cauda da véspera) até o fim do dia ou a última batida
+        meia_noite, cauda, fim = faixa_batidas_processadas(data, horarios, cauda)
+
+        # Verificar se já existem batidas processadas para este servidor e turno
+        consulta = self.db.query(BatidaProcessada).filter(
             BatidaProcessada.servidor_id == servidor_id,
-            BatidaProcessada.data_hora >= datetime.combine(data, time.min),
-            BatidaProcessada.data_hora <= datetime.combine(data, time.max)
-        ).all()
+            BatidaProcessada.data_hora >= meia_noite,
+            BatidaProcessada.data_hora <= fim
+        )
+        if cauda is not None:
+            consulta = consulta.filter(BatidaProcessada.data_hora > cauda)
+        batidas_existentes = consulta.all()
         
         # Se existirem, excluir
         if batidas_existentes:
             for batida in batidas_existentes:
                 self.db.delete(batida)
             
-        # Criar novas batidas processadas
-        for i, horario in enumerate(horarios):
-            # Determinar o tipo da batida (entrada/saída)
-            tipo = "entrada" if i % 2 == 0 else "saida"
-            
-            # Criar batida processada
-            batida_processada = BatidaProcessada(
-                servidor_id=servidor_id,
-                data_hora=horario,
-                tipo=tipo,
-                status=status,
-                justificativa_id=justificativa_id,
-                processado_por="sistema"
-            )
-            
-            # Adicionar ao banco de dados
-            self.db.add(batida_processada)
+        # Criar novas batidas processadas, vinculadas às originais
+        for linha in linhas_batidas_processadas(servidor_id, horarios, status, justificativa_id, self._ids_originais):
+            self.db.add(BatidaProcessada(**linha))
             
         # Commit das alterações
         self.db.commit()
@@ -485,3 +926,17 @@ class PontoProcessor:
         horas, segundos = divmod(total_segundos, 3600)
         minutos = segundos // 60
         return f"{horas:02d}:{minutos:02d}"
+
+    @staticmethod
+    def _formatar_minutos(minutos: int) -> str:
+        """
+        Formata uma quantidade de minutos para uma string no formato "HH:MM".
+
+        Args:
+            minutos (int): Quantidade de minutos.
+
+        Returns:
+            str: String formatada no padrão "HH:MM".
+        """
+        horas, minutos = divmod(abs(minutos), 60)
+        return f"{horas:02d}:{minutos:02d}"
@@ -0,0 +1,246 @@
+# app/services/pontualidade_service.py
+"""
+Percentis de pontualidade por secretaria.
+
+Para cada (secretaria, dia, tipo) é guardado um esboço mesclável da
+distribuição dos desvios das batidas em relação ao horário previsto: na
+entrada, a primeira batida do turno menos o início previsto (positivo =
+atraso); na saída, a última batida menos o fim previsto (negativo = saída
+antecipada). Como as batidas têm resolução de minuto, o esboço é um
+histograma esparso de minutos inteiros: mesclar é somar contagens e os
+percentis são exatos. Um período é respondido somando os esboços dos dias,
+sem ordenar nem ler as batidas.
+"""
+from array import array
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import math
+import sys
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.batida import BatidaOriginal
+from app.models.esboco_pontualidade import EsbocoPontualidade
+from app.models.servidor import Servidor
+from app.schemas.pontualidade import PercentisPontualidade
+from app.services.horario_resolver import ResolvedorHorarios
+from app.services.montador_turnos import intervalo_corte, montar_turnos
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+TIPOS_PONTUALIDADE = ("entrada", "saida")
+
+class EsbocoQuantis:
+    """Histograma esparso de desvios em minutos inteiros, mesclável e com quantis exatos."""
+
+    __slots__ = ("contagens", "total")
+
+    def __init__(self):
+        self.contagens: Dict[int, int] = {}
+        self.total = 0
+
+    def adicionar(self, valor: int, quantidade: int = 1):
+        limite = settings.PONTUALIDADE_LIMITE_MINUTOS
+        valor = max(-limite, min(limite, valor))
+        self.contagens[valor] = self.contagens.get(valor, 0) + quantidade
+        self.total += quantidade
+
+    def mesclar(self, outro: "EsbocoQuantis"):
+        for valor, quantidade in outro.contagens.items():
+            self.contagens[valor] = self.contagens.get(valor, 0) + quantidade
+        self.total += outro.total
+
+    def quantis(self, qs: Iterable[float]) -> List[Optional[int]]:
+        """
+        Quantis pelo método do posto mais próximo (o menor valor cuja
+        frequência acumulada alcança q * total), em uma passada ordenada.
+        """
+        qs = list(qs)
+        if not self.total:
+            return [None] * len(qs)
+        # Posto de cada quantil (o arredondamento evita 0.9 * 10 = 9.000000000000002)
+        alvos = sorted((max(1, math.ceil(round(q * self.total, 9))), i) for i, q in enumerate(qs))
+        resultado: List[Optional[int]] = [None] * len(qs)
+        acumulado = 0
+        proximo = 0
+        for valor in sorted(self.contagens):
+            acumulado += self.contagens[valor]
+            while proximo < len(alvos) and alvos[proximo][0] <= acumulado:
+                resultado[alvos[proximo][1]] = valor
+                proximo += 1
+            if proximo == len(alvos):
+                break
+        return resultado
+
+    def para_bytes(self) -> bytes:
+        pares = array("i")
+        for valor in sorted(self.contagens):
+            pares.append(valor)
+            pares.append(self.contagens[valor])
+        if sys.byteorder != "little":
+            pares.byteswap()
+        return pares.tobytes()
+
+    @classmethod
+    def de_bytes(cls, dados: bytes) -> "EsbocoQuantis":
+        pares = array("i")
+        pares.frombytes(dados)
+        if sys.byteorder != "little":
+            pares.byteswap()
+        esboco = cls()
+        for i in range(0, len(pares), 2):
+            esboco.contagens[pares[i]] = esboco.contagens.get(pares[i], 0) + pares[i + 1]
+            esboco.total += pares[i + 1]
+        return esboco
+
+class PontualidadeService:
+    """Atualiza e consulta os esboços de pontualidade por secretaria e dia."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def atualizar(self, periodo_inicio: date, periodo_fim: date, secretaria_id: Optional[int] = None) -> int:
+        """
+        Reconstrói os esboços dos dias do período a partir das batidas, em uma
+        leitura ordenada por servidor: cada turno com horário previsto
+        contribui com o desvio da primeira e da última batida.
+
+        Args:
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            secretaria_id: Restringe à secretaria; todas quando None
+
+        Returns:
+            Quantidade de esboços gravados
+        """
+        consulta = self.db.query(Servidor.id, Servidor.secretaria_id).filter(
+            Servidor.ativo == True, Servidor.secretaria_id.isnot(None)
+        )
+        if secretaria_id is not None:
+            consulta = consulta.filter(Servidor.secretaria_id == secretaria_id)
+        secretaria_por_servidor: Dict[int, int] = dict(consulta.all())
+
+        vespera = periodo_inicio - timedelta(days=1)
+        resolvedor = ResolvedorHorarios(self.db).carregar(secretaria_por_servidor, vespera, periodo_fim)
+        cortes: Dict[object, int] = {}
+
+        def corte_para(servidor_id: int, data: date) -> int:
+            horario = resolvedor.resolver(servidor_id, data)
+            chave = None if horario is None else (horario.origem if horario.origem is not None else id(horario))
+            if chave not in cortes:
+                cortes[chave] = intervalo_corte(horario)
+            return cortes[chave]
+
+        esbocos: Dict[Tuple[int, date, str], EsbocoQuantis] = {}
+
+        def esboco(chave: Tuple[int, date, str]) -> EsbocoQuantis:
+            if chave not in esbocos:
+                esbocos[chave] = EsbocoQuantis()
+            return esbocos[chave]
+
+        batidas = self.db.query(BatidaOriginal.servidor_id, BatidaOriginal.data_hora).filter(
+            BatidaOriginal.data_hora >= datetime.combine(vespera, time.min),
+            BatidaOriginal.data_hora < datetime.combine(periodo_fim + timedelta(days=2), time.min)
+        )
+        if secretaria_id is not None:
+            batidas = batidas.filter(BatidaOriginal.servidor_id.in_(
+                self.db.query(Servidor.id).filter(Servidor.secretaria_id == secretaria_id)
+            ))
+        batidas = batidas.order_by(BatidaOriginal.servidor_id, BatidaOriginal.data_hora).yield_per(10000)
+
+        for servidor_id, linhas in groupby(batidas, key=lambda linha: linha[0]):
+            sec_id = secretaria_por_servidor.get(servidor_id)
+            if sec_id is None:
+                continue
+            turnos = montar_turnos(
+                (data_hora for _, data_hora in linhas),
+                lambda data, servidor_id=servidor_id: corte_para(servidor_id, data)
+            )
+            for data, turno in turnos.turnos.items():
+                if data < periodo_inicio or data > periodo_fim:
+                    continue
+                horario = resolvedor.resolver(servidor_id, data)
+                if horario is None or not horario.minutos:
+                    continue  # Sem horário previsto (ou folga) não há desvio a medir
+                esboco((sec_id, data, "entrada")).adicionar(turno.minutos[0] - horario.minutos[0])
+                if len(turno.minutos) > 1:
+                    esboco((sec_id, data, "saida")).adicionar(turno.minutos[-1] - horario.minutos[-1])
+
+        # Substitui os esboços do período (o recálculo é idempotente)
+        anteriores = self.db.query(EsbocoPontualidade).filter(
+            EsbocoPontualidade.data >= periodo_inicio,
+            EsbocoPontualidade.data <= periodo_fim
+        )
+        if secretaria_id is not None:
+            anteriores = anteriores.filter(EsbocoPontualidade.secretaria_id == secretaria_id)
+        anteriores.delete(synchronize_session=False)
+
+        if esbocos:
+            self.db.execute(EsbocoPontualidade.__table__.insert(), [
+                {"secretaria_id": sec_id, "data": data, "tipo": tipo,
+                 "esboco": esboco.para_bytes(), "total": esboco.total}
+                for (sec_id, data, tipo), esboco in esbocos.items()
+            ])
+        self.db.commit()
+        logger.info(f"Esboços de pontualidade {periodo_inicio} a {periodo_fim}: {len(esbocos)} gravado(s)")
+        return len(esbocos)
+
+    def percentis(self, periodo_inicio: date, periodo_fim: date, tipo: str = "entrada",
+                  secretaria_id: Optional[int] = None,
+                  quantis: Tuple[float, ...] = (0.5, 0.9, 0.99)) -> List[PercentisPontualidade]:
+        """
+        Percentis dos desvios no período, por secretaria e no total (secretaria_id nulo),
+        somando os esboços diários.
+
+        Args:
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            tipo: entrada ou saida
+            secretaria_id: Restringe à secretaria (sem linha de total)
+            quantis: Quantis a calcular, entre 0 e 1
+
+        Returns:
+            Percentis por secretaria, seguidos do total quando há mais de uma
+
+        Raises:
+            ValueError: Se o tipo ou os quantis forem inválidos
+        """
+        if tipo not in TIPOS_PONTUALIDADE:
+            raise ValueError(f"Tipo inválido: {tipo}. Use entrada ou saida")
+        if any(q <= 0 or q > 1 for q in quantis):
+            raise ValueError("Quantis devem estar entre 0 (exclusive) e 1")
+
+        consulta = self.db.query(EsbocoPontualidade.secretaria_id, EsbocoPontualidade.esboco).filter(
+            EsbocoPontualidade.tipo == tipo,
+            EsbocoPontualidade.data >= periodo_inicio,
+            EsbocoPontualidade.data <= periodo_fim
+        )
+        if secretaria_id is not None:
+            consulta = consulta.filter(EsbocoPontualidade.secretaria_id == secretaria_id)
+
+        por_secretaria: Dict[int, EsbocoQuantis] = {}
+        for sec_id, dados in consulta:
+            if sec_id not in por_secretaria:
+                por_secretaria[sec_id] = EsbocoQuantis()
+            por_secretaria[sec_id].mesclar(EsbocoQuantis.de_bytes(dados))
+
+        def resultado(sec_id: Optional[int], esboco: EsbocoQuantis) -> PercentisPontualidade:
+            valores = esboco.quantis(quantis)
+            return PercentisPontualidade(
+                secretaria_id=sec_id,
+                tipo=tipo,
+                total=esboco.total,
+                percentis={f"p{q * 100:g}": v for q, v in zip(quantis, valores)},
+            )
+
+        linhas = [resultado(sec_id, esboco) for sec_id, esboco in sorted(por_secretaria.items())]
+        if len(por_secretaria) > 1:
+            total = EsbocoQuantis()
+            for esboco in por_secretaria.values():
+                total.mesclar(esboco)
+            linhas.append(resultado(None, total))
+        return linhas
@@ -0,0 +1,258 @@
+# app/services/recalculo_data.py
+"""
+Recálculo de uma data para todos os servidores, em lote.
+
+Usado quando uma alteração vale para todos em um mesmo dia (criação,
+alteração ou remoção de feriado). Em vez de reprocessar servidor a servidor
+(várias consultas e um commit por dia), as entradas da data são lidas com
+uma consulta por tabela, os dias são apurados em memória com as mesmas
+regras do PontoProcessor e apenas os dias cujo resultado mudou são gravados,
+com um upsert dos resumos, uma troca das batidas processadas e uma
+atualização do banco de horas em lote, em uma única transação.
+"""
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional
+import logging
+import time as relogio
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.batida import BatidaOriginal, BatidaProcessada
+from app.models.feriado import Feriado
+from app.models.justificativa import Justificativa
+from app.models.resumo_diario import ResumoDiario
+from app.models.servidor import Servidor
+from app.services.banco_horas_service import BancoHorasService, calcular_delta_minutos
+from app.services.horario_resolver import ResolvedorHorarios
+from app.services.montador_turnos import TurnosMontados, intervalo_corte, montar_turnos
+from app.services.ponto_processor import (
+    CalculadoraHorasExtras, classificar_dia, faixa_batidas_processadas, impressao_entradas,
+    linhas_batidas_processadas, versao_regras
+)
+from app.services.regras_calculo import carregar_regras
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class RecalculoData:
+    """Recalcula o espelho de ponto de uma data para todos os servidores afetados."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recalcular(self, data: date) -> Dict[str, Any]:
+        """
+        Recalcula a data para os servidores ativos e para os que já têm resumo
+        gravado nela. Dias cuja impressão das entradas não mudou são apenas
+        desmarcados como desatualizados.
+
+        Args:
+            data: Data a recalcular
+
+        Returns:
+            Servidores avaliados, dias regravados e inalterados e a duração
+        """
+        inicio = relogio.perf_counter()
+        vespera = data - timedelta(days=1)
+
+        # Resumos gravados na data
+        resumos = {
+            resumo.servidor_id: resumo for resumo in self.db.query(
+                ResumoDiario.servidor_id, ResumoDiario.hash_entradas, ResumoDiario.desatualizado
+            ).filter(ResumoDiario.data == data)
+        }
+
+        secretaria_por_servidor: Dict[int, Optional[int]] = dict(
+            self.db.query(Servidor.id, Servidor.secretaria_id).filter(
+                or_(Servidor.ativo == True, Servidor.id.in_(
+                    self.db.query(ResumoDiario.servidor_id).filter(ResumoDiario.data == data)
+                ))
+            ).all()
+        )
+
+        resolvedor = ResolvedorHorarios(self.db).carregar(secretaria_por_servidor, vespera, data)
+        feriado = self.db.query(Feriado.id).filter(Feriado.data == data, Feriado.ativo == True).first() is not None
+
+        justificativas: Dict[int, List] = {}
+        for justificativa in self.db.query(
+            Justificativa.servidor_id, Justificativa.id, Justificativa.status, Justificativa.tipo,
+            Justificativa.descricao, Justificativa.updated_at
+        ).filter(Justificativa.data == data).order_by(Justificativa.id):
+            justificativas.setdefault(justificativa.servidor_id, []).append(justificativa)
+
+        # Calculadora e versão das regras por secretaria
+        calculadoras: Dict[Optional[int], tuple] = {}
+        cortes: Dict[object, int] = {}
+
+        def corte_para(servidor_id: int, dia: date) -> int:
+            horario = resolvedor.resolver(servidor_id, dia)
+            chave = None if horario is None else (horario.origem if horario.origem is not None else id(horario))
+            corte = cortes.get(chave)
+            if corte is None:
+                corte = cortes[chave] = intervalo_corte(horario)
+            return corte
+
+        resultados: List[Dict[str, Any]] = []
+        inalterados: List[int] = []
+
+        def recalcular_servidor(servidor_id: int, turnos: TurnosMontados,
+                                ids_originais: Dict[datetime, List[int]]):
+            sec_id = secretaria_por_servidor[servidor_id]
+            par = calculadoras.get(sec_id)
+            if par is None:
+                regras = carregar_regras(self.db, sec_id)
+                par = calculadoras[sec_id] = (
+                    CalculadoraHorasExtras(feriados=[data] if feriado else [], regras=regras),
+                    versao_regras(regras),
+                )
+            calculadora, versao = par
+
+            horario = resolvedor.resolver(servidor_id, data)
+            turno = turnos.get(data)
+            horarios = turno.horarios if turno is not None else []
+            cauda = turnos.caudas.get(data)
+            justificativas_dia = justificativas.get(servidor_id, [])
+
+            impressao = impressao_entradas(horarios, cauda, justificativas_dia, feriado, horario, versao)
+            resumo = resumos.get(servidor_id)
+            if resumo is not None and resumo.hash_entradas == impressao:
+                if resumo.desatualizado:
+                    inalterados.append(servidor_id)
+                return
+
+            is_dia_especial = calculadora._is_dia_especial(data, horario)
+            if horarios:
+                apuracao = calculadora._pipeline(horario).apurar(turno.minutos, is_dia_especial)
+                trabalhados, extras = apuracao.trabalhados, apuracao.extras
+                faltantes, noturnos = apuracao.faltantes, apuracao.noturnos
+                inconsistente = apuracao.inconsistente
+            else:
+                trabalhados = extras = noturnos = 0
+                inconsistente = False
+                jornada = horario.jornada_minutos if horario is not None else calculadora.jornada_minutos
+                faltantes = 0 if is_dia_especial else jornada
+
+            justificativa = next((j for j in justificativas_dia if j.status == "aprovada"), None)
+            status, observacao, justificativa_id = classificar_dia(
+                bool(horarios), is_dia_especial, justificativa, faltantes, inconsistente
+            )
+            resultados.append({
+                "servidor_id": servidor_id,
+                "data": data,
+                "minutos_trabalhados": trabalhados,
+                "minutos_extras": extras,
+                "minutos_faltantes": faltantes,
+                "minutos_noturnos": noturnos,
+                "status": status,
+                "justificativa_id": justificativa_id,
+                "observacao": observacao[:200],
+                "desatualizado": False,
+                "hash_entradas": impressao,
+                "_horarios": horarios,
+                "_cauda": cauda,
+                "_ids_originais": ids_originais,
+            })
+
+        # Batidas da véspera ao dia seguinte, lidas uma única vez em ordem de servidor e horário
+        batidas = self.db.query(BatidaOriginal.servidor_id, BatidaOriginal.data_hora, BatidaOriginal.id).filter(
+            BatidaOriginal.data_hora >= datetime.combine(vespera, time.min),
+            BatidaOriginal.data_hora < datetime.combine(data + timedelta(days=2), time.min)
+        ).order_by(BatidaOriginal.servidor_id, BatidaOriginal.data_hora, BatidaOriginal.id).yield_per(10000)
+
+        sem_batidas = set(secretaria_por_servidor)
+        for servidor_id, linhas in groupby(batidas, key=lambda linha: linha[0]):
+            if servidor_id not in secretaria_por_servidor:
+                continue
+            sem_batidas.discard(servidor_id)
+            # IDs das originais por horário, para vincular as batidas processadas regravadas
+            horarios: List[datetime] = []
+            ids_originais: Dict[datetime, List[int]] = {}
+            for _, data_hora, batida_id in linhas:
+                horarios.append(data_hora)
+                ids_originais.setdefault(data_hora, []).append(batida_id)
+            recalcular_servidor(servidor_id, montar_turnos(
+                iter(horarios),
+                lambda dia, servidor_id=servidor_id: corte_para(servidor_id, dia)
+            ), ids_originais)
+        for servidor_id in sem_batidas:
+            recalcular_servidor(servidor_id, TurnosMontados(), {})
+
+        self._gravar(data, resultados)
+        if inalterados:
+            self.db.query(ResumoDiario).filter(
+                ResumoDiario.data == data,
+                ResumoDiario.servidor_id.in_(inalterados)
+            ).update({ResumoDiario.desatualizado: False}, synchronize_session=False)
+        self.db.commit()
+
+        duracao = relogio.perf_counter() - inicio
+        logger.info(
+            f"Recálculo de {data}: {len(secretaria_por_servidor)} servidor(es), "
+            f"{len(resultados)} dia(s) regravado(s) em {duracao:.2f}s"
+        )
+        return {
+            "data": data.isoformat(),
+            "servidores": len(secretaria_por_servidor),
+            "recalculados": len(resultados),
+            "inalterados": len(secretaria_por_servidor) - len(resultados),
+            "duracao_segundos": round(duracao, 3),
+        }
+
+    def _gravar(self, data: date, resultados: List[Dict[str, Any]]) -> None:
+        """
+        Grava em lote os resumos, as batidas processadas e o banco de horas
+        dos dias recalculados. Não faz commit.
+        """
+        if not resultados:
+            return
+
+        colunas = [c for c in resultados[0] if not c.startswith("_")]
+        stmt = insert(ResumoDiario)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[ResumoDiario.servidor_id, ResumoDiario.data],
+            set_={
+                **{coluna: stmt.excluded[coluna] for coluna in colunas if coluna not in ("servidor_id", "data")},
+                "processado_em": func.now(),
+                "updated_at": func.now(),
+            }
+        ), [{coluna: r[coluna] for coluna in colunas} for r in resultados])
+
+        # Faixa do turno de cada servidor, a mesma regravada por PontoProcessor
+        faixas = [faixa_batidas_processadas(data, r["_horarios"], r["_cauda"]) for r in resultados]
+        meia_noite = faixas[0][0]
+        fins = [fim for _, _, fim in faixas]
+        # Os limites constantes de data_hora podam o DELETE para as partições do dia
+        self.db.execute(text("""
+            DELETE FROM ponto.batidas_processadas b
+            USING unnest(CAST(:servidor_ids AS integer[]), CAST(:caudas AS timestamp[]),
+                         CAST(:fins AS timestamp[])) AS f(servidor_id, cauda, fim)
+            WHERE b.servidor_id = f.servidor_id
+              AND b.data_hora >= :meia_noite
+              AND b.data_hora <= :fim_maximo
+              AND (f.cauda IS NULL OR b.data_hora > f.cauda)
+              AND b.data_hora <= f.fim
+        """), {
+            "servidor_ids": [r["servidor_id"] for r in resultados],
+            "caudas": [cauda for _, cauda, _ in faixas],
+            "fins": fins,
+            "meia_noite": meia_noite,
+            "fim_maximo": max(fins),
+        })
+
+        batidas = [
+            linha
+            for r in resultados
+            for linha in linhas_batidas_processadas(
+                r["servidor_id"], r["_horarios"], r["status"], r["justificativa_id"], r["_ids_originais"]
+            )
+        ]
+        if batidas:
+            self.db.execute(insert(BatidaProcessada), batidas)
+
+        BancoHorasService(self.db).registrar_deltas(data, {
+            r["servidor_id"]: calcular_delta_minutos(r["status"], r["minutos_extras"], r["minutos_faltantes"])
+            for r in resultados
+        })
@@ -0,0 +1,430 @@
+# app/services/regras_calculo.py
+"""
+Regras de apuração do ponto.
+
+A configuração declarativa (RegrasCalculo) fica em ponto.configuracoes_sistema:
+a chave "regras_calculo" traz o padrão global e "regras_calculo.secretaria.{id}"
+sobrescreve campos para uma secretaria. Para cada par (regras, horário) as
+regras são compiladas uma única vez em uma cadeia de funções com as constantes
+já resolvidas (jornada, intervalo, tolerâncias, tetos) e em uma tabela de
+minutos noturnos; a apuração de um dia apenas executa essas funções.
+"""
+from array import array
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from app.models.configuracao_sistema import ConfiguracaoSistema
+from app.schemas.regras_calculo import RegrasCalculo, SemanaDsr, ApuracaoMensal
+from app.services.pareamento_batidas import Pareador, criar_pareador
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+CHAVE_REGRAS_GLOBAIS = "regras_calculo"
+CHAVE_REGRAS_SECRETARIA = "regras_calculo.secretaria.{}"
+
+# Minutos cobertos pelas batidas de um dia (batidas após a meia-noite passam de 1440)
+MINUTOS_DOIS_DIAS = 2 * 1440
+
+class ApuracaoDia:
+    """Resultado da apuração de um dia, em minutos."""
+
+    __slots__ = ("trabalhados", "diferenca", "extras", "faltantes", "excedentes", "noturnos",
+                 "descartadas", "inferidas", "inconsistente")
+
+    def __init__(self):
+        self.trabalhados = 0
+        self.diferenca = 0
+        self.extras = 0
+        self.faltantes = 0
+        self.excedentes = 0  # Horas extras acima do teto diário (não computadas)
+        self.noturnos = 0
+        self.descartadas = 0  # Batidas repetidas ou sem par desconsideradas
+        self.inferidas = 0  # Batidas completadas pelo horário previsto
+        self.inconsistente = False  # Pareamento sinalizado para revisão
+
+Etapa = Callable[[ApuracaoDia, array], None]
+
+class PipelineRegras:
+    """Cadeia de etapas compiladas para um par (regras, horário)."""
+
+    __slots__ = ("jornada_minutos", "_etapas_util", "_etapas_especial", "_pareador")
+
+    def __init__(self, jornada_minutos: int, etapas_util: Tuple[Etapa, ...], etapas_especial: Tuple[Etapa, ...],
+                 pareador: Optional[Pareador] = None):
+        self.jornada_minutos = jornada_minutos
+        self._etapas_util = etapas_util
+        self._etapas_especial = etapas_especial
+        # None na configuração legada: as etapas ignoram a última batida de quantidade ímpar
+        self._pareador = pareador
+
+    @property
+    def pareia(self) -> bool:
+        return self._pareador is not None
+
+    def apurar(self, minutos: array, dia_especial: bool) -> ApuracaoDia:
+        """
+        Apura um dia.
+
+        Args:
+            minutos: Batidas do dia em minutos desde a meia-noite, em ordem
+            dia_especial: Feriado, folga ou descanso semanal (todo o trabalho é extra)
+        """
+        apuracao = ApuracaoDia()
+        if self._pareador is not None:
+            pareamento = self._pareador(minutos)
+            minutos = pareamento.minutos
+            apuracao.descartadas = pareamento.descartadas
+            apuracao.inferidas = pareamento.inferidas
+            apuracao.inconsistente = pareamento.inconsistente
+        for etapa in (self._etapas_especial if dia_especial else self._etapas_util):
+            etapa(apuracao, minutos)
+        return apuracao
+
+    def apurar_lote(self, dias: Iterable[Tuple[array, bool]]) -> List[ApuracaoDia]:
+        """
+        Apura vários dias com o mesmo pipeline (ex.: o mês de um servidor com o mesmo horário).
+
+        Args:
+            dias: Pares (minutos, dia_especial)
+
+        Returns:
+            Apuração de cada dia, na mesma ordem
+        """
+        apurar = self.apurar
+        return [apurar(minutos, dia_especial) for minutos, dia_especial in dias]
+
+def _minuto_do_dia(t) -> int:
+    return t.hour * 60 + t.minute
+
+def _tabela_noturna(inicio: int, fim: int) -> array:
+    """
+    Soma de prefixo dos minutos noturnos em dois dias consecutivos:
+    tabela[k] = minutos noturnos em [0, k). A sobreposição de um par
+    entrada/saída com o período noturno é tabela[saida] - tabela[entrada].
+    """
+    tabela = array("i", [0]) * (MINUTOS_DOIS_DIAS + 1)
+    acumulado = 0
+    for k in range(MINUTOS_DOIS_DIAS):
+        minuto = k % 1440
+        noturno = (inicio <= minuto < fim) if inicio < fim else (minuto >= inicio or minuto < fim)
+        acumulado += noturno
+        tabela[k + 1] = acumulado
+    return tabela
+
+def compilar(regras: RegrasCalculo, horario=None) -> PipelineRegras:
+    """
+    Compila as regras para um horário.
+
+    Args:
+        regras: Configuração de regras
+        horario: HorarioTrabalho previsto (None para quem não tem horário cadastrado)
+
+    Returns:
+        Pipeline pronto para apurar dias
+    """
+    if horario is not None:
+        jornada = horario.jornada_minutos
+        esperado = horario.minutos
+        # O intervalo previsto no horário pode reduzir, mas não ampliar, o mínimo exigido
+        intervalo_previsto = horario.intervalo_minutos
+        if intervalo_previsto is None or intervalo_previsto > regras.intervalo_minimo_minutos:
+            intervalo_minimo = regras.intervalo_minimo_minutos
+        else:
+            intervalo_minimo = intervalo_previsto
+    else:
+        jornada = regras.jornada_padrao_minutos
+        esperado = None
+        intervalo_minimo = regras.intervalo_minimo_minutos
+
+    # Minutos trabalhados: soma dos pares completos menos a falta de intervalo mínimo
+    if intervalo_minimo:
+        def trabalhados(ap: ApuracaoDia, m: array):
+            n = len(m) - len(m) % 2
+            total = 0
+            for i in range(0, n, 2):
+                total += m[i + 1] - m[i]
+            for i in range(2, n, 2):
+                intervalo = m[i] - m[i - 1]
+                if intervalo < intervalo_minimo:
+                    total -= intervalo_minimo - intervalo
+            ap.trabalhados = total
+            ap.diferenca = total - jornada
+    else:
+        def trabalhados(ap: ApuracaoDia, m: array):
+            n = len(m) - len(m) % 2
+            total = 0
+            for i in range(0, n, 2):
+                total += m[i + 1] - m[i]
+            ap.trabalhados = total
+            ap.diferenca = total - jornada
+
+    etapas_util: List[Etapa] = [trabalhados]
+    etapas_especial: List[Etapa] = [trabalhados]
+
+    # Intervalo não registrado: jornada longa em um único par perde o intervalo mínimo
+    pareamento = regras.pareamento
+    if pareamento.descontar_intervalo_nao_registrado and intervalo_minimo:
+        exige_intervalo = pareamento.jornada_exige_intervalo_minutos
+
+        def intervalo_nao_registrado(ap: ApuracaoDia, m: array):
+            if len(m) - len(m) % 2 == 2 and ap.trabalhados > exige_intervalo:
+                ap.trabalhados -= intervalo_minimo
+                ap.diferenca -= intervalo_minimo
+        etapas_util.append(intervalo_nao_registrado)
+        etapas_especial.append(intervalo_nao_registrado)
+
+    # Tolerância (CLT art. 58 §1º): variações de até N minutos por batida, limitadas
+    # a M minutos no dia, não são computadas como extras nem como faltas
+    tolerancia_batida = regras.tolerancia_batida_minutos
+    tolerancia_diaria = regras.tolerancia_diaria_minutos
+    if tolerancia_diaria:
+        if esperado:
+            quantidade_esperada = len(esperado)
+
+            def tolerancia(ap: ApuracaoDia, m: array):
+                if len(m) != quantidade_esperada:
+                    return
+                variacao_total = 0
+                for i in range(quantidade_esperada):
+                    variacao = m[i] - esperado[i]
+                    if variacao < 0:
+                        variacao = -variacao
+                    if variacao > tolerancia_batida:
+                        return
+                    variacao_total += variacao
+                if variacao_total <= tolerancia_diaria:
+                    ap.diferenca = 0
+        else:
+            # Sem horário previsto por batida, aplica a tolerância diária sobre o saldo do dia
+            def tolerancia(ap: ApuracaoDia, m: array):
+                if -tolerancia_diaria <= ap.diferenca <= tolerancia_diaria:
+                    ap.diferenca = 0
+        etapas_util.append(tolerancia)
+
+    def saldo_util(ap: ApuracaoDia, m: array):
+        if ap.diferenca >= 0:
+            ap.extras = ap.diferenca
+        else:
+            ap.faltantes = -ap.diferenca
+    etapas_util.append(saldo_util)
+
+    def saldo_especial(ap: ApuracaoDia, m: array):
+        ap.extras = ap.trabalhados
+    etapas_especial.append(saldo_especial)
+
+    # Teto diário de horas extras da secretaria
+    limite_diario = regras.limite_extras_diario_minutos
+    if limite_diario is not None:
+        def teto_diario(ap: ApuracaoDia, m: array):
+            if ap.extras > limite_diario:
+                ap.excedentes = ap.extras - limite_diario
+                ap.extras = limite_diario
+        etapas_util.append(teto_diario)
+        etapas_especial.append(teto_diario)
+
+    # Adicional noturno (CLT art. 73), por tabela de soma de prefixo
+    noturno = regras.adicional_noturno
+    if noturno.ativo:
+        tabela = _tabela_noturna(_minuto_do_dia(noturno.inicio), _minuto_do_dia(noturno.fim))
+        limite_tabela = MINUTOS_DOIS_DIAS
+        hora_reduzida = noturno.hora_reduzida
+
+        def minutos_noturnos(ap: ApuracaoDia, m: array):
+            n = len(m) - len(m) % 2
+            total = 0
+            for i in range(0, n, 2):
+                entrada = m[i] if m[i] < limite_tabela else limite_tabela
+                saida = m[i + 1] if m[i + 1] < limite_tabela else limite_tabela
+                total += tabela[saida] - tabela[entrada]
+            # Hora noturna reduzida: 52min30s equivalem a uma hora (fator 60/52,5 = 8/7)
+            ap.noturnos = total * 8 // 7 if hora_reduzida else total
+        etapas_util.append(minutos_noturnos)
+        etapas_especial.append(minutos_noturnos)
+
+    pareador = criar_pareador(pareamento, esperado or None)
+    return PipelineRegras(jornada, tuple(etapas_util), tuple(etapas_especial), pareador)
+
+def regras_legadas(jornada_minutos: int, intervalo_minimo: int) -> RegrasCalculo:
+    """Regras equivalentes ao cálculo original: sem tolerâncias, tetos nem adicional noturno."""
+    return RegrasCalculo(
+        jornada_padrao_minutos=jornada_minutos,
+        intervalo_minimo_minutos=intervalo_minimo,
+        tolerancia_batida_minutos=0,
+        tolerancia_diaria_minutos=0,
+        adicional_noturno={"ativo": False},
+    )
+
+def _mesclar(base: Dict[str, Any], sobrescrita: Dict[str, Any]) -> Dict[str, Any]:
+    """Mescla recursivamente a configuração da secretaria sobre a global."""
+    resultado = dict(base)
+    for chave, valor in sobrescrita.items():
+        if isinstance(valor, dict) and isinstance(resultado.get(chave), dict):
+            resultado[chave] = _mesclar(resultado[chave], valor)
+        else:
+            resultado[chave] = valor
+    return resultado
+
+def carregar_regras(db: Session, secretaria_id: Optional[int]) -> RegrasCalculo:
+    """
+    Carrega as regras vigentes para a secretaria (global + sobrescrita da secretaria).
+
+    Args:
+        db: Sessão do banco de dados
+        secretaria_id: ID da secretaria (None usa apenas as regras globais)
+
+    Returns:
+        Regras validadas
+    """
+    chaves = [CHAVE_REGRAS_GLOBAIS]
+    if secretaria_id is not None:
+        chaves.append(CHAVE_REGRAS_SECRETARIA.format(secretaria_id))
+
+    valores = dict(
+        db.query(ConfiguracaoSistema.chave, ConfiguracaoSistema.valor)
+        .filter(ConfiguracaoSistema.chave.in_(chaves))
+        .all()
+    )
+
+    configuracao: Dict[str, Any] = {}
+    for chave in chaves:
+        if valores.get(chave):
+            configuracao = _mesclar(configuracao, json.loads(valores[chave]))
+    return RegrasCalculo(**configuracao)
+
+def salvar_regras_secretaria(db: Session, secretaria_id: int, configuracao: Dict[str, Any],
+                             usuario: Optional[str] = None) -> RegrasCalculo:
+    """
+    Grava a sobrescrita de regras de uma secretaria e retorna as regras efetivas.
+    Não faz commit.
+
+    Raises:
+        ValueError: Se a configuração resultante for inválida
+    """
+    chave = CHAVE_REGRAS_SECRETARIA.format(secretaria_id)
+    valor = json.dumps(configuracao, default=str)
+    stmt = insert(ConfiguracaoSistema).values(
+        chave=chave,
+        valor=valor,
+        tipo="json",
+        descricao=f"Regras de apuração do ponto da secretaria {secretaria_id}",
+        atualizado_por=usuario,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConfiguracaoSistema.chave],
+        set_={"valor": valor, "atualizado_por": usuario, "atualizado_em": func.now(), "updated_at": func.now()}
+    )
+    db.execute(stmt)
+    return carregar_regras(db, secretaria_id)
+
+def apurar_semanas(dias: List[Tuple[date, bool, str, int, int]], regras: RegrasCalculo) -> List[SemanaDsr]:
+    """
+    Apura o DSR por semana (segunda a domingo) a partir dos dias do espelho.
+
+    Args:
+        dias: Tuplas (data, descanso, status, minutos_trabalhados, minutos_extras), em ordem de data
+        regras: Regras da secretaria
+
+    Returns:
+        Apuração de cada semana
+    """
+    semanas: List[SemanaDsr] = []
+    if not regras.dsr.ativo:
+        return semanas
+
+    por_semana: Dict[date, List[Tuple[date, bool, str, int, int]]] = {}
+    for dia in dias:
+        por_semana.setdefault(dia[0] - timedelta(days=dia[0].weekday()), []).append(dia)
+
+    for inicio, dias_semana in sorted(por_semana.items()):
+        dias_descanso = sum(1 for _, descanso, _, _, _ in dias_semana if descanso)
+        dias_uteis = len(dias_semana) - dias_descanso
+        faltas = sum(
+            1 for _, descanso, status, trabalhados, _ in dias_semana
+            if not descanso and status == "irregular" and trabalhados == 0
+        )
+        extras = sum(d[4] for d in dias_semana)
+        dsr_devido = not (regras.dsr.perde_com_falta_injustificada and faltas > 0)
+        reflexo = 0
+        if regras.dsr.reflexo_horas_extras and dsr_devido and dias_uteis > 0:
+            reflexo = extras * dias_descanso // dias_uteis
+
+        semanas.append(SemanaDsr(
+            inicio=dias_semana[0][0],
+            fim=dias_semana[-1][0],
+            dias_uteis=dias_uteis,
+            dias_descanso=dias_descanso,
+            faltas_injustificadas=faltas,
+            dsr_devido=dsr_devido,
+            minutos_extras=extras,
+            reflexo_dsr_minutos=reflexo,
+        ))
+    return semanas
+
+def apurar_mes(db: Session, servidor_id: int, ano: int, mes: int) -> ApuracaoMensal:
+    """
+    Apura o mês de um servidor: totais, teto mensal de horas extras e DSR.
+
+    Raises:
+        ValueError: Se o servidor não existir
+    """
+    # Importações locais: estes serviços dependem do processador, que depende deste módulo
+    from app.models.feriado import Feriado
+    from app.models.servidor import Servidor
+    from app.services.horario_resolver import ResolvedorHorarios
+    from app.services.resumo_diario_service import ResumoDiarioService
+
+    servidor = db.query(Servidor).filter(Servidor.id == servidor_id).first()
+    if not servidor:
+        raise ValueError(f"Servidor com ID {servidor_id} não encontrado")
+
+    periodo_inicio = date(ano, mes, 1)
+    periodo_fim = date(ano, mes, monthrange(ano, mes)[1])
+
+    regras = carregar_regras(db, servidor.secretaria_id)
+    resumos = ResumoDiarioService(db).obter_espelho(servidor_id, periodo_inicio, periodo_fim)
+    feriados = {
+        f for (f,) in db.query(Feriado.data).filter(
+            Feriado.data >= periodo_inicio, Feriado.data <= periodo_fim, Feriado.ativo == True
+        )
+    }
+    resolvedor = ResolvedorHorarios(db).carregar([servidor_id], periodo_inicio, periodo_fim)
+    descanso_semana = set(regras.dias_semana_descanso)
+
+    def is_descanso(data: date) -> bool:
+        if data in feriados:
+            return True
+        horario = resolvedor.resolver(servidor_id, data)
+        if horario is not None:
+            return not horario.minutos
+        return data.weekday() in descanso_semana
+
+    dias = [
+        (r.data, is_descanso(r.data), r.status, r.minutos_trabalhados, r.minutos_extras)
+        for r in resumos
+    ]
+    semanas = apurar_semanas(dias, regras)
+
+    total_extras = sum(r.minutos_extras for r in resumos)
+    limite = regras.limite_extras_mensal_minutos
+    extras_computadas = total_extras if limite is None else min(total_extras, limite)
+
+    return ApuracaoMensal(
+        servidor_id=servidor_id,
+        ano=ano,
+        mes=mes,
+        minutos_trabalhados=sum(r.minutos_trabalhados for r in resumos),
+        minutos_extras=extras_computadas,
+        minutos_extras_excedentes=total_extras - extras_computadas,
+        minutos_faltantes=sum(r.minutos_faltantes for r in resumos),
+        minutos_noturnos=sum(r.minutos_noturnos or 0 for r in resumos),
+        semanas=semanas,
+        reflexo_dsr_minutos=sum(s.reflexo_dsr_minutos for s in semanas),
+    )
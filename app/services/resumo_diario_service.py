@@ -0,0 +1,166 @@
+# app/services/resumo_diario_service.py
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+import logging
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.resumo_diario import ResumoDiario
+from app.models.servidor import Servidor
+from app.services.ponto_processor import PontoProcessor
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class ResumoDiarioService:
+    """
+    Mantém o espelho de ponto materializado (ponto.resumos_diarios).
+
+    Alterações em batidas, justificativas e feriados apenas marcam os dias
+    afetados como desatualizados; a leitura do espelho recalcula somente esses
+    dias (e os que ainda não foram processados) e devolve o restante direto da
+    tabela, com uma leitura por faixa de datas no índice (servidor_id, data).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def invalidar_dia(self, servidor_id: int, data: date) -> int:
+        """
+        Marca o resumo de um dia de um servidor como desatualizado.
+
+        Args:
+            servidor_id: ID do servidor
+            data: Data afetada
+
+        Returns:
+            Quantidade de resumos marcados
+        """
+        return self.invalidar_dias([(servidor_id, data)])
+
+    def invalidar_dias(self, dias: Iterable[Tuple[int, date]]) -> int:
+        """
+        Marca como desatualizados os resumos de vários pares (servidor, data).
+
+        Args:
+            dias: Pares (servidor_id, data) afetados
+
+        Returns:
+            Quantidade de resumos marcados
+        """
+        dias = list(set(dias))
+        if not dias:
+            return 0
+
+        return self.db.query(ResumoDiario).filter(
+            tuple_(ResumoDiario.servidor_id, ResumoDiario.data).in_(dias),
+            ResumoDiario.desatualizado == False
+        ).update({ResumoDiario.desatualizado: True}, synchronize_session=False)
+
+    def invalidar_batidas(self, batidas: Iterable[Tuple[int, datetime]]) -> int:
+        """
+        Marca como desatualizados os dias afetados por batidas incluídas ou removidas.
+
+        Uma batida pode pertencer ao turno iniciado na véspera (plantão que
+        atravessa a meia-noite), por isso a véspera também é marcada.
+
+        Args:
+            batidas: Pares (servidor_id, data_hora) das batidas
+
+        Returns:
+            Quantidade de resumos marcados
+        """
+        dias = set()
+        for servidor_id, data_hora in batidas:
+            data = data_hora.date()
+            dias.add((servidor_id, data))
+            dias.add((servidor_id, data - timedelta(days=1)))
+        return self.invalidar_dias(dias)
+
+    def invalidar_data(self, data: date) -> int:
+        """
+        Marca como desatualizados os resumos de todos os servidores em uma data
+        (usado quando um feriado é criado, alterado ou removido).
+
+        Args:
+            data: Data afetada
+
+        Returns:
+            Quantidade de resumos marcados
+        """
+        return self.db.query(ResumoDiario).filter(
+            ResumoDiario.data == data,
+            ResumoDiario.desatualizado == False
+        ).update({ResumoDiario.desatualizado: True}, synchronize_session=False)
+
+    def invalidar_secretaria(self, secretaria_id: int, a_partir_de: date) -> Dict[int, List[date]]:
+        """
+        Marca como desatualizados os resumos dos servidores de uma secretaria a
+        partir de uma data (usado quando as regras de apuração mudam).
+
+        Args:
+            secretaria_id: ID da secretaria
+            a_partir_de: Primeira data afetada
+
+        Returns:
+            Datas marcadas por servidor, em ordem
+        """
+        marcados = self.db.execute(
+            update(ResumoDiario).where(
+                ResumoDiario.servidor_id.in_(
+                    select(Servidor.id).where(Servidor.secretaria_id == secretaria_id)
+                ),
+                ResumoDiario.data >= a_partir_de,
+                ResumoDiario.desatualizado == False
+            ).values(desatualizado=True).returning(ResumoDiario.servidor_id, ResumoDiario.data),
+            execution_options={"synchronize_session": False}
+        )
+
+        dias: Dict[int, List[date]] = {}
+        for servidor_id, data in marcados:
+            dias.setdefault(servidor_id, []).append(data)
+        for datas in dias.values():
+            datas.sort()
+        return dias
+
+    def obter_espelho(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> List[ResumoDiario]:
+        """
+        Retorna o espelho de ponto de um servidor no período, recalculando
+        apenas os dias ausentes ou desatualizados.
+
+        Args:
+            servidor_id: ID do servidor
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+
+        Returns:
+            Lista de resumos diários ordenada por data
+        """
+        resumos = self._buscar_resumos(servidor_id, periodo_inicio, periodo_fim)
+        atualizados = {resumo.data for resumo in resumos if not resumo.desatualizado}
+
+        total_dias = (periodo_fim - periodo_inicio).days + 1
+        pendentes = [
+            periodo_inicio + timedelta(days=i)
+            for i in range(total_dias)
+            if periodo_inicio + timedelta(days=i) not in atualizados
+        ]
+
+        if not pendentes:
+            return resumos
+
+        logger.info(f"Recalculando {len(pendentes)} dia(s) do espelho do servidor {servidor_id}")
+        PontoProcessor(self.db).processar_dias(servidor_id, pendentes)
+
+        # Os resumos carregados antes do recálculo estão obsoletos na sessão
+        self.db.expire_all()
+        return self._buscar_resumos(servidor_id, periodo_inicio, periodo_fim)
+
+    def _buscar_resumos(self, servidor_id: int, periodo_inicio: date, periodo_fim: date) -> List[ResumoDiario]:
+        """Leitura por faixa no índice (servidor_id, data)."""
+        return self.db.query(ResumoDiario).filter(
+            ResumoDiario.servidor_id == servidor_id,
+            ResumoDiario.data >= periodo_inicio,
+            ResumoDiario.data <= periodo_fim
+        ).order_by(ResumoDiario.data).all()
@@ -0,0 +1,357 @@
+# app/services/sequencias_status.py
+"""
+Análise de sequências de faltas, atrasos e justificativas.
+
+O status diário de cada servidor é guardado por ano e por tipo como uma
+sequência de bits (um por dia do ano) codificada em comprimentos de corrida:
+uint16 alternados com a quantidade de dias sem e com a ocorrência, a partir
+de 1º de janeiro. Um ano típico cabe em poucas dezenas de bytes, e as
+consultas ("quem tem 3 ou mais faltas seguidas", "quem atrasou mais de 5
+vezes no mês") percorrem apenas as corridas, sem ler o espelho nem as
+batidas. Os dias de descanso (fim de semana, folga, feriado) também são
+guardados, para que não interrompam uma sequência de faltas.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import sys
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.batida import BatidaOriginal
+from app.models.feriado import Feriado
+from app.models.resumo_diario import ResumoDiario
+from app.models.sequencia_status import SequenciaStatus
+from app.models.servidor import Servidor
+from app.schemas.sequencia_status import OcorrenciasServidor
+from app.services.horario_resolver import ResolvedorHorarios
+from app.services.montador_turnos import intervalo_corte, montar_turnos
+from app.services.regras_calculo import carregar_regras
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+TIPOS_OCORRENCIA = ("falta", "atraso", "justificada")
+TIPO_DESCANSO = "descanso"
+
+Intervalo = Tuple[int, int]  # Ordinais de início e fim, inclusivos
+
+def codificar(bits: Iterable[int]) -> bytes:
+    """
+    Codifica os bits de um ano em comprimentos de corrida alternados,
+    começando pela corrida de zeros (que pode ser vazia).
+    """
+    corridas = array("H")
+    atual, comprimento = 0, 0
+    for bit in bits:
+        bit = 1 if bit else 0
+        if bit == atual:
+            comprimento += 1
+        else:
+            corridas.append(comprimento)
+            atual, comprimento = bit, 1
+    corridas.append(comprimento)
+    if sys.byteorder != "little":
+        corridas.byteswap()
+    return corridas.tobytes()
+
+def _corridas(sequencia: bytes) -> array:
+    corridas = array("H")
+    corridas.frombytes(sequencia)
+    if sys.byteorder != "little":
+        corridas.byteswap()
+    return corridas
+
+def decodificar(sequencia: bytes, dias_no_ano: int) -> bytearray:
+    """Bits do ano (um byte 0/1 por dia) a partir da sequência codificada."""
+    bits = bytearray(dias_no_ano)
+    posicao, bit = 0, 0
+    for comprimento in _corridas(sequencia):
+        if bit:
+            bits[posicao:posicao + comprimento] = b"\x01" * comprimento
+        posicao += comprimento
+        bit ^= 1
+    return bits
+
+def intervalos(sequencia: bytes, ano: int) -> List[Intervalo]:
+    """Intervalos de dias marcados, como ordinais, direto das corridas."""
+    resultado = []
+    posicao = date(ano, 1, 1).toordinal()
+    bit = 0
+    for comprimento in _corridas(sequencia):
+        if bit and comprimento:
+            resultado.append((posicao, posicao + comprimento - 1))
+        posicao += comprimento
+        bit ^= 1
+    return resultado
+
+def _recortar(lista: Iterable[Intervalo], inicio: int, fim: int) -> List[Intervalo]:
+    """Recorta os intervalos ao período e une os contíguos (ex.: 31/12 e 1º/01)."""
+    resultado: List[List[int]] = []
+    for a, b in sorted(lista):
+        a, b = max(a, inicio), min(b, fim)
+        if a > b:
+            continue
+        if resultado and a <= resultado[-1][1] + 1:
+            resultado[-1][1] = max(resultado[-1][1], b)
+        else:
+            resultado.append([a, b])
+    return [(a, b) for a, b in resultado]
+
+def maior_sequencia(ocorrencias: List[Intervalo], descansos: List[Intervalo]) -> Tuple[int, Optional[Intervalo]]:
+    """
+    Maior sequência de dias com ocorrência. Dois intervalos separados apenas
+    por dias de descanso formam uma só sequência; os dias de descanso não
+    entram na contagem.
+
+    Args:
+        ocorrencias: Intervalos recortados e unidos, em ordem
+        descansos: Intervalos de descanso recortados e unidos, em ordem
+
+    Returns:
+        Quantidade de dias da maior sequência e seu intervalo (do primeiro ao último dia com ocorrência)
+    """
+    inicios_descanso = [a for a, _ in descansos]
+    melhor, melhor_intervalo = 0, None
+    cadeia_inicio = cadeia_fim = None
+    cadeia_dias = 0
+    for a, b in ocorrencias:
+        if cadeia_fim is not None:
+            # A lacuna (cadeia_fim, a) é coberta por um único intervalo de descanso?
+            i = bisect_right(inicios_descanso, cadeia_fim + 1) - 1
+            if i >= 0 and descansos[i][1] >= a - 1:
+                cadeia_fim = b
+                cadeia_dias += b - a + 1
+            else:
+                cadeia_fim = None
+        if cadeia_fim is None:
+            cadeia_inicio, cadeia_fim, cadeia_dias = a, b, b - a + 1
+        if cadeia_dias > melhor:
+            melhor, melhor_intervalo = cadeia_dias, (cadeia_inicio, cadeia_fim)
+    return melhor, melhor_intervalo
+
+class AnaliseSequencias:
+    """Atualiza e consulta as sequências de status diário dos servidores."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def atualizar(self, periodo_inicio: date, periodo_fim: date, secretaria_id: Optional[int] = None) -> int:
+        """
+        Recalcula os bits dos dias do período a partir do espelho de ponto e
+        dos turnos montados, e regrava as sequências afetadas.
+
+        Falta é o dia irregular sem minutos trabalhados; atraso é o turno cuja
+        primeira batida passa do início previsto mais a tolerância por batida;
+        justificada é o status do espelho; descanso é feriado, folga do horário
+        ou dia de descanso das regras.
+
+        Args:
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            secretaria_id: Restringe aos servidores ativos da secretaria; todos quando None
+
+        Returns:
+            Quantidade de sequências gravadas
+        """
+        consulta = self.db.query(Servidor.id, Servidor.secretaria_id).filter(Servidor.ativo == True)
+        if secretaria_id is not None:
+            consulta = consulta.filter(Servidor.secretaria_id == secretaria_id)
+        secretaria_por_servidor: Dict[int, Optional[int]] = dict(consulta.all())
+        if not secretaria_por_servidor:
+            return 0
+
+        vespera = periodo_inicio - timedelta(days=1)
+        datas = [periodo_inicio + timedelta(days=i) for i in range((periodo_fim - periodo_inicio).days + 1)]
+        resolvedor = ResolvedorHorarios(self.db).carregar(secretaria_por_servidor, vespera, periodo_fim)
+        feriados = {
+            f for (f,) in self.db.query(Feriado.data).filter(
+                Feriado.data >= periodo_inicio, Feriado.data <= periodo_fim, Feriado.ativo == True
+            )
+        }
+        regras = {s: carregar_regras(self.db, s) for s in set(secretaria_por_servidor.values())}
+
+        # Dias marcados por (servidor, tipo), como ordinais
+        marcados: Dict[Tuple[int, str], Set[int]] = {}
+
+        def marcar(servidor_id: int, tipo: str, data: date):
+            marcados.setdefault((servidor_id, tipo), set()).add(data.toordinal())
+
+        for servidor_id, data, status, trabalhados in self.db.query(
+            ResumoDiario.servidor_id, ResumoDiario.data, ResumoDiario.status, ResumoDiario.minutos_trabalhados
+        ).filter(
+            ResumoDiario.data >= periodo_inicio,
+            ResumoDiario.data <= periodo_fim,
+            ResumoDiario.status.in_(("irregular", "justificada"))
+        ):
+            if servidor_id not in secretaria_por_servidor:
+                continue
+            if status == "justificada":
+                marcar(servidor_id, "justificada", data)
+            elif not trabalhados:
+                marcar(servidor_id, "falta", data)
+
+        cortes: Dict[object, int] = {}
+
+        def corte_para(servidor_id: int, data: date) -> int:
+            horario = resolvedor.resolver(servidor_id, data)
+            chave = None if horario is None else (horario.origem if horario.origem is not None else id(horario))
+            if chave not in cortes:
+                cortes[chave] = intervalo_corte(horario)
+            return cortes[chave]
+
+        for servidor_id in secretaria_por_servidor:
+            descanso_semana = regras[secretaria_por_servidor[servidor_id]].dias_semana_descanso
+            for data in datas:
+                horario = resolvedor.resolver(servidor_id, data)
+                if data in feriados or (not horario.minutos if horario is not None else data.weekday() in descanso_semana):
+                    marcar(servidor_id, TIPO_DESCANSO, data)
+
+        # Atrasos: primeira batida de cada turno contra o início previsto
+        batidas = self.db.query(BatidaOriginal.servidor_id, BatidaOriginal.data_hora).filter(
+            BatidaOriginal.data_hora >= datetime.combine(vespera, time.min),
+            BatidaOriginal.data_hora < datetime.combine(periodo_fim + timedelta(days=2), time.min)
+        ).order_by(BatidaOriginal.servidor_id, BatidaOriginal.data_hora).yield_per(10000)
+        for servidor_id, linhas in groupby(batidas, key=lambda linha: linha[0]):
+            if servidor_id not in secretaria_por_servidor:
+                continue
+            tolerancia = regras[secretaria_por_servidor[servidor_id]].tolerancia_batida_minutos
+            turnos = montar_turnos(
+                (data_hora for _, data_hora in linhas),
+                lambda data, servidor_id=servidor_id: corte_para(servidor_id, data)
+            )
+            for data, turno in turnos.turnos.items():
+                if data < periodo_inicio or data > periodo_fim or data in feriados:
+                    continue
+                horario = resolvedor.resolver(servidor_id, data)
+                if horario is not None and horario.minutos and turno.minutos[0] > horario.minutos[0] + tolerancia:
+                    marcar(servidor_id, "atraso", data)
+
+        return self._gravar(periodo_inicio, periodo_fim, list(secretaria_por_servidor), marcados)
+
+    def _gravar(self, periodo_inicio: date, periodo_fim: date, servidor_ids: List[int],
+                marcados: Dict[Tuple[int, str], Set[int]]) -> int:
+        """Mescla os bits do período nas sequências gravadas de cada ano e faz o upsert."""
+        gravadas = 0
+        for ano in range(periodo_inicio.year, periodo_fim.year + 1):
+            inicio_ano = date(ano, 1, 1).toordinal()
+            dias_no_ano = date(ano, 12, 31).toordinal() - inicio_ano + 1
+            inicio = max(periodo_inicio.toordinal(), inicio_ano) - inicio_ano
+            fim = min(periodo_fim.toordinal(), inicio_ano + dias_no_ano - 1) - inicio_ano
+
+            existentes = {
+                (servidor_id, tipo): sequencia
+                for servidor_id, tipo, sequencia in self.db.query(
+                    SequenciaStatus.servidor_id, SequenciaStatus.tipo, SequenciaStatus.sequencia
+                ).filter(SequenciaStatus.ano == ano, SequenciaStatus.servidor_id.in_(servidor_ids))
+            }
+
+            linhas = []
+            for servidor_id in servidor_ids:
+                for tipo in TIPOS_OCORRENCIA + (TIPO_DESCANSO,):
+                    chave = (servidor_id, tipo)
+                    dias = marcados.get(chave, ())
+                    if chave not in existentes and not dias:
+                        continue
+                    bits = decodificar(existentes[chave], dias_no_ano) if chave in existentes else bytearray(dias_no_ano)
+                    bits[inicio:fim + 1] = bytes(fim - inicio + 1)
+                    for ordinal in dias:
+                        posicao = ordinal - inicio_ano
+                        if 0 <= posicao < dias_no_ano:
+                            bits[posicao] = 1
+                    linhas.append({
+                        "servidor_id": servidor_id, "ano": ano, "tipo": tipo,
+                        "sequencia": codificar(bits), "dias": sum(bits),
+                    })
+
+            if linhas:
+                stmt = insert(SequenciaStatus)
+                self.db.execute(stmt.on_conflict_do_update(
+                    index_elements=[SequenciaStatus.servidor_id, SequenciaStatus.ano, SequenciaStatus.tipo],
+                    set_={"sequencia": stmt.excluded.sequencia, "dias": stmt.excluded.dias, "atualizado_em": func.now()}
+                ), linhas)
+                gravadas += len(linhas)
+
+        self.db.commit()
+        logger.info(f"Sequências de status {periodo_inicio} a {periodo_fim}: {gravadas} gravada(s)")
+        return gravadas
+
+    def consultar(self, tipo: str, periodo_inicio: date, periodo_fim: date,
+                  minimo_sequencia: int = 1, minimo_dias: int = 1,
+                  secretaria_id: Optional[int] = None, atravessar_descanso: bool = True,
+                  limit: int = 100) -> List[OcorrenciasServidor]:
+        """
+        Servidores com ocorrências do tipo no período, pela maior sequência e
+        pela quantidade de dias.
+
+        Args:
+            tipo: falta, atraso ou justificada
+            periodo_inicio: Data de início do período
+            periodo_fim: Data de fim do período
+            minimo_sequencia: Dias seguidos mínimos na maior sequência
+            minimo_dias: Quantidade mínima de dias no período
+            secretaria_id: Restringe aos servidores da secretaria
+            atravessar_descanso: Dias de descanso não interrompem a sequência
+            limit: Quantidade máxima de servidores retornados
+
+        Returns:
+            Servidores em ordem decrescente de maior sequência e de dias
+        """
+        if tipo not in TIPOS_OCORRENCIA:
+            raise ValueError(f"Tipo inválido: {tipo}. Use um de {', '.join(TIPOS_OCORRENCIA)}")
+
+        tipos = [tipo, TIPO_DESCANSO] if atravessar_descanso else [tipo]
+        consulta = self.db.query(
+            SequenciaStatus.servidor_id, SequenciaStatus.ano, SequenciaStatus.tipo, SequenciaStatus.sequencia
+        ).filter(
+            SequenciaStatus.tipo.in_(tipos),
+            SequenciaStatus.ano >= periodo_inicio.year,
+            SequenciaStatus.ano <= periodo_fim.year,
+            SequenciaStatus.dias > 0
+        )
+        if secretaria_id is not None:
+            consulta = consulta.join(Servidor, Servidor.id == SequenciaStatus.servidor_id) \
+                .filter(Servidor.secretaria_id == secretaria_id)
+
+        por_servidor: Dict[int, Dict[str, List[Intervalo]]] = {}
+        for servidor_id, ano, tipo_linha, sequencia in consulta:
+            por_servidor.setdefault(servidor_id, {}).setdefault(tipo_linha, []).extend(intervalos(sequencia, ano))
+
+        inicio, fim = periodo_inicio.toordinal(), periodo_fim.toordinal()
+        encontrados = []
+        for servidor_id, por_tipo in por_servidor.items():
+            if tipo not in por_tipo:
+                continue
+            ocorrencias = _recortar(por_tipo[tipo], inicio, fim)
+            total = sum(b - a + 1 for a, b in ocorrencias)
+            if total < minimo_dias or total < minimo_sequencia:
+                continue
+            descansos = _recortar(por_tipo.get(TIPO_DESCANSO, ()), inicio, fim)
+            sequencia_dias, intervalo = maior_sequencia(ocorrencias, descansos)
+            if sequencia_dias < minimo_sequencia:
+                continue
+            encontrados.append((servidor_id, sequencia_dias, intervalo, total))
+
+        encontrados.sort(key=lambda item: (-item[1], -item[3], item[0]))
+        encontrados = encontrados[:limit]
+        nomes = dict(
+            self.db.query(Servidor.id, Servidor.nome).filter(Servidor.id.in_([e[0] for e in encontrados]))
+        ) if encontrados else {}
+
+        return [
+            OcorrenciasServidor(
+                servidor_id=servidor_id,
+                nome=nomes.get(servidor_id),
+                tipo=tipo,
+                total_dias=total,
+                maior_sequencia=sequencia_dias,
+                sequencia_inicio=date.fromordinal(intervalo[0]),
+                sequencia_fim=date.fromordinal(intervalo[1]),
+            )
+            for servidor_id, sequencia_dias, intervalo, total in encontrados
+        ]
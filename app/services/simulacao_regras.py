@@ -0,0 +1,270 @@
+# app/services/simulacao_regras.py
+"""
+Simulação de regras de apuração ("e se") sobre um mês.
+
+As batidas do mês são lidas uma única vez, em ordem de servidor e horário, e
+cada turno montado é apurado lado a lado por duas calculadoras: a das regras
+vigentes da secretaria e a das mesmas regras com as sobrescritas propostas.
+Apenas os agregados das diferenças são retornados; nada é gravado.
+"""
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import time as relogio
+
+from sqlalchemy.orm import Session
+
+from app.models.batida import BatidaOriginal
+from app.models.feriado import Feriado
+from app.models.justificativa import Justificativa
+from app.models.servidor import Servidor
+from app.schemas.regras_calculo import (
+    RegrasCalculo, SimulacaoRegrasResultado, SimulacaoSecretaria, TotaisSimulacao
+)
+from app.services.horario_resolver import ResolvedorHorarios
+from app.services.montador_turnos import TurnosMontados, intervalo_corte, montar_turnos
+from app.services.ponto_processor import CalculadoraHorasExtras, classificar_dia
+from app.services.regras_calculo import _mesclar, carregar_regras
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class _Totais:
+    """Acumulador dos totais de um dos lados da simulação."""
+
+    __slots__ = ("trabalhados", "extras", "excedentes", "faltantes", "noturnos", "irregulares", "justificados")
+
+    def __init__(self):
+        self.trabalhados = 0
+        self.extras = 0
+        self.excedentes = 0
+        self.faltantes = 0
+        self.noturnos = 0
+        self.irregulares = 0
+        self.justificados = 0
+
+    def somar(self, outro: "_Totais"):
+        for campo in self.__slots__:
+            setattr(self, campo, getattr(self, campo) + getattr(outro, campo))
+
+    def aplicar_teto_mensal(self, limite: Optional[int]):
+        """Move para os excedentes as horas extras do mês acima do teto."""
+        if limite is not None and self.extras > limite:
+            self.excedentes += self.extras - limite
+            self.extras = limite
+
+    def schema(self) -> TotaisSimulacao:
+        return TotaisSimulacao(
+            minutos_trabalhados=self.trabalhados,
+            minutos_extras=self.extras,
+            minutos_extras_excedentes=self.excedentes,
+            minutos_faltantes=self.faltantes,
+            minutos_noturnos=self.noturnos,
+            dias_irregulares=self.irregulares,
+            dias_justificados=self.justificados,
+        )
+
+    def igual(self, outro: "_Totais") -> bool:
+        return all(getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+def _apurar_dia(calculadora: CalculadoraHorasExtras, data: date, horario, minutos, justificativa,
+                totais: _Totais) -> str:
+    """Apura um dia com a calculadora, acumula nos totais e retorna o status."""
+    is_dia_especial = calculadora._is_dia_especial(data, horario)
+    inconsistente = False
+    if minutos:
+        apuracao = calculadora._pipeline(horario).apurar(minutos, is_dia_especial)
+        faltantes = apuracao.faltantes
+        totais.trabalhados += apuracao.trabalhados
+        totais.extras += apuracao.extras
+        totais.excedentes += apuracao.excedentes
+        totais.noturnos += apuracao.noturnos
+        inconsistente = apuracao.inconsistente
+    elif is_dia_especial:
+        faltantes = 0
+    else:
+        faltantes = horario.jornada_minutos if horario is not None else calculadora.jornada_minutos
+    totais.faltantes += faltantes
+
+    status = classificar_dia(bool(minutos), is_dia_especial, justificativa, faltantes, inconsistente)[0]
+    if status == "irregular":
+        totais.irregulares += 1
+    elif status == "justificada":
+        totais.justificados += 1
+    return status
+
+def simular_regras(db: Session, ano: int, mes: int, sobrescritas: Dict[str, Any],
+                   secretaria_id: Optional[int] = None) -> SimulacaoRegrasResultado:
+    """
+    Compara a apuração do mês com as regras vigentes e com as regras propostas.
+
+    As sobrescritas são mescladas sobre as regras vigentes de cada secretaria
+    (como em salvar_regras_secretaria). O teto mensal de horas extras é
+    aplicado por servidor, como em apurar_mes.
+
+    Args:
+        db: Sessão do banco de dados
+        ano: Ano do mês simulado
+        mes: Mês simulado
+        sobrescritas: Campos de RegrasCalculo a alterar (ex.: {"tolerancia_batida_minutos": 10})
+        secretaria_id: Restringe aos servidores ativos da secretaria; todos quando None
+
+    Returns:
+        Totais atuais e propostos, transições de status e quebra por secretaria
+
+    Raises:
+        ValueError: Se as regras propostas forem inválidas
+    """
+    inicio_simulacao = relogio.perf_counter()
+    periodo_inicio = date(ano, mes, 1)
+    periodo_fim = date(ano, mes, monthrange(ano, mes)[1])
+    vespera = periodo_inicio - timedelta(days=1)
+    datas = [periodo_inicio + timedelta(days=i) for i in range((periodo_fim - periodo_inicio).days + 1)]
+
+    # Valida as sobrescritas antes de ler as batidas
+    RegrasCalculo(**_mesclar(carregar_regras(db, secretaria_id).model_dump(mode="json"), sobrescritas))
+
+    consulta_servidores = db.query(Servidor.id, Servidor.secretaria_id).filter(Servidor.ativo == True)
+    if secretaria_id is not None:
+        consulta_servidores = consulta_servidores.filter(Servidor.secretaria_id == secretaria_id)
+    secretaria_por_servidor: Dict[int, Optional[int]] = dict(consulta_servidores.all())
+
+    resolvedor = ResolvedorHorarios(db).carregar(secretaria_por_servidor, vespera, periodo_fim)
+    feriados = [
+        f for (f,) in db.query(Feriado.data).filter(
+            Feriado.data >= periodo_inicio, Feriado.data <= periodo_fim, Feriado.ativo == True
+        )
+    ]
+
+    # Primeira justificativa aprovada de cada (servidor, data)
+    justificativas: Dict[Tuple[int, date], Any] = {}
+    for justificativa in db.query(
+        Justificativa.servidor_id, Justificativa.data, Justificativa.id, Justificativa.tipo, Justificativa.descricao
+    ).filter(
+        Justificativa.data >= periodo_inicio,
+        Justificativa.data <= periodo_fim,
+        Justificativa.status == "aprovada"
+    ).order_by(Justificativa.id):
+        justificativas.setdefault((justificativa.servidor_id, justificativa.data), justificativa)
+
+    # Calculadoras vigente e proposta por secretaria
+    calculadoras: Dict[Optional[int], Tuple[CalculadoraHorasExtras, CalculadoraHorasExtras]] = {}
+
+    def calculadoras_da(sec_id: Optional[int]) -> Tuple[CalculadoraHorasExtras, CalculadoraHorasExtras]:
+        par = calculadoras.get(sec_id)
+        if par is None:
+            atuais = carregar_regras(db, sec_id)
+            propostas = RegrasCalculo(**_mesclar(atuais.model_dump(mode="json"), sobrescritas))
+            par = calculadoras[sec_id] = (
+                CalculadoraHorasExtras(feriados=feriados, regras=atuais),
+                CalculadoraHorasExtras(feriados=feriados, regras=propostas),
+            )
+        return par
+
+    # Intervalo de corte dos turnos por horário (não depende das regras)
+    cortes: Dict[object, int] = {}
+
+    def corte_para(servidor_id: int, data: date) -> int:
+        horario = resolvedor.resolver(servidor_id, data)
+        chave = None if horario is None else (horario.origem if horario.origem is not None else id(horario))
+        corte = cortes.get(chave)
+        if corte is None:
+            corte = cortes[chave] = intervalo_corte(horario)
+        return corte
+
+    transicoes: Dict[str, int] = {}
+    por_secretaria: Dict[Optional[int], List] = {}  # secretaria -> [servidores, afetados, atual, proposta]
+    dias_alterados = 0
+
+    def simular_servidor(servidor_id: int, turnos: TurnosMontados):
+        nonlocal dias_alterados
+        sec_id = secretaria_por_servidor[servidor_id]
+        atual, proposta = calculadoras_da(sec_id)
+        totais_atual, totais_proposta = _Totais(), _Totais()
+
+        for data in datas:
+            horario = resolvedor.resolver(servidor_id, data)
+            turno = turnos.get(data)
+            minutos = turno.minutos if turno is not None else None
+            justificativa = justificativas.get((servidor_id, data))
+            status_atual = _apurar_dia(atual, data, horario, minutos, justificativa, totais_atual)
+            status_proposto = _apurar_dia(proposta, data, horario, minutos, justificativa, totais_proposta)
+            if status_atual != status_proposto:
+                dias_alterados += 1
+                chave = f"{status_atual}->{status_proposto}"
+                transicoes[chave] = transicoes.get(chave, 0) + 1
+
+        totais_atual.aplicar_teto_mensal(atual.regras.limite_extras_mensal_minutos)
+        totais_proposta.aplicar_teto_mensal(proposta.regras.limite_extras_mensal_minutos)
+
+        secretaria = por_secretaria.get(sec_id)
+        if secretaria is None:
+            secretaria = por_secretaria[sec_id] = [0, 0, _Totais(), _Totais()]
+        secretaria[0] += 1
+        if not totais_atual.igual(totais_proposta):
+            secretaria[1] += 1
+        secretaria[2].somar(totais_atual)
+        secretaria[3].somar(totais_proposta)
+
+    # Batidas do mês (com a véspera e o dia seguinte, para os turnos que atravessam a meia-noite)
+    # lidas uma única vez, em ordem de servidor e horário
+    batidas = db.query(BatidaOriginal.servidor_id, BatidaOriginal.data_hora).filter(
+        BatidaOriginal.data_hora >= datetime.combine(vespera, time.min),
+        BatidaOriginal.data_hora < datetime.combine(periodo_fim + timedelta(days=2), time.min)
+    )
+    if secretaria_id is not None:
+        batidas = batidas.filter(BatidaOriginal.servidor_id.in_(
+            db.query(Servidor.id).filter(Servidor.secretaria_id == secretaria_id)
+        ))
+    batidas = batidas.order_by(BatidaOriginal.servidor_id, BatidaOriginal.data_hora).yield_per(10000)
+
+    sem_batidas = set(secretaria_por_servidor)
+    for servidor_id, linhas in groupby(batidas, key=lambda linha: linha[0]):
+        if servidor_id not in secretaria_por_servidor:
+            continue  # Servidor inativo
+        sem_batidas.discard(servidor_id)
+        turnos = montar_turnos(
+            (data_hora for _, data_hora in linhas),
+            lambda data, servidor_id=servidor_id: corte_para(servidor_id, data)
+        )
+        simular_servidor(servidor_id, turnos)
+    for servidor_id in sem_batidas:
+        simular_servidor(servidor_id, TurnosMontados())
+
+    total_atual, total_proposta = _Totais(), _Totais()
+    secretarias = []
+    for sec_id, (servidores, afetados, atual, proposta) in sorted(
+        por_secretaria.items(), key=lambda item: (item[0] is None, item[0] or 0)
+    ):
+        total_atual.somar(atual)
+        total_proposta.somar(proposta)
+        secretarias.append(SimulacaoSecretaria(
+            secretaria_id=sec_id,
+            servidores=servidores,
+            servidores_afetados=afetados,
+            atual=atual.schema(),
+            proposta=proposta.schema(),
+        ))
+
+    duracao = relogio.perf_counter() - inicio_simulacao
+    logger.info(
+        f"Simulação de regras {mes:02d}/{ano}: {len(secretaria_por_servidor)} servidor(es), "
+        f"{dias_alterados} dia(s) com status alterado em {duracao:.2f}s"
+    )
+    return SimulacaoRegrasResultado(
+        ano=ano,
+        mes=mes,
+        secretaria_id=secretaria_id,
+        sobrescritas=sobrescritas,
+        servidores=len(secretaria_por_servidor),
+        servidores_afetados=sum(s.servidores_afetados for s in secretarias),
+        dias_apurados=len(secretaria_por_servidor) * len(datas),
+        dias_status_alterado=dias_alterados,
+        transicoes_status=transicoes,
+        atual=total_atual.schema(),
+        proposta=total_proposta.schema(),
+        secretarias=secretarias,
+        duracao_segundos=round(duracao, 3),
+    )
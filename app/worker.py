@@ -0,0 +1,101 @@
+# app/worker.py
+"""
+Worker de processamento.
+
+Consome a fila ponto.tarefas_processamento em um processo separado da API,
+com pool de conexões próprio e um limite de tarefas simultâneas. Uso:
+
+    python -m app.worker --concorrencia 4
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.services.fila_tarefas import FilaTarefas
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Conexões que uma tarefa pode usar ao mesmo tempo: a da sessão, a do sinal de
+# vida (SinalVidaTarefa) e a do cursor do servidor da varredura de batidas
+CONEXOES_POR_TAREFA = 3
+
+class Worker:
+    """Executa tarefas da fila em N threads, cada uma com sua própria sessão."""
+
+    def __init__(self, concorrencia: int = None, intervalo_poll: float = None):
+        """
+        Args:
+            concorrencia: Número máximo de tarefas executadas ao mesmo tempo
+            intervalo_poll: Segundos de espera quando a fila está vazia
+        """
+        self.concorrencia = concorrencia or settings.WORKER_CONCORRENCIA
+        self.intervalo_poll = intervalo_poll or settings.WORKER_INTERVALO_POLL
+
+        # Conexões suficientes para todas as threads; o pool da API nunca é usado pelo worker
+        self.engine = create_engine(
+            settings.DATABASE_URI,
+            pool_size=self.concorrencia * CONEXOES_POR_TAREFA,
+            max_overflow=0,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+        self.SessionWorker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._parar = threading.Event()
+
+    def parar(self, *args):
+        """Solicita o encerramento após as tarefas em andamento."""
+        if not self._parar.is_set():
+            logger.info("Encerrando worker após as tarefas em andamento...")
+        self._parar.set()
+
+    def _laco(self, indice: int):
+        """Laço de uma thread: reserva, executa e espera quando não há tarefas."""
+        while not self._parar.is_set():
+            db = self.SessionWorker()
+            try:
+                fila = FilaTarefas(db)
+                tarefa = fila.reservar()
+                if tarefa is None:
+                    self._parar.wait(self.intervalo_poll)
+                    continue
+                logger.info(f"[{indice}] Executando tarefa {tarefa.id} ({tarefa.tipo}), tentativa {tarefa.tentativas}")
+                fila.executar(tarefa)
+            except Exception as e:
+                # Falha de infraestrutura (ex.: banco indisponível): espera e tenta de novo
+                logger.error(f"[{indice}] Erro no worker: {str(e)}")
+                self._parar.wait(self.intervalo_poll)
+            finally:
+                db.close()
+
+    def executar(self):
+        """Inicia as threads e bloqueia até receber SIGINT/SIGTERM."""
+        signal.signal(signal.SIGINT, self.parar)
+        signal.signal(signal.SIGTERM, self.parar)
+
+        logger.info(f"Worker iniciado com concorrência {self.concorrencia}")
+        threads = [
+            threading.Thread(target=self._laco, args=(i,), name=f"worker-{i}", daemon=True)
+            for i in range(self.concorrencia)
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1.0)
+
+        self.engine.dispose()
+        logger.info("Worker encerrado")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker da fila de processamento do ponto")
+    parser.add_argument("--concorrencia", type=int, default=None)
+    args = parser.parse_args()
+
+    Worker(concorrencia=args.concorrencia).executar()
@@ -199,6 +199,49 @@ export const batidasService = {
       throw error;
     }
   },
+
+  // Processa o período (grava resumos e banco de horas, por isso POST) e repassa
+  // cada linha do NDJSON à medida que chega: um dia ou os totais de um servidor
+  processarStream: async (
+    params: { data_inicio: string; data_fim: string; servidor_id?: number; secretaria_id?: number },
+    onLinha: (linha: any) => void
+  ) => {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([chave, valor]) => {
+      if (valor !== undefined && valor !== null) {
+        query.append(chave, String(valor));
+      }
+    });
+
+    const headers: Record<string, string> = {};
+    const token = typeof window !== 'undefined' ? localStorage.getItem('token') : null;
+    if (token) {
+      headers.Authorization = `Bearer ${token}`;
+    }
+
+    const response = await fetch(`${API_BASE_URL}/api/batidas/processamento/stream?${query}`, {
+      method: 'POST',
+      headers,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Erro ao processar o período (HTTP ${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let pendente = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      pendente += decoder.decode(value, { stream: true });
+      const linhas = pendente.split('\n');
+      pendente = linhas.pop() || '';
+      linhas.filter((linha) => linha.trim()).forEach((linha) => onLinha(JSON.parse(linha)));
+    }
+    if (pendente.trim()) {
+      onLinha(JSON.parse(pendente));
+    }
+  },
 };
 
 export const justificativasService = {
@@ -0,0 +1,95 @@
+# tests/test_banco_horas.py
+"""Razão do banco de horas: saldos acumulados após gravações em lote e reprocessamento."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.banco_horas import BancoHorasLancamento
+from app.models.batida import BatidaOriginal
+from app.models.servidor import Servidor
+from app.services.banco_horas_service import BancoHorasService
+from app.services.ponto_processor import PontoProcessor
+
+@pytest.fixture
+def servidor_id(db):
+    servidor = Servidor(nome="Servidor Teste", matricula="0001", cpf="00000000191")
+    db.add(servidor)
+    db.commit()
+    return servidor.id
+
+def _razao(db, servidor_id):
+    return [
+        (data, delta, saldo) for data, delta, saldo in db.query(
+            BancoHorasLancamento.data, BancoHorasLancamento.minutos_delta, BancoHorasLancamento.saldo_minutos
+        ).filter(BancoHorasLancamento.servidor_id == servidor_id).order_by(BancoHorasLancamento.data)
+    ]
+
+def _verificar_saldos_acumulados(razao):
+    acumulado = 0
+    for data, delta, saldo in razao:
+        acumulado += delta
+        assert saldo == acumulado, data
+
+def test_lote_mantem_saldos_acumulados(db, servidor_id):
+    servico = BancoHorasService(db)
+    inicio = date(2025, 3, 3)
+    for i in range(10):
+        servico.registrar_delta(servidor_id, inicio + timedelta(days=i), 10 * (i + 1))
+    db.commit()
+
+    # Datas existentes alteradas e inalteradas, novas e anteriores a todo o razão
+    gravados = servico.registrar_deltas_servidor(servidor_id, {
+        date(2025, 3, 1): -30,
+        inicio + timedelta(days=2): 30,  # inalterada
+        inicio + timedelta(days=4): -60,
+        inicio + timedelta(days=7): 5,
+        date(2025, 3, 20): 15,
+    })
+    db.commit()
+
+    razao = _razao(db, servidor_id)
+    _verificar_saldos_acumulados(razao)
+    deltas = {data: delta for data, delta, _ in razao}
+    assert deltas[date(2025, 3, 1)] == -30
+    assert deltas[inicio + timedelta(days=4)] == -60
+    assert deltas[inicio + timedelta(days=9)] == 100
+    assert gravados == 5
+    assert servico.saldo_em(servidor_id, date(2025, 3, 31)) == sum(deltas.values())
+
+def test_lote_sem_diferencas_nao_grava(db, servidor_id):
+    servico = BancoHorasService(db)
+    servico.registrar_deltas_servidor(servidor_id, {date(2025, 3, 3): 10, date(2025, 3, 4): -5})
+    db.commit()
+
+    assert servico.registrar_deltas_servidor(servidor_id, {date(2025, 3, 3): 10, date(2025, 3, 4): -5}) == 0
+    _verificar_saldos_acumulados(_razao(db, servidor_id))
+
+def test_reprocessar_periodo_confere_com_a_reconstrucao(db, servidor_id):
+    # Segunda a sexta com 9h, exceto quarta (4h); o resto do mês sem batidas
+    for dia in (3, 4, 5, 6, 7):
+        saida = 13 if dia == 5 else 18
+        db.add(BatidaOriginal(servidor_id=servidor_id, data_hora=datetime(2025, 3, dia, 8), tipo="entrada"))
+        db.add(BatidaOriginal(servidor_id=servidor_id, data_hora=datetime(2025, 3, dia, saida), tipo="saida"))
+    db.commit()
+
+    processor = PontoProcessor(db)
+    processor.processar_batidas_por_servidor(servidor_id, date(2025, 3, 1), date(2025, 3, 31))
+    # Reprocessar só uma parte do período mantém o sufixo consistente
+    PontoProcessor(db, reprocessar_inalterados=True).processar_dias(servidor_id, [date(2025, 3, 5), date(2025, 3, 6)])
+
+    razao = _razao(db, servidor_id)
+    assert len(razao) == 31
+    _verificar_saldos_acumulados(razao)
+
+    BancoHorasService(db).reconstruir(servidor_id)
+    assert _razao(db, servidor_id) == razao
+
+def test_gerador_interrompido_aplica_os_dias_gravados(db, servidor_id):
+    dias = PontoProcessor(db).iterar_dias(servidor_id, date(2025, 3, 3), date(2025, 3, 14))
+    next(dias)
+    next(dias)
+    dias.close()
+
+    razao = _razao(db, servidor_id)
+    assert [data for data, _, _ in razao] == [date(2025, 3, 3), date(2025, 3, 4)]
+    _verificar_saldos_acumulados(razao)
@@ -0,0 +1,61 @@
+# tests/test_esboco_quantis.py
+import math
+
+from app.core.config import settings
+from app.services.pontualidade_service import EsbocoQuantis
+
+def _esboco(valores):
+    esboco = EsbocoQuantis()
+    for valor in valores:
+        esboco.adicionar(valor)
+    return esboco
+
+def _posto_mais_proximo(valores, q):
+    ordenados = sorted(valores)
+    return ordenados[max(1, math.ceil(q * len(ordenados))) - 1]
+
+def test_esboco_vazio():
+    assert EsbocoQuantis().quantis([0.5, 0.9]) == [None, None]
+
+def test_posto_mais_proximo_arredonda_para_cima():
+    esboco = _esboco([1, 2, 3, 4])
+    # 0.5 * 4 = 2 -> 2º valor; 0.51 * 4 = 2.04 -> 3º valor
+    assert esboco.quantis([0.5, 0.51, 0.75, 0.76]) == [2, 3, 3, 4]
+
+def test_erro_de_ponto_flutuante_nao_sobe_o_posto():
+    # 0.9 * 10 = 9.000000000000002 não deve virar o 10º valor
+    esboco = _esboco(range(1, 11))
+    assert esboco.quantis([0.9]) == [9]
+    assert esboco.quantis([0.7]) == [7]
+
+def test_extremos():
+    esboco = _esboco([-5, 0, 10])
+    assert esboco.quantis([0.0, 1.0]) == [-5, 10]
+
+def test_quantis_em_qualquer_ordem():
+    esboco = _esboco([3, 1, 2, 2, 5])
+    assert esboco.quantis([0.9, 0.1, 0.5]) == [5, 1, 2]
+
+def test_confere_com_a_lista_ordenada():
+    valores = [((i * 37) % 23) - 11 for i in range(101)]
+    esboco = _esboco(valores)
+    qs = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+    assert esboco.quantis(qs) == [_posto_mais_proximo(valores, q) for q in qs]
+
+def test_mesclar_equivale_a_somar_as_amostras():
+    a, b = [1, 1, 4, 7], [2, 4, 9]
+    mesclado = _esboco(a)
+    mesclado.mesclar(_esboco(b))
+    assert mesclado.total == 7
+    assert mesclado.quantis([0.25, 0.5, 0.9]) == _esboco(a + b).quantis([0.25, 0.5, 0.9])
+
+def test_desvios_extremos_sao_truncados():
+    limite = settings.PONTUALIDADE_LIMITE_MINUTOS
+    esboco = _esboco([-(limite + 100), limite + 1])
+    assert esboco.quantis([0.0, 1.0]) == [-limite, limite]
+
+def test_serializacao_preserva_as_contagens():
+    esboco = _esboco([-3, -3, 0, 15])
+    copia = EsbocoQuantis.de_bytes(esboco.para_bytes())
+    assert copia.contagens == esboco.contagens
+    assert copia.total == esboco.total
@@ -0,0 +1,31 @@
+# tests/test_faixa_batidas_processadas.py
+from datetime import date, datetime
+
+from app.services.ponto_processor import faixa_batidas_processadas, linhas_batidas_processadas
+
+DIA = date(2025, 3, 12)
+
+def test_faixa_do_dia_sem_cauda():
+    horarios = [datetime(2025, 3, 12, 8), datetime(2025, 3, 12, 17)]
+    assert faixa_batidas_processadas(DIA, horarios) == (
+        datetime(2025, 3, 12), None, datetime(2025, 3, 12, 23, 59, 59, 999999)
+    )
+
+def test_faixa_de_turno_que_atravessa_a_meia_noite():
+    horarios = [datetime(2025, 3, 12, 22), datetime(2025, 3, 13, 6)]
+    cauda = datetime(2025, 3, 12, 6)
+    assert faixa_batidas_processadas(DIA, horarios, cauda) == (
+        datetime(2025, 3, 12), cauda, datetime(2025, 3, 13, 6)
+    )
+
+def test_linhas_vinculam_batidas_repetidas_por_posicao():
+    oito = datetime(2025, 3, 12, 8)
+    doze = datetime(2025, 3, 12, 12)
+    linhas = linhas_batidas_processadas(7, [oito, oito, doze], "irregular", None, {oito: [10, 11], doze: [12]})
+
+    assert [linha["batida_original_id"] for linha in linhas] == [10, 11, 12]
+    assert [linha["tipo"] for linha in linhas] == ["entrada", "saida", "entrada"]
+
+def test_linhas_sem_original_ficam_sem_vinculo():
+    linhas = linhas_batidas_processadas(7, [datetime(2025, 3, 12, 8)], "regular", None, {})
+    assert linhas[0]["batida_original_id"] is None
@@ -0,0 +1,155 @@
+# tests/test_fila_tarefas.py
+"""Reserva, sinal de vida e retomada de tarefas da fila de processamento."""
+from datetime import datetime, timedelta
+import threading
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.db.session import executar_scripts_inicializacao
+from app.models.tarefa_processamento import TarefaProcessamento
+from app.services import fila_tarefas
+from app.services.fila_tarefas import FilaTarefas, SinalVidaTarefa, enfileirar_tarefa, manipulador
+
+@pytest.fixture
+def registrar_manipulador():
+    """Registra manipuladores de teste e os remove ao final."""
+    tipos = []
+
+    def registrar(tipo, funcao):
+        tipos.append(tipo)
+        manipulador(tipo)(funcao)
+
+    yield registrar
+    for tipo in tipos:
+        fila_tarefas.MANIPULADORES.pop(tipo, None)
+
+def _executando(db, sem_sinal_ha: int, tentativas: int = 1, max_tentativas: int = 3) -> TarefaProcessamento:
+    momento = datetime.now() - timedelta(seconds=sem_sinal_ha)
+    tarefa = TarefaProcessamento(
+        tipo="processar_batidas", parametros={}, status="executando", tentativas=tentativas,
+        max_tentativas=max_tentativas, disponivel_em=momento, iniciado_em=momento, atualizado_em=momento,
+    )
+    db.add(tarefa)
+    db.commit()
+    return tarefa
+
+def test_reserva_tarefa_pendente_na_ordem(db):
+    primeira = enfileirar_tarefa(db, "processar_batidas")
+    enfileirar_tarefa(db, "processar_batidas")
+    adiada = enfileirar_tarefa(db, "processar_batidas", atraso_segundos=3600)
+    db.commit()
+
+    fila = FilaTarefas(db)
+    reservada = fila.reservar()
+    assert reservada.id == primeira.id
+    assert reservada.status == "executando"
+    assert reservada.tentativas == 1
+    assert reservada.atualizado_em == reservada.iniciado_em
+
+    assert fila.reservar() is not None
+    # A adiada ainda não está disponível
+    assert fila.reservar() is None
+    assert db.get(TarefaProcessamento, adiada.id).status == "pendente"
+
+def test_tarefa_com_sinal_de_vida_recente_nao_e_retomada(db):
+    tarefa = _executando(db, sem_sinal_ha=10)
+    # Iniciada há muito tempo, mas o worker continua renovando o sinal
+    tarefa.iniciado_em = datetime.now() - timedelta(seconds=settings.WORKER_TIMEOUT_TAREFA * 10)
+    db.commit()
+
+    assert FilaTarefas(db).reservar() is None
+
+def test_tarefa_sem_sinal_de_vida_e_retomada(db):
+    tarefa = _executando(db, sem_sinal_ha=settings.WORKER_TIMEOUT_TAREFA + 60)
+
+    retomada = FilaTarefas(db).reservar()
+    assert retomada.id == tarefa.id
+    assert retomada.tentativas == 2
+
+def test_tarefa_abandonada_na_ultima_tentativa_vira_erro(db):
+    tarefa = _executando(db, sem_sinal_ha=settings.WORKER_TIMEOUT_TAREFA + 60, tentativas=3, max_tentativas=3)
+
+    assert FilaTarefas(db).reservar() is None
+    db.refresh(tarefa)
+    assert tarefa.status == "erro"
+    assert tarefa.concluido_em is not None
+    assert "abandonada" in tarefa.erro
+
+def test_sinal_de_vida_renovado_durante_a_execucao(db, registrar_manipulador, monkeypatch):
+    renovou = threading.Event()
+    anterior = datetime.now() - timedelta(seconds=settings.WORKER_TIMEOUT_TAREFA + 60)
+
+    def lento(sessao, parametros):
+        # Simula um worker parado há muito tempo e espera a próxima renovação
+        sessao.query(TarefaProcessamento).filter(TarefaProcessamento.id == tarefa.id).update(
+            {TarefaProcessamento.atualizado_em: anterior}
+        )
+        sessao.commit()
+        renovou.wait(5)
+        return {}
+
+    renovar = SinalVidaTarefa.renovar
+
+    def renovar_e_avisar(self):
+        renovada = renovar(self)
+        renovou.set()
+        return renovada
+
+    monkeypatch.setattr(SinalVidaTarefa, "renovar", renovar_e_avisar)
+    monkeypatch.setattr(settings, "WORKER_INTERVALO_SINAL", 0.05)
+    registrar_manipulador("teste_lento", lento)
+    enfileirar_tarefa(db, "teste_lento")
+    db.commit()
+    fila = FilaTarefas(db)
+    tarefa = fila.reservar()
+
+    assert fila.executar(tarefa)
+    db.refresh(tarefa)
+    assert tarefa.status == "concluida"
+    assert tarefa.atualizado_em > anterior
+
+def test_sinal_de_vida_nao_renova_tarefa_retomada(db):
+    tarefa = _executando(db, sem_sinal_ha=0)
+    sinal = SinalVidaTarefa(db, tarefa)
+    tarefa.tentativas += 1
+    db.commit()
+
+    assert not sinal.renovar()
+
+def test_falha_devolve_a_fila_com_espera_e_depois_vira_erro(db, registrar_manipulador):
+    def falha(sessao, parametros):
+        raise RuntimeError("falhou")
+
+    registrar_manipulador("teste_falha", falha)
+    enfileirar_tarefa(db, "teste_falha", max_tentativas=2)
+    db.commit()
+    fila = FilaTarefas(db)
+
+    tarefa = fila.reservar()
+    assert not fila.executar(tarefa)
+    assert tarefa.status == "pendente"
+    assert tarefa.disponivel_em > datetime.now()
+    assert tarefa.erro == "falhou"
+
+    tarefa.disponivel_em = datetime.now()
+    db.commit()
+    tarefa = fila.reservar()
+    assert not fila.executar(tarefa)
+    assert tarefa.status == "erro"
+    assert tarefa.tentativas == 2
+
+def test_tipo_desconhecido_nao_e_enfileirado(db):
+    with pytest.raises(ValueError):
+        enfileirar_tarefa(db, "tipo_inexistente")
+
+def test_scripts_de_inicializacao_adicionam_o_sinal_de_vida_a_tabela_antiga(db):
+    with db.get_bind().begin() as conexao:
+        conexao.execute(text("ALTER TABLE ponto.tarefas_processamento DROP COLUMN atualizado_em"))
+        executar_scripts_inicializacao(conexao)
+        # Idempotente: a segunda execução não falha
+        executar_scripts_inicializacao(conexao)
+
+    colunas = {coluna["name"] for coluna in inspect(db.get_bind()).get_columns("tarefas_processamento", schema="ponto")}
+    assert "atualizado_em" in colunas
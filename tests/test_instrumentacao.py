@@ -0,0 +1,82 @@
+# tests/test_instrumentacao.py
+"""Contagem de consultas por rota, inclusive nas respostas em streaming."""
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.instrumentacao import ConsultasRequisicao, estatisticas_rotas, forma_sql, instrumentar_engine
+from app.main import instrumentacao_consultas_middleware
+
+@pytest.fixture
+def cliente():
+    engine = create_engine("sqlite://")
+    instrumentar_engine(engine)
+
+    app = FastAPI()
+    app.middleware("http")(instrumentacao_consultas_middleware)
+
+    def consultar():
+        with engine.connect() as conexao:
+            conexao.execute(text("SELECT 1")).scalar()
+
+    @app.get("/itens/{item_id}")
+    def ler_item(item_id: int):
+        consultar()
+        return {"id": item_id}
+
+    @app.get("/stream")
+    def stream():
+        consultar()
+
+        def gerar():
+            # Consultas feitas depois que a rota retornou
+            for i in range(settings.DB_N_MAIS_UM_LIMITE):
+                consultar()
+                yield f"{i}\n".encode()
+
+        return StreamingResponse(gerar(), media_type="application/x-ndjson")
+
+    estatisticas_rotas.limpar()
+    yield TestClient(app)
+    estatisticas_rotas.limpar()
+    engine.dispose()
+
+def _rota(caminho):
+    return next(linha for linha in estatisticas_rotas.resumo() if linha["rota"] == caminho)
+
+def test_consultas_agregadas_pelo_template_da_rota(cliente):
+    cliente.get("/itens/1")
+    cliente.get("/itens/2")
+
+    estatistica = _rota("GET /itens/{item_id}")
+    assert estatistica["requisicoes"] == 2
+    assert estatistica["consultas_total"] == 2
+    assert estatistica["requisicoes_n_mais_um"] == 0
+
+def test_consultas_do_corpo_em_streaming_sao_contadas(cliente):
+    resposta = cliente.get("/stream")
+    assert len(resposta.text.splitlines()) == settings.DB_N_MAIS_UM_LIMITE
+
+    estatistica = _rota("GET /stream")
+    assert estatistica["consultas_total"] == settings.DB_N_MAIS_UM_LIMITE + 1
+    assert estatistica["requisicoes_n_mais_um"] == 1
+    assert estatistica["formas_repetidas"] == [{"sql": "SELECT 1", "execucoes_max": settings.DB_N_MAIS_UM_LIMITE + 1}]
+
+def test_forma_sql_colapsa_listas_de_marcadores():
+    assert forma_sql("SELECT *\n  FROM t WHERE id IN (%(id_1)s, %(id_2)s, %(id_3)s)") == \
+        "SELECT * FROM t WHERE id IN (%(id_1)s)"
+    assert forma_sql("SELECT * FROM t WHERE id IN (?, ?)") == forma_sql("SELECT * FROM t WHERE id IN (?, ?, ?, ?)")
+
+def test_repetidas_ordenadas_e_limitadas():
+    consultas = ConsultasRequisicao()
+    for _ in range(3):
+        consultas.registrar("SELECT a", 0.001)
+    for _ in range(5):
+        consultas.registrar("SELECT b WHERE id IN (?, ?)", 0.001)
+    consultas.registrar("SELECT b WHERE id IN (?)", 0.001)
+
+    assert consultas.repetidas(3) == [("SELECT b WHERE id IN (?)", 6), ("SELECT a", 3)]
+    assert consultas.repetidas(7) == []
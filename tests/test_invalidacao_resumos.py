@@ -0,0 +1,149 @@
+# tests/test_invalidacao_resumos.py
+"""
+Mudanças de regras e de horários invalidam o espelho e enfileiram o
+reprocessamento na mesma transação.
+"""
+from datetime import date, time, timedelta
+
+import pytest
+
+from app.api.endpoints.secretarias import update_regras_calculo
+from app.core.config import settings
+from app.db.session import executar_scripts_inicializacao
+from app.models.horario import AlteracaoHorario, AlteracaoHorarioSecretaria, AlteracaoHorarioServidor, HorarioPadrao
+from app.models.resumo_diario import ResumoDiario
+from app.models.secretaria import Secretaria
+from app.models.servidor import Servidor
+from app.models.tarefa_processamento import TarefaProcessamento
+
+@pytest.fixture
+def secretarias_com_resumos(db):
+    """Duas secretarias com um servidor cada e resumos atualizados de 10 a 14/03/2025."""
+    servidores = []
+    for i in range(2):
+        secretaria = Secretaria(nome=f"Secretaria {i}", codigo=f"S{i}")
+        db.add(secretaria)
+        db.flush()
+        servidor = Servidor(nome=f"Servidor {i}", matricula=f"000{i}", cpf=f"0000000000{i}", secretaria_id=secretaria.id)
+        db.add(servidor)
+        db.flush()
+        for dia in range(10, 15):
+            db.add(ResumoDiario(servidor_id=servidor.id, data=date(2025, 3, dia), status="regular"))
+        servidores.append(servidor)
+    db.commit()
+    return [(servidor.secretaria_id, servidor.id) for servidor in servidores]
+
+def _desatualizados(db, servidor_id):
+    return [
+        data for (data,) in db.query(ResumoDiario.data).filter(
+            ResumoDiario.servidor_id == servidor_id, ResumoDiario.desatualizado == True
+        ).order_by(ResumoDiario.data)
+    ]
+
+def test_regras_invalidam_a_partir_da_vigencia(db, secretarias_com_resumos):
+    (secretaria_id, servidor_id), (_, outro_servidor_id) = secretarias_com_resumos
+
+    update_regras_calculo(secretaria_id, {"limite_extras_diario_minutos": 120}, date(2025, 3, 13), db=db)
+    db.rollback()  # Nada pendente: invalidação, tarefas e regras foram confirmadas juntas
+
+    assert _desatualizados(db, servidor_id) == [date(2025, 3, 13), date(2025, 3, 14)]
+    assert _desatualizados(db, outro_servidor_id) == []
+
+    tarefas = db.query(TarefaProcessamento).all()
+    assert [(t.tipo, t.parametros) for t in tarefas] == [
+        ("processar_dias", {"servidor_id": servidor_id, "datas": ["2025-03-13", "2025-03-14"]})
+    ]
+
+def test_regras_invalidas_nao_invalidam_resumos(db, secretarias_com_resumos):
+    from fastapi import HTTPException
+
+    (secretaria_id, servidor_id), _ = secretarias_com_resumos
+    with pytest.raises(HTTPException):
+        update_regras_calculo(secretaria_id, {"limite_extras_diario_minutos": -1}, date(2025, 3, 1), db=db)
+
+    assert _desatualizados(db, servidor_id) == []
+    assert db.query(TarefaProcessamento).count() == 0
+
+def _tarefas(db):
+    return sorted(
+        (t.parametros["servidor_id"], t.parametros["datas"])
+        for t in db.query(TarefaProcessamento).filter(TarefaProcessamento.tipo == "processar_dias")
+    )
+
+def _alteracao(db, inicio: date, fim: date) -> AlteracaoHorario:
+    alteracao = AlteracaoHorario(
+        descricao="Horário reduzido", criado_por="teste", data_inicio=inicio, data_fim=fim,
+        entrada_1=time(8), saida_1=time(14),
+    )
+    db.add(alteracao)
+    db.flush()
+    return alteracao
+
+def test_vinculo_de_servidor_a_alteracao_invalida_o_intervalo(db, secretarias_com_resumos):
+    (_, servidor_id), (_, outro_servidor_id) = secretarias_com_resumos
+    alteracao = _alteracao(db, date(2025, 3, 11), date(2025, 3, 12))
+    db.add(AlteracaoHorarioServidor(alteracao_id=alteracao.id, servidor_id=servidor_id))
+    db.commit()
+
+    assert _desatualizados(db, servidor_id) == [date(2025, 3, 11), date(2025, 3, 12)]
+    assert _desatualizados(db, outro_servidor_id) == []
+    assert _tarefas(db) == [(servidor_id, ["2025-03-11", "2025-03-12"])]
+
+def test_tarefas_dos_gatilhos_seguem_o_maximo_de_tentativas_configurado(db, secretarias_com_resumos, monkeypatch):
+    (_, servidor_id), _ = secretarias_com_resumos
+    monkeypatch.setattr(settings, "WORKER_MAX_TENTATIVAS", 7)
+    with db.get_bind().begin() as conexao:
+        executar_scripts_inicializacao(conexao)
+
+    alteracao = _alteracao(db, date(2025, 3, 11), date(2025, 3, 12))
+    db.add(AlteracaoHorarioServidor(alteracao_id=alteracao.id, servidor_id=servidor_id))
+    db.commit()
+
+    assert [t.max_tentativas for t in db.query(TarefaProcessamento)] == [7]
+
+def test_alteracao_de_secretaria_reprocessa_intervalo_antigo_e_novo(db, secretarias_com_resumos):
+    (secretaria_id, servidor_id), _ = secretarias_com_resumos
+    alteracao = _alteracao(db, date(2025, 3, 10), date(2025, 3, 10))
+    db.add(AlteracaoHorarioSecretaria(alteracao_id=alteracao.id, secretaria_id=secretaria_id))
+    db.commit()
+    db.query(ResumoDiario).update({ResumoDiario.desatualizado: False})
+    db.query(TarefaProcessamento).delete()
+    db.commit()
+
+    alteracao.data_inicio = date(2025, 3, 14)
+    alteracao.data_fim = date(2025, 3, 14)
+    db.commit()
+
+    assert _desatualizados(db, servidor_id) == [date(2025, 3, 10), date(2025, 3, 14)]
+    assert _tarefas(db) == [(servidor_id, ["2025-03-10"]), (servidor_id, ["2025-03-14"])]
+
+def test_exclusao_de_alteracao_invalida_antes_da_cascata(db, secretarias_com_resumos):
+    (_, servidor_id), _ = secretarias_com_resumos
+    alteracao = _alteracao(db, date(2025, 3, 13), date(2025, 3, 13))
+    db.add(AlteracaoHorarioServidor(alteracao_id=alteracao.id, servidor_id=servidor_id))
+    db.commit()
+    db.query(ResumoDiario).update({ResumoDiario.desatualizado: False})
+    db.query(TarefaProcessamento).delete()
+    db.commit()
+
+    db.query(AlteracaoHorario).filter(AlteracaoHorario.id == alteracao.id).delete()
+    db.commit()
+
+    assert _desatualizados(db, servidor_id) == [date(2025, 3, 13)]
+    assert _tarefas(db) == [(servidor_id, ["2025-03-13"])]
+
+def test_horario_padrao_invalida_o_dia_da_semana_no_mes_corrente(db, secretarias_com_resumos):
+    (_, servidor_id), _ = secretarias_com_resumos
+    hoje = date.today()
+    dias_do_mes = [hoje.replace(day=1) + timedelta(days=i) for i in range(hoje.day)]
+    for dia in dias_do_mes:
+        db.add(ResumoDiario(servidor_id=servidor_id, data=dia, status="regular"))
+    db.commit()
+
+    dia_semana = (hoje.weekday() + 1) % 7  # 0-6 a partir de domingo, como EXTRACT(DOW)
+    db.add(HorarioPadrao(servidor_id=servidor_id, dia_semana=dia_semana, entrada_1=time(8), saida_1=time(17)))
+    db.commit()
+
+    esperados = [dia for dia in dias_do_mes if dia.weekday() == hoje.weekday()]
+    assert _desatualizados(db, servidor_id) == esperados
+    assert _tarefas(db) == [(servidor_id, [dia.isoformat() for dia in esperados])]
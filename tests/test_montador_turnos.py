@@ -0,0 +1,95 @@
+# tests/test_montador_turnos.py
+from datetime import date, datetime, time
+
+from app.core.config import settings
+from app.services.montador_turnos import intervalo_corte, montar_turnos
+from app.services.ponto_processor import HorarioTrabalho
+
+EXPEDIENTE = HorarioTrabalho([(time(8), time(12)), (time(13), time(17))])
+PLANTAO_NOTURNO = HorarioTrabalho([(time(22), time(6))])
+
+def _corte_fixo(minutos):
+    return lambda data: minutos
+
+def test_intervalo_corte_sem_horario_ou_em_folga_usa_o_padrao():
+    assert intervalo_corte(None) == settings.TURNO_INTERVALO_CORTE_MINUTOS
+    assert intervalo_corte(HorarioTrabalho([]), padrao=300) == 300
+
+def test_intervalo_corte_e_o_ponto_medio_entre_periodo_e_descanso():
+    # Maior período 240 min, descanso 900 min
+    assert intervalo_corte(EXPEDIENTE) == 570
+    # Plantão 22:00-06:00: período 480 min, descanso 960 min
+    assert intervalo_corte(PLANTAO_NOTURNO) == 720
+
+def test_intervalo_corte_nunca_menor_que_o_intervalo_previsto_com_margem():
+    # Pausa prevista de 11h entre os períodos: o ponto médio (360) a separaria em dois turnos
+    partido = HorarioTrabalho([(time(8), time(9)), (time(20), time(21))])
+    assert intervalo_corte(partido) == 660 + 60
+
+def test_sem_batidas():
+    turnos = montar_turnos(iter([]), _corte_fixo(360))
+    assert turnos.turnos == {}
+    assert turnos.caudas == {}
+
+def test_expediente_em_um_dia():
+    batidas = [datetime(2025, 3, 12, h, m) for h, m in ((8, 0), (12, 0), (13, 0), (17, 1))]
+    turnos = montar_turnos(iter(batidas), _corte_fixo(570))
+
+    turno = turnos.get(date(2025, 3, 12))
+    assert list(turno.minutos) == [480, 720, 780, 1021]
+    assert turno.horarios == batidas
+    assert turnos.caudas == {}
+
+def test_turno_que_atravessa_a_meia_noite_pertence_a_data_de_inicio():
+    batidas = [
+        datetime(2025, 3, 12, 22), datetime(2025, 3, 13, 2), datetime(2025, 3, 13, 3), datetime(2025, 3, 13, 6),
+        datetime(2025, 3, 13, 22), datetime(2025, 3, 14, 6),
+    ]
+    turnos = montar_turnos(iter(batidas), _corte_fixo(720))
+
+    assert sorted(turnos.turnos) == [date(2025, 3, 12), date(2025, 3, 13)]
+    assert list(turnos.get(date(2025, 3, 12)).minutos) == [1320, 1560, 1620, 1800]
+    assert list(turnos.get(date(2025, 3, 13)).minutos) == [1320, 1800]
+    # Última batida de cada data que ainda é do turno da véspera
+    assert turnos.caudas == {date(2025, 3, 13): datetime(2025, 3, 13, 6), date(2025, 3, 14): datetime(2025, 3, 14, 6)}
+    assert turnos.get(date(2025, 3, 14)) is None
+
+def test_dias_consecutivos_sao_turnos_distintos():
+    batidas = [datetime(2025, 3, 12, 8), datetime(2025, 3, 12, 17), datetime(2025, 3, 13, 8), datetime(2025, 3, 13, 17)]
+    turnos = montar_turnos(iter(batidas), _corte_fixo(360))
+
+    assert list(turnos.get(date(2025, 3, 12)).minutos) == [480, 1020]
+    assert list(turnos.get(date(2025, 3, 13)).minutos) == [480, 1020]
+    assert turnos.caudas == {}
+
+def test_turnos_iniciados_na_mesma_data_sao_reunidos():
+    batidas = [datetime(2025, 3, 12, 6), datetime(2025, 3, 12, 8), datetime(2025, 3, 12, 18), datetime(2025, 3, 12, 20)]
+    turnos = montar_turnos(iter(batidas), _corte_fixo(360))
+
+    assert list(turnos.turnos) == [date(2025, 3, 12)]
+    assert list(turnos.get(date(2025, 3, 12)).minutos) == [360, 480, 1080, 1200]
+
+def test_quantidade_impar_de_batidas_e_mantida():
+    batidas = [datetime(2025, 3, 12, 8), datetime(2025, 3, 12, 12), datetime(2025, 3, 12, 13)]
+    turnos = montar_turnos(iter(batidas), _corte_fixo(570))
+
+    assert len(turnos.get(date(2025, 3, 12)).minutos) == 3
+
+def test_corte_consultado_pela_data_de_inicio_de_cada_turno():
+    consultadas = []
+
+    def corte_para(data):
+        consultadas.append(data)
+        return 720
+
+    batidas = [datetime(2025, 3, 12, 22), datetime(2025, 3, 13, 6), datetime(2025, 3, 13, 22), datetime(2025, 3, 14, 6)]
+    montar_turnos(iter(batidas), corte_para)
+
+    assert consultadas == [date(2025, 3, 12), date(2025, 3, 13)]
+
+def test_pausa_exatamente_igual_ao_corte_nao_separa_turnos():
+    batidas = [datetime(2025, 3, 12, 8), datetime(2025, 3, 12, 14)]
+    turnos = montar_turnos(iter(batidas), _corte_fixo(360))
+
+    assert list(turnos.get(date(2025, 3, 12)).minutos) == [480, 840]
+    assert len(turnos.turnos) == 1
@@ -0,0 +1,89 @@
+# tests/test_pareamento_batidas.py
+from array import array
+
+from app.schemas.regras_calculo import PareamentoConfig
+from app.services.pareamento_batidas import _lacuna_unica, criar_pareador, parear_lote
+
+# 08:00-12:00 e 13:00-17:00, em minutos
+ESPERADO = array("i", [480, 720, 780, 1020])
+
+def _minutos(*valores):
+    return array("i", valores)
+
+def test_configuracao_legada_nao_compila_pareador():
+    assert criar_pareador(PareamentoConfig()) is None
+
+def test_lote_legado_ignora_a_ultima_batida_impar():
+    resultados = parear_lote(None, [_minutos(480, 720), _minutos(480, 720, 781)])
+    assert list(resultados[0].minutos) == [480, 720]
+    assert resultados[0].descartadas == 0
+    assert list(resultados[1].minutos) == [480, 720]
+    assert resultados[1].descartadas == 1
+    assert not resultados[1].inconsistente
+
+def test_batidas_repetidas_sao_descartadas_pela_janela():
+    pareador = criar_pareador(PareamentoConfig(janela_duplicada_minutos=3))
+    resultado = pareador(_minutos(480, 481, 482, 720, 725))
+    # 481 e 482 estão a menos de 3 minutos da batida mantida anterior (480)
+    assert list(resultado.minutos) == [480, 720]
+    assert resultado.descartadas == 3
+
+def test_janela_compara_com_a_ultima_batida_mantida():
+    pareador = criar_pareador(PareamentoConfig(janela_duplicada_minutos=2))
+    # Cada batida está a 1 minuto da anterior, mas 482 está a 2 da mantida (480)
+    resultado = pareador(_minutos(480, 481, 482, 483))
+    assert list(resultado.minutos) == [480, 482]
+
+def test_quantidade_par_nao_e_alterada():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="sinalizar"))
+    resultado = pareador(_minutos(480, 720, 780, 1020))
+    assert list(resultado.minutos) == [480, 720, 780, 1020]
+    assert not resultado.inconsistente
+
+def test_sinalizar_ignora_a_ultima_e_marca_o_dia():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="sinalizar"))
+    resultado = pareador(_minutos(480, 720, 780))
+    assert list(resultado.minutos) == [480, 720]
+    assert resultado.descartadas == 1
+    assert resultado.inconsistente
+
+def test_horario_completa_a_saida_final():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="horario"), ESPERADO)
+    resultado = pareador(_minutos(482, 719, 785))
+    assert list(resultado.minutos) == [482, 719, 785, 1020]
+    assert resultado.inferidas == 1
+    assert not resultado.inconsistente
+
+def test_horario_completa_a_batida_do_meio():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="horario"), ESPERADO)
+    # Faltou a saída para o almoço
+    resultado = pareador(_minutos(478, 790, 1015))
+    assert list(resultado.minutos) == [478, 720, 790, 1015]
+    assert resultado.inferidas == 1
+
+def test_horario_sem_lacuna_unica_sinaliza():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="horario"), ESPERADO)
+    resultado = pareador(_minutos(480))
+    assert list(resultado.minutos) == []
+    assert resultado.inconsistente
+
+def test_horario_sem_horario_previsto_sinaliza():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="horario"))
+    resultado = pareador(_minutos(480, 720, 780))
+    assert list(resultado.minutos) == [480, 720]
+    assert resultado.inferidas == 0
+    assert resultado.inconsistente
+
+def test_lacuna_unica():
+    assert _lacuna_unica(_minutos(480, 720, 780), ESPERADO) == 3
+    assert _lacuna_unica(_minutos(720, 780, 1020), ESPERADO) == 0
+    assert _lacuna_unica(_minutos(480, 780, 1020), ESPERADO) == 1
+    # Quantidade que não deixa exatamente uma posição vazia
+    assert _lacuna_unica(_minutos(480, 1020), ESPERADO) == -1
+    assert _lacuna_unica(_minutos(480, 720, 780, 1020), ESPERADO) == -1
+
+def test_lote_com_pareador_mantem_a_ordem_dos_dias():
+    pareador = criar_pareador(PareamentoConfig(estrategia_impar="sinalizar"))
+    resultados = parear_lote(pareador, [_minutos(480, 720, 780), _minutos(), _minutos(480, 1020)])
+    assert [list(r.minutos) for r in resultados] == [[480, 720], [], [480, 1020]]
+    assert [r.inconsistente for r in resultados] == [True, False, False]
@@ -0,0 +1,31 @@
+# tests/test_particoes_batidas.py
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from app.models.batida import BatidaOriginal
+from app.models.secretaria import Secretaria
+from app.models.servidor import Servidor
+from app.services.particoes_batidas import garantir_particoes, nome_particao
+
+def test_nome_particao():
+    assert nome_particao("batidas_originais", date(2025, 3, 1)) == "batidas_originais_p2025_03"
+
+def test_linhas_da_particao_padrao_sao_movidas_para_o_mes(db):
+    secretaria = Secretaria(nome="Administração", codigo="ADM")
+    db.add(secretaria)
+    db.flush()
+    servidor = Servidor(nome="Servidor", matricula="0001", cpf="00000000191", secretaria_id=secretaria.id)
+    db.add(servidor)
+    db.flush()
+    db.add(BatidaOriginal(servidor_id=servidor.id, data_hora=datetime(2019, 6, 3, 8), tipo="entrada"))
+    db.commit()
+    assert db.execute(text("SELECT count(*) FROM ponto.batidas_originais_padrao")).scalar() == 1
+
+    criadas = garantir_particoes(db, date(2025, 3, 1), 0)
+
+    assert "batidas_originais_p2019_06" in criadas
+    assert db.execute(text("SELECT count(*) FROM ponto.batidas_originais_padrao")).scalar() == 0
+    assert db.execute(text("SELECT count(*) FROM ponto.batidas_originais_p2019_06")).scalar() == 1
+    # Nada a criar na segunda execução
+    assert garantir_particoes(db, date(2025, 3, 1), 0) == []
@@ -0,0 +1,61 @@
+# tests/test_reprocessamento_batidas.py
+"""
+Reprocessar um dia regrava as batidas processadas; a varredura de batidas
+novas não pode tratá-las como pendentes e duplicá-las.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func
+
+from app.models.batida import BatidaOriginal, BatidaProcessada
+from app.models.secretaria import Secretaria
+from app.models.servidor import Servidor
+from app.services.batida_processor_service import ProcessadorBatidas
+from app.services.ponto_processor import PontoProcessor
+from app.services.recalculo_data import RecalculoData
+
+DIA = date(2025, 3, 12)
+HORARIOS = [(8, 0), (12, 0), (13, 0), (17, 0)]
+
+@pytest.fixture
+def servidor_com_batidas(db):
+    secretaria = Secretaria(nome="Administração", codigo="ADM")
+    db.add(secretaria)
+    db.flush()
+    servidor = Servidor(nome="Servidor Teste", matricula="0001", cpf="00000000191", secretaria_id=secretaria.id)
+    db.add(servidor)
+    db.flush()
+    for i, (hora, minuto) in enumerate(HORARIOS):
+        db.add(BatidaOriginal(
+            servidor_id=servidor.id,
+            data_hora=datetime.combine(DIA, datetime.min.time()).replace(hour=hora, minute=minuto),
+            tipo="entrada" if i % 2 == 0 else "saida",
+        ))
+    db.commit()
+
+    # Primeira varredura: processa as originais
+    assert ProcessadorBatidas(db).processar_batidas_nao_processadas()["batidas"] == len(HORARIOS)
+    return servidor.id
+
+def _processadas(db, servidor_id):
+    return db.query(BatidaProcessada.batida_original_id).filter(
+        BatidaProcessada.servidor_id == servidor_id
+    ).all()
+
+def _verificar_sem_duplicatas(db, servidor_id):
+    ids_originais = {id_ for (id_,) in db.query(BatidaOriginal.id)}
+    processadas = _processadas(db, servidor_id)
+    assert sorted(id_ for (id_,) in processadas) == sorted(ids_originais)
+
+    # Nova varredura completa: nenhuma original pendente, nenhuma linha nova
+    assert ProcessadorBatidas(db).processar_batidas_nao_processadas(varredura_completa=True)["batidas"] == 0
+    assert db.query(func.count(BatidaProcessada.id)).scalar() == len(HORARIOS)
+
+def test_reprocessar_dias_mantem_vinculo_com_originais(db, servidor_com_batidas):
+    PontoProcessor(db).processar_dias(servidor_com_batidas, [DIA])
+    _verificar_sem_duplicatas(db, servidor_com_batidas)
+
+def test_recalcular_data_mantem_vinculo_com_originais(db, servidor_com_batidas):
+    RecalculoData(db).recalcular(DIA)
+    _verificar_sem_duplicatas(db, servidor_com_batidas)
@@ -0,0 +1,45 @@
+# tests/test_roteamento_leitura.py
+"""Escolha da réplica de leitura em SessaoRoteada (sem acesso ao banco)."""
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from app.db import session as modulo_sessao
+from app.db.session import SessaoRoteada, iniciar_estado_leitura
+from app.models.secretaria import Secretaria
+
+LEITURA = select(Secretaria.id)
+
+@pytest.fixture
+def replicas(monkeypatch):
+    engines = [create_engine("sqlite://") for _ in range(8)]
+    monkeypatch.setattr(modulo_sessao, "replica_engines", engines)
+    monkeypatch.setattr(modulo_sessao, "_estado_leitura", modulo_sessao.ContextVar("estado_leitura_teste", default=None))
+    return engines
+
+def _sessao():
+    return SessaoRoteada(bind=modulo_sessao.engine, usar_replica=True)
+
+def test_uma_replica_por_sessao(replicas):
+    sessao = _sessao()
+    escolhidas = {sessao.get_bind(clause=LEITURA) for _ in range(50)}
+    assert len(escolhidas) == 1
+    assert escolhidas.pop() in replicas
+
+def test_uma_replica_por_requisicao(replicas):
+    iniciar_estado_leitura()
+    escolhidas = {_sessao().get_bind(clause=LEITURA) for _ in range(20)}
+    assert len(escolhidas) == 1
+
+def test_leitura_propria_usa_o_primario(replicas):
+    iniciar_estado_leitura(forcar_primario=True)
+    assert _sessao().get_bind(clause=LEITURA) is modulo_sessao.engine
+
+def test_escrita_fixa_a_sessao_no_primario(replicas):
+    sessao = _sessao()
+    assert sessao.get_bind(clause=LEITURA) in replicas
+    assert sessao.get_bind(clause=insert(Secretaria)) is modulo_sessao.engine
+    assert sessao.get_bind(clause=LEITURA) is modulo_sessao.engine
+
+def test_sessao_de_escrita_nao_usa_replica(replicas):
+    sessao = SessaoRoteada(bind=modulo_sessao.engine)
+    assert sessao.get_bind(clause=LEITURA) is modulo_sessao.engine
@@ -0,0 +1,68 @@
+# tests/test_sequencias_status.py
+from datetime import date
+import random
+import struct
+
+from app.services.sequencias_status import _recortar, codificar, decodificar, intervalos, maior_sequencia
+
+def _dia(mes, dia, ano=2025):
+    return date(ano, mes, dia).toordinal()
+
+def test_codificar_corridas_alternadas_comecando_por_zeros():
+    assert codificar([0, 0, 1, 1, 1, 0]) == struct.pack("<3H", 2, 3, 1)
+    # Começando por um dia marcado, a primeira corrida de zeros é vazia
+    assert codificar([1, 1, 0]) == struct.pack("<3H", 0, 2, 1)
+    # Valores verdadeiros quaisquer contam como marcados
+    assert codificar([0, 5, True]) == struct.pack("<2H", 1, 2)
+
+def test_codificar_sem_dias():
+    assert codificar([]) == struct.pack("<H", 0)
+    assert decodificar(codificar([]), 0) == bytearray()
+
+def test_ano_sem_ocorrencias_tem_uma_corrida():
+    sequencia = codificar([0] * 365)
+    assert sequencia == struct.pack("<H", 365)
+    assert intervalos(sequencia, 2025) == []
+
+def test_ida_e_volta_preserva_os_bits():
+    gerador = random.Random(42)
+    for dias in (365, 366):
+        for densidade in (0.0, 0.05, 0.5, 1.0):
+            bits = bytearray(1 if gerador.random() < densidade else 0 for _ in range(dias))
+            assert decodificar(codificar(bits), dias) == bits
+
+def test_intervalos_em_ordinais():
+    bits = [0] * 365
+    bits[0] = bits[1] = 1  # 1º e 2/01
+    bits[364] = 1  # 31/12
+    assert intervalos(codificar(bits), 2025) == [(_dia(1, 1), _dia(1, 2)), (_dia(12, 31), _dia(12, 31))]
+
+def test_recortar_ao_periodo_e_unir_contiguos():
+    ultimo_dia = (date(2024, 12, 31).toordinal(), date(2024, 12, 31).toordinal())
+    primeiros = (_dia(1, 1), _dia(1, 3))
+    fora = (_dia(2, 1), _dia(2, 5))
+    assert _recortar([primeiros, ultimo_dia, fora], date(2024, 12, 1).toordinal(), _dia(1, 2)) == [
+        (date(2024, 12, 31).toordinal(), _dia(1, 2))
+    ]
+
+def test_maior_sequencia_sem_ocorrencias():
+    assert maior_sequencia([], []) == (0, None)
+
+def test_fim_de_semana_nao_interrompe_a_sequencia():
+    # Faltas na quinta e sexta e na segunda; sábado e domingo são descanso
+    faltas = [(_dia(3, 13), _dia(3, 14)), (_dia(3, 17), _dia(3, 17))]
+    descansos = [(_dia(3, 15), _dia(3, 16))]
+    assert maior_sequencia(faltas, descansos) == (3, (_dia(3, 13), _dia(3, 17)))
+
+def test_dia_trabalhado_interrompe_a_sequencia():
+    faltas = [(_dia(3, 10), _dia(3, 11)), (_dia(3, 13), _dia(3, 15))]
+    assert maior_sequencia(faltas, []) == (3, (_dia(3, 13), _dia(3, 15)))
+
+def test_descanso_que_cobre_so_parte_da_lacuna_interrompe():
+    faltas = [(_dia(3, 10), _dia(3, 10)), (_dia(3, 14), _dia(3, 14))]
+    descansos = [(_dia(3, 11), _dia(3, 12))]  # 13/03 foi trabalhado
+    assert maior_sequencia(faltas, descansos) == (1, (_dia(3, 10), _dia(3, 10)))
+
+def test_empate_mantem_a_primeira_sequencia():
+    faltas = [(_dia(3, 3), _dia(3, 4)), (_dia(3, 10), _dia(3, 11))]
+    assert maior_sequencia(faltas, []) == (2, (_dia(3, 3), _dia(3, 4)))
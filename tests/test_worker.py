@@ -0,0 +1,59 @@
+# tests/test_worker.py
+"""Worker com uma única thread executando uma tarefa real da fila."""
+from datetime import datetime
+import os
+import threading
+import time
+
+from app.core.config import settings
+from app.models.batida import BatidaOriginal, BatidaProcessada
+from app.models.servidor import Servidor
+from app.models.tarefa_processamento import TarefaProcessamento
+from app.services.batida_processor_service import ProcessadorBatidas
+from app.services.fila_tarefas import enfileirar_tarefa
+from app.worker import Worker
+
+def test_uma_thread_executa_processar_batidas(db, monkeypatch):
+    servidor = Servidor(nome="Servidor Teste", matricula="0001", cpf="00000000191")
+    db.add(servidor)
+    db.flush()
+    for i, hora in enumerate((8, 12, 13, 17)):
+        db.add(BatidaOriginal(
+            servidor_id=servidor.id, data_hora=datetime(2025, 3, 12, hora), tipo="entrada" if i % 2 == 0 else "saida"
+        ))
+    tarefa = enfileirar_tarefa(db, "processar_batidas")
+    db.commit()
+
+    # A sessão, o cursor da varredura e o sinal de vida ficam abertos ao mesmo tempo
+    processar_lote = ProcessadorBatidas._processar_lote
+
+    def processar_lote_lento(self, *args):
+        time.sleep(0.2)
+        return processar_lote(self, *args)
+
+    monkeypatch.setattr(ProcessadorBatidas, "_processar_lote", processar_lote_lento)
+    monkeypatch.setattr(settings, "DATABASE_URL", os.environ["TEST_DATABASE_URL"])
+    monkeypatch.setattr(settings, "WORKER_INTERVALO_SINAL", 0.01)
+
+    worker = Worker(concorrencia=1, intervalo_poll=0.05)
+    thread = threading.Thread(target=worker._laco, args=(0,), daemon=True)
+    thread.start()
+    try:
+        limite = time.monotonic() + 60
+        while time.monotonic() < limite:
+            db.expire_all()
+            situacao = db.get(TarefaProcessamento, tarefa.id)
+            # Concluída, com erro ou devolvida à fila após uma falha
+            if situacao.status in ("concluida", "erro") or situacao.erro:
+                break
+            time.sleep(0.05)
+    finally:
+        worker.parar()
+        thread.join(timeout=10)
+        worker.engine.dispose()
+
+    db.expire_all()
+    executada = db.get(TarefaProcessamento, tarefa.id)
+    assert executada.status == "concluida", executada.erro
+    assert executada.tentativas == 1
+    assert db.query(BatidaProcessada).count() == 4